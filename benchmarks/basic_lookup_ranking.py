@@ -0,0 +1,119 @@
+"""
+Measures the time and peak memory of ranking the entries of a basic archive, collecting every entry and sorting
+them as lookups used to, against streaming the entries through the bounded heap of heapq.nlargest. Entries are
+generated page by page as they are read from the indexed entries table. The time is measured without memory
+tracing, the peak memory in a second, traced run.
+
+Usage: python -m benchmarks.basic_lookup_ranking [--entries 1000000] [--max-entries 10] [--page-size 1000]
+"""
+import argparse
+import heapq
+import random
+import time
+import tracemalloc
+
+from datetime import datetime, timedelta, UTC as utc_tz
+
+from omnilake.constructs.archives.basic.runtime.lookup import _entry_rank
+from omnilake.tables.indexed_entries.client import IndexedEntry
+
+
+_TAGS = tuple(f'tag {idx}' for idx in range(200))
+
+
+def entry_pages(entries: int, page_size: int, seed: int = 0):
+    """
+    Generate pages of indexed entries with 5 random tags and a random effective date each.
+
+    Keyword arguments:
+    entries -- The number of entries
+    page_size -- The number of entries per page
+    seed -- The seed of the generator, the same seed generates the same entries
+    """
+    rng = random.Random(seed)
+
+    start = datetime(2020, 1, 1, tzinfo=utc_tz)
+
+    for page_start in range(0, entries, page_size):
+        yield [
+            IndexedEntry(
+                archive_id='benchmark',
+                entry_id=f'entry-{idx}',
+                effective_on=start + timedelta(minutes=rng.randrange(2_000_000)),
+                tags=rng.sample(_TAGS, k=5),
+            )
+            for idx in range(page_start, min(page_start + page_size, entries))
+        ]
+
+
+def full_sort(pages, max_entries: int, prioritized_tags):
+    """
+    Collect every entry and sort them all, keeping the max_entries highest ranked.
+
+    Keyword arguments:
+    pages -- The pages of entries
+    max_entries -- The number of entries to keep
+    prioritized_tags -- The prioritized tags
+    """
+    found_entries = [entry for page in pages for entry in page]
+
+    ranked = sorted(found_entries, key=lambda entry: _entry_rank(entry, prioritized_tags), reverse=True)
+
+    return [entry.entry_id for entry in ranked[:max_entries]]
+
+
+def streamed_heap(pages, max_entries: int, prioritized_tags):
+    """
+    Stream the entries through a heap of max_entries, as basic lookups do.
+
+    Keyword arguments:
+    pages -- The pages of entries
+    max_entries -- The number of entries to keep
+    prioritized_tags -- The prioritized tags
+    """
+    found_entries = (entry for page in pages for entry in page)
+
+    ranked = heapq.nlargest(max_entries, found_entries, key=lambda entry: _entry_rank(entry, prioritized_tags))
+
+    return [entry.entry_id for entry in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure ranking the entries of a basic archive')
+
+    parser.add_argument('--entries', type=int, default=1000000, help='Entries of the archive')
+
+    parser.add_argument('--max-entries', type=int, default=10, help='Entries selected by the lookup')
+
+    parser.add_argument('--page-size', type=int, default=1000, help='Entries per page read from the table')
+
+    args = parser.parse_args()
+
+    prioritized_tags = list(_TAGS[:3])
+
+    print(f'Archive: {args.entries} entries, selecting {args.max_entries}')
+
+    selected = {}
+
+    for label, rank in (('full sort', full_sort), ('streamed heap', streamed_heap)):
+        started = time.perf_counter()
+
+        selected[label] = rank(entry_pages(args.entries, args.page_size), args.max_entries, prioritized_tags)
+
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+
+        rank(entry_pages(args.entries, args.page_size), args.max_entries, prioritized_tags)
+
+        _, peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.stop()
+
+        print(f'{label:>13}: {elapsed:.1f} s, peak memory {peak / 2 ** 20:.1f} MiB')
+
+    print(f'Same entries selected: {selected["full sort"] == selected["streamed heap"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Measures the throughput of the sentence chunker over synthetic prose
+
+Usage: python -m benchmarks.chunking_throughput [--megabytes 1] [--max-tokens 256] [--overlap-tokens 32]
+"""
+import argparse
+import random
+import time
+
+from omnilake.constructs.archives.vector.runtime.chunking import (
+    DEFAULT_CHUNK_OVERLAP_TOKENS,
+    DEFAULT_MAX_CHUNK_TOKENS,
+    count_tokens,
+    sentence_chunk_spans,
+)
+
+
+_WORDS = (
+    'archive', 'entry', 'vector', 'lookup', 'source', 'summary', 'request', 'chunk', 'embedding', 'index', 'shard',
+    'the', 'of', 'and', 'to', 'a', 'in', 'is', 'that', 'for', 'it', 'with', 'as', 'was', 'on', 'by', 'data', 'lake',
+)
+
+
+def synthetic_prose(size: int, seed: int = 0) -> str:
+    """
+    Generate prose of at least size characters, sentences of 5 to 40 words grouped into paragraphs of 1 to 8
+    sentences.
+
+    Keyword arguments:
+    size -- The minimum number of characters
+    seed -- The seed of the generator, the same seed generates the same prose
+    """
+    rng = random.Random(seed)
+
+    paragraphs = []
+
+    length = 0
+
+    while length < size:
+        sentences = []
+
+        for _ in range(rng.randint(1, 8)):
+            words = rng.choices(_WORDS, k=rng.randint(5, 40))
+
+            sentences.append(' '.join(words).capitalize() + rng.choice('.!?'))
+
+        paragraph = ' '.join(sentences)
+
+        paragraphs.append(paragraph)
+
+        length += len(paragraph) + 2
+
+    return '\n\n'.join(paragraphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the throughput of the sentence chunker')
+
+    parser.add_argument('--megabytes', type=float, default=1.0, help='Size of the synthetic text')
+
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_CHUNK_TOKENS, help='Token budget of a chunk')
+
+    parser.add_argument('--overlap-tokens', type=int, default=DEFAULT_CHUNK_OVERLAP_TOKENS,
+                        help='Tokens of overlap between consecutive chunks')
+
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs, the fastest is reported')
+
+    args = parser.parse_args()
+
+    text = synthetic_prose(int(args.megabytes * 1024 * 1024))
+
+    timings = []
+
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+
+        spans = list(sentence_chunk_spans(text, max_tokens=args.max_tokens, overlap_tokens=args.overlap_tokens))
+
+        timings.append(time.perf_counter() - started)
+
+    max_chunk_tokens = max(count_tokens(text, start, end) for start, end in spans)
+
+    megabytes = len(text.encode('utf-8')) / 1024 / 1024
+
+    print(f'Text: {megabytes:.2f} MB, {len(spans)} chunks, largest chunk {max_chunk_tokens} tokens '
+          f'(budget {args.max_tokens})')
+
+    print(f'Throughput: {megabytes / min(timings):.1f} MB/s (fastest of {args.repeat} runs)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures the wall clock time to embed the chunks of an entry, one request per chunk as before batching and with
+batched, concurrent requests, against a stubbed Bedrock client with injected latency
+
+Usage: python -m benchmarks.embedding_batching [--entries 20] [--chunks-per-entry 40] [--latency-ms 80]
+"""
+import argparse
+import io
+import json
+import threading
+import time
+
+from omnilake.constructs.archives.vector.runtime.embeddings import MAX_EMBEDDING_BATCH_SIZE, EmbeddingGenerator
+
+
+class StubBedrockClient:
+    """
+    Bedrock runtime client returning embeddings after a fixed latency per request plus a latency per embedded text
+    """
+    def __init__(self, dimensions: int = 1024, latency: float = 0.08, text_latency: float = 0.001):
+        """
+        Initialize the stub
+
+        Keyword arguments:
+        dimensions -- The number of dimensions of the returned embeddings
+        latency -- Seconds every request takes
+        text_latency -- Seconds added to a request for every text it embeds
+        """
+        self.dimensions = dimensions
+
+        self.latency = latency
+
+        self.text_latency = text_latency
+
+        self.requests = 0
+
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId: str, contentType: str, accept: str, body: str):
+        texts = json.loads(body)['texts']
+
+        with self._lock:
+            self.requests += 1
+
+        time.sleep(self.latency + self.text_latency * len(texts))
+
+        response_body = {'embeddings': [[0.1] * self.dimensions for _ in texts]}
+
+        return {'body': io.BytesIO(json.dumps(response_body).encode('utf-8'))}
+
+
+def time_entries(generator: EmbeddingGenerator, entries: int, chunks_per_entry: int) -> float:
+    """
+    Embed the chunks of every entry, returning the mean wall clock seconds per entry
+
+    Keyword arguments:
+    generator -- The embedding generator
+    entries -- The number of entries embedded
+    chunks_per_entry -- The number of chunks of every entry
+    """
+    started = time.perf_counter()
+
+    for entry_idx in range(entries):
+        generator.embed([f'Entry {entry_idx} chunk {chunk_idx}' for chunk_idx in range(chunks_per_entry)])
+
+    return (time.perf_counter() - started) / entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the wall clock time of embedding the chunks of an entry')
+
+    parser.add_argument('--entries', type=int, default=20, help='Number of entries embedded')
+
+    parser.add_argument('--chunks-per-entry', type=int, default=40, help='Number of chunks of every entry')
+
+    parser.add_argument('--latency-ms', type=float, default=80, help='Latency of every embedding request')
+
+    parser.add_argument('--text-latency-ms', type=float, default=1, help='Latency added per embedded text')
+
+    parser.add_argument('--max-batch-size', type=int, default=MAX_EMBEDDING_BATCH_SIZE,
+                        help='Texts per request when batching')
+
+    parser.add_argument('--max-concurrency', type=int, default=4, help='Concurrent requests when batching')
+
+    args = parser.parse_args()
+
+    results = {}
+
+    for label, max_batch_size, max_concurrency in (
+        ('unbatched', 1, 1),
+        ('batched', args.max_batch_size, args.max_concurrency),
+    ):
+        client = StubBedrockClient(latency=args.latency_ms / 1000, text_latency=args.text_latency_ms / 1000)
+
+        generator = EmbeddingGenerator(
+            bedrock_client=client,
+            max_batch_size=max_batch_size,
+            max_concurrency=max_concurrency,
+        )
+
+        results[label] = time_entries(generator, entries=args.entries, chunks_per_entry=args.chunks_per_entry)
+
+        print(f'{label:>9}: {results[label] * 1000:.0f} ms per entry, {client.requests / args.entries:.1f} requests '
+              f'per entry (batch size {max_batch_size}, concurrency {max_concurrency})')
+
+    print(f'Speedup: {results["unbatched"] / results["batched"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Measures the relevance and latency of vector only, keyword only and hybrid lookups against a local LanceDB table.
+Every synthetic chunk shares the words and the embedding neighborhood of its topic and carries one identifier of its
+own, every query asks for the identifier of one chunk with a noisy embedding of it, the case keyword search covers
+and vector search alone cannot tell apart from the chunk's topic.
+
+Usage: python -m benchmarks.hybrid_retrieval [--rows 20000] [--dimensions 256] [--queries 200] [--query-noise 0.5]
+"""
+import argparse
+import random
+import tempfile
+
+import lancedb
+import numpy as np
+
+from omnilake.constructs.archives.vector.runtime.query import reciprocal_rank_fusion
+from omnilake.constructs.archives.vector.runtime.vector_storage import FULL_TEXT_COLUMN
+
+from benchmarks.vector_tables import chunk_rows, clustered_vectors, time_calls
+
+
+_TOPIC_WORDS = (
+    'archive', 'entry', 'vector', 'lookup', 'source', 'summary', 'request', 'chunk', 'embedding', 'index', 'shard',
+    'invoice', 'contract', 'release', 'incident', 'customer', 'policy', 'schedule', 'budget', 'report', 'design',
+)
+
+
+def synthetic_texts(rows: int, topics: int, seed: int = 0):
+    """
+    Generate the text of every chunk, a sentence of its topic's words followed by its identifier. Returns the texts
+    and the identifier of every chunk.
+
+    Keyword arguments:
+    rows -- The number of chunks
+    topics -- The number of topics
+    seed -- The seed of the generator
+    """
+    rng = random.Random(seed)
+
+    topic_words = [rng.sample(_TOPIC_WORDS, k=6) for _ in range(topics)]
+
+    identifiers = [f'ref{idx:07d}' for idx in range(rows)]
+
+    texts = [
+        ' '.join(rng.choices(topic_words[idx % topics], k=12)) + f' identifier {identifiers[idx]}.'
+        for idx in range(rows)
+    ]
+
+    return texts, identifiers
+
+
+def reciprocal_rank(expected: str, found) -> float:
+    """
+    Return the reciprocal rank of the expected chunk among the found chunk IDs, 0 when it was not found.
+
+    Keyword arguments:
+    expected -- The expected chunk ID
+    found -- The found chunk IDs, best first
+    """
+    return 1 / (found.index(expected) + 1) if expected in found else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the relevance and latency of hybrid lookups')
+
+    parser.add_argument('--rows', type=int, default=20000, help='Rows of the vector table')
+
+    parser.add_argument('--dimensions', type=int, default=256, help='Dimensions of the vectors')
+
+    parser.add_argument('--queries', type=int, default=200, help='Number of timed queries per mode')
+
+    parser.add_argument('--k', type=int, default=10, help='Hits returned by every lookup')
+
+    parser.add_argument('--chunk-spread', type=float, default=0.05, help='Spread of the embeddings of a topic\'s '
+                        'chunks around it, relative to its length')
+
+    parser.add_argument('--query-noise', type=float, default=0.5, help='Noise of the query embeddings, relative to '
+                        'the length of the embedding of the chunk they ask for')
+
+    args = parser.parse_args()
+
+    topics = max(args.rows // 20, 1)
+
+    texts, identifiers = synthetic_texts(rows=args.rows, topics=topics)
+
+    rng = np.random.default_rng(1)
+
+    # The chunks of a topic share its words and nearly its embedding, as passages about the same thing do
+    vectors = clustered_vectors(rows=topics, dimensions=args.dimensions)[np.arange(args.rows) % topics]
+
+    vectors = vectors + rng.standard_normal(vectors.shape).astype(np.float32) * (
+        args.chunk_spread / np.sqrt(args.dimensions)
+    )
+
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    targets = rng.choice(args.rows, size=args.queries, replace=False)
+
+    query_vectors = vectors[targets] + rng.standard_normal((args.queries, args.dimensions)).astype(np.float32) * (
+        args.query_noise / np.sqrt(args.dimensions)
+    )
+
+    query_strings = [f'identifier {identifiers[target]}' for target in targets]
+
+    expected = [f'chunk-{target}' for target in targets]
+
+    with tempfile.TemporaryDirectory() as uri:
+        table = lancedb.connect(uri).create_table('benchmark_chunks', data=chunk_rows(vectors, texts=texts))
+
+        table.create_fts_index(FULL_TEXT_COLUMN, replace=True, use_tantivy=False)
+
+        def _vector_hits(call_number):
+            search = table.search(query_vectors[call_number]).metric('cosine')
+
+            return search.select(['chunk_id']).limit(args.k).to_list()
+
+        def _keyword_hits(call_number):
+            search = table.search(query_strings[call_number], query_type='fts')
+
+            return search.select(['chunk_id']).limit(args.k).to_list()
+
+        def _hybrid(keyword_weight):
+            def _lookup(call_number):
+                fused = reciprocal_rank_fusion(
+                    rankings=[_vector_hits(call_number), _keyword_hits(call_number)],
+                    weights=[1 - keyword_weight, keyword_weight],
+                )
+
+                return [hit['chunk_id'] for hit in fused[:args.k]]
+
+            return _lookup
+
+        modes = {
+            'vector only': lambda call_number: [hit['chunk_id'] for hit in _vector_hits(call_number)],
+            'keyword only': lambda call_number: [hit['chunk_id'] for hit in _keyword_hits(call_number)],
+            'hybrid 0.3': _hybrid(0.3),
+            'hybrid 0.5': _hybrid(0.5),
+        }
+
+        timings = {label: time_calls(lookup, calls=args.queries) for label, lookup in modes.items()}
+
+    print(f'Table: {args.rows} rows of {args.dimensions} dimensions in {topics} topics, '
+          f'{args.queries} queries per mode')
+
+    for label, mode_timings in timings.items():
+        ranks = [reciprocal_rank(exp, found) for exp, found in zip(expected, mode_timings['results'])]
+
+        hit_rate = sum(1 for rank in ranks if rank) / len(ranks)
+
+        print(f'{label:>12}: MRR@{args.k} {np.mean(ranks):.3f}, hit rate {hit_rate:.3f}, '
+              f'p50 {mode_timings["p50"]:.2f} ms, p95 {mode_timings["p95"]:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
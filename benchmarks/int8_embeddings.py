@@ -0,0 +1,124 @@
+"""
+Measures the size, latency and recall of vector tables holding int8 embeddings, stored as float16, against tables
+holding float32 embeddings, and the recall recovered by rescoring int8 candidates with full precision embeddings.
+The int8 embeddings are the float embeddings quantized to 256 levels over the range of their values. The rescore
+latency leaves out embedding the text of the candidates at full precision, which is one model call per lookup.
+
+Usage: python -m benchmarks.int8_embeddings [--rows 100000] [--dimensions 1024] [--queries 100] [--rescore-factor 4]
+"""
+import argparse
+import os
+import tempfile
+
+import lancedb
+import numpy as np
+import pyarrow as pa
+
+from omnilake.constructs.archives.vector.runtime.query import rescore_hits
+
+from benchmarks.vector_tables import chunk_rows, exact_neighbors, recall_at_k, time_calls, vectors_and_queries
+
+
+def quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    """
+    Quantize the vectors to int8 values, returned as float32 for search.
+
+    Keyword arguments:
+    vectors -- The float vectors
+    """
+    low, high = float(vectors.min()), float(vectors.max())
+
+    levels = np.round((vectors - low) / (high - low) * 255) - 128
+
+    return levels.astype(np.float32)
+
+
+def directory_size(path: str) -> int:
+    """
+    Return the total size in bytes of the files under a directory.
+
+    Keyword arguments:
+    path -- The directory
+    """
+    return sum(
+        os.path.getsize(os.path.join(root, file_name))
+        for root, _, file_names in os.walk(path) for file_name in file_names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure int8 against float32 vector tables')
+
+    parser.add_argument('--rows', type=int, default=100000, help='Rows of the vector tables')
+
+    parser.add_argument('--dimensions', type=int, default=1024, help='Dimensions of the vectors')
+
+    parser.add_argument('--queries', type=int, default=100, help='Number of timed queries per table')
+
+    parser.add_argument('--k', type=int, default=10, help='Neighbors returned by every query, recall is measured at k')
+
+    parser.add_argument('--rescore-factor', type=int, default=4, help='Multiple of k fetched from the int8 table '
+                        'and rescored')
+
+    args = parser.parse_args()
+
+    vectors, queries = vectors_and_queries(rows=args.rows, queries=args.queries, dimensions=args.dimensions)
+
+    expected = exact_neighbors(vectors, queries, k=args.k)
+
+    quantized = quantize_int8(vectors)
+
+    quantized_queries = quantize_int8(queries)
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as uri:
+        db = lancedb.connect(uri)
+
+        float_table = db.create_table('float32_chunks', data=chunk_rows(vectors))
+
+        int8_table = db.create_table('int8_chunks', data=chunk_rows(quantized, value_type=pa.float16()))
+
+        sizes = {
+            'float32': directory_size(os.path.join(uri, 'float32_chunks.lance')),
+            'int8': directory_size(os.path.join(uri, 'int8_chunks.lance')),
+        }
+
+        def _lookup(table, query_vectors, limit):
+            def _search(call_number):
+                search = table.search(query_vectors[call_number]).metric('cosine').select(['chunk_id'])
+
+                return [hit['chunk_id'] for hit in search.limit(limit).to_list()]
+
+            return _search
+
+        def _rescored(call_number):
+            hits = int8_table.search(quantized_queries[call_number]).metric('cosine').select(['chunk_id']) \
+                .limit(args.k * args.rescore_factor).to_list()
+
+            # Stands in for embedding the text of the candidates at full precision
+            full_precision = [vectors[int(hit['chunk_id'].split('-', 1)[1])] for hit in hits]
+
+            return [hit['chunk_id'] for hit in rescore_hits(queries[call_number], hits, full_precision)[:args.k]]
+
+        float_timings = time_calls(_lookup(float_table, queries, args.k), args.queries)
+
+        results.append(('float32', sizes['float32'], float_timings))
+
+        int8_timings = time_calls(_lookup(int8_table, quantized_queries, args.k), args.queries)
+
+        results.append(('int8', sizes['int8'], int8_timings))
+
+        results.append((f'int8, rescore x{args.rescore_factor}', sizes['int8'], time_calls(_rescored, args.queries)))
+
+    print(f'Tables: {args.rows} rows of {args.dimensions} dimensions, {args.queries} queries per table')
+
+    for label, size, timings in results:
+        recall = recall_at_k(expected, timings['results'])
+
+        print(f'{label:>16}: {size / 2 ** 20:.1f} MiB, recall@{args.k} {recall:.3f}, '
+              f'p50 {timings["p50"]:.2f} ms, p95 {timings["p95"]:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
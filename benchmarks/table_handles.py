@@ -0,0 +1,73 @@
+"""
+Measures the latency of vector lookups against a local LanceDB table, connecting and opening the table for every
+lookup as a cold process does, against the warm handles of the table registry. Against local storage the cold
+overhead is only the manifest reads from disk, against S3 every read is a round trip.
+
+Usage: python -m benchmarks.table_handles [--rows 10000] [--dimensions 1024] [--lookups 200]
+"""
+import argparse
+import tempfile
+
+import lancedb
+
+from omnilake.constructs.archives.vector.runtime.table_registry import VectorTableRegistry
+
+from benchmarks.vector_tables import chunk_rows, time_calls, vectors_and_queries
+
+
+TABLE_NAME = 'benchmark_chunks'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the latency of cold and warm vector table handles')
+
+    parser.add_argument('--rows', type=int, default=10000, help='Rows of the vector table')
+
+    parser.add_argument('--dimensions', type=int, default=1024, help='Dimensions of the vectors')
+
+    parser.add_argument('--lookups', type=int, default=200, help='Number of timed lookups per mode')
+
+    parser.add_argument('--limit', type=int, default=10, help='Rows returned by every lookup')
+
+    args = parser.parse_args()
+
+    vectors, queries = vectors_and_queries(rows=args.rows, queries=args.lookups, dimensions=args.dimensions)
+
+    with tempfile.TemporaryDirectory() as uri:
+        lancedb.connect(uri).create_table(TABLE_NAME, data=chunk_rows(vectors))
+
+        def _search(table, call_number):
+            return table.search(queries[call_number]).metric('cosine').limit(args.limit).to_list()
+
+        registry = VectorTableRegistry(uri=uri)
+
+        registry.open_table(TABLE_NAME)
+
+        # Every lookup of a cold process connects and reads the table manifest again
+        modes = {
+            'cold': lambda: VectorTableRegistry(uri=uri).open_table(TABLE_NAME),
+            'warm': lambda: registry.open_table(TABLE_NAME),
+            'warm, latest': lambda: registry.open_table(TABLE_NAME, latest=True),
+        }
+
+        handle_timings = {
+            label: time_calls(lambda call_number: open_table(), calls=args.lookups)
+            for label, open_table in modes.items()
+        }
+
+        lookup_timings = {
+            label: time_calls(lambda call_number: _search(open_table(), call_number), calls=args.lookups)
+            for label, open_table in modes.items()
+        }
+
+    print(f'Table: {args.rows} rows of {args.dimensions} dimensions, {args.lookups} lookups per mode')
+
+    for label in modes:
+        handle, lookup = handle_timings[label], lookup_timings[label]
+
+        print(f'{label:>12}: handle p50 {handle["p50"]:.2f} ms, p95 {handle["p95"]:.2f} ms | '
+              f'lookup p50 {lookup["p50"]:.2f} ms, p95 {lookup["p95"]:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Measures the recall and latency of vector lookups against local LanceDB tables of increasing size, searched flat
+and through the IVF-PQ index built by the vector index lifecycle, at several nprobes and refine factors
+
+Usage: python -m benchmarks.vector_index_recall [--sizes 10000,100000,1000000] [--dimensions 256] [--k 10]
+"""
+import argparse
+import tempfile
+import time
+
+import lancedb
+
+from omnilake.constructs.archives.vector.runtime.vector_index import build_vector_index
+
+from benchmarks.vector_tables import chunk_rows, exact_neighbors, recall_at_k, time_calls, vectors_and_queries
+
+
+def _parse_ints(value: str):
+    return [int(part) for part in value.split(',') if part]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the recall and latency of flat and indexed vector lookups')
+
+    parser.add_argument('--sizes', type=_parse_ints, default=[10000, 100000, 1000000],
+                        help='Comma separated table sizes')
+
+    parser.add_argument('--dimensions', type=int, default=256, help='Dimensions of the vectors, 1M rows of 1024 '
+                        'dimensions take 4 GB')
+
+    parser.add_argument('--queries', type=int, default=100, help='Number of timed queries per configuration')
+
+    parser.add_argument('--k', type=int, default=10, help='Neighbors returned by every query, recall is measured at k')
+
+    parser.add_argument('--nprobes', type=_parse_ints, default=[10, 20, 50], help='Comma separated nprobes')
+
+    parser.add_argument('--refine-factors', type=_parse_ints, default=[0, 5], help='Comma separated refine factors, '
+                        '0 skips refinement')
+
+    args = parser.parse_args()
+
+    print(f'{"rows":>9} {"search":>24} {"recall@" + str(args.k):>10} {"p50 ms":>9} {"p95 ms":>9}')
+
+    for size in args.sizes:
+        vectors, queries = vectors_and_queries(rows=size, queries=args.queries, dimensions=args.dimensions)
+
+        expected = exact_neighbors(vectors, queries, k=args.k)
+
+        with tempfile.TemporaryDirectory() as uri:
+            table = lancedb.connect(uri).create_table('benchmark_chunks', data=chunk_rows(vectors))
+
+            def _lookup(call_number, nprobes=None, refine_factor=None):
+                search = table.search(queries[call_number]).metric('cosine').select(['chunk_id']).limit(args.k)
+
+                if nprobes:
+                    search = search.nprobes(nprobes)
+
+                if refine_factor:
+                    search = search.refine_factor(refine_factor)
+
+                return [hit['chunk_id'] for hit in search.to_list()]
+
+            results = [('flat', time_calls(_lookup, calls=args.queries))]
+
+            started = time.perf_counter()
+
+            build_vector_index(table, total_rows=size)
+
+            print(f'{size:>9} {"index build":>24} {"":>10} {(time.perf_counter() - started) * 1000:>9.0f}')
+
+            for nprobes in args.nprobes:
+                for refine_factor in args.refine_factors:
+                    timings = time_calls(
+                        lambda call_number: _lookup(call_number, nprobes=nprobes, refine_factor=refine_factor),
+                        calls=args.queries,
+                    )
+
+                    results.append((f'ivf_pq nprobes={nprobes} refine={refine_factor}', timings))
+
+        for label, timings in results:
+            recall = recall_at_k(expected, timings['results'])
+
+            print(f'{size:>9} {label:>24} {recall:>10.3f} {timings["p50"]:>9.2f} {timings["p95"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Synthetic vector tables and measurements shared by the vector archive benchmarks
+"""
+import time
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+
+def clustered_vectors(rows: int, dimensions: int, clusters: Optional[int] = None, spread: float = 0.7,
+                      seed: int = 0) -> np.ndarray:
+    """
+    Generate unit length float32 vectors grouped around random cluster centers, closer to the neighborhoods of
+    real embeddings than uniformly random vectors, which make every neighbor nearly equidistant.
+
+    Keyword arguments:
+    rows -- The number of vectors
+    dimensions -- The number of dimensions of every vector
+    clusters -- The number of cluster centers, defaults to one per 20 rows
+    spread -- The standard deviation of the vectors around their center, relative to the center's length
+    seed -- The seed of the generator, the same seed generates the same centers and vectors
+    """
+    rng = np.random.default_rng(seed)
+
+    clusters = clusters or max(rows // 20, 1)
+
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+
+    vectors = np.empty((rows, dimensions), dtype=np.float32)
+
+    # Generated in blocks to bound the memory of the intermediate arrays
+    for start in range(0, rows, 100_000):
+        end = min(start + 100_000, rows)
+
+        noise = rng.standard_normal((end - start, dimensions)).astype(np.float32) * (spread / np.sqrt(dimensions))
+
+        vectors[start:end] = centers[rng.integers(0, clusters, end - start)] + noise
+
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors
+
+
+def vectors_and_queries(rows: int, queries: int, dimensions: int, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate clustered vectors and queries held out of the same clusters, so every query has close neighbors.
+
+    Keyword arguments:
+    rows -- The number of vectors
+    queries -- The number of queries
+    dimensions -- The number of dimensions of every vector
+    kwargs -- Passed on to clustered_vectors
+    """
+    kwargs.setdefault('clusters', max(rows // 20, 1))
+
+    generated = clustered_vectors(rows=rows + queries, dimensions=dimensions, **kwargs)
+
+    return generated[:rows], generated[rows:]
+
+
+def chunk_rows(vectors: np.ndarray, texts: Optional[Sequence[str]] = None,
+               value_type: pa.DataType = pa.float32()) -> pa.Table:
+    """
+    Return the vectors as rows of a vector archive table, with entry and chunk IDs derived from their position.
+
+    Keyword arguments:
+    vectors -- The vectors of the rows
+    texts -- Optional text of every row
+    value_type -- The value type the vectors are stored as
+    """
+    rows, dimensions = vectors.shape
+
+    columns = {
+        'entry_id': pa.array([f'entry-{idx // 4}' for idx in range(rows)]),
+        'chunk_id': pa.array([f'chunk-{idx}' for idx in range(rows)]),
+    }
+
+    if texts is not None:
+        columns['text'] = pa.array(texts, type=pa.string())
+
+    columns['vector'] = pa.FixedSizeListArray.from_arrays(
+        pa.array(vectors.reshape(-1), type=pa.float32()).cast(value_type),
+        dimensions,
+    )
+
+    return pa.table(columns)
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[List[str]]:
+    """
+    Return the chunk IDs of the k nearest rows of every query by cosine distance, the ground truth of recall.
+
+    Keyword arguments:
+    vectors -- The unit length vectors of the rows
+    queries -- The unit length query vectors
+    k -- The number of neighbors
+    """
+    neighbors = []
+
+    for query in queries:
+        similarities = vectors @ query
+
+        nearest = np.argpartition(-similarities, k)[:k]
+
+        nearest = nearest[np.argsort(-similarities[nearest])]
+
+        neighbors.append([f'chunk-{idx}' for idx in nearest])
+
+    return neighbors
+
+
+def recall_at_k(expected: List[List[str]], found: List[List[str]]) -> float:
+    """
+    Return the mean share of the expected neighbors of every query that were found.
+
+    Keyword arguments:
+    expected -- The expected chunk IDs of every query
+    found -- The found chunk IDs of every query
+    """
+    return float(np.mean([len(set(exp) & set(fnd)) / len(exp) for exp, fnd in zip(expected, found)]))
+
+
+def time_calls(call: Callable[[int], List[str]], calls: int) -> Dict:
+    """
+    Time a call repeatedly, returning the results of every call and the latency percentiles in milliseconds.
+
+    Keyword arguments:
+    call -- The call, given the number of the call
+    calls -- The number of calls
+    """
+    latencies = []
+
+    results = []
+
+    for call_number in range(calls):
+        started = time.perf_counter()
+
+        results.append(call(call_number))
+
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'results': results,
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95)),
+        'mean': float(np.mean(latencies)),
+    }
@@ -47,12 +47,36 @@ class VectorArchiveConfiguration(RequestBody):
             optional=True,
         ),
 
+        RequestBodyAttribute(
+            'chunk_overlap_tokens',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'chunking_strategy',
+            default='CHARACTER',
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'embedding_type',
+            default='FLOAT',
+            optional=True,
+        ),
+
         RequestBodyAttribute(
             'max_chunk_length',
             attribute_type=RequestAttributeType.INTEGER,
             optional=True,
         ),
 
+        RequestBodyAttribute(
+            'max_chunk_tokens',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
         RequestBodyAttribute(
             'retain_latest_originals_only',
             attribute_type=RequestAttributeType.BOOLEAN,
@@ -60,6 +84,19 @@ class VectorArchiveConfiguration(RequestBody):
             optional=True,
         ),
 
+        RequestBodyAttribute(
+            'shard_count',
+            attribute_type=RequestAttributeType.INTEGER,
+            default=1,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'shard_strategy',
+            default='HASH',
+            optional=True,
+        ),
+
         RequestBodyAttribute(
             'tag_hint_instructions',
             optional=True,
@@ -69,11 +106,21 @@ class VectorArchiveConfiguration(RequestBody):
             'tag_model_id',
             optional=True,
         ),
+
+        RequestBodyAttribute(
+            'write_buffering',
+            attribute_type=RequestAttributeType.BOOLEAN,
+            default=False,
+            optional=True,
+        ),
     ]
 
     def __init__(self, chunk_body_overlap_percentage: Optional[int] = None, max_chunk_length: Optional[int] = None,
                  retain_latest_originals_only: Optional[bool] = None, tag_hint_instructions: Optional[str] = None,
-                 tag_model_id: Optional[str] = None):
+                 tag_model_id: Optional[str] = None, chunking_strategy: Optional[str] = None,
+                 max_chunk_tokens: Optional[int] = None, chunk_overlap_tokens: Optional[int] = None,
+                 write_buffering: Optional[bool] = None, embedding_type: Optional[str] = None,
+                 shard_count: Optional[int] = None, shard_strategy: Optional[str] = None):
         """
         Initialize the VectorArchiveConfiguration
 
@@ -81,17 +128,37 @@ class VectorArchiveConfiguration(RequestBody):
         chunk_body_overlap_percentage -- The chunk body overlap percentage for the vector archive, dictates how the vector
                                         ingestion process will chunk the body of the archive
         max_chunk_length -- The max chunk length for the vector archive, dictates the maximum length of a chunk
+        embedding_type -- The embedding type stored by the vector archive, FLOAT stores float32 embeddings, INT8 stores
+                          the int8 quantized embeddings at half the size, pair with a lookup rescore_factor to recover recall
+        chunking_strategy -- How entries are chunked, CHARACTER slices fixed length character windows, SENTENCE packs
+                             whole sentences into chunks bounded by a token budget
+        max_chunk_tokens -- The token budget of each chunk when using the SENTENCE chunking strategy
+        chunk_overlap_tokens -- The number of tokens shared by consecutive chunks when using the SENTENCE chunking strategy
         retain_latest_originals_only -- Whether or not to retain only the latest originals
+        shard_count -- The number of vector stores the archive is split across, shards can be added later on through
+                       the omnilake_archive_vector_add_shard_request event
+        shard_strategy -- How new entries are routed to the shards, HASH spreads them evenly by entry ID, TIME writes them
+                          to the most recently added shard
         tag_hint_instructions -- The tag hint instructions for the vector archive, dictates how the vector ingestion process
                                     will generate tags for the archive
         tag_model_id -- The tag model id for the vector archive, dictates the model to use for generating tags
+        write_buffering -- Whether or not to stage the vectors of new entries and commit them to the vector store in
+                           batches, new entries become searchable up to the vector storage write_buffer_max_seconds
+                           setting later
         """
         super().__init__(
             chunk_body_overlap_percentage=chunk_body_overlap_percentage,
+            chunk_overlap_tokens=chunk_overlap_tokens,
+            chunking_strategy=chunking_strategy,
+            embedding_type=embedding_type,
             max_chunk_length=max_chunk_length,
+            max_chunk_tokens=max_chunk_tokens,
             retain_latest_originals_only=retain_latest_originals_only,
+            shard_count=shard_count,
+            shard_strategy=shard_strategy,
             tag_hint_instructions=tag_hint_instructions,
             tag_model_id=tag_model_id,
+            write_buffering=write_buffering,
         )
 
 
@@ -281,6 +348,173 @@ class DirectSourceLookup(RequestBody):
         )
 
 
+class FederatedVectorLookup(RequestBody):
+    """
+    This is a lookup instruction, it describes how the lake should lookup information.
+
+    This is a federated vector lookup, it will lookup information across all of the vector archives provided. The
+    query is embedded once and the entries of all archives are ranked together, returning the best max_entries
+    distinct entries across the archives.
+
+    Keyword Arguments:
+    archive_ids -- The archive_ids to lookup
+    max_entries -- The maximum number of entries to return
+    query_string -- The query string the vector store will use for lookup
+    prioritize_tags -- The tags to prioritize in the lookup
+    nprobes -- The number of ANN index partitions to probe, higher values trade latency for recall
+    refine_factor -- The ANN refine factor, higher values trade latency for recall
+    rescore_factor -- Fetch rescore_factor times the candidates from archives storing int8 embeddings and re-rank them by
+                      full precision embeddings of their text, recovers the recall lost to the quantized embeddings
+    keyword_weight -- Weight between 0 and 1 of the keyword (BM25) ranking fused with the vector ranking, 0 or unset
+                      performs a vector only lookup
+    return_passages -- Return only the matched passages of each entry, saved as new entries, instead of the whole entries
+    passage_neighbors -- The number of neighboring chunks included on each side of a matched passage
+    mmr_lambda -- Trade off between relevance (1) and diversity (0) of the returned entries, re-ranks the entries with
+                  maximal marginal relevance so near duplicates do not crowd out distinct entries, unset disables
+    effective_after -- Only lookup entries effective on or after this ISO 8601 datetime
+    effective_before -- Only lookup entries effective before this ISO 8601 datetime
+    required_tags -- Only lookup entries tagged with all of these tags
+    source_prefix -- Only lookup entries that are the original of a source whose resource name starts with this prefix
+    """
+    attribute_definitions = [
+        RequestBodyAttribute(
+            'archive_ids',
+            attribute_type=RequestAttributeType.LIST,
+        ),
+
+        RequestBodyAttribute(
+            'effective_after',
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'effective_before',
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'keyword_weight',
+            attribute_type=RequestAttributeType.FLOAT,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'max_entries',
+            attribute_type=RequestAttributeType.INTEGER,
+        ),
+
+        RequestBodyAttribute(
+            'mmr_lambda',
+            attribute_type=RequestAttributeType.FLOAT,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'nprobes',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'query_string',
+        ),
+
+        RequestBodyAttribute(
+            'prioritize_tags',
+            attribute_type=RequestAttributeType.LIST,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'passage_neighbors',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'refine_factor',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'request_type',
+            immutable_default='VECTOR',
+        ),
+
+        RequestBodyAttribute(
+            'required_tags',
+            attribute_type=RequestAttributeType.LIST,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'rescore_factor',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'return_passages',
+            attribute_type=RequestAttributeType.BOOLEAN,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'source_prefix',
+            optional=True,
+        ),
+    ]
+
+    def __init__(self, archive_ids: List[str], max_entries: int, query_string: str,
+                 prioritize_tags: Optional[List] = None, nprobes: Optional[int] = None,
+                 refine_factor: Optional[int] = None, keyword_weight: Optional[float] = None,
+                 return_passages: Optional[bool] = None, passage_neighbors: Optional[int] = None,
+                 rescore_factor: Optional[int] = None, effective_after: Optional[str] = None,
+                 effective_before: Optional[str] = None, required_tags: Optional[List[str]] = None,
+                 source_prefix: Optional[str] = None, mmr_lambda: Optional[float] = None):
+        """
+        Initialize the FederatedVectorLookup
+
+        Keyword Arguments:
+        archive_ids -- The archive_ids to lookup
+        max_entries -- The maximum number of entries to return
+        query_string -- The query string to use for lookup
+        prioritize_tags -- The tags to prioritize in the lookup
+        nprobes -- The number of ANN index partitions to probe
+        refine_factor -- The ANN refine factor
+        rescore_factor -- The full precision rescoring factor
+        keyword_weight -- The weight of the keyword ranking in a hybrid lookup
+        return_passages -- Whether only the matched passages are returned
+        passage_neighbors -- The number of neighboring chunks included with each matched passage
+        effective_after -- The ISO 8601 datetime matched entries are effective on or after
+        effective_before -- The ISO 8601 datetime matched entries are effective before
+        required_tags -- The tags every matched entry must have
+        source_prefix -- The prefix of the source resource name matched entries are the original of
+        mmr_lambda -- The relevance and diversity trade off of the maximal marginal relevance re-ranking
+        """
+        if not archive_ids:
+            raise ValueError('At least one archive_id is required')
+
+        super().__init__(
+            archive_ids=archive_ids,
+            effective_after=effective_after,
+            effective_before=effective_before,
+            keyword_weight=keyword_weight,
+            max_entries=max_entries,
+            mmr_lambda=mmr_lambda,
+            nprobes=nprobes,
+            passage_neighbors=passage_neighbors,
+            query_string=query_string,
+            prioritize_tags=prioritize_tags,
+            refine_factor=refine_factor,
+            required_tags=required_tags,
+            rescore_factor=rescore_factor,
+            return_passages=return_passages,
+            source_prefix=source_prefix,
+        )
+
+
 class RelatedRequestResponseLookup(RequestBody):
     """
     This is a lookup instruction, it describes how the lake should lookup information.
@@ -364,17 +598,59 @@ class VectorLookup(RequestBody):
     max_entries -- The maximum number of entries to return
     query_string -- The query string the vector store will use for lookup
     prioritize_tags -- The tags to prioritize in the lookup
+    nprobes -- The number of ANN index partitions to probe, higher values trade latency for recall
+    refine_factor -- The ANN refine factor, higher values trade latency for recall
+    rescore_factor -- Fetch rescore_factor times the candidates from archives storing int8 embeddings and re-rank them by
+                      full precision embeddings of their text, recovers the recall lost to the quantized embeddings
+    keyword_weight -- Weight between 0 and 1 of the keyword (BM25) ranking fused with the vector ranking, 0 or unset
+                      performs a vector only lookup
+    return_passages -- Return only the matched passages of each entry, saved as new entries, instead of the whole entries
+    passage_neighbors -- The number of neighboring chunks included on each side of a matched passage
+    mmr_lambda -- Trade off between relevance (1) and diversity (0) of the returned entries, re-ranks the entries with
+                  maximal marginal relevance so near duplicates do not crowd out distinct entries, unset disables
+    effective_after -- Only lookup entries effective on or after this ISO 8601 datetime
+    effective_before -- Only lookup entries effective before this ISO 8601 datetime
+    required_tags -- Only lookup entries tagged with all of these tags
+    source_prefix -- Only lookup entries that are the original of a source whose resource name starts with this prefix
     """
     attribute_definitions = [
         RequestBodyAttribute(
             'archive_id',
         ),
 
+        RequestBodyAttribute(
+            'effective_after',
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'effective_before',
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'keyword_weight',
+            attribute_type=RequestAttributeType.FLOAT,
+            optional=True,
+        ),
+
         RequestBodyAttribute(
             'max_entries',
             attribute_type=RequestAttributeType.INTEGER,
         ),
 
+        RequestBodyAttribute(
+            'mmr_lambda',
+            attribute_type=RequestAttributeType.FLOAT,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'nprobes',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
         RequestBodyAttribute(
             'query_string',
         ),
@@ -385,14 +661,54 @@ class VectorLookup(RequestBody):
             optional=True,
         ),
 
+        RequestBodyAttribute(
+            'passage_neighbors',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'refine_factor',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
         RequestBodyAttribute(
             'request_type',
             immutable_default='VECTOR',
-        )
+        ),
+
+        RequestBodyAttribute(
+            'required_tags',
+            attribute_type=RequestAttributeType.LIST,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'rescore_factor',
+            attribute_type=RequestAttributeType.INTEGER,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'return_passages',
+            attribute_type=RequestAttributeType.BOOLEAN,
+            optional=True,
+        ),
+
+        RequestBodyAttribute(
+            'source_prefix',
+            optional=True,
+        ),
     ]
 
     def __init__(self, archive_id: str, max_entries: int, query_string: str,
-                 prioritize_tags: Optional[List] = None):
+                 prioritize_tags: Optional[List] = None, nprobes: Optional[int] = None,
+                 refine_factor: Optional[int] = None, keyword_weight: Optional[float] = None,
+                 return_passages: Optional[bool] = None, passage_neighbors: Optional[int] = None,
+                 rescore_factor: Optional[int] = None, effective_after: Optional[str] = None,
+                 effective_before: Optional[str] = None, required_tags: Optional[List[str]] = None,
+                 source_prefix: Optional[str] = None, mmr_lambda: Optional[float] = None):
         """
         Initialize the VectorLookup
 
@@ -401,12 +717,34 @@ class VectorLookup(RequestBody):
         max_entries -- The maximum number of entries to return
         query_string -- The query string to use for lookup
         prioritize_tags -- The tags to prioritize in the lookup
+        nprobes -- The number of ANN index partitions to probe
+        refine_factor -- The ANN refine factor
+        rescore_factor -- The full precision rescoring factor
+        keyword_weight -- The weight of the keyword ranking in a hybrid lookup
+        return_passages -- Whether only the matched passages are returned
+        passage_neighbors -- The number of neighboring chunks included with each matched passage
+        effective_after -- The ISO 8601 datetime matched entries are effective on or after
+        effective_before -- The ISO 8601 datetime matched entries are effective before
+        required_tags -- The tags every matched entry must have
+        source_prefix -- The prefix of the source resource name matched entries are the original of
+        mmr_lambda -- The relevance and diversity trade off of the maximal marginal relevance re-ranking
         """
         super().__init__(
             archive_id=archive_id,
+            effective_after=effective_after,
+            effective_before=effective_before,
+            keyword_weight=keyword_weight,
             max_entries=max_entries,
+            mmr_lambda=mmr_lambda,
+            nprobes=nprobes,
+            passage_neighbors=passage_neighbors,
             query_string=query_string,
             prioritize_tags=prioritize_tags,
+            refine_factor=refine_factor,
+            required_tags=required_tags,
+            rescore_factor=rescore_factor,
+            return_passages=return_passages,
+            source_prefix=source_prefix,
         )
 
 
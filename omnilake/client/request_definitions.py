@@ -15,6 +15,7 @@ from omnilake.client.construct_request_definitions import (
     DirectEntryLookup,
     DirectResponseConfig,
     DirectSourceLookup,
+    FederatedVectorLookup,
     RelatedRequestResponseLookup,
     RelatedRequestSourcesLookup,
     SimpleResponseConfig,
@@ -718,7 +719,7 @@ class LakeRequest(RequestBody):
         RequestBodyAttribute(
             'lookup_instructions',
             attribute_type=RequestAttributeType.OBJECT_LIST,
-            supported_request_body_types=[BasicLookup, DirectEntryLookup, DirectSourceLookup, RelatedRequestResponseLookup, RelatedRequestSourcesLookup, VectorLookup],
+            supported_request_body_types=[BasicLookup, DirectEntryLookup, DirectSourceLookup, FederatedVectorLookup, RelatedRequestResponseLookup, RelatedRequestSourcesLookup, VectorLookup],
         ),
 
         # Name is used as a reference for chained requests
@@ -741,7 +742,7 @@ class LakeRequest(RequestBody):
         ),
     ]
 
-    def __init__(self, lookup_instructions: List[Union[Dict, BasicLookup, DirectEntryLookup, DirectSourceLookup, RelatedRequestResponseLookup, RelatedRequestSourcesLookup, VectorLookup]],
+    def __init__(self, lookup_instructions: List[Union[Dict, BasicLookup, DirectEntryLookup, DirectSourceLookup, FederatedVectorLookup, RelatedRequestResponseLookup, RelatedRequestSourcesLookup, VectorLookup]],
                     processing_instructions: Union[Dict, SummarizationProcessor],
                     response_config: Optional[Union[Dict, DirectResponseConfig, SimpleResponseConfig]] = None):
             """
@@ -1057,7 +1058,7 @@ class SubmitChainRequest(RequestBody):
 class SubmitLakeRequest(LakeRequest):
     path = '/submit_lake_request'
 
-    def __init__(self, lookup_instructions: List[Union[Dict, BasicLookup, DirectEntryLookup, DirectSourceLookup, RelatedRequestResponseLookup, RelatedRequestSourcesLookup, VectorLookup]],
+    def __init__(self, lookup_instructions: List[Union[Dict, BasicLookup, DirectEntryLookup, DirectSourceLookup, FederatedVectorLookup, RelatedRequestResponseLookup, RelatedRequestSourcesLookup, VectorLookup]],
                     processing_instructions: Union[Dict, SummarizationProcessor],
                     response_config: Optional[Union[Dict, SimpleResponseConfig]] = None):
         """
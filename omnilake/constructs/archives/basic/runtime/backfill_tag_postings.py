@@ -0,0 +1,143 @@
+"""
+Backfills the tag postings of the entries of a basic archive.
+
+Entries tagged before the tag postings were introduced have none, so prioritized lookups would rank them as if
+they matched none of the prioritized tags. Entries tagged before tags were normalized have their tags normalized
+along the way. The backfill walks the entries of the archive page by page, saving the key of the last page in the
+event it requests to continue with, so a large archive is backfilled across as many events as it takes. Once the
+last page is backfilled the archive is marked as backfilled, from then on lookups trust its tag postings.
+"""
+import logging
+import time
+
+from datetime import datetime, UTC as utc_tz
+from typing import Dict
+
+from da_vinci.core.immutable_object import ObjectBody
+from da_vinci.core.logging import Logger
+
+from da_vinci.exception_trap.client import ExceptionReporter
+
+from da_vinci.event_bus.client import fn_event_response, EventPublisher
+from da_vinci.event_bus.event import Event as EventBusEvent
+
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+from omnilake.internal_lib.tags import normalize_tags
+
+from omnilake.tables.indexed_entries.client import IndexedEntriesClient
+from omnilake.tables.jobs.client import Job, JobsClient
+from omnilake.tables.provisioned_archives.client import ArchivesClient
+from omnilake.tables.tag_postings.client import TagPosting, TagPostingsClient
+
+from omnilake.constructs.archives.basic.runtime.event_definitions import BasicArchiveBackfillTagPostingsSchema
+
+
+# Seconds of work done by a single event before the backfill continues in the next one, leaves ample headroom
+# within the function timeout for the page in progress
+BATCH_SECONDS = 600
+
+# Number of entries read per page
+ENTRY_PAGE_SIZE = 100
+
+
+_FN_NAME = 'omnilake.constructs.archives.basic.backfill_tag_postings'
+
+
+@fn_event_response(exception_reporter=ExceptionReporter(), function_name=_FN_NAME,
+                   logger=Logger(namespace=_FN_NAME))
+def handler(event: Dict, context: Dict):
+    """
+    Lambda handler for the tag postings backfill function. Normalizes the tags of every entry of the archive and
+    writes their postings, doing either again is harmless so an interrupted backfill can be requested again.
+    """
+    logging.debug(f'Received request: {event}')
+
+    source_event = EventBusEvent.from_lambda_event(event)
+
+    event_body = ObjectBody(
+        body=source_event.body,
+        schema=BasicArchiveBackfillTagPostingsSchema,
+    )
+
+    archive_id = event_body.get('archive_id')
+
+    checkpoint = event_body.get('checkpoint') or None
+
+    deadline = time.monotonic() + BATCH_SECONDS
+
+    entries = IndexedEntriesClient()
+
+    tag_postings = TagPostingsClient()
+
+    jobs = JobsClient()
+
+    with jobs.job_execution(Job(job_type='BASIC_TAG_POSTINGS_BACKFILL')):
+        backfilled_postings = 0
+
+        normalized_entries = 0
+
+        while time.monotonic() < deadline:
+            entry_page, checkpoint = entries.get_page_by_archive(
+                archive_id=archive_id,
+                exclusive_start_key=checkpoint,
+                limit=ENTRY_PAGE_SIZE,
+            )
+
+            postings = []
+
+            for entry in entry_page:
+                normalized_tags = normalize_tags(entry.tags or [])
+
+                if normalized_tags != (entry.tags or []):
+                    entry.tags = normalized_tags
+
+                    entries.put(entry)
+
+                    normalized_entries += 1
+
+                postings.extend([
+                    TagPosting(archive_id=archive_id, entry_id=entry.entry_id, effective_on=entry.effective_on, tag=tag)
+                    for tag in normalized_tags
+                ])
+
+            tag_postings.batch_put(postings)
+
+            backfilled_postings += len(postings)
+
+            if not checkpoint:
+                break
+
+        logging.info(f'Backfilled {backfilled_postings} tag postings and normalized the tags of {normalized_entries} '
+                     f'entries of archive {archive_id}')
+
+        # Prioritized lookups cached before the backfill ranked the entries without postings or normalized tags too low
+        bump_archive_write_version(archive_id)
+
+        if not checkpoint:
+            archives = ArchivesClient()
+
+            archive = archives.get(archive_id=archive_id)
+
+            # Prioritized lookups only trust the tag postings of an archive once every entry has them
+            archive.tag_postings_backfilled_on = datetime.now(tz=utc_tz)
+
+            archives.put(archive)
+
+            logging.info(f'Completed the tag postings backfill of archive {archive_id}')
+
+            return
+
+        next_event_body = ObjectBody(
+            body={
+                'archive_id': archive_id,
+                'checkpoint': checkpoint,
+            },
+            schema=BasicArchiveBackfillTagPostingsSchema,
+        )
+
+        EventPublisher().submit(
+            event=source_event.next_event(
+                body=next_event_body.to_dict(),
+                event_type=next_event_body.get('event_type'),
+            )
+        )
@@ -7,6 +7,32 @@ from da_vinci.core.immutable_object import (
 )
 
 
+class BasicArchiveBackfillTagPostingsSchema(ObjectBodySchema):
+    """
+    The body of the omnilake_archive_basic_backfill_tag_postings event.
+    """
+    attributes = [
+        SchemaAttribute(
+            name='archive_id',
+            type=SchemaAttributeType.STRING,
+            required=True,
+        ),
+
+        SchemaAttribute(
+            name='checkpoint',
+            type=SchemaAttributeType.OBJECT,
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name='event_type',
+            type=SchemaAttributeType.STRING,
+            required=False,
+            default_value='omnilake_archive_basic_backfill_tag_postings',
+        ),
+    ]
+
+
 class BasicArchiveGenerateEntryTagsEventBodySchema(ObjectBodySchema):
     """
     The body of the omnilake_basic_archive_generate_entry_tags event.
@@ -22,10 +22,13 @@ from omnilake.internal_lib.ai_insights import (
 )
 
 from omnilake.internal_lib.clients import AIStatisticSchema, AIStatisticsCollector
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+from omnilake.internal_lib.tags import normalize_tags
 
 from omnilake.tables.provisioned_archives.client import ArchivesClient
 from omnilake.tables.indexed_entries.client import IndexedEntriesClient
 from omnilake.tables.jobs.client import JobsClient, JobStatus
+from omnilake.tables.tag_postings.client import TagPostingsClient
 
 from omnilake.constructs.archives.basic.runtime.event_definitions import (
     BasicArchiveGenerateEntryTagsEventBodySchema,
@@ -166,10 +169,24 @@ def handler(event: Dict, context: Dict):
 
         stats_collector.publish(statistic=ai_statistic)
 
-        entry.tags = [tag.lower().strip() for tag in insights['tags'].split(',')]
+        previous_tags = entry.tags
+
+        entry.tags = normalize_tags(insights['tags'].split(','))
 
         entries.put(entry)
 
+        # Keeps the inverted tag index used by prioritized lookups in line with the entry
+        TagPostingsClient().replace_entry_tags(
+            archive_id=archive_id,
+            entry_id=entry_id,
+            tags=entry.tags,
+            previous_tags=previous_tags,
+            effective_on=entry.effective_on,
+        )
+
+        # Tags are used to prioritize lookups
+        bump_archive_write_version(archive_id)
+
         logging.debug(f"Tags complete")
 
     parent_job.status = JobStatus.COMPLETED
@@ -18,16 +18,18 @@ from omnilake.internal_lib.clients import RawStorageManager
 from omnilake.internal_lib.event_definitions import (
     IndexEntryEventBodySchema,
 )
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
 from omnilake.internal_lib.naming import SourceResourceName
+from omnilake.internal_lib.tags import normalize_tags
 
 from omnilake.tables.provisioned_archives.client import ArchivesClient
 from omnilake.tables.indexed_entries.client import (
     IndexedEntry,
     IndexedEntriesClient,
-    IndexedEntriesScanDefinition,
 )
 from omnilake.tables.jobs.client import Job, JobsClient, JobStatus
 from omnilake.tables.sources.client import SourcesClient
+from omnilake.tables.tag_postings.client import TagPosting, TagPostingsClient
 
 from omnilake.constructs.archives.basic.runtime.event_definitions import (
     BasicArchiveGenerateEntryTagsEventBodySchema,
@@ -103,13 +105,13 @@ def handler(event: Dict, context: Dict):
         if is_latest_entry_for_original(original_of_source, entry_id):
             logging.debug(f"Entry {entry_id} is the latest entry for original source {original_of_source} ... continuing indexing")
 
-            scan_def = IndexedEntriesScanDefinition()
+            indexed_entries_client = IndexedEntriesClient()
 
-            scan_def.add('original_of_source', 'equal', original_of_source) 
+            matching_indexed_entries = indexed_entries_client.get_by_original_of_source(original_of_source)
 
-            indexed_entries_client = IndexedEntriesClient()
+            vacuumed_archive_ids = set()
 
-            matching_indexed_entries = indexed_entries_client.full_scan(scan_def)
+            vacuumed_postings = []
 
             for archive_entry in matching_indexed_entries:
                 if archive_entry.entry_id == entry_id:
@@ -119,8 +121,21 @@ def handler(event: Dict, context: Dict):
 
                 indexed_entries_client.delete(archive_entry)
 
+                vacuumed_postings.extend([
+                    TagPosting(archive_id=archive_entry.archive_id, entry_id=archive_entry.entry_id, tag=tag)
+                    for tag in normalize_tags(archive_entry.tags or [])
+                ])
+
+                vacuumed_archive_ids.add(archive_entry.archive_id)
+
                 logging.debug(f"Deleted entry index for entry {entry_id} in archive {archive_entry.archive_id}")
 
+            if vacuumed_postings:
+                TagPostingsClient().batch_delete(vacuumed_postings)
+
+            for vacuumed_archive_id in vacuumed_archive_ids - {archive_id}:
+                bump_archive_write_version(vacuumed_archive_id)
+
         else:
             logging.debug(f"Entry {entry_id} is not the latest entry for original source {original_of_source} ... skipping indexing")
 
@@ -149,6 +164,8 @@ def handler(event: Dict, context: Dict):
 
         indexed_entries.put(entry_obj)
 
+    bump_archive_write_version(archive_id)
+
     storage_mgr = RawStorageManager()
 
     # Retrieve the entry content from the storage manager
@@ -2,9 +2,12 @@
 Handles the lookup of data in a basic archive.
 """
 
+import heapq
 import logging
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from da_vinci.core.immutable_object import ObjectBody
 from da_vinci.core.logging import Logger
@@ -18,9 +21,72 @@ from omnilake.internal_lib.event_definitions import (
     LakeRequestLookupResponse,
     LakeRequestInternalRequestEventBodySchema,
 )
+from omnilake.internal_lib.lookup_cache import LookupResultCache
+from omnilake.internal_lib.tags import normalize_tags
 
-from omnilake.tables.indexed_entries.client import IndexedEntriesClient, IndexedEntriesScanDefinition
+from omnilake.tables.indexed_entries.client import IndexedEntriesClient, IndexedEntry
 from omnilake.tables.jobs.client import JobsClient
+from omnilake.tables.provisioned_archives.client import ArchivesClient
+from omnilake.tables.tag_postings.client import TagPostingsClient
+
+
+def _entry_rank(entry: IndexedEntry, prioritized_tags: Optional[List[str]] = None) -> Tuple[float, float, str]:
+    '''
+    Returns the rank of an entry, entries are ranked by their score with ties going to the most recently effective
+    entry and then to the entry ID so the selected entries do not depend on the order they were loaded in
+
+    Keyword arguments:
+    entry -- The entry to rank
+    prioritized_tags -- The prioritized tags
+    '''
+    score = entry.calculate_score(prioritized_tags) if prioritized_tags else 0
+
+    effective_on = entry.effective_on.timestamp() if entry.effective_on else 0
+
+    return score, effective_on, entry.entry_id
+
+
+def _lookup_tagged_entries(archive_id: str, max_entries: int, prioritized_tags: List[str]) -> List[str]:
+    '''
+    Returns the IDs of the highest ranked entries that share at least one of the prioritized tags. Entries are
+    scored by accumulating the postings of the prioritized tags, so only entries that share a tag are touched.
+
+    Keyword arguments:
+    archive_id -- The archive ID
+    max_entries -- The maximum number of entries to return
+    prioritized_tags -- The prioritized tags
+    '''
+    tag_postings = TagPostingsClient()
+
+    posted_entry_ids = []
+
+    posted_effective_on = []
+
+    for tag in prioritized_tags:
+        for page in tag_postings.get_by_tag(archive_id=archive_id, tag=tag):
+            for posting in page:
+                posted_entry_ids.append(posting.entry_id)
+
+                posted_effective_on.append(posting.effective_on.timestamp() if posting.effective_on else 0)
+
+    if not posted_entry_ids:
+        return []
+
+    # An entry has one posting per matching tag, counting them scores all entries at once
+    entry_ids, first_postings, matches = np.unique(
+        np.array(posted_entry_ids, dtype=np.str_),
+        return_index=True,
+        return_counts=True,
+    )
+
+    logging.debug(f'Found {len(entry_ids)} entries sharing a prioritized tag')
+
+    effective_on = np.array(posted_effective_on, dtype=np.float64)[first_postings]
+
+    # Ranks the entries the same as _entry_rank, the score is proportional to the matches, without loading them
+    ranking = np.lexsort((entry_ids, effective_on, matches))[::-1]
+
+    return entry_ids[ranking[:max_entries]].tolist()
 
 
 def _lookup_requested_entries(archive_id: str, max_entries: Optional[int] = None,
@@ -33,34 +99,57 @@ def _lookup_requested_entries(archive_id: str, max_entries: Optional[int] = None
     max_entries -- The maximum number of entries to return
     prioritized_tags -- The prioritized tags
     '''
-    found_entries = []
+    if not max_entries:
+        max_entries = 1
 
-    entry_scanner = IndexedEntriesScanDefinition()
+    # Tag postings are keyed by the normalized tags
+    prioritized_tags = normalize_tags(prioritized_tags or [])
 
-    entry_scanner.add('archive_id', 'equal', archive_id)
+    collected_entry_ids = []
 
-    entries = IndexedEntriesClient()
+    if prioritized_tags:
+        collected_entry_ids = _lookup_tagged_entries(
+            archive_id=archive_id,
+            max_entries=max_entries,
+            prioritized_tags=prioritized_tags,
+        )
 
-    for page in entries.scanner(entry_scanner):
-        for entry in page:
-            found_entries.append(entry)
+        if len(collected_entry_ids) == max_entries:
+            return collected_entry_ids
 
-    entry_list_size = len(found_entries)
+    # Remaining slots are filled with the entries without postings of the prioritized tags, which all score 0 and
+    # rank by recency. Entries tagged before their archive's tag postings were backfilled have none though, until
+    # the backfill completes those are scored by their own tags instead.
+    score_tags = []
 
-    if not max_entries:
-        max_entries = 1
+    if prioritized_tags:
+        archive = ArchivesClient().get(archive_id=archive_id)
+
+        if not archive or not archive.tag_postings_backfilled_on:
+            logging.info(f'Tag postings of archive {archive_id} are not backfilled ... scoring entries by their tags')
+
+            score_tags = prioritized_tags
+
+    tagged_entry_ids = set(collected_entry_ids)
+
+    entries = IndexedEntriesClient()
+
+    # Only the attributes used for ranking are loaded
+    ranking_attributes = ['effective_on', 'tags'] if score_tags else ['effective_on']
 
-    if max_entries < entry_list_size:
-        collected_entries = sorted(
-            found_entries,
-            key=lambda entry_obj: entry_obj.calculate_score(prioritized_tags),
-            reverse=True,
-        )[:max_entries]
+    found_entries = (
+        entry for page in entries.get_by_archive(archive_id=archive_id, attribute_names=ranking_attributes)
+        for entry in page if entry.entry_id not in tagged_entry_ids
+    )
 
-    else:
-        collected_entries = found_entries
+    # Entries are streamed through a heap of max_entries, so only the selected entries are held in memory
+    collected_entries = heapq.nlargest(
+        max_entries - len(collected_entry_ids),
+        found_entries,
+        key=lambda entry: _entry_rank(entry, score_tags),
+    )
 
-    return [entr.entry_id for entr in collected_entries]
+    return collected_entry_ids + [entr.entry_id for entr in collected_entries]
 
 
 _FN_NAME = "omnilake.constructs.archives.basic.lookup" 
@@ -103,11 +192,30 @@ def basic_lookup(event: Dict, context: Dict):
 
         prioritize_tags = retrieval_instructions.get("prioritize_tags")
 
-        retrieved_entries = _lookup_requested_entries(
-            archive_id=archive_id,
-            max_entries=max_entries,
-            prioritized_tags=prioritize_tags,
-        )
+        lookup_cache = LookupResultCache(request_type='BASIC')
+
+        cache_key = None
+
+        retrieved_entries = None
+
+        # Repeated lookups against an archive that was not written to since are served from the cache
+        if lookup_cache.enabled:
+            cache_key = lookup_cache.cache_key(archive_ids=[archive_id], lookup_instruction=retrieval_instructions)
+
+            retrieved_entries = lookup_cache.get(cache_key)
+
+        if retrieved_entries is None:
+            retrieved_entries = _lookup_requested_entries(
+                archive_id=archive_id,
+                max_entries=max_entries,
+                prioritized_tags=prioritize_tags,
+            )
+
+            if cache_key:
+                lookup_cache.put(cache_key=cache_key, archive_ids=[archive_id], entry_ids=retrieved_entries)
+
+        else:
+            logging.info(f'Serving lookup from the lookup result cache with key {cache_key}')
 
         lake_request_id = event_body.get("lake_request_id")
 
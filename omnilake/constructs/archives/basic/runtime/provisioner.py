@@ -66,6 +66,8 @@ def handler(event: Dict, context: Dict) -> Dict:
         description=description,
         status=ArchiveStatus.ACTIVE,
         archive_type=archive_type,
+        # Every entry of a new archive is given its tag postings when it is indexed
+        tag_postings_backfilled_on=datetime.now(tz=utz_tz),
     )
 
     archives = ArchivesClient()
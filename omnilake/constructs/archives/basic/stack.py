@@ -17,10 +17,13 @@ from da_vinci_cdk.constructs.event_bus import EventBusSubscriptionFunction
 
 from da_vinci_cdk.framework_stacks.services.event_bus.stack import EventBusStack
 
+from omnilake.tables.archive_write_versions.stack import ArchiveWriteVersion, ArchiveWriteVersionsTable
 from omnilake.tables.jobs.stack import Job, JobsTable
 from omnilake.tables.indexed_entries.stack import IndexedEntry, IndexedEntriesTable 
+from omnilake.tables.lookup_result_cache.stack import CachedLookupResult, LookupResultCacheTable
 from omnilake.tables.provisioned_archives.stack import Archive, ProvisionedArchivesTable
 from omnilake.tables.sources.stack import Source, SourcesTable
+from omnilake.tables.tag_postings.stack import TagPosting, TagPostingsTable
 
 from omnilake.tables.registered_request_constructs.cdk import (
     ArchiveConstructSchemas,
@@ -60,14 +63,17 @@ class LakeConstructArchiveBasicStack(Stack):
             app_base_image=app_base_image,
             architecture=architecture,
             required_stacks=[
+                ArchiveWriteVersionsTable,
                 AIStatisticsCollectorStack,
                 EventBusStack,
                 JobsTable,
                 IndexedEntriesTable,
+                LookupResultCacheTable,
                 LakeRawStorageManagerStack,
                 ProvisionedArchivesTable,
                 RegisteredRequestConstructsTable,
                 SourcesTable,
+                TagPostingsTable,
             ],
             deployment_id=deployment_id,
             scope=scope,
@@ -145,6 +151,11 @@ class LakeConstructArchiveBasicStack(Stack):
                 ),
             ],
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name='ai_statistics_collector',
                     resource_type=ResourceType.REST_SERVICE,
@@ -167,6 +178,11 @@ class LakeConstructArchiveBasicStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read_write',
                 ),
+                ResourceAccessRequest(
+                    resource_name=TagPosting.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
             ],
             scope=self,
             timeout=Duration.minutes(2),
@@ -183,6 +199,11 @@ class LakeConstructArchiveBasicStack(Stack):
             function_name=resource_namer('entry-basic-indexer', scope=self),
             memory_size=512,
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name='event_bus',
                     resource_type=ResourceType.ASYNC_SERVICE,
@@ -210,11 +231,61 @@ class LakeConstructArchiveBasicStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read',
                 ),
+                ResourceAccessRequest(
+                    resource_name=TagPosting.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
             ],
             scope=self,
             timeout=Duration.minutes(2),
         )
 
+        self.tag_postings_backfill = EventBusSubscriptionFunction(
+            base_image=self.app_base_image,
+            construct_id='basic_archive_tag_postings_backfill',
+            description='Backfills the tag postings of the entries of a basic archive.',
+            entry=self.runtime_path,
+            event_type='omnilake_archive_basic_backfill_tag_postings',
+            index='backfill_tag_postings.py',
+            handler='handler',
+            function_name=resource_namer('basic-archive-tag-postings-backfill', scope=self),
+            memory_size=512,
+            resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=Archive.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name='event_bus',
+                    resource_type=ResourceType.ASYNC_SERVICE,
+                ),
+                ResourceAccessRequest(
+                    resource_name=IndexedEntry.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=Job.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=TagPosting.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+            ],
+            scope=self,
+            timeout=Duration.minutes(15),
+        )
+
         self.data_retrieval = EventBusSubscriptionFunction(
             base_image=self.app_base_image,
             construct_id='basic_archive_data_retrieval',
@@ -226,6 +297,20 @@ class LakeConstructArchiveBasicStack(Stack):
             function_name=resource_namer('basic-archive-data-retrieval', scope=self),
             memory_size=512,
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=Archive.table_name,
+                    resource_type=ResourceType.TABLE,
+                ),
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+                ResourceAccessRequest(
+                    resource_name=CachedLookupResult.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name=Job.table_name,
                     resource_type=ResourceType.TABLE,
@@ -241,6 +326,11 @@ class LakeConstructArchiveBasicStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read',
                 ),
+                ResourceAccessRequest(
+                    resource_name=TagPosting.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
             ],
             scope=self,
             timeout=Duration.minutes(5),
@@ -0,0 +1,133 @@
+"""
+Normalizes the tags of the entries of a vector archive and of the chunks they are denormalized onto
+
+Entries tagged before tags were normalized keep their tags as generated, which normalized lookup tags do not match,
+neither when filtering the chunks by their required tags nor when prioritizing them. The backfill walks the entries
+of the archive page by page, saving the key of the last page in the event it requests to continue with, so a large
+archive is backfilled across as many events as it takes.
+"""
+import logging
+import time
+
+from typing import Dict
+
+from da_vinci.core.immutable_object import ObjectBody
+from da_vinci.core.logging import Logger
+
+from da_vinci.exception_trap.client import ExceptionReporter
+
+from da_vinci.event_bus.client import fn_event_response, EventPublisher
+from da_vinci.event_bus.event import Event as EventBusEvent
+
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+from omnilake.internal_lib.tags import normalize_tags
+
+from omnilake.tables.indexed_entries.client import IndexedEntriesClient
+from omnilake.tables.jobs.client import Job, JobsClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
+
+from omnilake.constructs.archives.vector.runtime.event_definitions import VectorArchiveBackfillTagsSchema
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_storage import update_chunk_tags
+
+
+# Seconds of work done by a single event before the backfill continues in the next one, leaves ample headroom
+# within the function timeout for the page in progress
+BATCH_SECONDS = 600
+
+# Number of entries read per page
+ENTRY_PAGE_SIZE = 100
+
+
+_FN_NAME = 'omnilake.constructs.vector.backfill_tags'
+
+
+@fn_event_response(exception_reporter=ExceptionReporter(), function_name=_FN_NAME,
+                   logger=Logger(namespace=_FN_NAME))
+def handler(event: Dict, context: Dict):
+    """
+    Lambda handler for the tag backfill function. Normalizes the tags of every entry of the archive and rewrites the
+    tags of the chunks of the entries whose tags changed, doing so again is harmless so an interrupted backfill can
+    be requested again.
+    """
+    logging.debug(f'Received request: {event}')
+
+    source_event = EventBusEvent.from_lambda_event(event)
+
+    event_body = ObjectBody(
+        body=source_event.body,
+        schema=VectorArchiveBackfillTagsSchema,
+    )
+
+    archive_id = event_body.get('archive_id')
+
+    checkpoint = event_body.get('checkpoint') or None
+
+    deadline = time.monotonic() + BATCH_SECONDS
+
+    entries = IndexedEntriesClient()
+
+    jobs = JobsClient()
+
+    with jobs.job_execution(Job(job_type='VECTOR_TAG_BACKFILL')):
+        registry = get_table_registry()
+
+        tables = [
+            registry.open_table(name=vector_store.storage_table_name(), latest=True)
+            for vector_store in VectorStoresClient().get_shards(archive_id=archive_id)
+        ]
+
+        normalized_entries = 0
+
+        while time.monotonic() < deadline:
+            entry_page, checkpoint = entries.get_page_by_archive(
+                archive_id=archive_id,
+                exclusive_start_key=checkpoint,
+                limit=ENTRY_PAGE_SIZE,
+            )
+
+            for entry in entry_page:
+                normalized_tags = normalize_tags(entry.tags or [])
+
+                if normalized_tags == (entry.tags or []):
+                    continue
+
+                entry.tags = normalized_tags
+
+                # Chunks are rewritten ahead of the entry, so an interrupted backfill still finds the entry's tags
+                # not normalized and rewrites its chunks again
+                for table in tables:
+                    update_chunk_tags(table=table, entry_id=entry.entry_id, tags=normalized_tags)
+
+                entries.put(entry)
+
+                normalized_entries += 1
+
+            if not checkpoint:
+                break
+
+        logging.info(f'Normalized the tags of {normalized_entries} entries of archive {archive_id}')
+
+        if normalized_entries:
+            # Lookups cached before the backfill missed the entries whose tags were not normalized
+            bump_archive_write_version(archive_id)
+
+        if not checkpoint:
+            logging.info(f'Completed the tag backfill of archive {archive_id}')
+
+            return
+
+        next_event_body = ObjectBody(
+            body={
+                'archive_id': archive_id,
+                'checkpoint': checkpoint,
+            },
+            schema=VectorArchiveBackfillTagsSchema,
+        )
+
+        EventPublisher().submit(
+            event=source_event.next_event(
+                body=next_event_body.to_dict(),
+                event_type=next_event_body.get('event_type'),
+            )
+        )
@@ -0,0 +1,191 @@
+"""
+Sentence and token aware chunking of entry content
+"""
+import re
+
+from collections import deque
+from enum import StrEnum
+from typing import Iterator, Tuple
+
+
+DEFAULT_MAX_CHUNK_TOKENS = 256
+
+DEFAULT_CHUNK_OVERLAP_TOKENS = 32
+
+# Approximates the embedding model's sub-word tokens with words and individual punctuation marks
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+# Sentences end with terminal punctuation followed by whitespace, paragraphs with one or more blank lines
+SEGMENT_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+|\n\s*\n\s*')
+
+
+class ChunkingStrategy(StrEnum):
+    CHARACTER = 'CHARACTER'
+    SENTENCE = 'SENTENCE'
+
+
+def count_tokens(text: str, start: int = 0, end: int = None) -> int:
+    """
+    Approximate the number of tokens in a span of the text, without copying the span.
+
+    Keyword arguments:
+    text -- The text
+    start -- The start of the span
+    end -- The end of the span, defaults to the end of the text
+    """
+    if end is None:
+        end = len(text)
+
+    return sum(1 for _ in TOKEN_PATTERN.finditer(text, start, end))
+
+
+def text_segments(text: str) -> Iterator[Tuple[int, int, bool]]:
+    """
+    Split the text into sentence spans. Yields the [start, end) span of each sentence along with whether
+    the sentence ends a paragraph. Leading and trailing whitespace is excluded from the spans.
+
+    Keyword arguments:
+    text -- The text to split
+    """
+    start = 0
+
+    for boundary in SEGMENT_BOUNDARY_PATTERN.finditer(text):
+        # Skip leading whitespace, a span of whitespace alone is not a sentence
+        while start < boundary.start() and text[start].isspace():
+            start += 1
+
+        if boundary.start() > start:
+            ends_paragraph = boundary.group().count('\n') > 1 or boundary.end() == len(text)
+
+            yield start, boundary.start(), ends_paragraph
+
+        start = boundary.end()
+
+    end = len(text)
+
+    while end > start and text[end - 1].isspace():
+        end -= 1
+
+    if end > start:
+        yield start, end, True
+
+
+def _token_windows(text: str, start: int, end: int, max_tokens: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Split a span that exceeds the token budget on its own into consecutive spans of at most max_tokens tokens.
+
+    Keyword arguments:
+    text -- The text
+    start -- The start of the span
+    end -- The end of the span
+    max_tokens -- The token budget of each span
+    """
+    window_start = None
+
+    window_end = None
+
+    window_tokens = 0
+
+    for token in TOKEN_PATTERN.finditer(text, start, end):
+        if window_start is None:
+            window_start = token.start()
+
+        window_end = token.end()
+
+        window_tokens += 1
+
+        if window_tokens == max_tokens:
+            yield window_start, window_end, window_tokens
+
+            window_start = None
+
+            window_tokens = 0
+
+    if window_start is not None:
+        yield window_start, window_end, window_tokens
+
+
+def sentence_chunk_spans(text: str, max_tokens: int = DEFAULT_MAX_CHUNK_TOKENS,
+                         overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS) -> Iterator[Tuple[int, int]]:
+    """
+    Chunk the text on sentence boundaries, packing whole sentences into chunks of at most max_tokens
+    tokens. Consecutive chunks share trailing sentences of up to overlap_tokens tokens. A chunk is closed early
+    at a paragraph boundary once it holds at least half of the budget. Sentences longer than the budget are
+    split on token boundaries. Yields the [start, end) character span of each chunk.
+
+    Keyword arguments:
+    text -- The text to chunk
+    max_tokens -- The token budget of each chunk
+    overlap_tokens -- The number of tokens of overlap between consecutive chunks
+    """
+    if max_tokens <= 0:
+        raise ValueError(f"Invalid max_tokens: {max_tokens}. Must be a positive integer.")
+
+    if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+        raise ValueError(f"Invalid overlap_tokens: {overlap_tokens}. Must be between 0 and {max_tokens - 1}.")
+
+    # Sentences of the chunk being built, as (start, end, tokens)
+    window = deque()
+
+    window_tokens = 0
+
+    # Whether the window holds sentences that have not been emitted in a chunk yet
+    pending = False
+
+    def _emit():
+        nonlocal window_tokens
+
+        chunk = (window[0][0], window[-1][1])
+
+        # Retain the trailing sentences that fit in the overlap for the next chunk
+        retained_tokens = 0
+
+        retained = 0
+
+        for _, _, tokens in reversed(window):
+            if retained_tokens + tokens > overlap_tokens:
+                break
+
+            retained_tokens += tokens
+
+            retained += 1
+
+        while len(window) > retained:
+            window.popleft()
+
+        window_tokens = retained_tokens
+
+        return chunk
+
+    for seg_start, seg_end, ends_paragraph in text_segments(text):
+        seg_tokens = count_tokens(text, seg_start, seg_end)
+
+        if seg_tokens > max_tokens:
+            pieces = list(_token_windows(text, seg_start, seg_end, max_tokens))
+
+        else:
+            pieces = [(seg_start, seg_end, seg_tokens)]
+
+        for piece in pieces:
+            if pending and window_tokens + piece[2] > max_tokens:
+                yield _emit()
+
+                pending = False
+
+            # Drop overlap that no longer leaves room for the piece
+            while window and window_tokens + piece[2] > max_tokens:
+                window_tokens -= window.popleft()[2]
+
+            window.append(piece)
+
+            window_tokens += piece[2]
+
+            pending = True
+
+        if ends_paragraph and pending and window_tokens >= max_tokens // 2:
+            yield _emit()
+
+            pending = False
+
+    if pending:
+        yield window[0][0], window[-1][1]
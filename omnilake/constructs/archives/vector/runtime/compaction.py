@@ -0,0 +1,94 @@
+"""
+Fragment compaction and version cleanup for vector tables
+"""
+import logging
+import statistics
+import time
+
+from datetime import datetime, timedelta, UTC as utc_tz
+from typing import Optional
+
+from lancedb.table import Table
+
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStore
+
+
+# Number of probe queries timed before and after a compaction
+LATENCY_SAMPLES = 3
+
+
+def count_fragments(table: Table) -> int:
+    """
+    Return the number of data fragments of the latest version of the table.
+
+    Keyword arguments:
+    table -- The vector table
+    """
+    return len(table.to_lance().get_fragments())
+
+
+def measure_query_latency(table: Table, samples: int = LATENCY_SAMPLES) -> Optional[float]:
+    """
+    Return the median latency, in milliseconds, of a nearest neighbor query against the table. The vector of a
+    stored chunk is used as the probe. Returns None when the table is empty.
+
+    Keyword arguments:
+    table -- The vector table
+    samples -- The number of probe queries to time
+    """
+    probe = table.search().select(['vector']).limit(1).to_list()
+
+    if not probe:
+        return None
+
+    latencies = []
+
+    for _ in range(samples):
+        started = time.perf_counter()
+
+        table.search(probe[0]['vector']).metric("cosine").select(['chunk_id']).limit(10).to_list()
+
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return round(statistics.median(latencies), 3)
+
+
+def compact_vector_table(table: Table, vector_store: VectorStore, version_retention_hours: int = 24):
+    """
+    Compact the small fragments of the table into larger ones, remove the table versions older than the retention
+    and fold the rewritten rows back into the existing indexes. The fragment counts and query latencies before and
+    after are recorded on the vector store.
+
+    Keyword arguments:
+    table -- The vector table
+    vector_store -- The vector store the table belongs to
+    version_retention_hours -- The number of hours old table versions are retained, readers holding an older
+                               version past the retention may fail
+    """
+    vector_store.fragments_before_compaction = count_fragments(table)
+
+    vector_store.query_latency_before_compaction_ms = measure_query_latency(table)
+
+    logging.info(f'Compacting {vector_store.fragments_before_compaction} fragments of vector store {vector_store.vector_store_id}')
+
+    table.compact_files()
+
+    cleanup_stats = table.cleanup_old_versions(older_than=timedelta(hours=version_retention_hours))
+
+    logging.info(f'Removed old versions of vector store {vector_store.vector_store_id}: {cleanup_stats}')
+
+    if vector_store.vector_index_type or vector_store.full_text_index_rows or vector_store.scalar_index_rows:
+        # Compaction remaps the indexes, optimizing merges the delta of any rows not yet indexed
+        table.to_lance().optimize.optimize_indices()
+
+    vector_store.fragments_after_compaction = count_fragments(table)
+
+    vector_store.query_latency_after_compaction_ms = measure_query_latency(table)
+
+    vector_store.compacted_on = datetime.now(utc_tz)
+
+    vector_store.table_writes_since_compaction = 0
+
+    logging.info(f'Compacted vector store {vector_store.vector_store_id} from {vector_store.fragments_before_compaction} '
+                 f'to {vector_store.fragments_after_compaction} fragments, query latency '
+                 f'{vector_store.query_latency_before_compaction_ms}ms -> {vector_store.query_latency_after_compaction_ms}ms')
@@ -0,0 +1,396 @@
+"""
+Handles the generation of embeddings for the vector archive
+"""
+import json
+import logging
+
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC as utc_tz
+from typing import Dict, List, Optional
+
+import boto3
+
+from da_vinci.core.global_settings import setting_value
+
+from omnilake.constructs.archives.vector.tables.embedding_cache.client import (
+    CachedEmbedding,
+    EmbeddingCacheClient,
+)
+from omnilake.constructs.archives.vector.tables.vector_stores.client import (
+    DEFAULT_EMBEDDING_DIMENSIONS,
+    DEFAULT_EMBEDDING_MODEL_ID,
+)
+
+
+# Cohere Embed v3 models only produce embeddings of their native dimensions, later models accept an output_dimension
+FIXED_DIMENSION_MODELS = {
+    'cohere.embed-english-v3': 1024,
+    'cohere.embed-multilingual-v3': 1024,
+}
+
+# Cohere Embed v3 accepts at most 96 texts per invocation
+MAX_EMBEDDING_BATCH_SIZE = 96
+
+# Cohere Embed v3 embedding types, float is returned when no embedding type is requested
+FLOAT_EMBEDDING_TYPE = 'float'
+
+INT8_EMBEDDING_TYPE = 'int8'
+
+
+_BEDROCK_CLIENT = None
+
+# Process local embeddings, kept as compact float32 arrays and shared across warm invocations
+_LOCAL_EMBEDDINGS = OrderedDict()
+
+
+def bedrock_runtime_client():
+    """
+    Returns the bedrock-runtime client shared across all embedding requests made by the process. Boto3 clients
+    are thread safe so the same client is re-used by the concurrent batch requests and across warm invocations.
+    """
+    global _BEDROCK_CLIENT
+
+    if _BEDROCK_CLIENT is None:
+        _BEDROCK_CLIENT = boto3.client(service_name='bedrock-runtime')
+
+    return _BEDROCK_CLIENT
+
+
+class EmbeddingCache:
+    """
+    Two tier embedding cache. A bounded, least recently used, process local tier sits in front of the persistent
+    embedding cache table, which is evicted by DynamoDB TTL.
+    """
+    def __init__(self, max_local_entries: int = 2048, retention_days: int = 30,
+                 cache_client: Optional[EmbeddingCacheClient] = None):
+        """
+        Initialize the embedding cache
+
+        Keyword arguments:
+        max_local_entries -- The maximum number of embeddings held in the process local tier
+        retention_days -- The number of days a cached embedding is retained in the persistent tier
+        cache_client -- Optional embedding cache table client
+        """
+        self.cache_client = cache_client or EmbeddingCacheClient()
+
+        self.max_local_entries = max_local_entries
+
+        self.retention_days = retention_days
+
+        self.hits = 0
+
+        self.misses = 0
+
+    def _set_local(self, cache_key: str, embedding: array):
+        """
+        Add an embedding to the process local tier, evicting the least recently used embeddings when full.
+
+        Keyword arguments:
+        cache_key -- The cache key
+        embedding -- The float32 embedding
+        """
+        _LOCAL_EMBEDDINGS[cache_key] = embedding
+
+        _LOCAL_EMBEDDINGS.move_to_end(cache_key)
+
+        while len(_LOCAL_EMBEDDINGS) > self.max_local_entries:
+            _LOCAL_EMBEDDINGS.popitem(last=False)
+
+    def get_many(self, cache_keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Return the cached embeddings for the given keys, keys that are not cached are not included in the result.
+
+        Keyword arguments:
+        cache_keys -- The cache keys to look up
+        """
+        found = {}
+
+        remote_keys = []
+
+        for cache_key in dict.fromkeys(cache_keys):
+            if cache_key in _LOCAL_EMBEDDINGS:
+                _LOCAL_EMBEDDINGS.move_to_end(cache_key)
+
+                found[cache_key] = _LOCAL_EMBEDDINGS[cache_key].tolist()
+
+            else:
+                remote_keys.append(cache_key)
+
+        if remote_keys:
+            for cache_key, cached in self.cache_client.batch_get(remote_keys).items():
+                embedding = cached.to_embedding()
+
+                self._set_local(cache_key, array('f', embedding))
+
+                found[cache_key] = embedding
+
+        hits = sum(1 for cache_key in cache_keys if cache_key in found)
+
+        self.hits += hits
+
+        self.misses += len(cache_keys) - hits
+
+        return found
+
+    def put_many(self, embeddings: Dict[str, List[float]], input_type: str, model_id: str):
+        """
+        Add the given embeddings to the cache.
+
+        Keyword arguments:
+        embeddings -- The embeddings keyed by cache key
+        input_type -- The input type the embeddings were generated with
+        model_id -- The model that generated the embeddings
+        """
+        time_to_live = datetime.now(tz=utc_tz) + timedelta(days=self.retention_days)
+
+        cached_embeddings = []
+
+        for cache_key, embedding in embeddings.items():
+            self._set_local(cache_key, array('f', embedding))
+
+            cached_embeddings.append(
+                CachedEmbedding(
+                    cache_key=cache_key,
+                    embedding=CachedEmbedding.encode_embedding(embedding),
+                    input_type=input_type,
+                    model_id=model_id,
+                    time_to_live=time_to_live,
+                )
+            )
+
+        self.cache_client.batch_put(cached_embeddings)
+
+
+class EmbeddingGenerator:
+    """
+    Generates embeddings for one or more texts, packing the texts into multi-text requests and executing the
+    requests concurrently.
+    """
+    def __init__(self, input_type: str = 'search_document', max_batch_size: int = MAX_EMBEDDING_BATCH_SIZE,
+                 max_concurrency: int = 4, model_id: str = DEFAULT_EMBEDDING_MODEL_ID, bedrock_client=None,
+                 cache: Optional[EmbeddingCache] = None, embedding_type: str = FLOAT_EMBEDDING_TYPE,
+                 dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS):
+        """
+        Initialize the embedding generator
+
+        Keyword arguments:
+        input_type -- The Cohere input type, search_document for indexing and search_query for lookups
+        max_batch_size -- The maximum number of texts sent in a single request
+        max_concurrency -- The maximum number of requests executing at the same time
+        model_id -- The embedding model ID
+        bedrock_client -- Optional bedrock-runtime client, defaults to the shared process client
+        cache -- Optional embedding cache consulted before any embedding request is made
+        embedding_type -- The Cohere embedding type, float or the int8 quantized embeddings returned natively by the model
+        dimensions -- The number of dimensions of the generated embeddings
+        """
+        if max_batch_size <= 0 or max_batch_size > MAX_EMBEDDING_BATCH_SIZE:
+            raise ValueError(f"Invalid max_batch_size: {max_batch_size}. Must be between 1 and {MAX_EMBEDDING_BATCH_SIZE}.")
+
+        if max_concurrency <= 0:
+            raise ValueError(f"Invalid max_concurrency: {max_concurrency}. Must be a positive integer.")
+
+        native_dimensions = FIXED_DIMENSION_MODELS.get(model_id)
+
+        if native_dimensions and dimensions != native_dimensions:
+            raise ValueError(f"Invalid dimensions: {dimensions}. Model {model_id} only produces {native_dimensions} dimensions.")
+
+        self.bedrock = bedrock_client or bedrock_runtime_client()
+
+        self.cache = cache
+
+        self.dimensions = dimensions
+
+        self.embedding_type = embedding_type
+
+        self.input_type = input_type
+
+        self.max_batch_size = max_batch_size
+
+        self.max_concurrency = max_concurrency
+
+        self.model_id = model_id
+
+    @property
+    def requests_dimensions(self) -> bool:
+        """
+        Whether the number of dimensions is sent with every request, models with fixed dimensions do not accept it
+        """
+        return self.model_id not in FIXED_DIMENSION_MODELS
+
+    @property
+    def cache_model_id(self) -> str:
+        """
+        The model ID the embeddings are cached under. Quantized embeddings are cached apart from float embeddings
+        and embeddings of the same model with different dimensions are cached apart from each other.
+        """
+        cache_model_id = self.model_id
+
+        if self.requests_dimensions:
+            cache_model_id = f"{cache_model_id}:{self.dimensions}"
+
+        if self.embedding_type == FLOAT_EMBEDDING_TYPE:
+            return cache_model_id
+
+        return f"{cache_model_id}:{self.embedding_type}"
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Executes a single embedding request for the given batch of texts.
+
+        Keyword arguments:
+        texts -- The texts to embed, must not exceed the max batch size
+        """
+        request = {
+            "texts": texts,
+            "input_type": self.input_type,
+        }
+
+        if self.embedding_type != FLOAT_EMBEDDING_TYPE:
+            request["embedding_types"] = [self.embedding_type]
+
+        if self.requests_dimensions:
+            request["output_dimension"] = self.dimensions
+
+        body = json.dumps(request)
+
+        response = self.bedrock.invoke_model(
+            modelId=self.model_id,
+            contentType="application/json",
+            accept="application/json",
+            body=body
+        )
+
+        response_body = json.loads(response['body'].read())
+
+        embeddings = response_body['embeddings']
+
+        # Embeddings are keyed by type when embedding types were requested
+        if isinstance(embeddings, dict):
+            embeddings = embeddings[self.embedding_type]
+
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings from {self.model_id}, received {len(embeddings)}")
+
+        if any(len(embedding) != self.dimensions for embedding in embeddings):
+            raise ValueError(f"Expected embeddings of {self.dimensions} dimensions from {self.model_id}")
+
+        return embeddings
+
+    def batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Packs the texts into batches no larger than the max batch size, preserving order.
+
+        Keyword arguments:
+        texts -- The texts to pack
+        """
+        return [texts[idx:idx + self.max_batch_size] for idx in range(0, len(texts), self.max_batch_size)]
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates the embeddings for all of the given texts without consulting the cache.
+
+        Keyword arguments:
+        texts -- The texts to embed
+        """
+        batches = self.batches(texts)
+
+        logging.debug(f"Embedding {len(texts)} texts in {len(batches)} batches with concurrency {self.max_concurrency}")
+
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        embeddings = []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+            # map preserves the submission order of the batches
+            for batch_embeddings in executor.map(self._embed_batch, batches):
+                embeddings.extend(batch_embeddings)
+
+        return embeddings
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates the embeddings for all of the given texts. The resulting embeddings are returned in the same
+        order as the texts.
+
+        Keyword arguments:
+        texts -- The texts to embed
+        """
+        if not texts:
+            return []
+
+        if not self.cache:
+            return self._embed_uncached(texts)
+
+        cache_keys = [CachedEmbedding.calculate_cache_key(self.cache_model_id, self.input_type, text) for text in texts]
+
+        embeddings = self.cache.get_many(cache_keys)
+
+        # Only embed each distinct missing text once
+        missing = {cache_key: text for cache_key, text in zip(cache_keys, texts) if cache_key not in embeddings}
+
+        if missing:
+            # Cached embeddings are float32, generated embeddings are rounded the same so both return the same values
+            generated = {
+                cache_key: array('f', embedding).tolist()
+                for cache_key, embedding in zip(missing.keys(), self._embed_uncached(list(missing.values())))
+            }
+
+            self.cache.put_many(generated, input_type=self.input_type, model_id=self.cache_model_id)
+
+            embeddings.update(generated)
+
+        return [embeddings[cache_key] for cache_key in cache_keys]
+
+    def embed_one(self, text: str) -> List[float]:
+        """
+        Generates the embedding for a single text.
+
+        Keyword arguments:
+        text -- The text to embed
+        """
+        return self.embed([text])[0]
+
+
+def get_embedding_generator(input_type: str = 'search_document', max_concurrency: Optional[int] = None,
+                            model_id: str = DEFAULT_EMBEDDING_MODEL_ID, use_cache: bool = True,
+                            embedding_type: str = FLOAT_EMBEDDING_TYPE,
+                            dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> EmbeddingGenerator:
+    """
+    Returns an embedding generator configured from the vector storage settings.
+
+    Keyword arguments:
+    input_type -- The Cohere input type
+    max_concurrency -- Overrides the configured maximum concurrent requests
+    model_id -- The embedding model ID
+    use_cache -- Whether the generator consults the embedding cache
+    embedding_type -- The Cohere embedding type
+    dimensions -- The number of dimensions of the generated embeddings
+    """
+    if max_concurrency is None:
+        max_concurrency = setting_value(namespace='omnilake::vector_storage', setting_key='embedding_max_concurrency')
+
+    cache = None
+
+    if use_cache:
+        cache = EmbeddingCache(
+            max_local_entries=setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='embedding_cache_max_local_entries',
+            ),
+            retention_days=setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='embedding_cache_retention_days',
+            ),
+        )
+
+    return EmbeddingGenerator(
+        cache=cache,
+        dimensions=dimensions,
+        embedding_type=embedding_type,
+        input_type=input_type,
+        max_concurrency=max_concurrency or 4,
+        model_id=model_id,
+    )
@@ -71,4 +71,150 @@ class VectorArchiveVacuumSchema(ObjectBodySchema):
             required=False,
             default_value="omnilake_archive_vector_vacuum_request",
         ),
-    ]
\ No newline at end of file
+    ]
+
+
+class VectorArchiveFlushSchema(ObjectBodySchema):
+    """
+    The body of the omnilake_archive_vector_flush_request event.
+    """
+    attributes = [
+        SchemaAttribute(
+            name="archive_id",
+            type=SchemaAttributeType.STRING,
+            required=True,
+        ),
+
+        SchemaAttribute(
+            name="event_type",
+            type=SchemaAttributeType.STRING,
+            required=False,
+            default_value="omnilake_archive_vector_flush_request",
+        ),
+
+        SchemaAttribute(
+            name="shard_number",
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+            default_value=0,
+        ),
+    ]
+
+
+class VectorArchiveMaintenanceSchema(ObjectBodySchema):
+    """
+    The body of the omnilake_archive_vector_maintenance_request event.
+    """
+    attributes = [
+        SchemaAttribute(
+            name="archive_id",
+            type=SchemaAttributeType.STRING,
+            required=True,
+        ),
+
+        SchemaAttribute(
+            name="compact",
+            type=SchemaAttributeType.BOOLEAN,
+            required=False,
+            default_value=False,
+        ),
+
+        SchemaAttribute(
+            name="event_type",
+            type=SchemaAttributeType.STRING,
+            required=False,
+            default_value="omnilake_archive_vector_maintenance_request",
+        ),
+
+        SchemaAttribute(
+            name="shard_number",
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+            default_value=0,
+        ),
+    ]
+
+
+class VectorArchiveAddShardSchema(ObjectBodySchema):
+    """
+    The body of the omnilake_archive_vector_add_shard_request event.
+    """
+    attributes = [
+        SchemaAttribute(
+            name="archive_id",
+            type=SchemaAttributeType.STRING,
+            required=True,
+        ),
+
+        SchemaAttribute(
+            name="event_type",
+            type=SchemaAttributeType.STRING,
+            required=False,
+            default_value="omnilake_archive_vector_add_shard_request",
+        ),
+    ]
+
+
+class VectorArchiveReembedSchema(ObjectBodySchema):
+    """
+    The body of the omnilake_archive_vector_reembed_request event.
+    """
+    attributes = [
+        SchemaAttribute(
+            name="archive_id",
+            type=SchemaAttributeType.STRING,
+            required=True,
+        ),
+
+        SchemaAttribute(
+            name="drop_previous_tables",
+            type=SchemaAttributeType.BOOLEAN,
+            required=False,
+            default_value=False,
+        ),
+
+        SchemaAttribute(
+            name="embedding_dimensions",
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name="embedding_model_id",
+            type=SchemaAttributeType.STRING,
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name="event_type",
+            type=SchemaAttributeType.STRING,
+            required=False,
+            default_value="omnilake_archive_vector_reembed_request",
+        ),
+    ]
+
+
+class VectorArchiveBackfillTagsSchema(ObjectBodySchema):
+    """
+    The body of the omnilake_archive_vector_backfill_tags_request event.
+    """
+    attributes = [
+        SchemaAttribute(
+            name="archive_id",
+            type=SchemaAttributeType.STRING,
+            required=True,
+        ),
+
+        SchemaAttribute(
+            name="checkpoint",
+            type=SchemaAttributeType.OBJECT,
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name="event_type",
+            type=SchemaAttributeType.STRING,
+            required=False,
+            default_value="omnilake_archive_vector_backfill_tags_request",
+        ),
+    ]
@@ -0,0 +1,209 @@
+"""
+Commits the writes staged in the write buffer of a vector store to its vector table
+"""
+import logging
+
+from typing import Dict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from da_vinci.core.global_settings import setting_value
+from da_vinci.core.immutable_object import ObjectBody
+from da_vinci.core.logging import Logger
+
+from da_vinci.exception_trap.client import ExceptionReporter
+
+from da_vinci.event_bus.client import fn_event_response, EventPublisher
+from da_vinci.event_bus.event import Event as EventBusEvent
+
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+
+from omnilake.tables.indexed_entries.client import IndexedEntriesClient
+from omnilake.tables.jobs.client import Job, JobsClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
+
+from omnilake.constructs.archives.vector.runtime.event_definitions import (
+    VectorArchiveFlushSchema,
+    VectorArchiveMaintenanceSchema,
+)
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.write_buffer import VectorWriteBuffer
+
+
+_FN_NAME = 'omnilake.constructs.vector.flush'
+
+# Matches the function timeout, a lock held longer than this was abandoned by a failed flush
+FLUSH_LOCK_SECONDS = 900
+
+# Maximum number of staged files committed to the table at once
+MAX_FLUSH_FILES = 500
+
+
+def reconcile_staged_entries(archive_id: str, staged_data: pa.Table) -> pa.Table:
+    """
+    Bring the staged rows up to date with their entries before they are committed. Rows of entries that were
+    removed from the archive while their writes were staged, such as entries replaced by a newer original of
+    their source, are dropped, and the tags generated for an entry since its rows were staged are applied, as
+    neither change could be made to rows that were not committed yet.
+
+    Keyword arguments:
+    archive_id -- The archive ID
+    staged_data -- The staged rows
+    """
+    entries = IndexedEntriesClient()
+
+    entry_tags = {}
+
+    for entry_id in pc.unique(staged_data['entry_id']).to_pylist():
+        entry = entries.get(archive_id=archive_id, entry_id=entry_id)
+
+        if entry:
+            entry_tags[entry_id] = entry.tags or []
+
+    staged_entry_ids = staged_data['entry_id'].to_pylist()
+
+    if len(entry_tags) < len(set(staged_entry_ids)):
+        logging.info(f'Dropping staged rows of {len(set(staged_entry_ids)) - len(entry_tags)} removed entries')
+
+        staged_data = staged_data.filter(pc.is_in(staged_data['entry_id'], value_set=pa.array(list(entry_tags), pa.string())))
+
+        staged_entry_ids = staged_data['entry_id'].to_pylist()
+
+    # Vector stores created before the entry metadata was denormalized onto the chunks have no tags column
+    if 'tags' in staged_data.column_names:
+        tags_idx = staged_data.column_names.index('tags')
+
+        staged_data = staged_data.set_column(
+            tags_idx,
+            staged_data.schema.field(tags_idx),
+            pa.array([entry_tags[entry_id] for entry_id in staged_entry_ids], type=staged_data.schema.field(tags_idx).type),
+        )
+
+    return staged_data
+
+
+@fn_event_response(exception_reporter=ExceptionReporter(), function_name=_FN_NAME,
+                   logger=Logger(namespace=_FN_NAME))
+def handler(event: Dict, context: Dict):
+    """
+    Lambda handler for the vector store flush function. Commits the staged writes of the archive's vector store
+    to the vector table in as few commits as possible, then requests index maintenance.
+    """
+    logging.debug(f'Received request: {event}')
+
+    source_event = EventBusEvent.from_lambda_event(event)
+
+    event_body = ObjectBody(
+        body=source_event.body,
+        schema=VectorArchiveFlushSchema,
+    )
+
+    archive_id = event_body.get('archive_id')
+
+    shard_number = int(event_body.get('shard_number') or 0)
+
+    jobs = JobsClient()
+
+    with jobs.job_execution(Job(job_type='VECTOR_FLUSH')):
+        vector_stores = VectorStoresClient()
+
+        vector_store = vector_stores.get_shard(archive_id=archive_id, shard_number=shard_number)
+
+        if not vector_store:
+            raise ValueError(f'Could not find vector store of shard {shard_number} for archive {archive_id}')
+
+        # Only the writes staged for the current vector table of the store are committed, see reembed.py
+        write_buffer = VectorWriteBuffer(
+            bucket_name=setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket'),
+            vector_store_id=vector_store.storage_table_name(),
+        )
+
+        if not write_buffer.acquire_lock(lock_seconds=FLUSH_LOCK_SECONDS):
+            logging.info(f'Flush of vector store {vector_store.vector_store_id} already in progress ... skipping')
+
+            return
+
+        table_writes = 0
+
+        flushed_rows = 0
+
+        try:
+            table = get_table_registry().open_table(name=vector_store.storage_table_name(), latest=True)
+
+            while True:
+                staged_keys = write_buffer.staged_keys(max_keys=MAX_FLUSH_FILES)
+
+                if not staged_keys:
+                    break
+
+                staged_data, _ = write_buffer.load(staged_keys)
+
+                staged_data = reconcile_staged_entries(archive_id=archive_id, staged_data=staged_data)
+
+                if staged_data.num_rows:
+                    # Inserting by chunk ID keeps the commit idempotent should removing the staged files fail
+                    table.merge_insert('chunk_id').when_not_matched_insert_all().execute(staged_data)
+
+                    table_writes += 1
+
+                    flushed_rows += staged_data.num_rows
+
+                # Released from the counter ahead of the files, a failed removal re-flushes the files idempotently
+                vector_stores.add_staged_rows(
+                    archive_id=vector_store.archive_id,
+                    rows=-sum(VectorWriteBuffer.staged_rows(key) for key in staged_keys),
+                )
+
+                write_buffer.remove(staged_keys)
+
+        finally:
+            write_buffer.release_lock()
+
+        event_publisher = EventPublisher()
+
+        # Writes staged after the last listing, while the lock was held, did not request a flush of their own
+        if write_buffer.staged_keys(max_keys=1):
+            flush_event_body = ObjectBody(
+                body={
+                    'archive_id': archive_id,
+                    'shard_number': shard_number,
+                },
+                schema=VectorArchiveFlushSchema,
+            )
+
+            event_publisher.submit(
+                event=source_event.next_event(
+                    body=flush_event_body.to_dict(),
+                    event_type=flush_event_body.get('event_type'),
+                )
+            )
+
+        if not table_writes:
+            return
+
+        logging.info(f'Flushed {flushed_rows} staged rows to vector store {vector_store.vector_store_id} in {table_writes} commits')
+
+        latest_vector_store = vector_stores.get_shard(archive_id=archive_id, shard_number=shard_number)
+
+        latest_vector_store.table_writes_since_compaction = (latest_vector_store.table_writes_since_compaction or 0) + table_writes
+
+        vector_stores.put(latest_vector_store)
+
+        bump_archive_write_version(archive_id)
+
+        # The index policy decides whether any maintenance is due for the flushed rows
+        maintenance_event_body = ObjectBody(
+            body={
+                'archive_id': archive_id,
+                'shard_number': shard_number,
+            },
+            schema=VectorArchiveMaintenanceSchema,
+        )
+
+        event_publisher.submit(
+            event=source_event.next_event(
+                body=maintenance_event_body.to_dict(),
+                event_type=maintenance_event_body.get('event_type'),
+            )
+        )
@@ -22,15 +22,21 @@ from omnilake.internal_lib.ai_insights import (
 )
 
 from omnilake.internal_lib.clients import AIStatisticSchema, AIStatisticsCollector
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+from omnilake.internal_lib.tags import normalize_tags
 
 from omnilake.tables.provisioned_archives.client import ArchivesClient
 from omnilake.tables.indexed_entries.client import IndexedEntriesClient
 from omnilake.tables.jobs.client import JobsClient, JobStatus
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
+from omnilake.constructs.archives.vector.tables.vector_store_chunks.client import VectorStoreChunksClient
 
 
 from omnilake.constructs.archives.vector.runtime.event_definitions import (
     VectorArchiveGenerateEntryTagsEventBodySchema,
 )
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_storage import update_chunk_tags
 
 
 def extract_tags(content: str, tag_hint: Optional[str] = None, tag_model_id: Optional[str] = None,
@@ -167,10 +173,30 @@ def handler(event: Dict, context: Dict):
 
         stats_collector.publish(statistic=ai_statistic)
 
-        entry.tags = [tag.lower().strip() for tag in insights['tags'].split(',')]
+        entry.tags = normalize_tags(insights['tags'].split(','))
 
         entries.put(entry)
 
+        # Keep the tags denormalized onto the entry's chunks in sync
+        shards = VectorStoresClient().get_shards(archive_id=archive_id)
+
+        if len(shards) > 1:
+            entry_chunks = VectorStoreChunksClient().get_chunks_by_archive_and_entry(archive_id, entry_id)
+
+            entry_vector_store_ids = {chunk.vector_store_id for chunk in entry_chunks}
+
+            shards = [shard for shard in shards if shard.vector_store_id in entry_vector_store_ids]
+
+        for vector_store in shards:
+            update_chunk_tags(
+                table=get_table_registry().open_table(name=vector_store.storage_table_name(), latest=True),
+                entry_id=entry_id,
+                tags=entry.tags,
+            )
+
+        # Tags are used to filter and prioritize lookups
+        bump_archive_write_version(archive_id)
+
         logging.debug(f"Tags complete")
 
     parent_job.status = JobStatus.COMPLETED
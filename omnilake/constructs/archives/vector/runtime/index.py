@@ -1,15 +1,13 @@
 """
 Processes all requests to vectorize text data and store it in vector storage.
 """
-import json
 import logging
 
 from datetime import datetime, UTC as utc_tz
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-import boto3
-import lancedb
+import numpy as np
 
 from da_vinci.core.global_settings import setting_value
 from da_vinci.core.immutable_object import ObjectBody
@@ -25,20 +23,45 @@ from omnilake.internal_lib.event_definitions import (
     IndexEntryEventBodySchema,
 )
 from omnilake.internal_lib.job_types import JobType
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
 from omnilake.internal_lib.naming import SourceResourceName
+from omnilake.internal_lib.tags import normalize_tags
 
+from omnilake.constructs.archives.vector.runtime.chunking import (
+    ChunkingStrategy,
+    DEFAULT_CHUNK_OVERLAP_TOKENS,
+    DEFAULT_MAX_CHUNK_TOKENS,
+    sentence_chunk_spans,
+)
+from omnilake.constructs.archives.vector.runtime.embeddings import (
+    EmbeddingGenerator,
+    INT8_EMBEDDING_TYPE,
+    get_embedding_generator,
+)
+from omnilake.constructs.archives.vector.runtime.shards import route_entry
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_index import VectorIndexPolicy
+from omnilake.constructs.archives.vector.runtime.write_buffer import VectorWriteBuffer
 from omnilake.constructs.archives.vector.runtime.vector_storage import (
+    CHUNK_HASH_COLUMN,
     DocumentChunk,
+    FULL_TEXT_COLUMN,
+    supports_chunk_diff,
+    supports_entry_metadata,
+    supports_full_text,
+    supports_passages,
+    vector_embedding_type,
 )
 
+from omnilake.tables.entries.client import Entry
 from omnilake.tables.provisioned_archives.client import ArchivesClient
 from omnilake.tables.indexed_entries.client import (
     IndexedEntry,
     IndexedEntriesClient,
-    IndexedEntriesScanDefinition,
 )
 from omnilake.tables.jobs.client import JobsClient, JobStatus
 from omnilake.tables.sources.client import SourcesClient
+from omnilake.tables.tag_postings.client import TagPosting, TagPostingsClient
 from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
 from omnilake.constructs.archives.vector.tables.vector_store_chunks.client import (
     VectorStoreChunk,
@@ -46,14 +69,17 @@ from omnilake.constructs.archives.vector.tables.vector_store_chunks.client impor
 )
 
 from omnilake.constructs.archives.vector.runtime.event_definitions import (
+    VectorArchiveFlushSchema,
     VectorArchiveGenerateEntryTagsEventBodySchema,
+    VectorArchiveMaintenanceSchema,
     VectorArchiveVacuumSchema,
 )
 
 
-def text_chunker(text: str, max_chunk_length: int = 1000, overlap: int = 40) -> List[str]:
+def text_chunk_spans(text: str, max_chunk_length: int = 1000, overlap: int = 40) -> List[Tuple[int, int]]:
     '''
-    Helper function for chunking text based on the max_chunk_length and overlap.
+    Helper function for calculating the [start, end) character spans of the chunks of a text based on the
+    max_chunk_length and overlap.
 
     Keyword arguments:
     text -- The text to chunk.
@@ -66,10 +92,9 @@ def text_chunker(text: str, max_chunk_length: int = 1000, overlap: int = 40) ->
 
     while start < len(text):
         end = min(start + max_chunk_length, len(text))
-        chunk = text[start:end]
 
-        # Append the chunk
-        result.append(chunk)
+        # Append the chunk span
+        result.append((start, end))
 
         # Calculate new start position, considering overlap
         start += max_chunk_length - overlap
@@ -77,6 +102,18 @@ def text_chunker(text: str, max_chunk_length: int = 1000, overlap: int = 40) ->
     return result
 
 
+def text_chunker(text: str, max_chunk_length: int = 1000, overlap: int = 40) -> List[str]:
+    '''
+    Helper function for chunking text based on the max_chunk_length and overlap.
+
+    Keyword arguments:
+    text -- The text to chunk.
+    max_chunk_length -- The maximum length of each chunk.
+    overlap -- The overlap between chunks.
+    '''
+    return [text[start:end] for start, end in text_chunk_spans(text, max_chunk_length, overlap)]
+
+
 def chunk_text(text: str, max_chunk_length: int = 1000, overlap: int = 40) -> List[str]:
     """
     Chunk text into smaller pieces.
@@ -89,63 +126,195 @@ def chunk_text(text: str, max_chunk_length: int = 1000, overlap: int = 40) -> Li
     return text_chunker(text, max_chunk_length, overlap)
 
 
-def get_embeddings(text: str):
+def archive_chunk_spans(text: str, archive_config: Dict) -> List[Tuple[int, int]]:
     """
-    Get embeddings for a given text.
+    Chunk the text with the chunking strategy selected by the archive configuration, returning the [start, end)
+    character span of each chunk.
 
     Keyword arguments:
-    text -- The text to get embeddings for.
+    text -- The text to chunk.
+    archive_config -- The configuration of the archive the text is indexed in.
     """
-    bedrock = boto3.client(service_name='bedrock-runtime')
-    
-    body = json.dumps({
-        "texts": [text],
-        "input_type": "search_document"
-    })
-    
-    response = bedrock.invoke_model(
-        modelId="cohere.embed-multilingual-v3",
-        contentType="application/json",
-        accept="application/json",
-        body=body
-    )
-    
-    response_body = json.loads(response['body'].read())
+    strategy = archive_config.get('chunking_strategy') or ChunkingStrategy.CHARACTER
+
+    if strategy == ChunkingStrategy.SENTENCE:
+        max_tokens = archive_config.get('max_chunk_tokens')
+
+        if max_tokens is None:
+            max_tokens = DEFAULT_MAX_CHUNK_TOKENS
+
+        # An overlap of 0 is valid, only fall back to the default when it is unset
+        overlap_tokens = archive_config.get('chunk_overlap_tokens')
+
+        if overlap_tokens is None:
+            overlap_tokens = DEFAULT_CHUNK_OVERLAP_TOKENS
+
+        # The spans are materialized, the embedding and passage offsets both index into them
+        return list(sentence_chunk_spans(text, max_tokens=max_tokens, overlap_tokens=overlap_tokens))
+
+    if strategy != ChunkingStrategy.CHARACTER:
+        raise ValueError(f"Invalid chunking_strategy: {strategy}. Must be one of {[s.value for s in ChunkingStrategy]}.")
+
+    # Get the max chunk length and overlap from the settings
+    max_chunk_length = setting_value(namespace='omnilake::vector_storage', setting_key='max_chunk_length')
+
+    chunk_overlap = setting_value(namespace='omnilake::vector_storage', setting_key='chunk_overlap')
+
+    return text_chunk_spans(text, max_chunk_length, chunk_overlap)
+
+
+def to_byte_spans(text: str, char_spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Convert character spans of a text into the byte spans of its UTF-8 encoding, as stored in the raw entry bucket.
+
+    Keyword arguments:
+    text -- The text the spans belong to.
+    char_spans -- The [start, end) character spans.
+    """
+    # Pure ASCII text has one byte per character
+    if text.isascii():
+        return list(char_spans)
+
+    boundaries = sorted({offset for span in char_spans for offset in span})
+
+    byte_offsets = {}
+
+    byte_offset = 0
+
+    previous = 0
 
-    logging.debug(f"Embedding response: {response_body}")
+    for boundary in boundaries:
+        byte_offset += len(text[previous:boundary].encode('utf-8'))
 
-    embedding = response_body['embeddings'][0]
+        byte_offsets[boundary] = byte_offset
 
-    return embedding
+        previous = boundary
 
+    return [(byte_offsets[start], byte_offsets[end]) for start, end in char_spans]
 
-def generate_vector_data(entry_id: str, text_chunks: List[str]) -> List[DocumentChunk]:
+
+def generate_vector_data(entry_id: str, text_chunks: List[str],
+                         embedding_generator: Optional[EmbeddingGenerator] = None,
+                         entry_metadata: Optional[Dict] = None, include_text: bool = False,
+                         byte_spans: Optional[List[Tuple[int, int]]] = None, include_chunk_hash: bool = False,
+                         previous_chunks: Optional[List[Dict]] = None) -> List[DocumentChunk]:
     """
     Generate vector data for a given text.
 
     Keyword arguments:
     entry_id -- The entry ID to associate with the vector data.
     text_chunks -- The text chunks to generate vector data for.
+    embedding_generator -- The embedding generator to use, defaults to one configured from the settings.
+    entry_metadata -- The entry metadata denormalized onto every chunk, see ENTRY_METADATA_COLUMNS.
+    include_text -- Whether the chunk text is stored alongside the vector, required for keyword search.
+    byte_spans -- The [start, end) byte spans of the chunks within the raw entry, stored to support passage lookups.
+    include_chunk_hash -- Whether the hash of the chunk text is stored, required for re-indexing by chunk diff.
+    previous_chunks -- The chunk rows of the previous entry of the same source. Chunks with identical text re-use
+                       the chunk ID and vector of the previous row instead of being embedded again.
     """
-    embeddings = []
+    if embedding_generator is None:
+        embedding_generator = get_embedding_generator(input_type='search_document')
+
+    chunk_hashes = [Entry.calculate_hash(chunk) for chunk in text_chunks]
+
+    # Previous rows available for re-use, keyed by the hash of their text
+    reusable_chunks = {}
+
+    for previous_chunk in previous_chunks or []:
+        reusable_chunks.setdefault(previous_chunk[CHUNK_HASH_COLUMN], []).append(previous_chunk)
+
+    reused = [
+        reusable_chunks[chunk_hash].pop() if reusable_chunks.get(chunk_hash) else None
+        for chunk_hash in chunk_hashes
+    ]
 
-    for chunk in text_chunks:
-        embedding_results = get_embeddings(chunk)
+    changed_chunks = [chunk for chunk, reused_chunk in zip(text_chunks, reused) if reused_chunk is None]
 
-        embeddings.append(embedding_results)
+    changed_embeddings = iter(embedding_generator.embed(changed_chunks))
+
+    # int8 embeddings are stored exactly as float16, see QuantizedDocumentChunk
+    quantized = embedding_generator.embedding_type == INT8_EMBEDDING_TYPE
 
     data = []
 
-    for chunk, embed in zip(text_chunks, embeddings):
-        data.append({
+    for chunk_index, (chunk, reused_chunk) in enumerate(zip(text_chunks, reused)):
+        if reused_chunk:
+            chunk_id, embed = reused_chunk['chunk_id'], reused_chunk['vector']
+
+        else:
+            chunk_id, embed = str(uuid4()), next(changed_embeddings)
+
+        chunk_data = {
             'entry_id': entry_id,
-            'chunk_id': str(uuid4()),
-            'vector': embed 
-        })
+            'chunk_id': chunk_id,
+            'vector': np.asarray(embed, dtype=np.float16) if quantized else embed,
+            **(entry_metadata or {}),
+        }
+
+        if include_chunk_hash:
+            chunk_data[CHUNK_HASH_COLUMN] = chunk_hashes[chunk_index]
+
+        if include_text:
+            chunk_data[FULL_TEXT_COLUMN] = chunk
+
+        if byte_spans:
+            chunk_data['byte_start'], chunk_data['byte_end'] = byte_spans[chunk_index]
+
+            chunk_data['chunk_index'] = chunk_index
+
+        data.append(chunk_data)
 
     return data
 
 
+def find_previous_entry_id(archive_id: str, entry_id: str, original_of_source: str) -> Optional[str]:
+    """
+    Return the ID of the latest entry of the archive, other than the given entry, that is the original of the
+    given source. Returns None when the source has no other entry in the archive.
+
+    Keyword arguments:
+    archive_id -- The archive ID.
+    entry_id -- The entry being indexed.
+    original_of_source -- The source resource name.
+    """
+    original_entries = IndexedEntriesClient().get_by_original_of_source(
+        original_of_source=original_of_source,
+        archive_id=archive_id,
+    )
+
+    previous_entries = [
+        indexed_entry for indexed_entry in original_entries if indexed_entry.entry_id != entry_id
+    ]
+
+    if not previous_entries:
+        return None
+
+    latest_entry = max(
+        previous_entries,
+        key=lambda indexed_entry: (indexed_entry.effective_on or datetime.min).replace(tzinfo=utc_tz),
+    )
+
+    return latest_entry.entry_id
+
+
+def load_previous_chunks(table, entry_id: str, total_chunks: int) -> List[Dict]:
+    """
+    Load the chunk ID, hash and vector of every chunk of an entry from the vector table. Chunks without a hash
+    can not be re-used and are only included to be removed.
+
+    Keyword arguments:
+    table -- The vector table.
+    entry_id -- The entry the chunks belong to.
+    total_chunks -- The number of chunks recorded for the entry.
+    """
+    if not total_chunks:
+        return []
+
+    return table.search().where(f"entry_id = '{entry_id}'").select(
+        ['chunk_id', CHUNK_HASH_COLUMN, 'vector']
+    ).limit(total_chunks).to_list()
+
+
 def is_latest_entry_for_original(source_resource_name: str, entry_id: str) -> bool:
     """
     Validate that the latest entry for the given original source is the entry being processed.
@@ -243,65 +412,223 @@ def handler(event: Dict, context: Dict):
     if 'message' in entry_content.response_body:
         raise Exception(f"Error retrieving entry content: {entry_content.response_body['message']}")
 
-    # Get the max chunk length and overlap from the settings
-    max_chunk_length = setting_value(namespace='omnilake::vector_storage', setting_key='max_chunk_length')
-
-    chunk_overlap = setting_value(namespace='omnilake::vector_storage', setting_key='chunk_overlap')
+    content = entry_content.response_body['content']
 
     # Chunk the text
-    text_chunks = chunk_text(entry_content.response_body['content'], max_chunk_length, chunk_overlap)
+    chunk_spans = archive_chunk_spans(content, archive_config)
 
-    # Generate the vector data
-    data = generate_vector_data(entry_id, text_chunks=text_chunks)
+    text_chunks = [content[start:end] for start, end in chunk_spans]
 
-    # Connect to the vector storage
-    vector_bucket = setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket')
+    vector_stores = VectorStoresClient()
 
-    db = lancedb.connect(f's3://{vector_bucket}')
+    first_shard = vector_stores.get(archive_id)
 
-    # Get the vector store ID
-    vector_stores = VectorStoresClient()
+    if not first_shard:
+        raise Exception(f"Vector store not found for archive {archive_id}")
 
-    archive_id = event_body.get("archive_id")
+    chunk_meta_client = VectorStoreChunksClient()
 
-    vector_stores = VectorStoresClient()
+    previous_entry_id = None
+
+    previous_chunks = []
+
+    previous_chunk_metas = []
+
+    # Re-index against the previous entry of the source, when it is replaced by this entry
+    if retain_latest_originals_only and entry_obj.original_of_source:
+        previous_entry_id = find_previous_entry_id(
+            archive_id=archive_id,
+            entry_id=entry_id,
+            original_of_source=entry_obj.original_of_source,
+        )
 
-    vector_store_obj = vector_stores.get(archive_id)
+    if previous_entry_id:
+        previous_chunk_metas = chunk_meta_client.get_chunks_by_archive_and_entry(archive_id, previous_entry_id)
+
+    # Get the vector store of the shard the entry is written to. An entry replacing the previous entry of its
+    # source is written to the shard of the previous entry, new entries are routed by the shard strategy
+    vector_store_obj = None
+
+    if previous_chunk_metas and (first_shard.shard_count or 1) > 1:
+        vector_store_obj = next(
+            (
+                shard for shard in vector_stores.get_shards(archive_id)
+                if shard.vector_store_id == previous_chunk_metas[0].vector_store_id
+            ),
+            None,
+        )
+
+        # The chunks of the previous entry may be recorded against a vector store that no longer backs a shard
+        if not vector_store_obj:
+            logging.warning(f"Could not find vector store {previous_chunk_metas[0].vector_store_id} of previous "
+                            f"entry {previous_entry_id} ... routing entry {entry_id} by the shard strategy")
+
+            previous_entry_id = None
+
+            previous_chunk_metas = []
 
     if not vector_store_obj:
-        raise Exception(f"Vector store not found for archive {archive_id}")
+        shard_number = route_entry(first_shard, entry_id)
+
+        vector_store_obj = first_shard if shard_number == 0 else vector_stores.get_shard(archive_id, shard_number)
 
     vector_store_id = vector_store_obj.vector_store_id
 
-    # Add the data to the vector store
-    vector_table = db.open_table(name=vector_store_id)
+    vector_table = get_table_registry().open_table(name=vector_store_obj.storage_table_name(), latest=True)
 
-    vector_table.add(data)
+    entry_metadata = None
 
-    # Record the chunks in the table
-    chunk_meta_client = VectorStoreChunksClient()
+    if supports_entry_metadata(vector_table):
+        entry_metadata = {
+            'effective_on': entry_obj.effective_on,
+            'original_of_source': entry_obj.original_of_source,
+            'tags': entry_obj.tags or [],
+        }
+
+    full_text = supports_full_text(vector_table)
+
+    chunk_diff = supports_chunk_diff(vector_table)
+
+    # Seconds the flush of staged writes is delayed, None when this event does not request a flush
+    flush_wait_seconds = None
+
+    # Re-indexing by chunk diff requires the chunk hashes, otherwise the previous entry is vacuumed
+    if not chunk_diff:
+        previous_entry_id = None
+
+        previous_chunk_metas = []
+
+    if previous_entry_id:
+        previous_chunks = load_previous_chunks(
+            table=vector_table,
+            entry_id=previous_entry_id,
+            total_chunks=len(previous_chunk_metas),
+        )
+
+    embedding_model_id, embedding_dimensions = vector_store_obj.embedding_model()
+
+    # Generate the vector data with the embedding model of the vector store
+    embedding_generator = get_embedding_generator(
+        input_type='search_document',
+        model_id=embedding_model_id,
+        embedding_type=vector_embedding_type(vector_table).lower(),
+        dimensions=embedding_dimensions,
+    )
+
+    data = generate_vector_data(
+        entry_id,
+        text_chunks=text_chunks,
+        embedding_generator=embedding_generator,
+        entry_metadata=entry_metadata,
+        include_text=full_text,
+        byte_spans=to_byte_spans(content, chunk_spans) if supports_passages(vector_table) else None,
+        include_chunk_hash=chunk_diff,
+        previous_chunks=previous_chunks,
+    )
+
+    embedding_cache = embedding_generator.cache
+
+    if embedding_cache:
+        logging.info(f"Embedding cache hits: {embedding_cache.hits}, misses: {embedding_cache.misses}")
+
+    if previous_entry_id:
+        kept_chunk_ids = {chunk['chunk_id'] for chunk in data}
+
+        reused_chunks = sum(1 for chunk in previous_chunks if chunk['chunk_id'] in kept_chunk_ids)
+
+        logging.info(f"Re-indexing entry {previous_entry_id} as {entry_id}, re-using {reused_chunks} of {len(data)} "
+                     f"chunks and removing {len(previous_chunks) - reused_chunks}")
+
+        # Re-assign the re-used chunks, add the changed chunks and remove the dropped chunks in a single commit
+        vector_table.merge_insert('chunk_id') \
+            .when_matched_update_all() \
+            .when_not_matched_insert_all() \
+            .when_not_matched_by_source_delete(f"entry_id = '{previous_entry_id}'") \
+            .execute(data)
+
+        chunk_meta_client.batch_delete([
+            chunk_meta for chunk_meta in previous_chunk_metas if chunk_meta.chunk_id not in kept_chunk_ids
+        ])
 
+    elif archive_config.get("write_buffering"):
+        # Writes are staged per vector table, writes staged for a table replaced by a re-embedding are never
+        # committed to its replacement
+        write_buffer = VectorWriteBuffer(
+            bucket_name=setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket'),
+            vector_store_id=vector_store_obj.storage_table_name(),
+        )
+
+        # Stage the data, the flusher commits it to the vector store along with the data of concurrent events
+        write_buffer.stage(vector_table, data)
+
+        # The counter tracks the buffer without listing it, only the write that empties or fills it requests a flush
+        staged_rows = vector_stores.add_staged_rows(archive_id=vector_store_obj.archive_id, rows=len(data))
+
+        max_staged_rows = setting_value(namespace='omnilake::vector_storage', setting_key='write_buffer_max_rows')
+
+        if staged_rows >= max_staged_rows > staged_rows - len(data):
+            # This write filled the buffer, flush right away
+            flush_wait_seconds = 0
+
+        elif staged_rows - len(data) <= 0:
+            # First write of the buffer, flush once the buffer window elapsed
+            flush_wait_seconds = setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='write_buffer_max_seconds',
+            )
+
+    else:
+        # Add the data to the vector store
+        vector_table.add(data)
+
+    # Record the chunks in the table
     logging.info(f"Adding {len(data)} chunks to vector store {vector_store_id}")
 
-    for chunk in data:
-        chunk_meta = VectorStoreChunk(
+    chunk_meta_client.batch_put([
+        VectorStoreChunk(
             archive_id=archive_id,
             entry_id=chunk['entry_id'],
             chunk_id=chunk['chunk_id'],
             vector_store_id=vector_store_id,
         )
-
-        chunk_meta_client.put(chunk_meta)
+        for chunk in data
+    ])
 
     logging.info(f"Saved {len(data)} chunks to vector store {vector_store_id}")
 
     # Update the vector store stats
-    vector_store_obj.total_entries += 1
+    previous_total_chunks = vector_store_obj.total_chunks or 0
+
+    # Chunks of the previous entry were either re-used or removed by the re-index
+    vector_store_obj.total_chunks = max(previous_total_chunks + len(data) - len(previous_chunks), 0)
+
+    # A re-indexed entry takes the place of the previous entry, which is not vacuumed
+    if not previous_entry_id:
+        vector_store_obj.total_entries += 1
+
+    previous_table_writes = vector_store_obj.table_writes_since_compaction or 0
+
+    write_buffered = not previous_entry_id and archive_config.get("write_buffering", False)
+
+    # The flusher counts the commits of buffered writes
+    if not write_buffered:
+        vector_store_obj.table_writes_since_compaction = previous_table_writes + 1
 
     vector_store_obj.total_entries_last_calculated = datetime.now(utc_tz)
 
     vector_stores.put(vector_store_obj)
 
+    # Buffered writes only become visible to lookups once they are flushed
+    if not write_buffered:
+        bump_archive_write_version(archive_id)
+
+    if embedding_cache:
+        vector_stores.add_embedding_cache_statistics(
+            archive_id=vector_store_obj.archive_id,
+            hits=embedding_cache.hits,
+            misses=embedding_cache.misses,
+        )
+
     # Update the job statuses and close them out
     vectorize_job.status = JobStatus.COMPLETED
 
@@ -317,41 +644,96 @@ def handler(event: Dict, context: Dict):
 
     event_publisher = EventPublisher()
 
-    # Check if we need to vacuum old entries from the archive
-    if retain_latest_originals_only and entry_obj.original_of_source:
-        scan_def = IndexedEntriesScanDefinition()
+    if flush_wait_seconds is not None:
+        logging.info(f"Requesting flush of staged writes for vector store {vector_store_id} in {flush_wait_seconds} seconds")
+
+        flush_event_body = ObjectBody(
+            body={
+                "archive_id": archive_id,
+                "shard_number": vector_store_obj.shard_number,
+            },
+            schema=VectorArchiveFlushSchema,
+        )
+
+        # Delivery of the event is delayed, giving concurrent index events the chance to stage their writes
+        event_publisher.submit(
+            event=source_event.next_event(
+                body=flush_event_body.to_dict(),
+                event_type=flush_event_body.get("event_type"),
+            ),
+            delay=flush_wait_seconds,
+        )
+
+    # Request index maintenance when the added rows crossed a threshold of the index policy, the flusher requests
+    # it for buffered writes once they are committed
+    maintenance_required = not write_buffered and VectorIndexPolicy.from_settings().maintenance_required(
+        vector_store_obj,
+        previous_total_chunks,
+        full_text=full_text,
+        previous_table_writes=previous_table_writes,
+    )
 
-        scan_def.add('original_of_source', 'equal', entry_obj.original_of_source) 
+    if maintenance_required:
+        logging.info(f"Requesting index maintenance for vector store {vector_store_id}")
+
+        maintenance_event_body = ObjectBody(
+            body={
+                "archive_id": archive_id,
+                "shard_number": vector_store_obj.shard_number,
+            },
+            schema=VectorArchiveMaintenanceSchema,
+        )
 
+        event_publisher.submit(
+            event=source_event.next_event(
+                body=maintenance_event_body.to_dict(),
+                event_type=maintenance_event_body.get("event_type"),
+            )
+        )
+
+    # Check if we need to vacuum old entries from the archive
+    if retain_latest_originals_only and entry_obj.original_of_source:
         archive_entries_client = IndexedEntriesClient()
 
-        archive_entries = archive_entries_client.full_scan(scan_def)
+        archive_entries = archive_entries_client.get_by_original_of_source(entry_obj.original_of_source)
 
         for archive_entry in archive_entries:
             if archive_entry.entry_id == entry_obj.entry_id:
-                logging.debug(f"Skipping processed entry")
+                logging.debug("Skipping processed entry")
 
                 continue
 
             logging.debug(f"Deleting entry index for entry {archive_entry.entry_id} in archive {archive_entry.archive_id}")
 
-            vacuum_event_body = ObjectBody(
-                body={
-                    "archive_id": archive_entry.archive_id,
-                    "entry_id": archive_entry.entry_id,
-                },
-                schema=VectorArchiveVacuumSchema,
-            )
+            # The re-index already re-assigned or removed the chunks of the previous entry. Its chunk records are
+            # now record this entry, and a vacuum reading them from the entry index could delete them.
+            reindexed = archive_entry.archive_id == archive_id and archive_entry.entry_id == previous_entry_id
+
+            if not reindexed:
+                vacuum_event_body = ObjectBody(
+                    body={
+                        "archive_id": archive_entry.archive_id,
+                        "entry_id": archive_entry.entry_id,
+                    },
+                    schema=VectorArchiveVacuumSchema,
+                )
 
-            event_publisher.submit(
-                event=source_event.next_event(
-                    body=vacuum_event_body.to_dict(),
-                    event_type=vacuum_event_body.get("event_type"),
+                event_publisher.submit(
+                    event=source_event.next_event(
+                        body=vacuum_event_body.to_dict(),
+                        event_type=vacuum_event_body.get("event_type"),
+                    )
                 )
-            )
 
             archive_entries_client.delete(archive_entry)
 
+            # Entries of basic archives sharing the source are vacuumed as well, their tag postings go with them
+            if archive_entry.tags:
+                TagPostingsClient().batch_delete([
+                    TagPosting(archive_id=archive_entry.archive_id, entry_id=archive_entry.entry_id, tag=tag)
+                    for tag in normalize_tags(archive_entry.tags)
+                ])
+
             logging.debug(f"Deleted entry index for entry {archive_entry.entry_id} in archive {archive_entry.archive_id}")
 
     else:
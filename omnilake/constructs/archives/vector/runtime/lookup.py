@@ -17,10 +17,12 @@ from omnilake.internal_lib.event_definitions import (
     LakeRequestInternalRequestEventBodySchema,
     LakeRequestLookupResponse,
 )
+from omnilake.internal_lib.lookup_cache import LookupResultCache
 
 from omnilake.tables.jobs.client import JobsClient, JobStatus
 
 # Local imports
+from omnilake.constructs.archives.vector.runtime.lookup_filter import LookupFilter
 from omnilake.constructs.archives.vector.runtime.query import VectorStorageSearch
 
 from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
@@ -67,27 +69,65 @@ def handler(event: Dict, context: Dict):
 
     lookup_instructions = event_body["request_body"]
 
-    archive_id = lookup_instructions["archive_id"]
+    # A federated lookup searches several archives at once, ranking their entries together
+    archive_ids = lookup_instructions.get("archive_ids") or [lookup_instructions.get("archive_id")]
 
-    vector_store = vs_client.get(archive_id=archive_id)
+    if None in archive_ids:
+        raise ValueError('Vector lookup requires one of archive_id or archive_ids')
 
-    if not vector_store:
-        raise ValueError(f'Could not find vector store for archive {archive_id}')
+    for archive_id in archive_ids:
+        vector_store = vs_client.get(archive_id=archive_id)
+
+        if not vector_store:
+            raise ValueError(f'Could not find vector store for archive {archive_id}')
     
-    vector_store_search = VectorStorageSearch()
+    lookup_cache = LookupResultCache(request_type='VECTOR')
 
-    query_string = lookup_instructions["query_string"]
+    cache_key = None
 
-    max_entries = lookup_instructions.get("max_entries")
+    search_results = None
 
-    prioritize_tags = lookup_instructions.get("prioritize_tags")
+    # Repeated lookups against archives that were not written to since are served from the cache
+    if lookup_cache.enabled:
+        cache_key = lookup_cache.cache_key(archive_ids=archive_ids, lookup_instruction=lookup_instructions)
 
-    search_results = vector_store_search.execute(
-        archive_id=archive_id,
-        query_string=query_string,
-        max_entries=max_entries,
-        prioritize_tags=prioritize_tags,
-    )
+        search_results = lookup_cache.get(cache_key)
+
+    if search_results is not None:
+        logging.info(f'Serving lookup from the lookup result cache with key {cache_key}')
+
+        query_job.status_message = f'Returned {len(search_results)} cached entries'
+
+    else:
+        # Results cached under the current write versions must include every write those versions cover
+        vector_store_search = VectorStorageSearch(latest_tables=cache_key is not None)
+
+        query_string = lookup_instructions["query_string"]
+
+        max_entries = lookup_instructions.get("max_entries")
+
+        prioritize_tags = lookup_instructions.get("prioritize_tags")
+
+        search_results = vector_store_search.execute(
+            archive_ids=archive_ids,
+            query_string=query_string,
+            max_entries=max_entries,
+            prioritize_tags=prioritize_tags,
+            nprobes=lookup_instructions.get("nprobes"),
+            refine_factor=lookup_instructions.get("refine_factor"),
+            rescore_factor=lookup_instructions.get("rescore_factor"),
+            keyword_weight=lookup_instructions.get("keyword_weight"),
+            return_passages=lookup_instructions.get("return_passages") or False,
+            passage_neighbors=lookup_instructions.get("passage_neighbors") or 0,
+            lookup_filter=LookupFilter.from_instructions(lookup_instructions),
+            mmr_lambda=lookup_instructions.get("mmr_lambda"),
+        )
+
+        query_job.status_message = (f'Returned {len(search_results)} entries after scanning '
+                                    f'{vector_store_search.rows_scanned} rows in {vector_store_search.rounds} rounds')
+
+        if cache_key:
+            lookup_cache.put(cache_key=cache_key, archive_ids=archive_ids, entry_ids=search_results)
 
     logging.debug(f'Final search results: {search_results}')
 
@@ -0,0 +1,146 @@
+"""
+Entry metadata filters of vector lookups, pushed down into the vector search as a prefilter
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, UTC as utc_tz
+from typing import Dict, List, Optional
+
+from omnilake.internal_lib.tags import normalize_tags
+
+# Highest unicode code point, a prefix ending with it has no exclusive upper bound
+MAX_CODE_POINT = 0x10FFFF
+
+
+def _sql_string(value: str) -> str:
+    """
+    Return the value as a quoted SQL string literal.
+
+    Keyword arguments:
+    value -- The string value
+    """
+    escaped = value.replace("'", "''")
+
+    return f"'{escaped}'"
+
+
+def _as_utc(value: datetime) -> datetime:
+    """
+    Return the datetime as a timezone aware UTC datetime, naive datetimes are assumed to be UTC.
+
+    Keyword arguments:
+    value -- The datetime
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=utc_tz)
+
+    return value.astimezone(utc_tz)
+
+
+def _sql_timestamp(value: datetime) -> str:
+    """
+    Return the datetime as a SQL timestamp literal. The chunk timestamps are stored as naive UTC.
+
+    Keyword arguments:
+    value -- The datetime
+    """
+    return f"timestamp '{_as_utc(value).replace(tzinfo=None).isoformat(sep=' ')}'"
+
+
+@dataclass
+class LookupFilter:
+    """
+    Restricts a vector lookup to the chunks of entries matching the given metadata. Every given condition must
+    hold.
+    """
+    effective_after: Optional[datetime] = None
+    effective_before: Optional[datetime] = None
+    required_tags: List[str] = field(default_factory=list)
+    source_prefix: Optional[str] = None
+
+    @classmethod
+    def from_instructions(cls, lookup_instructions: Dict) -> 'LookupFilter':
+        """
+        Load the filter from the lookup instructions.
+
+        Keyword arguments:
+        lookup_instructions -- The vector lookup instructions
+        """
+        effective_after = lookup_instructions.get('effective_after')
+
+        effective_before = lookup_instructions.get('effective_before')
+
+        return cls(
+            effective_after=datetime.fromisoformat(effective_after) if effective_after else None,
+            effective_before=datetime.fromisoformat(effective_before) if effective_before else None,
+            # Chunk tags are stored normalized, those stored before tags were normalized are rewritten by the backfill
+            required_tags=normalize_tags(lookup_instructions.get('required_tags') or []),
+            source_prefix=lookup_instructions.get('source_prefix') or None,
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.effective_after or self.effective_before or self.required_tags or self.source_prefix)
+
+    def where_clause(self) -> Optional[str]:
+        """
+        Return the filter as a SQL predicate over the denormalized entry metadata columns. The effective date
+        bounds and source prefix are expressed as ranges so they can be served by the BTREE indexes, the tags by
+        the LABEL_LIST index. Returns None when the filter is empty.
+        """
+        predicates = []
+
+        if self.effective_after:
+            predicates.append(f"effective_on >= {_sql_timestamp(self.effective_after)}")
+
+        if self.effective_before:
+            predicates.append(f"effective_on < {_sql_timestamp(self.effective_before)}")
+
+        if self.required_tags:
+            # The predicate compares the normalized required tags to the stored chunk tags as is, which the index
+            # serves, so it relies on the stored tags being normalized as well
+            tag_list = ', '.join(_sql_string(tag) for tag in self.required_tags)
+
+            predicates.append(f"array_has_all(tags, [{tag_list}])")
+
+        if self.source_prefix:
+            predicates.append(f"original_of_source >= {_sql_string(self.source_prefix)}")
+
+            # The smallest string greater than every string starting with the prefix
+            if ord(self.source_prefix[-1]) < MAX_CODE_POINT:
+                upper_bound = self.source_prefix[:-1] + chr(ord(self.source_prefix[-1]) + 1)
+
+                predicates.append(f"original_of_source < {_sql_string(upper_bound)}")
+
+        if not predicates:
+            return None
+
+        return ' AND '.join(predicates)
+
+    def matches(self, hit: Dict) -> bool:
+        """
+        Whether the entry metadata of a hit matches the filter, used for the hits of vector stores without the
+        denormalized metadata columns and for keyword hits.
+
+        Keyword arguments:
+        hit -- The chunk hit, including its entry metadata
+        """
+        effective_on = hit.get('effective_on')
+
+        if self.effective_after or self.effective_before:
+            if effective_on is None:
+                return False
+
+            effective_on = _as_utc(effective_on)
+
+            if self.effective_after and effective_on < _as_utc(self.effective_after):
+                return False
+
+            if self.effective_before and effective_on >= _as_utc(self.effective_before):
+                return False
+
+        if self.required_tags and not set(self.required_tags).issubset(hit.get('tags') or []):
+            return False
+
+        if self.source_prefix and not (hit.get('original_of_source') or '').startswith(self.source_prefix):
+            return False
+
+        return True
@@ -0,0 +1,133 @@
+"""
+Performs the maintenance of the vector stores of an archive
+"""
+import logging
+
+from typing import Dict
+
+from da_vinci.core.global_settings import setting_value
+from da_vinci.core.immutable_object import ObjectBody
+from da_vinci.core.logging import Logger
+
+from da_vinci.exception_trap.client import ExceptionReporter
+
+from da_vinci.event_bus.client import fn_event_response
+from da_vinci.event_bus.event import Event as EventBusEvent
+
+from omnilake.tables.jobs.client import Job, JobsClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
+
+from omnilake.constructs.archives.vector.runtime.compaction import compact_vector_table
+from omnilake.constructs.archives.vector.runtime.event_definitions import VectorArchiveMaintenanceSchema
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_index import (
+    VectorIndexPolicy,
+    maintain_full_text_index,
+    maintain_scalar_indexes,
+    maintain_vector_index,
+)
+from omnilake.constructs.archives.vector.runtime.vector_storage import supports_full_text
+
+
+_FN_NAME = 'omnilake.constructs.vector.maintenance'
+
+
+@fn_event_response(exception_reporter=ExceptionReporter(), function_name=_FN_NAME,
+                   logger=Logger(namespace=_FN_NAME))
+def handler(event: Dict, context: Dict):
+    """
+    Lambda handler for the vector store maintenance function. Compacts the vector table, then builds, rebuilds or
+    optimizes the ANN index, the full text index and the scalar indexes of the archive's vector store as dictated
+    by the index policy.
+    """
+    logging.debug(f'Received request: {event}')
+
+    source_event = EventBusEvent.from_lambda_event(event)
+
+    event_body = ObjectBody(
+        body=source_event.body,
+        schema=VectorArchiveMaintenanceSchema,
+    )
+
+    archive_id = event_body.get('archive_id')
+
+    shard_number = int(event_body.get('shard_number') or 0)
+
+    jobs = JobsClient()
+
+    with jobs.job_execution(Job(job_type='VECTOR_MAINTENANCE')):
+        vector_stores = VectorStoresClient()
+
+        vector_store = vector_stores.get_shard(archive_id=archive_id, shard_number=shard_number)
+
+        if not vector_store:
+            raise ValueError(f'Could not find vector store of shard {shard_number} for archive {archive_id}')
+
+        table = get_table_registry().open_table(name=vector_store.storage_table_name(), latest=True)
+
+        policy = VectorIndexPolicy.from_settings()
+
+        compacted = False
+
+        table_writes = vector_store.table_writes_since_compaction or 0
+
+        # Compact ahead of the index maintenance so new indexes are built over the compacted fragments
+        if event_body.get('compact') or policy.compaction_due(vector_store):
+            compact_vector_table(
+                table=table,
+                vector_store=vector_store,
+                version_retention_hours=setting_value(
+                    namespace='omnilake::vector_storage',
+                    setting_key='version_retention_hours',
+                ),
+            )
+
+            compacted = True
+
+        vector_index_changed = maintain_vector_index(table=table, vector_store=vector_store, policy=policy)
+
+        full_text_index_changed = False
+
+        if supports_full_text(table):
+            full_text_index_changed = maintain_full_text_index(table=table, vector_store=vector_store, policy=policy)
+
+        scalar_indexes_changed = maintain_scalar_indexes(table=table, vector_store=vector_store, policy=policy)
+
+        if not (compacted or vector_index_changed or full_text_index_changed or scalar_indexes_changed):
+            return
+
+        # Index builds can take minutes, reload the store to avoid overwriting counters updated in the meantime
+        latest_vector_store = vector_stores.get_shard(archive_id=archive_id, shard_number=shard_number)
+
+        if compacted:
+            latest_vector_store.compacted_on = vector_store.compacted_on
+
+            latest_vector_store.fragments_after_compaction = vector_store.fragments_after_compaction
+
+            latest_vector_store.fragments_before_compaction = vector_store.fragments_before_compaction
+
+            latest_vector_store.query_latency_after_compaction_ms = vector_store.query_latency_after_compaction_ms
+
+            latest_vector_store.query_latency_before_compaction_ms = vector_store.query_latency_before_compaction_ms
+
+            # Writes made while compacting are kept for the next compaction
+            latest_vector_store.table_writes_since_compaction = max(
+                (latest_vector_store.table_writes_since_compaction or 0) - table_writes,
+                0,
+            )
+
+        latest_vector_store.full_text_index_rows = vector_store.full_text_index_rows
+
+        latest_vector_store.scalar_index_rows = vector_store.scalar_index_rows
+
+        latest_vector_store.vector_index_last_updated = vector_store.vector_index_last_updated
+
+        latest_vector_store.vector_index_rows = vector_store.vector_index_rows
+
+        latest_vector_store.vector_index_trained_rows = vector_store.vector_index_trained_rows
+
+        latest_vector_store.vector_index_type = vector_store.vector_index_type
+
+        vector_stores.put(latest_vector_store)
+
+        logging.info(f'Completed maintenance for vector store {vector_store.vector_store_id} covering {vector_store.vector_index_rows} rows')
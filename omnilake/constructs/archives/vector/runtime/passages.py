@@ -0,0 +1,156 @@
+"""
+Builds passage entries out of the chunks matched by a vector lookup
+"""
+import logging
+
+from typing import Dict, List, Optional, Tuple
+from uuid import NAMESPACE_URL, uuid5
+
+from lancedb.table import Table
+
+from omnilake.internal_lib.clients import RawStorageManager
+from omnilake.internal_lib.naming import EntryResourceName
+
+from omnilake.constructs.archives.vector.runtime.vector_storage import supports_passages
+
+
+# Separates non-contiguous passages of the same entry
+PASSAGE_SEPARATOR = '\n\n...\n\n'
+
+
+def passage_entry_id(entry_id: str, spans: List[Tuple[int, int]]) -> str:
+    """
+    Return the ID of the entry holding the given passages of an entry. The ID is derived from the entry and the
+    byte spans, so lookups matching the same passages re-use the same passage entry.
+
+    Keyword arguments:
+    entry_id -- The entry the passages were read from
+    spans -- The merged [start, end) byte spans of the passages
+    """
+    span_list = ','.join(f'{start}-{end}' for start, end in spans)
+
+    return str(uuid5(NAMESPACE_URL, f'{EntryResourceName(entry_id)}/passages/{span_list}'))
+
+
+def merge_byte_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Merge overlapping or adjacent byte spans, returning them in order.
+
+    Keyword arguments:
+    spans -- The [start, end) byte spans
+    """
+    merged = []
+
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+
+            continue
+
+        merged.append((start, end))
+
+    return merged
+
+
+class PassageBuilder:
+    """
+    Reads the passages matched by a lookup from the raw entry bucket and saves them as new entries, so only the
+    matched passages of an entry are passed on instead of the whole entry. Passage entries are keyed by the entry
+    and the byte spans they hold, a passage entry saved by an earlier lookup is re-used without reading or writing
+    the passages again.
+    """
+    def __init__(self, table: Table, neighbors: int = 0, raw_storage: Optional[RawStorageManager] = None):
+        """
+        Initialize the passage builder
+
+        Keyword arguments:
+        table -- The vector table the chunks were matched in
+        neighbors -- The number of neighboring chunks, on each side, included with every matched chunk
+        raw_storage -- Optional raw storage manager client
+        """
+        self.table = table
+
+        self.neighbors = max(neighbors or 0, 0)
+
+        self.raw_storage = raw_storage or RawStorageManager()
+
+        self.supported = supports_passages(table)
+
+    def _byte_spans(self, entry_id: str, chunk_hits: List[Dict]) -> List[Tuple[int, int]]:
+        """
+        Return the merged byte spans of the matched chunks and their neighbors.
+
+        Keyword arguments:
+        entry_id -- The entry the chunks belong to
+        chunk_hits -- The matched chunk hits of the entry
+        """
+        spans = [(hit['byte_start'], hit['byte_end']) for hit in chunk_hits]
+
+        if self.neighbors:
+            matched_indexes = {hit['chunk_index'] for hit in chunk_hits}
+
+            neighbor_indexes = set()
+
+            for chunk_index in matched_indexes:
+                neighbor_indexes.update(range(max(chunk_index - self.neighbors, 0), chunk_index + self.neighbors + 1))
+
+            neighbor_indexes -= matched_indexes
+
+            if neighbor_indexes:
+                index_list = ', '.join(str(chunk_index) for chunk_index in sorted(neighbor_indexes))
+
+                neighbor_rows = self.table.search().where(
+                    f"entry_id = '{entry_id}' AND chunk_index IN ({index_list})"
+                ).select(['byte_start', 'byte_end']).limit(len(neighbor_indexes)).to_list()
+
+                spans.extend((row['byte_start'], row['byte_end']) for row in neighbor_rows)
+
+        return merge_byte_spans(spans)
+
+    def build(self, entry_id: str, chunk_hits: List[Dict]) -> str:
+        """
+        Save the matched passages of an entry as an entry and return its ID. Returns the original entry ID when
+        the chunk positions were not recorded, as is the case for vector stores created before passage support.
+
+        Keyword arguments:
+        entry_id -- The entry the chunks belong to
+        chunk_hits -- The matched chunk hits of the entry
+        """
+        if not self.supported or any(hit.get('byte_start') is None for hit in chunk_hits):
+            logging.debug(f'No chunk positions recorded for entry {entry_id} ... returning whole entry')
+
+            return entry_id
+
+        spans = self._byte_spans(entry_id, chunk_hits)
+
+        passage_id = passage_entry_id(entry_id=entry_id, spans=spans)
+
+        existing_resp = self.raw_storage.describe_entry(entry_id=passage_id)
+
+        if 'message' not in existing_resp.response_body:
+            logging.debug(f'Re-using entry {passage_id} holding {len(spans)} passages of entry {entry_id}')
+
+            return passage_id
+
+        ranges_resp = self.raw_storage.get_entry_ranges(entry_id=entry_id, ranges=spans)
+
+        if 'message' in ranges_resp.response_body:
+            raise Exception(f"Error retrieving passages of entry {entry_id}: {ranges_resp.response_body['message']}")
+
+        content = PASSAGE_SEPARATOR.join(ranges_resp.response_body['contents'])
+
+        effective_on = chunk_hits[0].get('effective_on')
+
+        resp = self.raw_storage.create_entry(
+            content=content,
+            effective_on=effective_on,
+            entry_id=passage_id,
+            sources=[str(EntryResourceName(entry_id))],
+        )
+
+        if 'message' in resp.response_body:
+            raise Exception(f"Error saving passages of entry {entry_id}: {resp.response_body['message']}")
+
+        logging.debug(f'Saved {len(spans)} passages of entry {entry_id} as entry {passage_id}')
+
+        return passage_id
@@ -8,8 +8,6 @@ import logging
 from datetime import datetime, UTC as utz_tz
 from typing import Dict
 
-import lancedb
-
 from da_vinci.core.global_settings import setting_value
 from da_vinci.core.immutable_object import ObjectBody
 from da_vinci.core.logging import Logger
@@ -27,9 +25,13 @@ from omnilake.tables.provisioned_archives.client import (
     ArchiveStatus,
 )
 from omnilake.tables.jobs.client import Job, JobsClient, JobStatus
-from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStore, VectorStoresClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
 
-from omnilake.constructs.archives.vector.runtime.vector_storage import DocumentChunk
+from omnilake.constructs.archives.vector.runtime.shards import ShardStrategy, create_shard
+from omnilake.constructs.archives.vector.runtime.vector_storage import (
+    EmbeddingType,
+    document_chunk_model,
+)
 
 
 _FN_NAME = 'omnilake.constructs.vector.provisioner'
@@ -67,27 +69,39 @@ def handler(event: Dict, context: Dict) -> Dict:
 
     vector_bucket = setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket')
 
-    db = lancedb.connect(f's3://{vector_bucket}')
-
     archives = ArchivesClient()
 
     archive_id = event_body.get("archive_id")
 
     archive = archives.get(archive_id=archive_id)
 
-    initial_vector_store = VectorStore(
-        archive_id=archive_id,
-        bucket_name=vector_bucket,
-    )
+    schema = document_chunk_model(archive.configuration.get('embedding_type') or EmbeddingType.FLOAT)
 
-    db.create_table(
-        name=initial_vector_store.vector_store_id,
-        schema=DocumentChunk,
-    )
+    shard_count = int(archive.configuration.get('shard_count') or 1)
+
+    if shard_count < 1:
+        raise ValueError(f"Invalid shard_count: {shard_count}. Must be a positive integer.")
+
+    shard_strategy = ShardStrategy(archive.configuration.get('shard_strategy') or ShardStrategy.HASH)
 
     vector_stores = VectorStoresClient()
 
-    vector_stores.put(initial_vector_store)
+    # The first shard tracks the shard layout, it is saved last so entries are only routed to existing shards
+    for shard_number in reversed(range(shard_count)):
+        shard_attributes = {}
+
+        if shard_number == 0:
+            shard_attributes = {'shard_count': shard_count, 'shard_strategy': shard_strategy}
+
+        vector_store = create_shard(
+            archive_id=archive_id,
+            shard_number=shard_number,
+            bucket_name=vector_bucket,
+            schema=schema,
+            **shard_attributes,
+        )
+
+        vector_stores.put(vector_store)
 
     # Set the archive status to active
     archive.status = ArchiveStatus.ACTIVE
@@ -1,79 +1,559 @@
 """
 Handles the Vector Storage queries
 """
-import json
+import heapq
+import itertools
 import logging
 import math
 
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC as utc_tz
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
 
-import boto3
-import lancedb
+import numpy as np
 
 from da_vinci.core.global_settings import setting_value
 
-from omnilake.tables.entries.client import Entry, EntriesClient
+from omnilake.internal_lib.tags import tag_match_scores
+
 from omnilake.tables.indexed_entries.client import IndexedEntriesClient
-from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import (
+    DEFAULT_EMBEDDING_DIMENSIONS,
+    DEFAULT_EMBEDDING_MODEL_ID,
+    VectorStore,
+    VectorStoresClient,
+)
+
+from omnilake.constructs.archives.vector.runtime.embeddings import EmbeddingGenerator, get_embedding_generator
+from omnilake.constructs.archives.vector.runtime.lookup_filter import LookupFilter
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.passages import PassageBuilder
+from omnilake.constructs.archives.vector.runtime.vector_storage import (
+    ENTRY_METADATA_COLUMNS,
+    FULL_TEXT_COLUMN,
+    PASSAGE_COLUMNS,
+    EmbeddingType,
+    supports_entry_metadata,
+    supports_passages,
+    vector_embedding_type,
+)
+
+
+# Each search round extends the ranking of every shard to this many times the rows of the previous round
+SEARCH_GROWTH_FACTOR = 2
+
+MAX_SEARCH_ROUNDS = 6
+
+# Rank constant of reciprocal rank fusion, dampens the influence of the top ranks of any single ranking
+RRF_K = 60
+
+# Maximum number of shards searched at the same time, across all archives of a lookup
+MAX_SHARD_CONCURRENCY = 8
+
+# Number of distinct entries, as a multiple of max_entries, maximal marginal relevance selects from
+MMR_CANDIDATE_FACTOR = 3
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], weights: List[float], k: int = RRF_K) -> List[Dict]:
+    """
+    Merge multiple rankings of chunk hits into one using weighted reciprocal rank fusion. Each hit scores
+    weight / (k + rank) for every ranking it appears in.
+
+    Keyword arguments:
+    rankings -- The rankings to merge, each ordered from best to worst
+    weights -- The weight of each ranking
+    k -- The rank constant
+    """
+    scores = {}
+
+    hits = {}
+
+    for ranking, weight in zip(rankings, weights):
+        for rank, hit in enumerate(ranking, start=1):
+            chunk_id = hit['chunk_id']
+
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (k + rank)
+
+            hits.setdefault(chunk_id, hit)
+
+    return [hits[chunk_id] for chunk_id in sorted(scores, key=scores.get, reverse=True)]
+
+
+def merge_shard_hits(shard_hits: List[List[Dict]], result_limits: int, key: Callable[[Dict], float]) -> List[Dict]:
+    """
+    Merge the rankings of the searched shards into a single ranking of at most result_limits hits. Each
+    ranking is already ordered by the key, so they are merged lazily through a heap instead of being sorted.
+
+    Keyword arguments:
+    shard_hits -- The ranking of every shard
+    result_limits -- The maximum number of hits returned
+    key -- The ranking key, lower ranks first
+    """
+    if len(shard_hits) == 1:
+        return shard_hits[0][:result_limits]
+
+    return list(itertools.islice(heapq.merge(*shard_hits, key=key), result_limits))
+
+
+def merge_vector_hits(shard_hits: List[List[Dict]], shard_models: List[Hashable], result_limits: int) -> List[Dict]:
+    """
+    Merge the vector rankings of the searched shards into a single ranking of at most result_limits hits. The
+    distances of shards embedded with the same model are comparable and merged as is, the rankings of different
+    models are fused by rank.
+
+    Keyword arguments:
+    shard_hits -- The ranking of every shard, ordered by distance
+    shard_models -- The embedding model of every shard
+    result_limits -- The maximum number of hits returned
+    """
+    model_hits = {}
+
+    for hits, model in zip(shard_hits, shard_models):
+        model_hits.setdefault(model, []).append(hits)
+
+    rankings = [
+        merge_shard_hits(hits, result_limits, key=lambda hit: hit['_distance']) for hits in model_hits.values()
+    ]
+
+    if len(rankings) == 1:
+        return rankings[0]
+
+    return reciprocal_rank_fusion(rankings=rankings, weights=[1.0] * len(rankings))[:result_limits]
+
+
+def rescore_hits(query_vector: List[float], hits: List[Dict], vectors: List[List[float]]) -> List[Dict]:
+    """
+    Re-rank the vector hits by the cosine distance, computed in float32, between the full precision query
+    embedding and a full precision vector of each hit. Recovers the ordering lost to quantized embeddings. The
+    distance of every hit is replaced.
+
+    Keyword arguments:
+    query_vector -- The full precision query embedding
+    hits -- The vector hits
+    vectors -- The full precision vector of each hit
+    """
+    if not hits:
+        return hits
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    query = np.asarray(query_vector, dtype=np.float32)
+
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+
+    similarities = np.divide(vectors @ query, norms, out=np.zeros(len(hits), dtype=np.float32), where=norms > 0)
+
+    for hit, similarity in zip(hits, similarities):
+        hit['_distance'] = float(1 - similarity)
+
+    return [hits[idx] for idx in np.argsort(-similarities, kind='stable')]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Return the vectors scaled to unit length, zero vectors are left as is.
+
+    Keyword arguments:
+    vectors -- The vectors, one per row
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def maximal_marginal_relevance(query_vector: List[float], hits: List[Dict], mmr_lambda: float,
+                               limit: int) -> List[Dict]:
+    """
+    Re-rank the hits with maximal marginal relevance. Hits are selected one at a time, each scoring
+    mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, where relevance is the cosine similarity of the hit to
+    the query and redundancy its highest cosine similarity to the hits already selected. Near duplicates of a
+    selected hit fall behind distinct hits of slightly lower relevance.
+
+    The limit best hits are returned first, in the order they were selected, followed by the remaining hits in
+    their original order. Hits without a stored vector, such as keyword only hits, are treated as unrelated to
+    every other hit and as having no similarity to the query.
+
+    Keyword arguments:
+    query_vector -- The query embedding
+    hits -- The hits to re-rank, including their stored vector
+    mmr_lambda -- Trade off between relevance (1) and diversity (0)
+    limit -- The number of hits to select
+    """
+    if len(hits) < 2:
+        return hits
+
+    query = _normalize_rows(np.asarray(query_vector, dtype=np.float32))
+
+    dimensions = query.shape[0]
+
+    vectors = _normalize_rows(np.asarray(
+        [hit['vector'] if hit.get('vector') is not None else np.zeros(dimensions) for hit in hits],
+        dtype=np.float32,
+    ))
+
+    relevance = vectors @ query
+
+    # Highest similarity of every hit to the hits selected so far
+    redundancy = np.zeros(len(hits), dtype=np.float32)
+
+    available = np.ones(len(hits), dtype=bool)
+
+    selected = []
+
+    for _ in range(min(limit, len(hits))):
+        scores = np.where(available, mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, -np.inf)
+
+        idx = int(np.argmax(scores))
+
+        selected.append(idx)
+
+        available[idx] = False
+
+        np.maximum(redundancy, vectors @ vectors[idx], out=redundancy)
+
+    return [hits[idx] for idx in selected] + [hit for idx, hit in enumerate(hits) if available[idx]]
 
 
 class VectorStorageSearch:
     """
     Vector Storage Query
     """
-    def __init__(self):
+    def __init__(self, latest_tables: bool = False):
+        """
+        Initialize the search
+
+        Keyword arguments:
+        latest_tables -- Whether the searched tables are moved to their latest version before searching, rather
+                         than searching cached table handles that may be up to the staleness bound behind. Required
+                         when the results are cached under the current write versions of the archives.
+        """
+        self.latest_tables = latest_tables
+
         self.storage_bucket_name = setting_value(
             namespace='omnilake::vector_storage',
             setting_key='vector_store_bucket',
         )
 
-    def _query(self, db: lancedb.DBConnection, vector_store_id: str, query: str, result_limits: int = 100) -> List[str]:
+        # Float embedding generators of the documents, keyed by embedding model, used to rescore int8 hits
+        self._full_precision_generators = {}
+
+        # Statistics of the last executed search
+        self.rounds = 0
+
+        self.rows_scanned = 0
+
+    @staticmethod
+    def _search_shards(shards: List[VectorStore], search: Callable[[VectorStore], List[Dict]],
+                       shard_archives: Dict[str, str]) -> List[List[Dict]]:
+        """
+        Run a search against every shard concurrently, returning the hits of each shard. Every hit records the
+        vector store it was found in and the archive that vector store belongs to.
+
+        Keyword arguments:
+        shards -- The vector stores of the shards to search
+        search -- The search run against a single shard
+        shard_archives -- The archive ID of each shard, keyed by vector store ID
+        """
+        def _search_shard(shard: VectorStore) -> List[Dict]:
+            hits = search(shard)
+
+            for hit in hits:
+                hit['vector_store_id'] = shard.vector_store_id
+
+                hit['archive_id'] = shard_archives[shard.vector_store_id]
+
+            return hits
+
+        if len(shards) == 1:
+            return [_search_shard(shards[0])]
+
+        with ThreadPoolExecutor(max_workers=min(len(shards), MAX_SHARD_CONCURRENCY)) as executor:
+            return list(executor.map(_search_shard, shards))
+
+    def _search_shard_pages(self, shards: List[VectorStore], shard_hits: List[List[Dict]], exhausted: Set[int],
+                            result_limits: int, search: Callable[[VectorStore, int, int], List[Dict]],
+                            shard_archives: Dict[str, str], candidate_factors: Optional[Dict[str, int]] = None) -> int:
+        """
+        Extend the ranking of every shard that is not yet exhausted to result_limits hits. Each shard is only
+        searched for the page of rows following the hits it already returned, the new hits are appended to its
+        ranking. Returns the number of rows the searches returned.
+
+        Keyword arguments:
+        shards -- The vector stores of the shards to search
+        shard_hits -- The hits returned by each shard so far, extended in place
+        exhausted -- The positions of the shards that returned all of their rows, extended in place
+        result_limits -- The number of hits each shard's ranking is extended to
+        search -- The search run against a single shard, called with the shard, the offset and the limit
+        shard_archives -- The archive ID of each shard, keyed by vector store ID
+        candidate_factors -- Optional multiple of result_limits the ranking of a shard is extended to instead, keyed
+                             by vector store ID
+        """
+        candidate_factors = candidate_factors or {}
+
+        pending = [idx for idx in range(len(shards)) if idx not in exhausted]
+
+        if not pending:
+            return 0
+
+        limits = {
+            shards[idx].vector_store_id: result_limits * candidate_factors.get(shards[idx].vector_store_id, 1)
+            for idx in pending
+        }
+
+        offsets = {shards[idx].vector_store_id: len(shard_hits[idx]) for idx in pending}
+
+        page_hits = self._search_shards(
+            shards=[shards[idx] for idx in pending],
+            search=lambda shard: search(
+                shard,
+                offsets[shard.vector_store_id],
+                limits[shard.vector_store_id] - offsets[shard.vector_store_id],
+            ),
+            shard_archives=shard_archives,
+        )
+
+        rows = 0
+
+        for idx, hits in zip(pending, page_hits):
+            vector_store_id = shards[idx].vector_store_id
+
+            # A shard returning fewer rows than requested has none left
+            if len(hits) < limits[vector_store_id] - offsets[vector_store_id]:
+                exhausted.add(idx)
+
+            shard_hits[idx].extend(hits)
+
+            rows += len(hits)
+
+        return rows
+
+    def _query(self, vector_store: VectorStore, query: str, result_limits: int = 100, nprobes: Optional[int] = None,
+               refine_factor: Optional[int] = None, where: Optional[str] = None,
+               include_vectors: bool = False, offset: int = 0, include_text: bool = False) -> List[Dict]:
         """
-        Load the results from the Vector Storage service.
+        Load the results from the Vector Storage service. Returns the matching chunk rows, including the
+        denormalized entry metadata when the vector store carries it.
 
         Keyword arguments:
-        db -- The connection to the Vector Storage service
-        vector_store_id -- The ID of the vector store to query
-        query -- The query to perform
+        vector_store -- The vector store to query
+        query -- The query embedding, generated with the embedding model of the vector store
         result_limits -- The number of results to return
+        nprobes -- The number of index partitions to probe, only applies to stores with an ANN index
+        refine_factor -- Re-rank refine_factor * result_limits candidates with full vectors, only applies to stores with an ANN index
+        where -- Optional SQL predicate applied ahead of the vector search, only rows matching it are searched
+        include_vectors -- Whether the stored vector of each chunk is returned
+        offset -- The number of best ranked results skipped
+        include_text -- Whether the text of each chunk is returned
         """
-        table = db.open_table(name=vector_store_id)
+        table = get_table_registry(bucket_name=self.storage_bucket_name).open_table(name=vector_store.storage_table_name())
+
+        columns = self._result_columns(table)
 
-        result = table.search(query).metric("cosine").limit(result_limits).to_list()
+        if include_vectors:
+            columns.append('vector')
 
-        entries = [r["entry_id"] for r in result]
+        if include_text:
+            columns.append(FULL_TEXT_COLUMN)
 
-        return entries
+        search = table.search(query).metric("cosine").select(columns).limit(result_limits)
 
-    def _remove_source_duplicates(self, entries: List[Entry]) -> List[Entry]:
+        if offset:
+            search = search.offset(offset)
+
+        if where:
+            search = search.where(where, prefilter=True)
+
+        if nprobes:
+            search = search.nprobes(nprobes)
+
+        if refine_factor:
+            search = search.refine_factor(refine_factor)
+
+        return search.to_list()
+
+    def _keyword_query(self, vector_store: VectorStore, query_string: str, result_limits: int = 100,
+                       include_vectors: bool = False, offset: int = 0) -> List[Dict]:
         """
-        Remove all entries that are duplicates of the source. Favor the entry with the latest effective date.
+        Load the BM25 ranked results of a full text search over the chunk text.
 
         Keyword arguments:
-        entries -- The entries to remove duplicates from.
+        vector_store -- The vector store to query
+        query_string -- The query string to search for
+        result_limits -- The number of results to return
+        include_vectors -- Whether the stored vector of each chunk is returned
+        offset -- The number of best ranked results skipped
+        """
+        table = get_table_registry(bucket_name=self.storage_bucket_name).open_table(name=vector_store.storage_table_name())
+
+        columns = self._result_columns(table)
+
+        if include_vectors:
+            columns.append('vector')
+
+        search = table.search(query_string, query_type='fts').select(columns).limit(result_limits)
+
+        if offset:
+            search = search.offset(offset)
+
+        return search.to_list()
+
+    @staticmethod
+    def _result_columns(table) -> List[str]:
+        """
+        Return the columns selected from the vector table for each hit.
+
+        Keyword arguments:
+        table -- The vector table
+        """
+        columns = ['entry_id', 'chunk_id']
+
+        if supports_entry_metadata(table):
+            columns.extend(ENTRY_METADATA_COLUMNS)
+
+        if supports_passages(table):
+            columns.extend(PASSAGE_COLUMNS)
+
+        return columns
+
+    def _full_precision_generator(self, embedding_model: Tuple[str, int]) -> EmbeddingGenerator:
+        """
+        Return the float embedding generator of the documents embedded with the given model.
+
+        Keyword arguments:
+        embedding_model -- The ID of the embedding model and the number of dimensions of its embeddings
+        """
+        if embedding_model not in self._full_precision_generators:
+            model_id, dimensions = embedding_model
+
+            self._full_precision_generators[embedding_model] = get_embedding_generator(
+                input_type='search_document',
+                model_id=model_id,
+                dimensions=dimensions,
+            )
+
+        return self._full_precision_generators[embedding_model]
+
+    def _rescore_shard_hits(self, shards: List[VectorStore], shard_hits: List[List[Dict]], rescored_shards: Set[int],
+                            query_embeddings: Dict[Tuple[str, int], List[float]]) -> None:
+        """
+        Re-rank the hits of the shards storing int8 embeddings by full precision embeddings of their chunk text.
+        Each hit is embedded once, in the round it is returned, the embedding cache serves text embedded by earlier
+        lookups. Hits without text keep their quantized distance.
+
+        Keyword arguments:
+        shards -- The vector stores of the searched shards
+        shard_hits -- The hits returned by each shard so far, re-ranked in place
+        rescored_shards -- The positions of the shards whose hits are rescored
+        query_embeddings -- The full precision query embedding of each embedding model
+        """
+        for idx in rescored_shards:
+            embedding_model = shards[idx].embedding_model()
+
+            hits = [hit for hit in shard_hits[idx] if not hit.get('_rescored') and hit.get(FULL_TEXT_COLUMN)]
+
+            if hits:
+                rescore_hits(
+                    query_vector=query_embeddings[embedding_model],
+                    hits=hits,
+                    vectors=self._full_precision_generator(embedding_model).embed(
+                        [hit[FULL_TEXT_COLUMN] for hit in hits]
+                    ),
+                )
+
+                for hit in hits:
+                    hit['_rescored'] = True
+
+            shard_hits[idx].sort(key=lambda hit: hit['_distance'])
+
+    def _load_missing_entry_metadata(self, hits: List[Dict], loaded_entries: Optional[Dict] = None) -> List[Dict]:
+        """
+        Fill in the entry metadata for hits from vector stores created before the metadata was denormalized onto
+        the chunks. Hits that already carry the metadata are not touched.
+
+        Keyword arguments:
+        hits -- The chunk hits returned by the search, each recording the archive it belongs to.
+        loaded_entries -- Optional indexed entries already loaded, keyed by archive and entry ID. Newly loaded entries are added.
+        """
+        indexed_entries = IndexedEntriesClient()
+
+        if loaded_entries is None:
+            loaded_entries = {}
+
+        for hit in hits:
+            if 'effective_on' in hit:
+                continue
+
+            entry_id = hit['entry_id']
+
+            archive_id = hit['archive_id']
+
+            # The tags of an entry indexed into several archives are generated per archive
+            entry_key = (archive_id, entry_id)
+
+            if entry_key not in loaded_entries:
+                logging.debug(f'Fetching entry ID: {entry_id}')
+
+                entry_index = indexed_entries.get(archive_id=archive_id, entry_id=entry_id)
+
+                if not entry_index:
+                    raise ValueError(f'Could not find entry index for {entry_id} in archive {archive_id}')
+
+                loaded_entries[entry_key] = entry_index
+
+            entry_index = loaded_entries[entry_key]
+
+            hit['effective_on'] = entry_index.effective_on
+
+            hit['original_of_source'] = entry_index.original_of_source
+
+            hit['tags'] = entry_index.tags
+
+        return hits
+
+    @staticmethod
+    def _effective_date(hit: Dict) -> datetime:
+        """
+        Return the effective date of a hit as a timezone aware datetime.
+
+        Keyword arguments:
+        hit -- The chunk hit
+        """
+        effective_on = hit.get('effective_on')
+
+        if effective_on is None:
+            return datetime.min.replace(tzinfo=utc_tz)
+
+        if effective_on.tzinfo is None:
+            effective_on = effective_on.replace(tzinfo=utc_tz)
+
+        return effective_on
+
+    def _remove_source_duplicates(self, hits: List[Dict]) -> List[Dict]:
+        """
+        Remove all hits that are duplicates of the source. Favor the entry with the latest effective date.
+
+        Keyword arguments:
+        hits -- The chunk hits to remove duplicates from.
         """
         # Track all of the original source entries
         existing_source_entries = {}
 
         ids_to_remove = set()
 
-        entries_client = EntriesClient()
-
-        for idx, entry in enumerate(entries):
-            # Fetch Entry Table Object
-            entry_global_obj  = entries_client.get(entry_id=entry)
-
-            original_of_source = entry_global_obj.original_of_source
+        for idx, hit in enumerate(hits):
+            original_of_source = hit.get('original_of_source')
 
             # If Entry is not original content of a source, skip
             if not original_of_source:
                 continue
 
+            effective_date = self._effective_date(hit)
+
             # If the original source is not in the existing source entries, add it
             if original_of_source not in existing_source_entries:
                 existing_source_entries[original_of_source] = {
                     'list_id': idx,
-                    'effective_date': entry_global_obj.effective_on,
+                    'effective_date': effective_date,
                 }
 
                 continue
@@ -82,145 +562,369 @@ class VectorStorageSearch:
 
             existing_entry_effective_date = existing_source_entries[original_of_source]['effective_date']
 
-            existing_entry = entries[existing_entry_idx]
+            existing_entry = hits[existing_entry_idx]['entry_id']
 
-            if existing_entry_effective_date < entry_global_obj.effective_on:
-                logging.debug(f'Removing duplicate source entry {existing_entry} in favor of {entry}.')
+            if existing_entry_effective_date < effective_date:
+                logging.debug(f'Removing duplicate source entry {existing_entry} in favor of {hit["entry_id"]}.')
 
                 ids_to_remove.add(existing_entry_idx)
 
                 existing_source_entries[original_of_source]['list_id'] = idx
 
-                existing_source_entries[original_of_source]['effective_date'] = entry_global_obj.effective_on
+                existing_source_entries[original_of_source]['effective_date'] = effective_date
 
             else:
-                logging.debug(f'Removing duplicate source entry {entry} in favor of {existing_entry}.')
+                logging.debug(f'Removing duplicate source entry {hit["entry_id"]} in favor of {existing_entry}.')
 
                 ids_to_remove.add(idx)
 
-        return [entry for idx, entry in enumerate(entries) if idx not in ids_to_remove]
+        return [hit for idx, hit in enumerate(hits) if idx not in ids_to_remove]
 
-    def _sort_entries_by_tag(self, archive_id: str, entries: List[Entry], target_tags: List[str]) -> List[Entry]:
+    def _sort_entries_by_tag(self, hits: List[Dict], target_tags: List[str]) -> List[Dict]:
         """
-        Sort the entries based on the target tags.
+        Sort the hits based on the target tags, the tags of the hits and the target tags are both normalized.
 
         Keyword arguments:
-        archive_id -- The ID of the archive to sort against.
-        entries -- The entry_ids to sort.
+        hits -- The chunk hits to sort.
         target_tags -- The target tags to sort against.
         """
-        indexed_entries = IndexedEntriesClient()
-
-        entries_to_sort = []
-
-        for entry in entries:
-            logging.debug(f'Fetching entry ID: {entry}')
-
-            entry_index = indexed_entries.get(
-                archive_id=archive_id,
-                entry_id=entry,
-            )
-
-            logging.debug(f'Entry index details: {entry_index}')
-
-            if not entry_index:
-                raise ValueError(f'Could not find entry index for {entry} in archive {archive_id}')
-
-            entries_to_sort.append(entry_index)
-
-        sorted_entries = sorted(
-            entries_to_sort,
-            key=lambda entry_obj: entry_obj.calculate_score(target_tags),
-            reverse=True,
+        scores = tag_match_scores(
+            candidate_tags=[hit.get('tags') or [] for hit in hits],
+            target_tags=target_tags,
         )
 
-        result = [entry.entry_id for entry in sorted_entries]
-
-        return result
+        # Stable, hits with the same score keep their relevance order
+        return [hits[idx] for idx in np.argsort(-scores, kind='stable')]
 
     @staticmethod
-    def text_embedding(text: str):
+    def text_embedding(text: str, model_id: str = DEFAULT_EMBEDDING_MODEL_ID,
+                       dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS):
         """
         Create a prompt embedding for the query.
 
         Keyword Arguments:
             prompt: The prompt to query
+            model_id: The embedding model of the vector stores searched with the embedding
+            dimensions: The number of dimensions of the embeddings held by the vector stores
         """
-        bedrock = boto3.client(service_name='bedrock-runtime')
-
-        body = json.dumps({
-            "texts": [text],
-            "input_type": "search_query"
-        })
-        
-        response = bedrock.invoke_model(
-            modelId="cohere.embed-multilingual-v3",
-            contentType="application/json",
-            accept="application/json",
-            body=body
+        embedding_generator = get_embedding_generator(
+            input_type='search_query',
+            max_concurrency=1,
+            model_id=model_id,
+            dimensions=dimensions,
         )
-    
-        response_body = json.loads(response['body'].read())
 
-        logging.debug(f'Embedding response: {response_body}')
+        embedding = embedding_generator.embed_one(text)
 
-        embedding = response_body['embeddings'][0]
+        logging.debug(f'Embedding generated for query: {text}')
 
         return embedding
 
-    def execute(self, archive_id: str, query_string: str, max_entries: int, prioritize_tags: List[str] = None) -> List[str]:
+    def execute(self, query_string: str, max_entries: int, archive_id: Optional[str] = None,
+                archive_ids: Optional[List[str]] = None, prioritize_tags: List[str] = None,
+                nprobes: Optional[int] = None, refine_factor: Optional[int] = None,
+                rescore_factor: Optional[int] = None, keyword_weight: Optional[float] = None,
+                return_passages: bool = False, passage_neighbors: int = 0,
+                lookup_filter: Optional[LookupFilter] = None, mmr_lambda: Optional[float] = None) -> List[str]:
         """
-        Entry point for the query API Lambda function.
+        Entry point for the query API Lambda function. Searching multiple archives embeds the query once per
+        embedding model and ranks the hits of all their shards together, returning the best entries across the
+        archives.
+
+        Keyword arguments:
+        archive_id -- The ID of the archive to search
+        archive_ids -- The IDs of the archives to search, takes precedence over archive_id
+        query_string -- The query string to search for
+        max_entries -- The maximum number of entries to return
+        prioritize_tags -- The tags to prioritize in the results
+        nprobes -- The number of index partitions to probe, higher values trade latency for recall
+        refine_factor -- The refine factor applied to indexed searches, higher values trade latency for recall
+        rescore_factor -- The number of candidates, as a multiple of the rows of a round, fetched from shards storing
+                          int8 embeddings and re-ranked by full precision embeddings of their text
+        keyword_weight -- Weight between 0 and 1 of the keyword ranking fused with the vector ranking
+        return_passages -- Return entries holding only the matched passages instead of the whole matched entries
+        passage_neighbors -- The number of neighboring chunks included on each side of a matched passage
+        lookup_filter -- Optional entry metadata filter, only chunks of matching entries are returned
+        mmr_lambda -- Trade off between relevance (1) and diversity (0) of the returned entries, unset skips the
+                      maximal marginal relevance re-ranking
         """
-        query = self.text_embedding(query_string)
+        if keyword_weight is not None and not 0 <= keyword_weight <= 1:
+            raise ValueError(f"Invalid keyword_weight: {keyword_weight}. Must be between 0 and 1.")
+
+        if mmr_lambda is not None and not 0 <= mmr_lambda <= 1:
+            raise ValueError(f"Invalid mmr_lambda: {mmr_lambda}. Must be between 0 and 1.")
+
+        if rescore_factor is not None and rescore_factor < 1:
+            raise ValueError(f"Invalid rescore_factor: {rescore_factor}. Must be a positive integer.")
+
+        # A lambda of 1 ranks by relevance alone, the same as not re-ranking
+        diversify = mmr_lambda is not None and mmr_lambda < 1
+
+        # Preserve the requested order while dropping archives requested more than once
+        archive_ids = list(dict.fromkeys(archive_ids or [archive_id]))
+
+        if None in archive_ids:
+            raise ValueError('One of archive_id or archive_ids is required')
 
         vector_stores = VectorStoresClient()
 
-        vector_store = vector_stores.get(archive_id=archive_id)
+        shards = []
+
+        shard_archives = {}
+
+        for archive_id in archive_ids:
+            archive_shards = vector_stores.get_shards(archive_id=archive_id)
+
+            if not archive_shards:
+                raise ValueError(f'Could not find vector store for archive {archive_id}')
+
+            for shard in archive_shards:
+                shard_archives[shard.vector_store_id] = archive_id
+
+            shards.extend(archive_shards)
+
+        archive_names = ', '.join(f'"{archive_id}"' for archive_id in archive_ids)
+
+        if self.latest_tables:
+            registry = get_table_registry(bucket_name=self.storage_bucket_name)
+
+            # Later opens of the tables during the search re-use the refreshed handles
+            for shard in shards:
+                registry.open_table(name=shard.storage_table_name(), latest=True)
+
+        # The query is embedded once per embedding model of the searched shards, shards being re-embedded or
+        # archives indexed with different models are searched with the embedding of their own model
+        query_embeddings = {}
 
-        if not vector_store:
-            raise ValueError(f'Could not find vector store for archive {archive_id}')
+        for shard in shards:
+            embedding_model = shard.embedding_model()
 
-        vector_store_id = vector_store.vector_store_id
+            if embedding_model not in query_embeddings:
+                query_embeddings[embedding_model] = self.text_embedding(query_string, *embedding_model)
 
-        logging.info(f'Querying vector storage "{vector_store_id}" with "{query}"')
+        # Similarities between the vectors of different models are meaningless
+        if diversify and len(query_embeddings) > 1:
+            logging.info(f'Archives {archive_names} use {len(query_embeddings)} embedding models ... skipping diversification')
 
-        db = lancedb.connect(f's3://{self.storage_bucket_name}')
+            diversify = False
+
+        logging.info(f'Querying {len(shards)} vector storage shards of archives {archive_names} with "{query_string}"')
 
         # Proactive validation
         if max_entries is None or not isinstance(max_entries, int) or max_entries <= 0:
             raise ValueError(f"Invalid max_entries: {max_entries}. Must be a positive integer.")
 
+        # Maximal marginal relevance needs a larger pool of distinct entries to select the diverse ones from
+        candidate_entries = max_entries * MMR_CANDIDATE_FACTOR if diversify else max_entries
+
         # Reactive error handling
         try:
-            result_limits = max_entries + math.ceil(max_entries * 0.3)
+            result_limits = candidate_entries + math.ceil(candidate_entries * 0.3)
         except TypeError as error:
             raise TypeError(f"Error calculating result_limits with max_entries = {max_entries}") from error
 
-        resulting_entries = self._query(
-            db=db,
-            query=query,
-            result_limits=max_entries + math.ceil(max_entries * 0.3), # Set query limit to 30% more than the max entries
-            vector_store_id=vector_store_id,
-        )
+        # Keyword search requires the chunk text and its full text index, older stores fall back to vector only
+        keyword_shards = [shard for shard in shards if shard.full_text_index_rows] if keyword_weight else []
+
+        hybrid = bool(keyword_shards)
+
+        if keyword_weight and not hybrid:
+            logging.info(f'Archives {archive_names} have no full text index ... performing vector only lookup')
+
+        # The stored vectors of float stores are full precision already, only int8 stores holding the chunk text
+        # can be rescored
+        rescored_shards = set()
+
+        if rescore_factor and rescore_factor > 1:
+            for idx, shard in enumerate(shards):
+                table = get_table_registry(bucket_name=self.storage_bucket_name).open_table(name=shard.storage_table_name())
+
+                if vector_embedding_type(table) == EmbeddingType.INT8 and FULL_TEXT_COLUMN in table.schema.names:
+                    rescored_shards.add(idx)
+
+            if not rescored_shards:
+                logging.info(f'Archives {archive_names} hold no int8 embeddings with their text ... skipping rescoring')
+
+        candidate_factors = {shards[idx].vector_store_id: rescore_factor for idx in rescored_shards}
+
+        prefilters = {}
+
+        if lookup_filter:
+            for shard in shards:
+                table = get_table_registry(bucket_name=self.storage_bucket_name).open_table(name=shard.storage_table_name())
+
+                # Stores without the denormalized metadata are filtered once the metadata of the hits is loaded
+                if supports_entry_metadata(table):
+                    prefilters[shard.vector_store_id] = lookup_filter.where_clause()
+
+            logging.info(f'Filtering lookup of archives {archive_names} with {lookup_filter.where_clause()}')
+
+        self.rounds = 0
 
-        logging.info(f'Vector storage query returned {len(resulting_entries)} results.')
+        self.rows_scanned = 0
 
-        if not resulting_entries:
-            return []
+        loaded_entries = {}
 
-        de_duplicated_entries = self._remove_source_duplicates(entries=resulting_entries)
+        de_duplicated_hits = []
+
+        # The hits of each shard accumulate over the rounds, a round only searches the rows past them
+        shard_hits = [[] for _ in shards]
+
+        exhausted_shards = set()
+
+        keyword_shard_hits = [[] for _ in keyword_shards]
+
+        exhausted_keyword_shards = set()
+
+        while True:
+            self.rounds += 1
+
+            self.rows_scanned += self._search_shard_pages(
+                shards=shards,
+                shard_hits=shard_hits,
+                exhausted=exhausted_shards,
+                result_limits=result_limits,
+                search=lambda shard, offset, limit: self._query(
+                    query=query_embeddings[shard.embedding_model()],
+                    result_limits=limit,
+                    vector_store=shard,
+                    nprobes=nprobes,
+                    refine_factor=refine_factor,
+                    where=prefilters.get(shard.vector_store_id),
+                    include_vectors=diversify,
+                    offset=offset,
+                    include_text=shard.vector_store_id in candidate_factors,
+                ),
+                shard_archives=shard_archives,
+                candidate_factors=candidate_factors,
+            )
+
+            if rescored_shards:
+                self._rescore_shard_hits(
+                    shards=shards,
+                    shard_hits=shard_hits,
+                    rescored_shards=rescored_shards,
+                    query_embeddings=query_embeddings,
+                )
+
+            # The archives are exhausted when every shard returned all of its rows
+            exhausted = len(exhausted_shards) == len(shards)
+
+            resulting_hits = merge_vector_hits(
+                shard_hits=shard_hits,
+                shard_models=[shard.embedding_model() for shard in shards],
+                result_limits=result_limits,
+            )
+
+            if hybrid:
+                self.rows_scanned += self._search_shard_pages(
+                    shards=keyword_shards,
+                    shard_hits=keyword_shard_hits,
+                    exhausted=exhausted_keyword_shards,
+                    result_limits=result_limits,
+                    search=lambda shard, offset, limit: self._keyword_query(
+                        query_string=query_string,
+                        result_limits=limit,
+                        vector_store=shard,
+                        include_vectors=diversify,
+                        offset=offset,
+                    ),
+                    shard_archives=shard_archives,
+                )
+
+                exhausted = exhausted and len(exhausted_keyword_shards) == len(keyword_shards)
+
+                # BM25 scores depend on the term statistics of each shard, so the shards are fused by rank
+                keyword_hits = reciprocal_rank_fusion(
+                    rankings=keyword_shard_hits,
+                    weights=[1.0] * len(keyword_shard_hits),
+                )[:result_limits]
+
+                resulting_hits = reciprocal_rank_fusion(
+                    rankings=[resulting_hits, keyword_hits],
+                    weights=[1 - keyword_weight, keyword_weight],
+                )
+
+            resulting_hits = self._load_missing_entry_metadata(
+                hits=resulting_hits,
+                loaded_entries=loaded_entries,
+            )
+
+            # Keyword hits and the hits of stores without the denormalized metadata are not prefiltered
+            if lookup_filter:
+                resulting_hits = [hit for hit in resulting_hits if lookup_filter.matches(hit)]
+
+            # Group the chunk hits by entry, keeping the best ranked hit of each entry across all searched archives
+            entry_hits = {}
+
+            entry_chunk_hits = {}
+
+            for hit in resulting_hits:
+                entry_hits.setdefault(hit['entry_id'], hit)
+
+                entry_chunk_hits.setdefault(hit['entry_id'], []).append(hit)
+
+            de_duplicated_hits = self._remove_source_duplicates(hits=list(entry_hits.values()))
+
+            logging.debug(f'Search round {self.rounds} returned {len(resulting_hits)} rows, '
+                          f'{len(de_duplicated_hits)} distinct entries')
+
+            if len(de_duplicated_hits) >= candidate_entries or exhausted:
+                break
+
+            if self.rounds >= MAX_SEARCH_ROUNDS:
+                logging.info(f'Reached maximum search rounds with {len(de_duplicated_hits)} of {candidate_entries} entries')
+
+                break
+
+            result_limits *= SEARCH_GROWTH_FACTOR
+
+        logging.info(f'Vector storage search scanned {self.rows_scanned} rows in {self.rounds} rounds, '
+                     f'found {len(de_duplicated_hits)} distinct entries.')
+
+        # Selects the entries before they are prioritized by tag, the tags only reorder the selected entries
+        if diversify:
+            de_duplicated_hits = maximal_marginal_relevance(
+                query_vector=next(iter(query_embeddings.values())),
+                hits=de_duplicated_hits,
+                mmr_lambda=mmr_lambda,
+                limit=max_entries,
+            )[:max_entries]
 
         if prioritize_tags:
-            sorted_entries = self._sort_entries_by_tag(
-                archive_id=archive_id,
-                entries=de_duplicated_entries,
+            de_duplicated_hits = self._sort_entries_by_tag(
+                hits=de_duplicated_hits,
                 target_tags=prioritize_tags,
             )
 
-            finalized_entries = sorted_entries[:max_entries]
+        finalized_entries = [hit['entry_id'] for hit in de_duplicated_hits[:max_entries]]
+
+        if return_passages:
+            shard_tables = {shard.vector_store_id: shard.storage_table_name() for shard in shards}
+
+            passage_builders = {}
+
+            passage_entries = []
+
+            for entry_id in finalized_entries:
+                # All chunks of an entry are held by a single shard of an archive, an entry indexed into several
+                # of the searched archives is built from the shard of its best ranked hit
+                vector_store_id = entry_chunk_hits[entry_id][0]['vector_store_id']
+
+                chunk_hits = [hit for hit in entry_chunk_hits[entry_id] if hit['vector_store_id'] == vector_store_id]
+
+                if vector_store_id not in passage_builders:
+                    passage_builders[vector_store_id] = PassageBuilder(
+                        table=get_table_registry(bucket_name=self.storage_bucket_name).open_table(
+                            name=shard_tables[vector_store_id],
+                        ),
+                        neighbors=passage_neighbors,
+                    )
+
+                passage_entries.append(
+                    passage_builders[vector_store_id].build(entry_id=entry_id, chunk_hits=chunk_hits)
+                )
 
-        else:
-            finalized_entries = de_duplicated_entries[:max_entries]
+            finalized_entries = passage_entries
 
-        return finalized_entries
\ No newline at end of file
+        return finalized_entries
@@ -0,0 +1,997 @@
+"""
+Re-embeds the vector stores of an archive with a different embedding model
+
+The chunks of every vector store are re-embedded into a new vector table while lookups and writes keep using the
+current tables. The migration runs as a chain of events, each processing a bounded amount of work and saving its
+progress in the vector store migrations table, so an interrupted migration resumes from its last checkpoint.
+
+BUILDING -- The chunks recorded in the vector store chunks table are re-embedded into the new tables, page by page
+INDEXING -- The indexes of the new tables are built, one table per event
+CUTOVER -- Writes made since the chunks were re-embedded are reconciled and each vector store is switched over
+DRAINING -- Writes made by functions that loaded a vector store ahead of its cutover are reconciled
+
+Steps that wait, for staged writes to be flushed or for the writes of functions that loaded a vector store ahead of
+its cutover, request the next step through a delayed event rather than waiting within the function.
+"""
+import logging
+import time
+
+from datetime import datetime, UTC as utc_tz
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+import pyarrow as pa
+
+from lancedb.table import Table
+
+from da_vinci.core.global_settings import setting_value
+from da_vinci.core.immutable_object import ObjectBody
+from da_vinci.core.logging import Logger
+
+from da_vinci.exception_trap.client import ExceptionReporter
+
+from da_vinci.event_bus.client import fn_event_response, EventPublisher
+from da_vinci.event_bus.event import Event as EventBusEvent
+
+from omnilake.internal_lib.clients import RawStorageManager
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+
+from omnilake.tables.indexed_entries.client import IndexedEntriesClient
+from omnilake.tables.jobs.client import Job, JobsClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import (
+    DEFAULT_EMBEDDING_DIMENSIONS,
+    VectorStore,
+    VectorStoresClient,
+)
+from omnilake.constructs.archives.vector.tables.vector_store_chunks.client import VectorStoreChunksClient
+from omnilake.constructs.archives.vector.tables.vector_store_migrations.client import (
+    MigrationStatus,
+    VectorStoreMigration,
+    VectorStoreMigrationsClient,
+)
+
+from omnilake.constructs.archives.vector.runtime.embeddings import (
+    FIXED_DIMENSION_MODELS,
+    INT8_EMBEDDING_TYPE,
+    EmbeddingGenerator,
+    get_embedding_generator,
+)
+from omnilake.constructs.archives.vector.runtime.event_definitions import (
+    VectorArchiveFlushSchema,
+    VectorArchiveMaintenanceSchema,
+    VectorArchiveReembedSchema,
+)
+from omnilake.constructs.archives.vector.runtime.flush import (
+    FLUSH_LOCK_SECONDS,
+    MAX_FLUSH_FILES,
+    reconcile_staged_entries,
+)
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_index import (
+    VectorIndexPolicy,
+    maintain_full_text_index,
+    maintain_scalar_indexes,
+    maintain_vector_index,
+)
+from omnilake.constructs.archives.vector.runtime.vector_storage import (
+    FULL_TEXT_COLUMN,
+    supports_entry_metadata,
+    supports_full_text,
+    supports_passages,
+    update_chunk_tags,
+    vector_embedding_type,
+)
+from omnilake.constructs.archives.vector.runtime.write_buffer import VectorWriteBuffer
+
+
+_FN_NAME = 'omnilake.constructs.vector.reembed'
+
+# Seconds of work done by a single event before the migration continues in the next one, leaves ample headroom
+# within the function timeout for the batch in progress
+BATCH_SECONDS = 600
+
+# Number of chunks read from the vector store chunks table per checkpoint
+CHUNK_PAGE_SIZE = 500
+
+# Number of chunks read from a vector table and re-embedded at once
+COPY_BATCH_SIZE = 250
+
+# Number of rows of a re-embedded vector table reconciled per checkpoint
+RECONCILE_PAGE_SIZE = 1000
+
+# Seconds the cutover waits for the requested flushes of staged writes before checking again
+CUTOVER_RETRY_SECONDS = 60
+
+# Seconds after the cutover before the writes of functions that loaded a vector store ahead of it are reconciled,
+# covers the timeout of the index function and the window of the write buffer
+DRAIN_SECONDS = 300
+
+# Index attributes of a vector store and their values without an index, built over the new table ahead of the cutover
+INDEX_ATTRIBUTES = {
+    'full_text_index_rows': 0,
+    'scalar_index_rows': 0,
+    'vector_index_rows': 0,
+    'vector_index_trained_rows': 0,
+    'vector_index_type': None,
+}
+
+
+def chunk_id_predicate(chunk_ids: List[str]) -> str:
+    """
+    Return the predicate matching the rows of the given chunks.
+
+    Keyword arguments:
+    chunk_ids -- The chunk IDs
+    """
+    chunk_id_list = ', '.join(f"'{chunk_id}'" for chunk_id in chunk_ids)
+
+    return f"chunk_id IN ({chunk_id_list})"
+
+
+def reembedded_schema(table: Table, dimensions: int) -> pa.Schema:
+    """
+    Return the schema of the vector table with its vectors resized to the given dimensions. The columns of the
+    table are kept as they are, so every row can be copied over as is.
+
+    Keyword arguments:
+    table -- The vector table
+    dimensions -- The number of dimensions of the re-embedded vectors
+    """
+    vector_idx = table.schema.get_field_index('vector')
+
+    vector_field = table.schema.field(vector_idx)
+
+    return table.schema.set(
+        vector_idx,
+        pa.field('vector', pa.list_(vector_field.type.value_type, dimensions), nullable=vector_field.nullable),
+    )
+
+
+def create_shard_table(vector_store: VectorStore, dimensions: int) -> Dict:
+    """
+    Create the vector table a vector store is re-embedded into. Returns the names of the new and the current
+    vector table of the store.
+
+    Keyword arguments:
+    vector_store -- The vector store
+    dimensions -- The number of dimensions of the re-embedded vectors
+    """
+    registry = get_table_registry()
+
+    current_table = registry.open_table(name=vector_store.storage_table_name(), latest=True)
+
+    # The chunk text is re-read from the raw entry when the table only records the position of the chunks
+    if not (supports_full_text(current_table) or supports_passages(current_table)):
+        raise ValueError(f'Vector store {vector_store.vector_store_id} records neither the text nor the position of '
+                         f'its chunks and can not be re-embedded, re-index the archive instead')
+
+    table_name = f'{vector_store.vector_store_id}-{uuid4().hex[:8]}'
+
+    registry.create_table(name=table_name, schema=reembedded_schema(current_table, dimensions))
+
+    logging.info(f'Created vector table {table_name} to re-embed vector store {vector_store.vector_store_id}')
+
+    return {
+        'previous_table_name': vector_store.storage_table_name(),
+        'table_name': table_name,
+    }
+
+
+class ChunkReembedder:
+    """
+    Copies chunk rows from one vector table to another, replacing their vectors with the embeddings of the chunk
+    text generated by the new embedding model.
+    """
+    def __init__(self, embedding_model_id: str, embedding_dimensions: int,
+                 raw_storage: Optional[RawStorageManager] = None):
+        """
+        Initialize the re-embedder
+
+        Keyword arguments:
+        embedding_model_id -- The ID of the model the chunks are re-embedded with
+        embedding_dimensions -- The number of dimensions of the re-embedded vectors
+        raw_storage -- Optional raw storage manager client
+        """
+        self.embedding_dimensions = embedding_dimensions
+
+        self.embedding_model_id = embedding_model_id
+
+        self.raw_storage = raw_storage or RawStorageManager()
+
+        self._generators: Dict[str, EmbeddingGenerator] = {}
+
+    def generator(self, table: Table) -> EmbeddingGenerator:
+        """
+        Return the embedding generator of the vector table, holding the same embedding type as the table.
+
+        Keyword arguments:
+        table -- The vector table the embeddings are written to
+        """
+        embedding_type = vector_embedding_type(table).lower()
+
+        if embedding_type not in self._generators:
+            self._generators[embedding_type] = get_embedding_generator(
+                input_type='search_document',
+                model_id=self.embedding_model_id,
+                embedding_type=embedding_type,
+                dimensions=self.embedding_dimensions,
+            )
+
+        return self._generators[embedding_type]
+
+    def chunk_texts(self, rows: List[Dict]) -> List[str]:
+        """
+        Return the text of each chunk row. Rows that do not carry their text are read from the raw entry by the
+        recorded byte span of the chunk.
+
+        Keyword arguments:
+        rows -- The chunk rows
+        """
+        texts = [row.get(FULL_TEXT_COLUMN) for row in rows]
+
+        entry_rows = {}
+
+        for idx, row in enumerate(rows):
+            if texts[idx] is not None:
+                continue
+
+            if row.get('byte_start') is None:
+                raise ValueError(f"Chunk {row['chunk_id']} records neither its text nor its position")
+
+            entry_rows.setdefault(row['entry_id'], []).append(idx)
+
+        for entry_id, row_indexes in entry_rows.items():
+            entry_content = self.raw_storage.get_entry(entry_id)
+
+            if 'message' in entry_content.response_body:
+                raise Exception(f"Error retrieving entry content: {entry_content.response_body['message']}")
+
+            content = entry_content.response_body['content'].encode('utf-8')
+
+            for idx in row_indexes:
+                texts[idx] = content[rows[idx]['byte_start']:rows[idx]['byte_end']].decode('utf-8')
+
+        return texts
+
+    def copy(self, source_table: Table, target_table: Table, chunk_ids: List[str]) -> List[str]:
+        """
+        Re-embed the given chunks of the source table into the target table, returns the entry ID of each chunk
+        copied. Chunks that are no longer in the source table are skipped, chunks already in the target table are
+        replaced, so copying the same chunks again is harmless.
+
+        Keyword arguments:
+        source_table -- The vector table the chunks are read from
+        target_table -- The vector table the re-embedded chunks are written to
+        chunk_ids -- The IDs of the chunks to copy
+        """
+        generator = self.generator(target_table)
+
+        # int8 embeddings are stored exactly as float16, see QuantizedDocumentChunk
+        quantized = generator.embedding_type == INT8_EMBEDDING_TYPE
+
+        copied_entry_ids = []
+
+        for idx in range(0, len(chunk_ids), COPY_BATCH_SIZE):
+            batch_chunk_ids = chunk_ids[idx:idx + COPY_BATCH_SIZE]
+
+            rows = source_table.search().where(chunk_id_predicate(batch_chunk_ids)).limit(len(batch_chunk_ids)).to_list()
+
+            if not rows:
+                continue
+
+            embeddings = generator.embed(self.chunk_texts(rows))
+
+            data = []
+
+            for row, embedding in zip(rows, embeddings):
+                # Drops the columns added by the search, such as the row distance
+                chunk = {column: value for column, value in row.items() if not column.startswith('_')}
+
+                chunk['vector'] = np.asarray(embedding, dtype=np.float16) if quantized else embedding
+
+                data.append(chunk)
+
+            target_table.merge_insert('chunk_id') \
+                .when_matched_update_all() \
+                .when_not_matched_insert_all() \
+                .execute(data)
+
+            copied_entry_ids.extend(chunk['entry_id'] for chunk in data)
+
+        return copied_entry_ids
+
+
+def build_indexes(table: Table, vector_store: VectorStore) -> Dict:
+    """
+    Build the indexes of a re-embedded vector table, returns the index attributes of the vector store once it is
+    switched over to the table.
+
+    Keyword arguments:
+    table -- The re-embedded vector table
+    vector_store -- The vector store the table belongs to
+    """
+    # Tracks the indexes of the new table, the vector store keeps tracking the indexes of its current table
+    indexed_store = VectorStore(
+        archive_id=vector_store.archive_id,
+        bucket_name=vector_store.bucket_name,
+        vector_store_id=vector_store.vector_store_id,
+    )
+
+    policy = VectorIndexPolicy.from_settings()
+
+    maintain_vector_index(table=table, vector_store=indexed_store, policy=policy)
+
+    if supports_full_text(table):
+        maintain_full_text_index(table=table, vector_store=indexed_store, policy=policy)
+
+    maintain_scalar_indexes(table=table, vector_store=indexed_store, policy=policy)
+
+    indexes = {attribute: getattr(indexed_store, attribute) for attribute in INDEX_ATTRIBUTES}
+
+    if indexed_store.vector_index_last_updated:
+        indexes['vector_index_last_updated'] = indexed_store.vector_index_last_updated.isoformat()
+
+    return indexes
+
+
+def drain_write_buffer(archive_id: str, vector_store_key: str, table_name: str, table: Table) -> bool:
+    """
+    Commit the writes staged for a vector table that was replaced by a re-embedding, the flush function only
+    commits the writes staged for the current table of a vector store. Returns False when the staged writes are
+    being flushed by another function.
+
+    Keyword arguments:
+    archive_id -- The archive ID
+    vector_store_key -- The key of the vector store the table belonged to, see shard_key
+    table_name -- The name of the replaced vector table
+    table -- The replaced vector table
+    """
+    write_buffer = VectorWriteBuffer(
+        bucket_name=setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket'),
+        vector_store_id=table_name,
+    )
+
+    if not write_buffer.staged_keys(max_keys=1):
+        return True
+
+    if not write_buffer.acquire_lock(lock_seconds=FLUSH_LOCK_SECONDS):
+        return False
+
+    try:
+        while True:
+            staged_keys = write_buffer.staged_keys(max_keys=MAX_FLUSH_FILES)
+
+            if not staged_keys:
+                break
+
+            staged_data, _ = write_buffer.load(staged_keys)
+
+            staged_data = reconcile_staged_entries(archive_id=archive_id, staged_data=staged_data)
+
+            if staged_data.num_rows:
+                table.merge_insert('chunk_id').when_not_matched_insert_all().execute(staged_data)
+
+            # The staged rows were counted on the vector store when they were staged, see flush.py
+            VectorStoresClient().add_staged_rows(
+                archive_id=vector_store_key,
+                rows=-sum(VectorWriteBuffer.staged_rows(key) for key in staged_keys),
+            )
+
+            write_buffer.remove(staged_keys)
+
+    finally:
+        write_buffer.release_lock()
+
+    logging.info(f'Committed the writes staged for replaced vector table {table_name}')
+
+    return True
+
+
+class ArchiveReembedding:
+    """
+    Executes the steps of the re-embedding of an archive.
+    """
+    def __init__(self, migration: VectorStoreMigration, source_event: EventBusEvent,
+                 migrations: Optional[VectorStoreMigrationsClient] = None):
+        """
+        Initialize the re-embedding
+
+        Keyword arguments:
+        migration -- The migration of the archive
+        source_event -- The event that requested the step
+        migrations -- Optional vector store migrations table client
+        """
+        self.migration = migration
+
+        self.source_event = source_event
+
+        self.migrations = migrations or VectorStoreMigrationsClient()
+
+        self.event_publisher = EventPublisher()
+
+        self.reembedder = ChunkReembedder(
+            embedding_model_id=migration.embedding_model_id,
+            embedding_dimensions=int(migration.embedding_dimensions),
+        )
+
+        self.vector_stores = VectorStoresClient()
+
+        self._entries = IndexedEntriesClient()
+
+        # Tags of the entries of the archive loaded while reconciling, None for entries removed from the archive
+        self._entry_tags: Dict[str, Optional[List[str]]] = {}
+
+    @property
+    def archive_id(self) -> str:
+        """
+        The ID of the archive being re-embedded
+        """
+        return self.migration.archive_id
+
+    def publish(self, event_body: ObjectBody, delay: int = 0):
+        """
+        Publish an event following the source event.
+
+        Keyword arguments:
+        event_body -- The body of the event
+        delay -- The number of seconds the delivery of the event is delayed
+        """
+        self.event_publisher.submit(
+            event=self.source_event.next_event(
+                body=event_body.to_dict(),
+                event_type=event_body.get('event_type'),
+            ),
+            delay=delay,
+        )
+
+    def entry_tags(self, entry_id: str) -> Optional[List[str]]:
+        """
+        Return the tags of an entry of the archive, None when the entry was removed from the archive.
+
+        Keyword arguments:
+        entry_id -- The ID of the entry
+        """
+        if entry_id not in self._entry_tags:
+            entry = self._entries.get(archive_id=self.archive_id, entry_id=entry_id)
+
+            self._entry_tags[entry_id] = (entry.tags or []) if entry else None
+
+        return self._entry_tags[entry_id]
+
+    def _tables(self, shard_table: Dict) -> Tuple[Table, Table]:
+        """
+        Return the current and the re-embedded vector table of a vector store.
+
+        Keyword arguments:
+        shard_table -- The table names of the vector store, as recorded by the migration
+        """
+        registry = get_table_registry()
+
+        return (
+            registry.open_table(name=shard_table['previous_table_name'], latest=True),
+            registry.open_table(name=shard_table['table_name'], latest=True),
+        )
+
+    def build(self, deadline: float) -> bool:
+        """
+        Re-embed the chunks of the archive page by page, saving a checkpoint after every page. Returns whether all
+        chunks were re-embedded.
+
+        Keyword arguments:
+        deadline -- The monotonic time by which no new page is started
+        """
+        chunks = VectorStoreChunksClient()
+
+        checkpoint = self.migration.checkpoint or None
+
+        while time.monotonic() < deadline:
+            chunk_page, checkpoint = chunks.get_page_by_archive(
+                archive_id=self.archive_id,
+                exclusive_start_key=checkpoint,
+                limit=CHUNK_PAGE_SIZE,
+            )
+
+            store_chunk_ids = {}
+
+            for chunk in chunk_page:
+                store_chunk_ids.setdefault(chunk.vector_store_id, []).append(chunk.chunk_id)
+
+            for vector_store_id, chunk_ids in store_chunk_ids.items():
+                # Chunks of shards added since the migration started are re-embedded when reconciling them
+                if vector_store_id not in self.migration.shard_tables:
+                    continue
+
+                source_table, target_table = self._tables(self.migration.shard_tables[vector_store_id])
+
+                copied_entry_ids = self.reembedder.copy(source_table, target_table, chunk_ids)
+
+                self.migration.migrated_chunks = (self.migration.migrated_chunks or 0) + len(copied_entry_ids)
+
+            self.migration.checkpoint = checkpoint
+
+            self.migrations.put(self.migration)
+
+            if not checkpoint:
+                logging.info(f'Re-embedded {self.migration.migrated_chunks} chunks of archive {self.archive_id}')
+
+                return True
+
+        return False
+
+    def index(self, deadline: float) -> bool:
+        """
+        Build the indexes of the re-embedded tables, one table at a time. Returns whether all tables are indexed.
+
+        Keyword arguments:
+        deadline -- The monotonic time by which no new table is indexed
+        """
+        shards = {shard.vector_store_id: shard for shard in self.vector_stores.get_shards(self.archive_id)}
+
+        for vector_store_id, shard_table in self.migration.shard_tables.items():
+            if 'indexes' in shard_table:
+                continue
+
+            if time.monotonic() >= deadline:
+                return False
+
+            _, target_table = self._tables(shard_table)
+
+            shard_table['indexes'] = build_indexes(table=target_table, vector_store=shards[vector_store_id])
+
+            self.migrations.put(self.migration)
+
+        return True
+
+    def _reconcile_chunks(self, checkpoint: Dict, deadline: float) -> bool:
+        """
+        Re-embed the recorded chunks of the archive that are missing from the re-embedded tables, page by page.
+        Returns whether all pages were reconciled.
+
+        Keyword arguments:
+        checkpoint -- The reconcile checkpoint, updated after every page
+        deadline -- The monotonic time by which no new page is started
+        """
+        chunks = VectorStoreChunksClient()
+
+        while True:
+            if time.monotonic() >= deadline:
+                return False
+
+            chunk_page, last_key = chunks.get_page_by_archive(
+                archive_id=self.archive_id,
+                exclusive_start_key=checkpoint.get('key'),
+                limit=CHUNK_PAGE_SIZE,
+            )
+
+            store_chunks = {}
+
+            for chunk in chunk_page:
+                store_chunks.setdefault(chunk.vector_store_id, []).append(chunk)
+
+            for vector_store_id, recorded_chunks in store_chunks.items():
+                if vector_store_id not in self.migration.shard_tables:
+                    continue
+
+                source_table, target_table = self._tables(self.migration.shard_tables[vector_store_id])
+
+                chunk_ids = [chunk.chunk_id for chunk in recorded_chunks]
+
+                target_chunk_ids = {
+                    row['chunk_id'] for row in target_table.search().where(chunk_id_predicate(chunk_ids))
+                    .select(['chunk_id']).limit(len(chunk_ids)).to_list()
+                }
+
+                # The indexed entry is created before the chunks of an entry are written and removed before they
+                # are vacuumed, chunks of removed entries are skipped
+                missing_chunk_ids = [
+                    chunk.chunk_id for chunk in recorded_chunks
+                    if chunk.chunk_id not in target_chunk_ids and self.entry_tags(chunk.entry_id) is not None
+                ]
+
+                if missing_chunk_ids:
+                    copied_entry_ids = self.reembedder.copy(source_table, target_table, missing_chunk_ids)
+
+                    self.migration.migrated_chunks = (self.migration.migrated_chunks or 0) + len(copied_entry_ids)
+
+            checkpoint['key'] = last_key
+
+            self.migration.reconcile_checkpoint = checkpoint
+
+            self.migrations.put(self.migration)
+
+            if not last_key:
+                return True
+
+    def _reconcile_rows(self, checkpoint: Dict, deadline: float) -> bool:
+        """
+        Drop the rows of entries removed from the archive and sync the tags of the entries in the re-embedded
+        tables, page by page. Each table is read as of the version it had when its reconcile started, so the
+        rows removed or updated by the reconcile do not shift the pages. Returns whether all tables were
+        reconciled.
+
+        Keyword arguments:
+        checkpoint -- The reconcile checkpoint, updated after every page
+        deadline -- The monotonic time by which no new page is started
+        """
+        for vector_store_id in sorted(self.migration.shard_tables):
+            if checkpoint.get('vector_store_id') and vector_store_id < checkpoint['vector_store_id']:
+                continue
+
+            _, target_table = self._tables(self.migration.shard_tables[vector_store_id])
+
+            if checkpoint.get('vector_store_id') != vector_store_id:
+                checkpoint.update({'vector_store_id': vector_store_id, 'version': target_table.version, 'offset': 0})
+
+            metadata = supports_entry_metadata(target_table)
+
+            columns = ['entry_id', 'chunk_id', 'tags'] if metadata else ['entry_id', 'chunk_id']
+
+            snapshot = target_table.to_lance().checkout_version(checkpoint['version'])
+
+            while True:
+                if time.monotonic() >= deadline:
+                    return False
+
+                rows = snapshot.to_table(
+                    columns=columns,
+                    offset=checkpoint['offset'],
+                    limit=RECONCILE_PAGE_SIZE,
+                ).to_pylist()
+
+                removed_entry_ids = sorted({row['entry_id'] for row in rows if self.entry_tags(row['entry_id']) is None})
+
+                if removed_entry_ids:
+                    entry_id_list = ', '.join(f"'{entry_id}'" for entry_id in removed_entry_ids)
+
+                    target_table.delete(f"entry_id IN ({entry_id_list})")
+
+                if metadata:
+                    # Chunks copied from the source table carry its tags, which are not updated once the store is
+                    # switched over
+                    stale_entry_ids = {
+                        row['entry_id'] for row in rows
+                        if self.entry_tags(row['entry_id']) is not None
+                        and sorted(row['tags'] or []) != sorted(self.entry_tags(row['entry_id']))
+                    }
+
+                    for entry_id in stale_entry_ids:
+                        update_chunk_tags(table=target_table, entry_id=entry_id, tags=self.entry_tags(entry_id))
+
+                checkpoint['offset'] += len(rows)
+
+                self.migration.reconcile_checkpoint = checkpoint
+
+                self.migrations.put(self.migration)
+
+                if len(rows) < RECONCILE_PAGE_SIZE:
+                    break
+
+            logging.info(f'Reconciled the rows of the re-embedded table of vector store {vector_store_id}')
+
+        return True
+
+    def reconcile(self, deadline: float) -> bool:
+        """
+        Bring the re-embedded tables up to date with the writes made to the current tables since their chunks were
+        copied. Recorded chunks missing from the re-embedded tables are re-embedded first, then the rows of
+        entries removed from the archive are dropped and the tags of the entries are synced. The progress is saved
+        after every page, a reconcile that does not complete by the deadline resumes from its checkpoint. Returns
+        whether the reconcile completed.
+
+        Keyword arguments:
+        deadline -- The monotonic time by which no new page is started
+        """
+        checkpoint = self.migration.reconcile_checkpoint or {'stage': 'CHUNKS'}
+
+        if checkpoint['stage'] == 'CHUNKS':
+            if not self._reconcile_chunks(checkpoint=checkpoint, deadline=deadline):
+                return False
+
+            checkpoint = {'stage': 'ROWS'}
+
+        if not self._reconcile_rows(checkpoint=checkpoint, deadline=deadline):
+            return False
+
+        self.migration.reconcile_checkpoint = None
+
+        self.migrations.put(self.migration)
+
+        logging.info(f'Reconciled the re-embedded tables of archive {self.archive_id}')
+
+        return True
+
+    def cutover(self, deadline: float) -> Optional[int]:
+        """
+        Switch the vector stores of the archive over to their re-embedded tables. Returns the number of seconds to
+        wait before continuing when writes staged for the current tables must be flushed first or the reconcile
+        did not complete by the deadline, None once the vector stores were switched over.
+
+        Keyword arguments:
+        deadline -- The monotonic time by which no new reconcile page is started
+        """
+        shards = self.vector_stores.get_shards(self.archive_id)
+
+        bucket_name = setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket')
+
+        pending_shards = [
+            shard for shard in shards
+            if VectorWriteBuffer(bucket_name=bucket_name, vector_store_id=shard.storage_table_name()).staged_keys(max_keys=1)
+        ]
+
+        if pending_shards:
+            logging.info(f'Waiting for the staged writes of {len(pending_shards)} shards of archive {self.archive_id} to be flushed')
+
+            for shard in pending_shards:
+                self.publish(
+                    ObjectBody(
+                        body={
+                            'archive_id': self.archive_id,
+                            'shard_number': shard.shard_number,
+                        },
+                        schema=VectorArchiveFlushSchema,
+                    )
+                )
+
+            return CUTOVER_RETRY_SECONDS
+
+        # Shards added since the migration started are re-embedded in full by the reconcile
+        for shard in shards:
+            if shard.vector_store_id not in self.migration.shard_tables:
+                self.migration.shard_tables[shard.vector_store_id] = create_shard_table(
+                    vector_store=shard,
+                    dimensions=int(self.migration.embedding_dimensions),
+                )
+
+                self.migrations.put(self.migration)
+
+        if not self.reconcile(deadline=deadline):
+            return 0
+
+        for shard in shards:
+            shard_table = self.migration.shard_tables[shard.vector_store_id]
+
+            _, target_table = self._tables(shard_table)
+
+            # Reloaded to avoid overwriting counters updated while reconciling
+            vector_store = self.vector_stores.get(archive_id=shard.archive_id)
+
+            vector_store.embedding_dimensions = int(self.migration.embedding_dimensions)
+
+            vector_store.embedding_model_id = self.migration.embedding_model_id
+
+            vector_store.vector_table_name = shard_table['table_name']
+
+            indexes = shard_table.get('indexes') or {}
+
+            for attribute, unindexed_value in INDEX_ATTRIBUTES.items():
+                setattr(vector_store, attribute, indexes.get(attribute, unindexed_value))
+
+            vector_index_last_updated = indexes.get('vector_index_last_updated')
+
+            vector_store.vector_index_last_updated = datetime.fromisoformat(vector_index_last_updated) if vector_index_last_updated else None
+
+            vector_store.table_writes_since_compaction = 0
+
+            vector_store.total_chunks = target_table.count_rows()
+
+            # Each vector store is switched over by a single write, lookups embed their query with the model of
+            # each store they search
+            self.vector_stores.put(vector_store)
+
+            logging.info(f'Switched vector store {shard.vector_store_id} over to vector table {shard_table["table_name"]}')
+
+        bump_archive_write_version(self.archive_id)
+
+        self.migration.cutover_on = datetime.now(tz=utc_tz)
+
+        self.migration.status = MigrationStatus.DRAINING
+
+        self.migrations.put(self.migration)
+
+        # The index policy decides whether the rows added since the indexes were built require any maintenance
+        for shard in shards:
+            self.publish(
+                ObjectBody(
+                    body={
+                        'archive_id': self.archive_id,
+                        'shard_number': shard.shard_number,
+                    },
+                    schema=VectorArchiveMaintenanceSchema,
+                )
+            )
+
+        return None
+
+    def drain(self, deadline: float, drop_previous_tables: bool = False) -> Optional[int]:
+        """
+        Reconcile the writes made to the replaced tables by functions that loaded a vector store ahead of its
+        cutover and complete the migration. Returns the number of seconds to wait before continuing when the
+        writes staged for a replaced table are being flushed by another function or the reconcile did not complete
+        by the deadline, None once the migration completed.
+
+        Keyword arguments:
+        deadline -- The monotonic time by which no new reconcile page is started
+        drop_previous_tables -- Whether the replaced vector tables are dropped once the migration completed
+        """
+        # Staged writes are committed before the reconcile starts, a reconcile in progress already committed them
+        if not self.migration.reconcile_checkpoint:
+            shard_keys = {shard.vector_store_id: shard.archive_id for shard in self.vector_stores.get_shards(self.archive_id)}
+
+            for vector_store_id, shard_table in self.migration.shard_tables.items():
+                source_table, _ = self._tables(shard_table)
+
+                drained = drain_write_buffer(
+                    archive_id=self.archive_id,
+                    vector_store_key=shard_keys[vector_store_id],
+                    table_name=shard_table['previous_table_name'],
+                    table=source_table,
+                )
+
+                if not drained:
+                    return CUTOVER_RETRY_SECONDS
+
+        if not self.reconcile(deadline=deadline):
+            return 0
+
+        bump_archive_write_version(self.archive_id)
+
+        self.migration.completed_on = datetime.now(tz=utc_tz)
+
+        self.migration.status = MigrationStatus.COMPLETED
+
+        self.migrations.put(self.migration)
+
+        if drop_previous_tables:
+            registry = get_table_registry()
+
+            for shard_table in self.migration.shard_tables.values():
+                registry.drop_table(name=shard_table['previous_table_name'])
+
+                logging.info(f'Dropped replaced vector table {shard_table["previous_table_name"]}')
+
+        logging.info(f'Completed re-embedding of archive {self.archive_id} with {self.migration.embedding_model_id}')
+
+        return None
+
+
+def start_migration(archive_id: str, embedding_model_id: str, embedding_dimensions: Optional[int] = None) -> VectorStoreMigration:
+    """
+    Start the re-embedding of an archive, creating the vector table each vector store is re-embedded into.
+
+    Keyword arguments:
+    archive_id -- The archive ID
+    embedding_model_id -- The ID of the model the chunks are re-embedded with
+    embedding_dimensions -- The number of dimensions of the re-embedded vectors, defaults to the native dimensions
+                            of the model
+    """
+    native_dimensions = FIXED_DIMENSION_MODELS.get(embedding_model_id)
+
+    if embedding_dimensions is None:
+        embedding_dimensions = native_dimensions or DEFAULT_EMBEDDING_DIMENSIONS
+
+    embedding_dimensions = int(embedding_dimensions)
+
+    if native_dimensions and embedding_dimensions != native_dimensions:
+        raise ValueError(f"Invalid embedding_dimensions: {embedding_dimensions}. Model {embedding_model_id} only produces {native_dimensions} dimensions.")
+
+    shards = VectorStoresClient().get_shards(archive_id=archive_id)
+
+    if not shards:
+        raise ValueError(f'Could not find vector store for archive {archive_id}')
+
+    if all(shard.embedding_model() == (embedding_model_id, embedding_dimensions) for shard in shards):
+        raise ValueError(f'Archive {archive_id} is already embedded with {embedding_model_id} at {embedding_dimensions} dimensions')
+
+    migration = VectorStoreMigration(
+        archive_id=archive_id,
+        embedding_dimensions=embedding_dimensions,
+        embedding_model_id=embedding_model_id,
+        shard_tables={
+            shard.vector_store_id: create_shard_table(vector_store=shard, dimensions=embedding_dimensions)
+            for shard in shards
+        },
+    )
+
+    VectorStoreMigrationsClient().put(migration)
+
+    logging.info(f'Started re-embedding of archive {archive_id} with {embedding_model_id} at {embedding_dimensions} dimensions')
+
+    return migration
+
+
+@fn_event_response(exception_reporter=ExceptionReporter(), function_name=_FN_NAME,
+                   logger=Logger(namespace=_FN_NAME))
+def handler(event: Dict, context: Dict):
+    """
+    Lambda handler for the vector re-embed function. Starts or continues the re-embedding of an archive, every
+    event executes a bounded amount of work and requests the next step until the migration completed.
+    """
+    logging.debug(f'Received request: {event}')
+
+    source_event = EventBusEvent.from_lambda_event(event)
+
+    event_body = ObjectBody(
+        body=source_event.body,
+        schema=VectorArchiveReembedSchema,
+    )
+
+    archive_id = event_body.get('archive_id')
+
+    deadline = time.monotonic() + BATCH_SECONDS
+
+    migrations = VectorStoreMigrationsClient()
+
+    migration = migrations.get(archive_id=archive_id)
+
+    embedding_model_id = event_body.get('embedding_model_id')
+
+    in_progress = migration is not None and migration.status != MigrationStatus.COMPLETED
+
+    jobs = JobsClient()
+
+    with jobs.job_execution(Job(job_type='VECTOR_REEMBED')):
+        if embedding_model_id and not in_progress:
+            migration = start_migration(
+                archive_id=archive_id,
+                embedding_model_id=embedding_model_id,
+                embedding_dimensions=event_body.get('embedding_dimensions'),
+            )
+
+        elif embedding_model_id and migration.embedding_model_id != embedding_model_id:
+            raise ValueError(f'Archive {archive_id} is already being re-embedded with {migration.embedding_model_id}')
+
+        elif embedding_model_id and event_body.get('embedding_dimensions') not in (None, migration.embedding_dimensions):
+            raise ValueError(f'Archive {archive_id} is already being re-embedded at {migration.embedding_dimensions} dimensions')
+
+        elif not in_progress:
+            logging.info(f'No re-embedding in progress for archive {archive_id} ... skipping')
+
+            return
+
+        reembedding = ArchiveReembedding(migration=migration, source_event=source_event, migrations=migrations)
+
+        status = MigrationStatus(migration.status)
+
+        # Seconds the delivery of the event requesting the next step is delayed
+        next_delay_seconds = 0
+
+        if status == MigrationStatus.BUILDING:
+            if reembedding.build(deadline=deadline):
+                migration.status = MigrationStatus.INDEXING
+
+                migrations.put(migration)
+
+        elif status == MigrationStatus.INDEXING:
+            if reembedding.index(deadline=deadline):
+                migration.status = MigrationStatus.CUTOVER
+
+                migrations.put(migration)
+
+        elif status == MigrationStatus.CUTOVER:
+            next_delay_seconds = reembedding.cutover(deadline=deadline)
+
+            if next_delay_seconds is None:
+                next_delay_seconds = DRAIN_SECONDS
+
+        elif status == MigrationStatus.DRAINING:
+            next_delay_seconds = reembedding.drain(
+                deadline=deadline,
+                drop_previous_tables=event_body.get('drop_previous_tables'),
+            )
+
+        if migration.status == MigrationStatus.COMPLETED:
+            return
+
+        logging.info(f'Requesting next step of the re-embedding of archive {archive_id} in {next_delay_seconds} seconds')
+
+        reembedding.publish(
+            ObjectBody(
+                body={
+                    'archive_id': archive_id,
+                    'drop_previous_tables': event_body.get('drop_previous_tables'),
+                },
+                schema=VectorArchiveReembedSchema,
+            ),
+            delay=next_delay_seconds,
+        )
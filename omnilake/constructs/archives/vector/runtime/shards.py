@@ -0,0 +1,147 @@
+"""
+Splits the vector storage of an archive across multiple vector stores (shards) and adds shards to an archive
+"""
+import hashlib
+import logging
+
+from enum import StrEnum
+from typing import Dict, Type
+
+from da_vinci.core.immutable_object import ObjectBody
+from da_vinci.core.logging import Logger
+
+from da_vinci.exception_trap.client import ExceptionReporter
+
+from da_vinci.event_bus.client import fn_event_response
+from da_vinci.event_bus.event import Event as EventBusEvent
+
+from omnilake.tables.jobs.client import Job, JobsClient
+from omnilake.constructs.archives.vector.tables.vector_stores.client import (
+    VectorStore,
+    VectorStoresClient,
+    shard_key,
+)
+
+from omnilake.constructs.archives.vector.runtime.event_definitions import VectorArchiveAddShardSchema
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_storage import (
+    DocumentChunk,
+    document_chunk_model,
+    vector_embedding_type,
+)
+
+
+class ShardStrategy(StrEnum):
+    HASH = 'HASH'
+    TIME = 'TIME'
+
+
+def route_entry(first_shard: VectorStore, entry_id: str) -> int:
+    """
+    Return the number of the shard a new entry is written to. HASH spreads the entries evenly across the shards
+    by their ID. TIME writes all new entries to the most recently added shard, so every shard holds a contiguous
+    period of the archive. Adding a shard only changes where new entries are written, entries already indexed
+    stay in their shard.
+
+    Keyword arguments:
+    first_shard -- The vector store of the first shard of the archive, tracks the shard layout
+    entry_id -- The ID of the new entry
+    """
+    shard_count = first_shard.shard_count or 1
+
+    if shard_count == 1:
+        return 0
+
+    if ShardStrategy(first_shard.shard_strategy or ShardStrategy.HASH) == ShardStrategy.TIME:
+        return shard_count - 1
+
+    entry_hash = hashlib.sha256(entry_id.encode('utf-8')).digest()
+
+    return int.from_bytes(entry_hash[:8], 'big') % shard_count
+
+
+def create_shard(archive_id: str, shard_number: int, bucket_name: str,
+                 schema: Type[DocumentChunk] = DocumentChunk, **shard_attributes: Dict) -> VectorStore:
+    """
+    Create the vector table of a shard and return its vector store, the vector store is not saved.
+
+    Keyword arguments:
+    archive_id -- The archive ID
+    shard_number -- The number of the shard
+    bucket_name -- The vector store bucket
+    schema -- The document chunk model of the vector table
+    shard_attributes -- Additional attributes of the vector store
+    """
+    vector_store = VectorStore(
+        archive_id=shard_key(archive_id, shard_number),
+        bucket_name=bucket_name,
+        shard_number=shard_number,
+        **shard_attributes,
+    )
+
+    get_table_registry(bucket_name=bucket_name).create_table(
+        name=vector_store.storage_table_name(),
+        schema=schema,
+    )
+
+    return vector_store
+
+
+_FN_NAME = 'omnilake.constructs.vector.add_shard'
+
+
+@fn_event_response(exception_reporter=ExceptionReporter(), function_name=_FN_NAME,
+                   logger=Logger(namespace=_FN_NAME))
+def handler(event: Dict, context: Dict):
+    """
+    Lambda handler for the add shard function. Adds a shard to the vector storage of an archive while it is in
+    use, existing shards are not re-indexed.
+    """
+    logging.debug(f'Received request: {event}')
+
+    source_event = EventBusEvent.from_lambda_event(event)
+
+    event_body = ObjectBody(
+        body=source_event.body,
+        schema=VectorArchiveAddShardSchema,
+    )
+
+    archive_id = event_body.get('archive_id')
+
+    jobs = JobsClient()
+
+    with jobs.job_execution(Job(job_type='VECTOR_ADD_SHARD')):
+        vector_stores = VectorStoresClient()
+
+        first_shard = vector_stores.get(archive_id=archive_id)
+
+        if not first_shard:
+            raise ValueError(f'Could not find vector store for archive {archive_id}')
+
+        shard_number = first_shard.shard_count or 1
+
+        first_table = get_table_registry().open_table(name=first_shard.storage_table_name(), latest=True)
+
+        embedding_model_id, embedding_dimensions = first_shard.embedding_model()
+
+        # New shards get the latest schema, holding the same embeddings as the rest of the archive
+        new_shard = create_shard(
+            archive_id=archive_id,
+            shard_number=shard_number,
+            bucket_name=first_shard.bucket_name,
+            schema=document_chunk_model(vector_embedding_type(first_table), dimensions=embedding_dimensions),
+            embedding_dimensions=embedding_dimensions,
+            embedding_model_id=embedding_model_id,
+        )
+
+        # Reserves the shard number, a concurrent add shard request numbered its shard the same
+        if not vector_stores.put_if_not_exists(new_shard):
+            get_table_registry(bucket_name=first_shard.bucket_name).drop_table(name=new_shard.storage_table_name())
+
+            raise ValueError(f'Shard {shard_number} of archive {archive_id} is already being added')
+
+        # Entries are only routed to the shard once it exists
+        if not vector_stores.increment_shard_count(archive_id=archive_id, shard_count=shard_number):
+            raise ValueError(f'Shard count of archive {archive_id} changed while adding shard {shard_number}')
+
+        logging.info(f'Added shard {shard_number} to archive {archive_id} as vector store {new_shard.vector_store_id}')
@@ -0,0 +1,140 @@
+"""
+Process wide registry of LanceDB connections and opened vector tables.
+
+The connection and table handles are kept at the module level so warm invocations avoid re-reading the table
+manifests from S3. A handle is only refreshed once it is older than the configured staleness bound and the
+table version has moved since it was last loaded. Writes, and reads that must see the latest version, open the
+table with latest=True to check out the latest version on the cached handle.
+"""
+import logging
+
+from datetime import timedelta
+from typing import Dict, Optional
+
+import lancedb
+
+from lancedb.table import Table
+
+from da_vinci.core.global_settings import setting_value
+
+
+class VectorTableRegistry:
+    """
+    Registry of the LanceDB connection and opened table handles for a single storage location.
+    """
+    def __init__(self, uri: str, staleness_seconds: int = 30):
+        """
+        Initialize the registry
+
+        Keyword arguments:
+        uri -- The LanceDB URI, e.g. s3://bucket
+        staleness_seconds -- The maximum number of seconds a table handle is used before checking for a newer version
+        """
+        self.uri = uri
+
+        self.staleness_seconds = staleness_seconds
+
+        self._connection = None
+
+        self._tables: Dict[str, Table] = {}
+
+    @property
+    def connection(self) -> lancedb.DBConnection:
+        """
+        Returns the connection for the registry, connecting on first use.
+        """
+        if self._connection is None:
+            logging.debug(f'Connecting to LanceDB at {self.uri} with staleness bound of {self.staleness_seconds} seconds')
+
+            # LanceDB only reloads a table's manifest when the read consistency interval has elapsed and the
+            # version has moved, the interval acts as the staleness bound for the cached handles
+            self._connection = lancedb.connect(
+                self.uri,
+                read_consistency_interval=timedelta(seconds=self.staleness_seconds),
+            )
+
+        return self._connection
+
+    def create_table(self, name: str, schema, **kwargs) -> Table:
+        """
+        Create a new table and register the handle
+
+        Keyword arguments:
+        name -- The name of the table
+        schema -- The schema of the table
+        """
+        table = self.connection.create_table(name=name, schema=schema, **kwargs)
+
+        self._tables[name] = table
+
+        return table
+
+    def drop_table(self, name: str):
+        """
+        Drop a table and its registered handle
+
+        Keyword arguments:
+        name -- The name of the table
+        """
+        self.connection.drop_table(name)
+
+        self._tables.pop(name, None)
+
+    def invalidate(self, name: Optional[str] = None):
+        """
+        Drop a cached table handle, or all handles when no name is provided.
+
+        Keyword arguments:
+        name -- The name of the table
+        """
+        if name is None:
+            self._tables.clear()
+
+            return
+
+        self._tables.pop(name, None)
+
+    def open_table(self, name: str, latest: bool = False) -> Table:
+        """
+        Returns the handle for the given table, opening it on first use.
+
+        Keyword arguments:
+        name -- The name of the table
+        latest -- Whether a cached handle is moved to the latest version of the table, rather than being used
+                  until the staleness bound elapsed. Required before writing to the table.
+        """
+        if name not in self._tables:
+            logging.debug(f'Opening vector table {name}')
+
+            self._tables[name] = self.connection.open_table(name=name)
+
+        elif latest:
+            self._tables[name].checkout_latest()
+
+        return self._tables[name]
+
+
+_REGISTRIES: Dict[str, VectorTableRegistry] = {}
+
+
+def get_table_registry(bucket_name: Optional[str] = None) -> VectorTableRegistry:
+    """
+    Returns the process wide registry for the vector store bucket.
+
+    Keyword arguments:
+    bucket_name -- The vector store bucket, defaults to the configured vector store bucket
+    """
+    if bucket_name is None:
+        bucket_name = setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket')
+
+    uri = f's3://{bucket_name}'
+
+    if uri not in _REGISTRIES:
+        staleness_seconds = setting_value(namespace='omnilake::vector_storage', setting_key='table_staleness_seconds')
+
+        _REGISTRIES[uri] = VectorTableRegistry(
+            uri=uri,
+            staleness_seconds=staleness_seconds if staleness_seconds is not None else 30,
+        )
+
+    return _REGISTRIES[uri]
@@ -1,69 +1,131 @@
 import logging
 
-from typing import Dict
+from typing import Dict, List
 
-import lancedb
-
-from da_vinci.core.global_settings import setting_value
 from da_vinci.core.immutable_object import ObjectBody
 from da_vinci.core.logging import Logger
 
 from da_vinci.exception_trap.client import ExceptionReporter
 
-from da_vinci.event_bus.client import fn_event_response
+from da_vinci.event_bus.client import fn_event_response, EventPublisher
 from da_vinci.event_bus.event import Event as EventBusEvent
 
+from omnilake.internal_lib.lookup_cache import bump_archive_write_version
+
 from omnilake.tables.indexed_entries.client import IndexedEntriesClient
 from omnilake.tables.jobs.client import Job, JobsClient
 from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStoresClient
 from omnilake.constructs.archives.vector.tables.vector_store_chunks.client import VectorStoreChunksClient
 
-from omnilake.constructs.archives.vector.runtime.event_definitions import VectorArchiveVacuumSchema
+from omnilake.constructs.archives.vector.runtime.event_definitions import (
+    VectorArchiveMaintenanceSchema,
+    VectorArchiveVacuumSchema,
+)
+from omnilake.constructs.archives.vector.runtime.table_registry import get_table_registry
+from omnilake.constructs.archives.vector.runtime.vector_index import VectorIndexPolicy
 
 
-def delete_entry_index(entry_id: str, archive_id: str):
+def delete_entries_index(entry_ids: List[str], archive_id: str) -> List[int]:
     """
-    Delete the entry index for the given entry ID and archive ID.
+    Delete the chunks of all the given entries from the vector stores of the archive. The chunks are removed from
+    each vector table they were written to with a single predicate, backed by the entry_id scalar index, and from
+    the chunks table in batches, skipping the chunk records re-assigned to other entries. Returns the numbers of
+    the shards whose compaction threshold was crossed by the delete.
 
     Keyword arguments:
-    entry_id -- The ID of the entry to delete
-    archive_id -- The ID of the archive to delete the entry from
+    entry_ids -- The IDs of the entries to delete
+    archive_id -- The ID of the archive to delete the entries from
     """
-    vector_bucket = setting_value(namespace='omnilake::vector_storage', setting_key='vector_store_bucket')
+    if not entry_ids:
+        return []
 
     vector_store_chunks = VectorStoreChunksClient()
 
-    chunk_objs = vector_store_chunks.get_chunks_by_archive_and_entry(archive_id, entry_id)
+    chunk_objs = []
 
-    # Load the vector store bucket information
-    db = lancedb.connect(f's3://{vector_bucket}')
+    for entry_id in entry_ids:
+        chunk_objs.extend(vector_store_chunks.get_chunks_by_archive_and_entry(archive_id, entry_id))
+
+    # The entry index is eventually consistent, chunk records a concurrent re-index just re-assigned to another
+    # entry must not be deleted with the entries
+    chunk_objs = vector_store_chunks.filter_unchanged(chunk_objs)
 
-    # Iterate over the organized chunks and remove the entries from the vector store
     vector_stores = VectorStoresClient()
 
-    vector_store = vector_stores.get(
-        archive_id=archive_id,
-    )
+    shards = vector_stores.get_shards(archive_id)
+
+    if len(shards) == 1:
+        shard_chunk_objs = {shards[0].vector_store_id: chunk_objs}
+
+    else:
+        # Only the shards the chunks were written to are touched
+        shard_chunk_objs = {}
 
-    table = db.open_table(name=vector_store.vector_store_id)
+        for chunk_obj in chunk_objs:
+            shard_chunk_objs.setdefault(chunk_obj.vector_store_id, []).append(chunk_obj)
 
-    for chunk in chunk_objs:
-        from_entry = table.search().where(f"chunk_id == '{chunk.chunk_id}'").to_list()
+    policy = VectorIndexPolicy.from_settings()
 
-        if len(from_entry) == 0:
-            logging.error(f"Could not find entry for chunk: {chunk.chunk_id}")
+    compaction_required = []
 
+    for vector_store in shards:
+        if vector_store.vector_store_id not in shard_chunk_objs:
             continue
 
-        # Remove the entry from the old vector store
-        table.delete(f"chunk_id == '{chunk.chunk_id}'")
+        recorded_chunks = shard_chunk_objs[vector_store.vector_store_id]
+
+        shard_entry_ids = entry_ids if len(shards) == 1 else sorted({chunk.entry_id for chunk in recorded_chunks})
+
+        table = get_table_registry().open_table(name=vector_store.storage_table_name(), latest=True)
+
+        entry_id_list = ', '.join(f"'{entry_id}'" for entry_id in shard_entry_ids)
+
+        predicate = f"entry_id IN ({entry_id_list})"
+
+        deleted_chunks = table.count_rows(predicate)
+
+        if deleted_chunks != len(recorded_chunks):
+            logging.warning(f"Found {deleted_chunks} chunks in vector store {vector_store.vector_store_id} for "
+                            f"{len(recorded_chunks)} recorded chunks of entries {shard_entry_ids}")
+
+        if deleted_chunks:
+            # A single delete creates a single new table version regardless of the number of chunks
+            table.delete(predicate)
 
-        # Update the vector store chunk table
-        vector_store_chunks.delete(chunk)
+        logging.debug(f"Deleted {deleted_chunks} chunks of {len(shard_entry_ids)} entries from vector store {vector_store.vector_store_id}")
 
-    vector_store.total_entries -= 1
+        vector_store.total_chunks = max((vector_store.total_chunks or 0) - deleted_chunks, 0)
 
-    vector_stores.put(vector_store)
+        vector_store.total_entries -= len(shard_entry_ids)
+
+        previous_table_writes = vector_store.table_writes_since_compaction or 0
+
+        if deleted_chunks:
+            vector_store.table_writes_since_compaction = previous_table_writes + 1
+
+        vector_stores.put(vector_store)
+
+        if policy.compaction_required(vector_store, previous_table_writes):
+            compaction_required.append(vector_store.shard_number or 0)
+
+    # Update the vector store chunk table
+    vector_store_chunks.batch_delete(chunk_objs)
+
+    bump_archive_write_version(archive_id)
+
+    return compaction_required
+
+
+def delete_entry_index(entry_id: str, archive_id: str) -> List[int]:
+    """
+    Delete the entry index for the given entry ID and archive ID. Returns the numbers of the shards whose
+    compaction threshold was crossed by the delete.
+
+    Keyword arguments:
+    entry_id -- The ID of the entry to delete
+    archive_id -- The ID of the archive to delete the entry from
+    """
+    return delete_entries_index(entry_ids=[entry_id], archive_id=archive_id)
 
 
 _FN_NAME = 'omnilake.constructs.vector.vector_vacuum'
@@ -95,7 +157,7 @@ def handler(event: Dict, context: Dict):
     with jobs.job_execution(Job(job_type='VECTOR_VACUUM')):
         logging.debug(f"Deleting entry index for entry {entry_id} in archive {archive_id}")
 
-        delete_entry_index(entry_id, archive_id)
+        compaction_required = delete_entry_index(entry_id, archive_id)
 
         archive_entries_client = IndexedEntriesClient()
 
@@ -107,4 +169,22 @@ def handler(event: Dict, context: Dict):
             logging.debug(f"Deleted entry index for entry {entry_id} in archive {archive_id}")
 
         else:
-            logging.debug(f"Could not find entry index for entry {entry_id} in archive {archive_id} ... nothing to delete")
\ No newline at end of file
+            logging.debug(f"Could not find entry index for entry {entry_id} in archive {archive_id} ... nothing to delete")
+
+        for shard_number in compaction_required:
+            logging.info(f"Requesting compaction of vector store shard {shard_number} for archive {archive_id}")
+
+            maintenance_event_body = ObjectBody(
+                body={
+                    "archive_id": archive_id,
+                    "shard_number": shard_number,
+                },
+                schema=VectorArchiveMaintenanceSchema,
+            )
+
+            EventPublisher().submit(
+                event=source_event.next_event(
+                    body=maintenance_event_body.to_dict(),
+                    event_type=maintenance_event_body.get("event_type"),
+                )
+            )
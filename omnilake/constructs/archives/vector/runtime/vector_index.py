@@ -0,0 +1,336 @@
+"""
+ANN index lifecycle management for vector stores
+"""
+import logging
+import math
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC as utc_tz
+from typing import Optional
+
+from da_vinci.core.global_settings import setting_value
+
+from lancedb.table import Table
+
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStore
+from omnilake.constructs.archives.vector.runtime.vector_storage import FULL_TEXT_COLUMN
+
+
+VECTOR_INDEX_TYPE = 'IVF_PQ'
+
+# Each PQ sub-vector covers 16 dimensions of the embedding
+PQ_DIMENSIONS_PER_SUB_VECTOR = 16
+
+MAX_INDEX_PARTITIONS = 4096
+
+# Columns covered by scalar indexes and their index type. The ID columns serve the vacuum and re-index
+# predicates, the entry metadata columns the lookup prefilters
+SCALAR_INDEXES = {
+    'chunk_id': 'BTREE',
+    'entry_id': 'BTREE',
+    'effective_on': 'BTREE',
+    'original_of_source': 'BTREE',
+    'tags': 'LABEL_LIST',
+}
+
+
+@dataclass
+class VectorIndexPolicy:
+    """
+    Dictates when a vector store index is built, optimized, or rebuilt.
+
+    Attributes:
+    row_threshold -- The number of rows a vector store must reach before an index is built
+    optimize_rows -- The number of un-indexed rows that trigger an incremental index optimization
+    rebuild_growth_factor -- The growth, relative to the rows the index was trained on, that triggers a full rebuild
+    full_text_optimize_rows -- The number of rows missing from the full text index that trigger a rebuild of it
+    scalar_optimize_rows -- The number of rows missing from the scalar indexes that trigger a rebuild of them
+    compaction_writes -- The number of table writes since the last compaction that trigger a compaction
+    compaction_interval_hours -- The age of the last compaction after which any written table is compacted
+    """
+    row_threshold: int = 10000
+    optimize_rows: int = 5000
+    rebuild_growth_factor: float = 2.0
+    full_text_optimize_rows: int = 500
+    scalar_optimize_rows: int = 1000
+    compaction_writes: int = 64
+    compaction_interval_hours: int = 24
+
+    @classmethod
+    def from_settings(cls) -> 'VectorIndexPolicy':
+        """
+        Load the policy from the vector storage settings
+        """
+        return cls(
+            row_threshold=setting_value(namespace='omnilake::vector_storage', setting_key='vector_index_row_threshold'),
+            optimize_rows=setting_value(namespace='omnilake::vector_storage', setting_key='vector_index_optimize_rows'),
+            full_text_optimize_rows=setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='full_text_index_optimize_rows',
+            ),
+            scalar_optimize_rows=setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='scalar_index_optimize_rows',
+            ),
+            compaction_writes=setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='compaction_table_writes',
+            ),
+            compaction_interval_hours=setting_value(
+                namespace='omnilake::vector_storage',
+                setting_key='compaction_interval_hours',
+            ),
+        )
+
+    def compaction_due(self, vector_store: VectorStore) -> bool:
+        """
+        Whether the vector table should be compacted, either because enough writes accumulated since the last
+        compaction or because the last compaction is older than the interval and the table was written since.
+
+        Keyword arguments:
+        vector_store -- The vector store
+        """
+        table_writes = vector_store.table_writes_since_compaction or 0
+
+        if table_writes >= self.compaction_writes:
+            return True
+
+        last_compacted = vector_store.compacted_on or vector_store.created_on
+
+        if last_compacted.tzinfo is None:
+            last_compacted = last_compacted.replace(tzinfo=utc_tz)
+
+        return table_writes > 0 and datetime.now(utc_tz) - last_compacted >= timedelta(hours=self.compaction_interval_hours)
+
+    def compaction_required(self, vector_store: VectorStore, previous_table_writes: int) -> bool:
+        """
+        Whether the writes made since previous_table_writes crossed the compaction threshold.
+
+        Keyword arguments:
+        vector_store -- The vector store, with the updated table_writes_since_compaction
+        previous_table_writes -- The table writes since the last compaction before the write was made
+        """
+        return previous_table_writes < self.compaction_writes <= (vector_store.table_writes_since_compaction or 0)
+
+    @staticmethod
+    def _refresh_crossed(indexed_rows: int, previous_total_chunks: int, total_chunks: int, refresh_rows: int) -> bool:
+        """
+        Whether the rows missing from an index crossed a multiple of refresh_rows. The first rows written to a
+        store always do, so the index is available from the start.
+
+        Keyword arguments:
+        indexed_rows -- The rows covered by the index, 0 when there is no index
+        previous_total_chunks -- The total chunks before the rows were added
+        total_chunks -- The total chunks after the rows were added
+        refresh_rows -- The number of missing rows that trigger a rebuild of the index
+        """
+        if not indexed_rows:
+            return previous_total_chunks == 0 < total_chunks
+
+        previous_steps = max(previous_total_chunks - indexed_rows, 0) // refresh_rows
+
+        return (total_chunks - indexed_rows) // refresh_rows > previous_steps
+
+    def full_text_maintenance_required(self, vector_store: VectorStore, previous_total_chunks: int) -> bool:
+        """
+        Whether the rows added since previous_total_chunks require the full text index to be (re)built.
+
+        Keyword arguments:
+        vector_store -- The vector store, with the updated total_chunks
+        previous_total_chunks -- The total chunks before the rows were added
+        """
+        return self._refresh_crossed(
+            indexed_rows=vector_store.full_text_index_rows or 0,
+            previous_total_chunks=previous_total_chunks,
+            total_chunks=vector_store.total_chunks,
+            refresh_rows=self.full_text_optimize_rows,
+        )
+
+    def scalar_maintenance_required(self, vector_store: VectorStore, previous_total_chunks: int) -> bool:
+        """
+        Whether the rows added since previous_total_chunks require the scalar indexes to be (re)built.
+
+        Keyword arguments:
+        vector_store -- The vector store, with the updated total_chunks
+        previous_total_chunks -- The total chunks before the rows were added
+        """
+        return self._refresh_crossed(
+            indexed_rows=vector_store.scalar_index_rows or 0,
+            previous_total_chunks=previous_total_chunks,
+            total_chunks=vector_store.total_chunks,
+            refresh_rows=self.scalar_optimize_rows,
+        )
+
+    def maintenance_required(self, vector_store: VectorStore, previous_total_chunks: int,
+                             full_text: bool = False, previous_table_writes: Optional[int] = None) -> bool:
+        """
+        Whether the rows added since previous_total_chunks crossed a boundary that requires index maintenance.
+        Only crossings are reported so concurrent writers do not all request the same maintenance.
+
+        Keyword arguments:
+        vector_store -- The vector store, with the updated total_chunks
+        previous_total_chunks -- The total chunks before the rows were added
+        full_text -- Whether the vector store carries chunk text covered by a full text index
+        previous_table_writes -- The table writes since the last compaction before the rows were added
+        """
+        if previous_table_writes is not None and self.compaction_required(vector_store, previous_table_writes):
+            return True
+
+        if full_text and self.full_text_maintenance_required(vector_store, previous_total_chunks):
+            return True
+
+        if self.scalar_maintenance_required(vector_store, previous_total_chunks):
+            return True
+
+        total_chunks = vector_store.total_chunks
+
+        if not vector_store.vector_index_type:
+            return previous_total_chunks < self.row_threshold <= total_chunks
+
+        indexed_rows = vector_store.vector_index_rows or 0
+
+        previous_steps = max(previous_total_chunks - indexed_rows, 0) // self.optimize_rows
+
+        return (total_chunks - indexed_rows) // self.optimize_rows > previous_steps
+
+    def rebuild_required(self, vector_store: VectorStore, total_rows: int) -> bool:
+        """
+        Whether the vector store index must be (re)built from scratch.
+
+        Keyword arguments:
+        vector_store -- The vector store
+        total_rows -- The current number of rows in the vector table
+        """
+        if not vector_store.vector_index_type:
+            return total_rows >= self.row_threshold
+
+        return total_rows >= (vector_store.vector_index_trained_rows or 0) * self.rebuild_growth_factor
+
+
+def build_vector_index(table: Table, total_rows: int):
+    """
+    Build an IVF-PQ index over the vector column of the table, replacing any existing index.
+
+    Keyword arguments:
+    table -- The vector table
+    total_rows -- The number of rows in the table
+    """
+    dimension = table.schema.field('vector').type.list_size
+
+    num_partitions = min(max(int(math.sqrt(total_rows)), 1), MAX_INDEX_PARTITIONS)
+
+    num_sub_vectors = max(dimension // PQ_DIMENSIONS_PER_SUB_VECTOR, 1)
+
+    logging.info(f'Building {VECTOR_INDEX_TYPE} index over {total_rows} rows with {num_partitions} partitions and {num_sub_vectors} sub-vectors')
+
+    table.create_index(
+        metric='cosine',
+        num_partitions=num_partitions,
+        num_sub_vectors=num_sub_vectors,
+        replace=True,
+    )
+
+
+def maintain_full_text_index(table: Table, vector_store: VectorStore, policy: VectorIndexPolicy) -> bool:
+    """
+    Build the full text (BM25) index over the chunk text when rows are missing from it. The native inverted index
+    is rebuilt rather than incrementally updated, which is cheap next to the vector index. Returns whether the
+    vector store was changed.
+
+    Keyword arguments:
+    table -- The vector table
+    vector_store -- The vector store the table belongs to
+    policy -- The index lifecycle policy
+    """
+    total_rows = table.count_rows()
+
+    indexed_rows = vector_store.full_text_index_rows or 0
+
+    if total_rows == 0 or (indexed_rows and total_rows - indexed_rows < policy.full_text_optimize_rows):
+        logging.debug(f'No full text index maintenance required for vector store {vector_store.vector_store_id}')
+
+        return False
+
+    logging.info(f'Building full text index over {total_rows} rows of vector store {vector_store.vector_store_id}')
+
+    # The native index is stored with the table, tantivy indexes are only supported on local storage
+    table.create_fts_index(FULL_TEXT_COLUMN, replace=True, use_tantivy=False)
+
+    vector_store.full_text_index_rows = total_rows
+
+    return True
+
+
+def maintain_scalar_indexes(table: Table, vector_store: VectorStore, policy: VectorIndexPolicy) -> bool:
+    """
+    Build the scalar indexes over the ID and entry metadata columns when rows are missing from them. Rows missing
+    from the indexes are still found by a flat scan, the indexes only keep the predicates fast. Returns whether
+    the vector store was changed.
+
+    Keyword arguments:
+    table -- The vector table
+    vector_store -- The vector store the table belongs to
+    policy -- The index lifecycle policy
+    """
+    total_rows = table.count_rows()
+
+    indexed_rows = vector_store.scalar_index_rows or 0
+
+    if total_rows == 0 or (indexed_rows and total_rows - indexed_rows < policy.scalar_optimize_rows):
+        logging.debug(f'No scalar index maintenance required for vector store {vector_store.vector_store_id}')
+
+        return False
+
+    column_names = set(table.schema.names)
+
+    for column, index_type in SCALAR_INDEXES.items():
+        # Vector stores created before the entry metadata was denormalized onto the chunks lack those columns
+        if column not in column_names:
+            continue
+
+        logging.info(f'Building {index_type} scalar index on {column} over {total_rows} rows of vector store {vector_store.vector_store_id}')
+
+        table.create_scalar_index(column, index_type=index_type, replace=True)
+
+    vector_store.scalar_index_rows = total_rows
+
+    return True
+
+
+def maintain_vector_index(table: Table, vector_store: VectorStore, policy: VectorIndexPolicy) -> bool:
+    """
+    Build, rebuild, or incrementally optimize the vector index of a store according to the policy. Updates the
+    index tracking attributes of the vector store, returns whether the vector store was changed.
+
+    Keyword arguments:
+    table -- The vector table
+    vector_store -- The vector store the table belongs to
+    policy -- The index lifecycle policy
+    """
+    total_rows = table.count_rows()
+
+    vector_store.total_chunks = total_rows
+
+    if policy.rebuild_required(vector_store, total_rows):
+        build_vector_index(table, total_rows)
+
+        vector_store.vector_index_trained_rows = total_rows
+
+    elif vector_store.vector_index_type and total_rows - (vector_store.vector_index_rows or 0) >= policy.optimize_rows:
+        logging.info(f'Optimizing index of vector store {vector_store.vector_store_id} to include new rows')
+
+        # Adds the un-indexed rows to the existing index partitions without retraining
+        table.to_lance().optimize.optimize_indices()
+
+    else:
+        logging.debug(f'No index maintenance required for vector store {vector_store.vector_store_id}')
+
+        return False
+
+    vector_store.vector_index_type = VECTOR_INDEX_TYPE
+
+    vector_store.vector_index_rows = total_rows
+
+    vector_store.vector_index_last_updated = datetime.now(utc_tz)
+
+    return True
@@ -4,9 +4,39 @@ Vector Storage Definitions
 import logging
 
 from dataclasses import dataclass, field
-from typing import List 
+from datetime import datetime
+from enum import StrEnum
+from typing import Dict, List, Optional, Tuple, Type
+
+import pyarrow as pa
 
 from lancedb.pydantic import LanceModel, Vector
+from lancedb.table import Table
+from pydantic import create_model
+
+from omnilake.internal_lib.tags import normalize_tags
+
+from omnilake.constructs.archives.vector.tables.vector_stores.client import DEFAULT_EMBEDDING_DIMENSIONS
+
+
+# Entry metadata denormalized onto every chunk so lookups do not need to read the entry tables per hit
+ENTRY_METADATA_COLUMNS = ('effective_on', 'original_of_source', 'tags')
+
+# Chunk text column, covered by the full text (BM25) index used by hybrid lookups
+FULL_TEXT_COLUMN = 'text'
+
+# Hash of the chunk text, used to re-use the chunks of the previous entry of a source when re-indexing
+CHUNK_HASH_COLUMN = 'chunk_hash'
+
+# Position of each chunk within its entry, used to read the matched passages from the raw entry
+PASSAGE_COLUMNS = ('chunk_index', 'byte_start', 'byte_end')
+
+
+# Binary embeddings are not offered, searching them needs a hamming distance the pinned LanceDB release lacks and
+# stored as float16 like int8 embeddings they would not save any space
+class EmbeddingType(StrEnum):
+    FLOAT = 'FLOAT'
+    INT8 = 'INT8'
 
 
 class DocumentChunk(LanceModel):
@@ -15,9 +45,135 @@ class DocumentChunk(LanceModel):
     """
     entry_id: str
     chunk_id: str
+    effective_on: Optional[datetime] = None
+    original_of_source: Optional[str] = None
+    tags: List[str] = []
+    text: Optional[str] = None
+    chunk_index: Optional[int] = None
+    byte_start: Optional[int] = None
+    byte_end: Optional[int] = None
+    chunk_hash: Optional[str] = None
     vector: Vector(dim=1024) # type: ignore
 
 
+class QuantizedDocumentChunk(DocumentChunk):
+    """
+    Document chunk model of vector stores holding int8 embeddings. The int8 values are stored exactly as float16,
+    which halves the size of every vector while keeping them searchable by the native vector search and indexes.
+    """
+    vector: Vector(dim=1024, value_type=pa.float16()) # type: ignore
+
+
+# Document chunk models of embeddings with other than the default dimensions, keyed by embedding type and dimensions
+_DOCUMENT_CHUNK_MODELS: Dict[Tuple[EmbeddingType, int], Type[DocumentChunk]] = {}
+
+
+def document_chunk_model(embedding_type: str = EmbeddingType.FLOAT,
+                         dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> Type[DocumentChunk]:
+    """
+    Return the document chunk model of a vector store holding the given embedding type and dimensions.
+
+    Keyword arguments:
+    embedding_type -- The embedding type, see EmbeddingType
+    dimensions -- The number of dimensions of the embeddings
+    """
+    embedding_type = EmbeddingType(embedding_type)
+
+    base_model = QuantizedDocumentChunk if embedding_type == EmbeddingType.INT8 else DocumentChunk
+
+    if dimensions == DEFAULT_EMBEDDING_DIMENSIONS:
+        return base_model
+
+    model_key = (embedding_type, dimensions)
+
+    if model_key not in _DOCUMENT_CHUNK_MODELS:
+        value_type = pa.float16() if embedding_type == EmbeddingType.INT8 else pa.float32()
+
+        _DOCUMENT_CHUNK_MODELS[model_key] = create_model(
+            f'{base_model.__name__}{dimensions}',
+            __base__=base_model,
+            vector=(Vector(dim=dimensions, value_type=value_type), ...),
+        )
+
+    return _DOCUMENT_CHUNK_MODELS[model_key]
+
+
+def vector_embedding_type(table: Table) -> EmbeddingType:
+    """
+    Return the embedding type held by the vector table.
+
+    Keyword arguments:
+    table -- The vector table
+    """
+    if table.schema.field('vector').type.value_type == pa.float16():
+        return EmbeddingType.INT8
+
+    return EmbeddingType.FLOAT
+
+
+def supports_entry_metadata(table: Table) -> bool:
+    """
+    Whether the vector table carries the denormalized entry metadata columns. Tables created before the columns
+    were introduced do not, and lookups against them fall back to the indexed entries table.
+
+    Keyword arguments:
+    table -- The vector table
+    """
+    column_names = set(table.schema.names)
+
+    return all(column in column_names for column in ENTRY_METADATA_COLUMNS)
+
+
+def supports_full_text(table: Table) -> bool:
+    """
+    Whether the vector table carries the chunk text required for keyword search. Tables created before the
+    column was introduced only support vector lookups.
+
+    Keyword arguments:
+    table -- The vector table
+    """
+    return FULL_TEXT_COLUMN in table.schema.names
+
+
+def supports_chunk_diff(table: Table) -> bool:
+    """
+    Whether the vector table records the hash of each chunk, required to re-index an entry by chunk diff.
+
+    Keyword arguments:
+    table -- The vector table
+    """
+    return CHUNK_HASH_COLUMN in table.schema.names
+
+
+def supports_passages(table: Table) -> bool:
+    """
+    Whether the vector table records the position of each chunk within its entry, required for passage lookups.
+
+    Keyword arguments:
+    table -- The vector table
+    """
+    column_names = set(table.schema.names)
+
+    return all(column in column_names for column in PASSAGE_COLUMNS)
+
+
+def update_chunk_tags(table: Table, entry_id: str, tags: List[str]):
+    """
+    Set the denormalized tags of every chunk belonging to an entry.
+
+    Keyword arguments:
+    table -- The vector table
+    entry_id -- The entry the chunks belong to
+    tags -- The tags of the entry
+    """
+    if not supports_entry_metadata(table):
+        logging.debug(f"Vector table {table.name} does not support entry metadata ... skipping tag update")
+
+        return
+
+    table.update(where=f"entry_id = '{entry_id}'", values={'tags': tags})
+
+
 @dataclass
 class VectorRankingItem:
     vector_storage_id: str
@@ -32,7 +188,12 @@ class VectorRankingItem:
         """
         logging.debug(f"Calculating match between {expected_tags} and {self.tags}")
 
-        return len(set(expected_tags) & set(self.tags)) / len(expected_tags)
+        expected_tags = normalize_tags(expected_tags)
+
+        if not expected_tags:
+            return 0
+
+        return len(set(expected_tags) & set(normalize_tags(self.tags))) / len(expected_tags)
 
 
 def vector_ranker(expected_tags: List[str], items: List[VectorRankingItem], max_length: int = 1) -> List[VectorRankingItem]:
@@ -51,13 +212,18 @@ def vector_ranker(expected_tags: List[str], items: List[VectorRankingItem], max_
 
 def calculate_tag_match_percentage(object_tags: List[str], target_tags: List[str]) -> int:
     """
-    Calculate the match percentage between the object's tags and the target tags.
+    Calculate the match percentage between the object's tags and the target tags, both are normalized.
 
     Keyword arguments:
     object_tags -- The list of tags to compare
     target_tags -- The list of tags to compare
     """
-    matching_tags = set(object_tags) & set(target_tags)
+    target_tags = normalize_tags(target_tags)
+
+    if not target_tags:
+        return 0
+
+    matching_tags = set(normalize_tags(object_tags or [])) & set(target_tags)
 
     # Calculate the match percentage
     return len(matching_tags) / len(target_tags) * 100
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Buffers vector table writes as staged Arrow files in S3 so they can be committed to the table in large batches.
+
+Rows staged in the buffer are not visible to lookups until they are flushed, which happens at the latest
+write_buffer_max_seconds after the first row was staged, or as soon as write_buffer_max_rows rows are staged. The
+number of staged rows is tracked by the staged_rows counter of the vector store, so staging a write does not list
+the buffer.
+"""
+import io
+import logging
+
+from datetime import datetime, timedelta, UTC as utc_tz
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import boto3
+import pyarrow as pa
+
+from botocore.exceptions import ClientError
+
+from lancedb.table import Table
+
+
+STAGED_WRITES_PREFIX = 'staged_writes'
+
+# S3 limit of a DeleteObjects request
+DELETE_OBJECTS_LIMIT = 1000
+
+
+class VectorWriteBuffer:
+    """
+    Staged writes of a single vector store.
+    """
+    def __init__(self, bucket_name: str, vector_store_id: str, s3_client=None):
+        """
+        Initialize the write buffer
+
+        Keyword arguments:
+        bucket_name -- The vector store bucket
+        vector_store_id -- The ID of the vector store, or the name of its vector table once re-embedded
+        s3_client -- Optional S3 client
+        """
+        self.bucket_name = bucket_name
+
+        self.vector_store_id = vector_store_id
+
+        self.s3 = s3_client or boto3.client('s3')
+
+    @property
+    def prefix(self) -> str:
+        """
+        The key prefix of the staged writes of the vector store
+        """
+        return f'{STAGED_WRITES_PREFIX}/{self.vector_store_id}/'
+
+    @property
+    def lock_key(self) -> str:
+        """
+        The key of the flush lock of the vector store
+        """
+        return f'{STAGED_WRITES_PREFIX}/{self.vector_store_id}.lock'
+
+    @staticmethod
+    def staged_rows(key: str) -> int:
+        """
+        Return the number of rows held by a staged file, as recorded in its key.
+
+        Keyword arguments:
+        key -- The key of the staged file
+        """
+        return int(key.rsplit('-', 1)[1].split('.', 1)[0])
+
+    def stage(self, table: Table, data: List[Dict]) -> str:
+        """
+        Stage rows to be added to the vector table, returning the key of the staged file.
+
+        Keyword arguments:
+        table -- The vector table, provides the schema of the staged rows
+        data -- The rows to stage
+        """
+        staged = pa.Table.from_pylist(data, schema=table.schema)
+
+        sink = io.BytesIO()
+
+        with pa.ipc.new_file(sink, staged.schema) as writer:
+            writer.write_table(staged)
+
+        # Keys sort by the time they were staged and record the number of rows they hold
+        key = f'{self.prefix}{datetime.now(utc_tz).strftime("%Y%m%dT%H%M%S%f")}-{uuid4()}-{len(data)}.arrow'
+
+        self.s3.put_object(Bucket=self.bucket_name, Key=key, Body=sink.getvalue())
+
+        logging.debug(f'Staged {len(data)} rows for vector store {self.vector_store_id} as {key}')
+
+        return key
+
+    def staged_keys(self, max_keys: Optional[int] = None) -> List[str]:
+        """
+        Return the keys of the staged files, oldest first.
+
+        Keyword arguments:
+        max_keys -- Optional maximum number of keys to return
+        """
+        keys = []
+
+        paginator = self.s3.get_paginator('list_objects_v2')
+
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+
+            if max_keys and len(keys) >= max_keys:
+                return sorted(keys)[:max_keys]
+
+        return sorted(keys)
+
+    def load(self, keys: List[str]) -> Tuple[Optional[pa.Table], int]:
+        """
+        Load the staged files into a single Arrow table, returning the table and its number of rows.
+
+        Keyword arguments:
+        keys -- The keys of the staged files
+        """
+        tables = []
+
+        for key in keys:
+            response = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+
+            tables.append(pa.ipc.open_file(io.BytesIO(response['Body'].read())).read_all())
+
+        if not tables:
+            return None, 0
+
+        combined = pa.concat_tables(tables)
+
+        return combined, combined.num_rows
+
+    def remove(self, keys: List[str]):
+        """
+        Remove staged files once they were committed to the vector table.
+
+        Keyword arguments:
+        keys -- The keys of the staged files
+        """
+        for idx in range(0, len(keys), DELETE_OBJECTS_LIMIT):
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys[idx:idx + DELETE_OBJECTS_LIMIT]], 'Quiet': True},
+            )
+
+    def acquire_lock(self, lock_seconds: int) -> bool:
+        """
+        Acquire the lock that allows a single flusher to commit the staged writes of the vector store. Locks that
+        are older than lock_seconds are considered abandoned and are taken over. Returns whether the lock was
+        acquired.
+
+        Keyword arguments:
+        lock_seconds -- The number of seconds after which a lock that was not released is abandoned
+        """
+        # Every lock holds a unique body, so its ETag identifies the flusher that wrote it
+        lock_body = str(uuid4()).encode()
+
+        try:
+            # Conditional write, only succeeds when no lock object exists
+            self.s3.put_object(Bucket=self.bucket_name, Key=self.lock_key, Body=lock_body, IfNoneMatch='*')
+
+            return True
+
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                raise
+
+        try:
+            lock = self.s3.head_object(Bucket=self.bucket_name, Key=self.lock_key)
+
+        except ClientError as e:
+            # Released in the meantime
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return self.acquire_lock(lock_seconds)
+
+            raise
+
+        if datetime.now(utc_tz) - lock['LastModified'] < timedelta(seconds=lock_seconds):
+            return False
+
+        logging.info(f'Taking over abandoned flush lock of vector store {self.vector_store_id}')
+
+        try:
+            # Conditional overwrite, only succeeds when the abandoned lock was neither released nor taken over
+            self.s3.put_object(Bucket=self.bucket_name, Key=self.lock_key, Body=lock_body, IfMatch=lock['ETag'])
+
+            return True
+
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                return False
+
+            # Released in the meantime
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return self.acquire_lock(lock_seconds)
+
+            raise
+
+    def release_lock(self):
+        """
+        Release the flush lock of the vector store.
+        """
+        self.s3.delete_object(Bucket=self.bucket_name, Key=self.lock_key)
@@ -11,13 +11,43 @@ class VectorArchiveLookupObjectSchema(ObjectBodySchema):
         SchemaAttribute(
             name='archive_id',
             type=SchemaAttributeType.STRING,
-            required=True,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='archive_ids',
+            type=SchemaAttributeType.STRING_LIST,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='effective_after',
+            type=SchemaAttributeType.STRING,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='effective_before',
+            type=SchemaAttributeType.STRING,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='keyword_weight',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
         ),
         SchemaAttribute(
             name='max_entries',
             type=SchemaAttributeType.NUMBER,
             required=False,
         ),
+        SchemaAttribute(
+            name='mmr_lambda',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='nprobes',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
         SchemaAttribute(
             name='query_string',
             type=SchemaAttributeType.STRING,
@@ -28,6 +58,36 @@ class VectorArchiveLookupObjectSchema(ObjectBodySchema):
             type=SchemaAttributeType.STRING_LIST,
             required=False,
         ),
+        SchemaAttribute(
+            name='passage_neighbors',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='refine_factor',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='required_tags',
+            type=SchemaAttributeType.STRING_LIST,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='rescore_factor',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='return_passages',
+            type=SchemaAttributeType.BOOLEAN,
+            required=False,
+        ),
+        SchemaAttribute(
+            name='source_prefix',
+            type=SchemaAttributeType.STRING,
+            required=False,
+        ),
     ]
 
 
@@ -40,12 +100,38 @@ class VectorArchiveProvisionObjectSchema(ObjectBodySchema):
             required=False,
         ),
 
+        SchemaAttribute(
+            name='chunk_overlap_tokens',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name='chunking_strategy',
+            type=SchemaAttributeType.STRING,
+            default_value='CHARACTER',
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name='embedding_type',
+            type=SchemaAttributeType.STRING,
+            default_value='FLOAT',
+            required=False,
+        ),
+
         SchemaAttribute(
             name='max_chunk_length',
             type=SchemaAttributeType.NUMBER,
             required=False,
         ),
 
+        SchemaAttribute(
+            name='max_chunk_tokens',
+            type=SchemaAttributeType.NUMBER,
+            required=False,
+        ),
+
         SchemaAttribute(
             name='retain_latest_originals_only',
             type=SchemaAttributeType.BOOLEAN,
@@ -53,6 +139,20 @@ class VectorArchiveProvisionObjectSchema(ObjectBodySchema):
             required=False,
         ),
 
+        SchemaAttribute(
+            name='shard_count',
+            type=SchemaAttributeType.NUMBER,
+            default_value=1,
+            required=False,
+        ),
+
+        SchemaAttribute(
+            name='shard_strategy',
+            type=SchemaAttributeType.STRING,
+            default_value='HASH',
+            required=False,
+        ),
+
         SchemaAttribute(
             name='tag_hint_instructions',
             type=SchemaAttributeType.STRING,
@@ -64,4 +164,11 @@ class VectorArchiveProvisionObjectSchema(ObjectBodySchema):
             type=SchemaAttributeType.STRING,
             required=False,
         ),
+
+        SchemaAttribute(
+            name='write_buffering',
+            type=SchemaAttributeType.BOOLEAN,
+            default_value=False,
+            required=False,
+        ),
     ]
\ No newline at end of file
@@ -19,9 +19,11 @@ from da_vinci_cdk.constructs.base import resource_namer
 from da_vinci_cdk.constructs.global_setting import GlobalSetting, GlobalSettingType
 from da_vinci_cdk.constructs.event_bus import EventBusSubscriptionFunction
 
+from omnilake.tables.archive_write_versions.stack import ArchiveWriteVersion, ArchiveWriteVersionsTable
 from omnilake.tables.entries.stack import Entry, EntriesTable
 from omnilake.tables.indexed_entries.stack import IndexedEntry, IndexedEntriesTable
 from omnilake.tables.jobs.stack import Job, JobsTable
+from omnilake.tables.lookup_result_cache.stack import CachedLookupResult, LookupResultCacheTable
 from omnilake.tables.provisioned_archives.stack import Archive, ProvisionedArchivesTable
 from omnilake.tables.registered_request_constructs.cdk import (
     ArchiveConstructSchemas,
@@ -31,6 +33,7 @@ from omnilake.tables.registered_request_constructs.cdk import (
 )
 from omnilake.tables.registered_request_constructs.stack import RegisteredRequestConstructsTable
 from omnilake.tables.sources.stack import Source, SourcesTable
+from omnilake.tables.tag_postings.stack import TagPosting, TagPostingsTable
 
 from omnilake.services.ai_statistics_collector.stack import AIStatisticsCollectorStack
 
@@ -42,6 +45,10 @@ from omnilake.constructs.archives.vector.schemas import (
     VectorArchiveProvisionObjectSchema,
 )
 
+from omnilake.constructs.archives.vector.tables.embedding_cache.stack import (
+    CachedEmbedding,
+    EmbeddingCacheTable,
+)
 from omnilake.constructs.archives.vector.tables.vector_stores.stack import (
     VectorStoresTable,
     VectorStore,
@@ -50,6 +57,10 @@ from omnilake.constructs.archives.vector.tables.vector_store_chunks.stack import
     VectorStoreChunk,
     VectorStoreChunksTable,
 )
+from omnilake.constructs.archives.vector.tables.vector_store_migrations.stack import (
+    VectorStoreMigration,
+    VectorStoreMigrationsTable,
+)
 
 
 class LakeConstructArchiveVectorStack(Stack):
@@ -74,16 +85,21 @@ class LakeConstructArchiveVectorStack(Stack):
             requires_event_bus=True,
             requires_exceptions_trap=True,
             required_stacks=[
+                ArchiveWriteVersionsTable,
                 AIStatisticsCollectorStack,
+                EmbeddingCacheTable,
                 EntriesTable,
                 JobsTable,
                 IndexedEntriesTable,
+                LookupResultCacheTable,
                 LakeRawStorageManagerStack,
                 ProvisionedArchivesTable,
                 RegisteredRequestConstructsTable,
                 SourcesTable,
+                TagPostingsTable,
                 VectorStoresTable,
                 VectorStoreChunksTable,
+                VectorStoreMigrationsTable,
             ],
             deployment_id=deployment_id,
             scope=scope,
@@ -172,6 +188,11 @@ class LakeConstructArchiveVectorStack(Stack):
                 ),
             ],
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name='event_bus',
                     resource_type=ResourceType.ASYNC_SERVICE,
@@ -181,6 +202,11 @@ class LakeConstructArchiveVectorStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read',
                 ),
+                ResourceAccessRequest(
+                    resource_name=CachedEmbedding.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name=IndexedEntry.table_name,
                     resource_type=ResourceType.TABLE,
@@ -200,6 +226,11 @@ class LakeConstructArchiveVectorStack(Stack):
                     resource_name='raw_storage_manager',
                     resource_type=ResourceType.REST_SERVICE,
                 ),
+                ResourceAccessRequest(
+                    resource_name=TagPosting.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name=VectorStore.table_name,
                     resource_type=ResourceType.TABLE,
@@ -226,6 +257,42 @@ class LakeConstructArchiveVectorStack(Stack):
             setting_type=GlobalSettingType.INTEGER
         )
 
+        self.embedding_max_concurrency_setting = GlobalSetting(
+            description="The maximum number of concurrent embedding batch requests made while indexing an entry.",
+            namespace='omnilake::vector_storage',
+            setting_key='embedding_max_concurrency',
+            setting_value=4,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.embedding_cache_max_local_entries_setting = GlobalSetting(
+            description="The maximum number of embeddings held in the process local embedding cache of a function.",
+            namespace='omnilake::vector_storage',
+            setting_key='embedding_cache_max_local_entries',
+            setting_value=2048,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.embedding_cache_retention_days_setting = GlobalSetting(
+            description="The total number of days cached embeddings are retained. CHANGES WILL NOT AFFECT EXISTING ENTRIES!!",
+            namespace='omnilake::vector_storage',
+            setting_key='embedding_cache_retention_days',
+            setting_value=30,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.table_staleness_seconds_setting = GlobalSetting(
+            description="The maximum number of seconds a warm function re-uses an opened vector table before checking for a newer table version.",
+            namespace='omnilake::vector_storage',
+            setting_key='table_staleness_seconds',
+            setting_value=30,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
         # TODO: Add this to the lookup request body for Vector archives
         self.max_chunk_length_setting = GlobalSetting(
             description="The maximum length of a chunk in a vector store.",
@@ -254,6 +321,16 @@ class LakeConstructArchiveVectorStack(Stack):
                 ),
             ],
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+                ResourceAccessRequest(
+                    resource_name=CachedLookupResult.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name='event_bus',
                     resource_type=ResourceType.ASYNC_SERVICE,
@@ -263,6 +340,11 @@ class LakeConstructArchiveVectorStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read',
                 ),
+                ResourceAccessRequest(
+                    resource_name=CachedEmbedding.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name=Entry.table_name,
                     resource_type=ResourceType.TABLE,
@@ -278,6 +360,10 @@ class LakeConstructArchiveVectorStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read_write',
                 ),
+                ResourceAccessRequest(
+                    resource_name='raw_storage_manager',
+                    resource_type=ResourceType.REST_SERVICE,
+                ),
                 ResourceAccessRequest(
                     resource_name=VectorStore.table_name,
                     resource_type=ResourceType.TABLE,
@@ -301,6 +387,15 @@ class LakeConstructArchiveVectorStack(Stack):
             function_name=resource_namer('archive-vector-vacuum', scope=self),
             memory_size=1024,
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name='event_bus',
+                    resource_type=ResourceType.ASYNC_SERVICE,
+                ),
                 ResourceAccessRequest(
                     resource_name=IndexedEntry.table_name,
                     resource_type=ResourceType.TABLE,
@@ -328,6 +423,157 @@ class LakeConstructArchiveVectorStack(Stack):
 
         self.vector_store_bucket.grant_read_write(self.vacuum.handler.function)
 
+        self.flush = EventBusSubscriptionFunction(
+            base_image=self.app_base_image,
+            construct_id='vector_flush',
+            description='Commits the staged writes of an archive vector store in batches',
+            entry=self.runtime_path,
+            event_type='omnilake_archive_vector_flush_request',
+            index='flush.py',
+            handler='handler',
+            function_name=resource_namer('archive-vector-flush', scope=self),
+            memory_size=2048,
+            resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name='event_bus',
+                    resource_type=ResourceType.ASYNC_SERVICE,
+                ),
+                ResourceAccessRequest(
+                    resource_name=IndexedEntry.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+                ResourceAccessRequest(
+                    resource_name=Job.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStore.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+            ],
+            scope=self,
+            timeout=Duration.minutes(15),
+        )
+
+        self.vector_store_bucket.grant_read_write(self.flush.handler.function)
+
+        self.write_buffer_max_rows_setting = GlobalSetting(
+            description="The number of rows staged in the write buffer of a vector store that trigger an immediate flush of it.",
+            namespace='omnilake::vector_storage',
+            setting_key='write_buffer_max_rows',
+            setting_value=5000,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.write_buffer_max_seconds_setting = GlobalSetting(
+            description="The number of seconds the first write staged in the write buffer of a vector store waits for concurrent writes before the buffer is flushed.",
+            namespace='omnilake::vector_storage',
+            setting_key='write_buffer_max_seconds',
+            setting_value=30,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.maintenance = EventBusSubscriptionFunction(
+            base_image=self.app_base_image,
+            construct_id='vector_maintenance',
+            description='Builds and maintains the ANN index of an archive vector store',
+            entry=self.runtime_path,
+            event_type='omnilake_archive_vector_maintenance_request',
+            index='maintenance.py',
+            handler='handler',
+            function_name=resource_namer('archive-vector-maintenance', scope=self),
+            memory_size=4096,
+            resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=Job.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStore.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+            ],
+            scope=self,
+            timeout=Duration.minutes(15),
+        )
+
+        self.vector_store_bucket.grant_read_write(self.maintenance.handler.function)
+
+        self.vector_index_row_threshold_setting = GlobalSetting(
+            description="The number of rows a vector store must reach before an ANN index is built for it.",
+            namespace='omnilake::vector_storage',
+            setting_key='vector_index_row_threshold',
+            setting_value=10000,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.vector_index_optimize_rows_setting = GlobalSetting(
+            description="The number of rows added to an indexed vector store that trigger an index optimization.",
+            namespace='omnilake::vector_storage',
+            setting_key='vector_index_optimize_rows',
+            setting_value=5000,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.full_text_index_optimize_rows_setting = GlobalSetting(
+            description="The number of rows missing from the full text index of a vector store that trigger a rebuild of it.",
+            namespace='omnilake::vector_storage',
+            setting_key='full_text_index_optimize_rows',
+            setting_value=500,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.compaction_table_writes_setting = GlobalSetting(
+            description="The number of writes made to a vector table since its last compaction that trigger a compaction.",
+            namespace='omnilake::vector_storage',
+            setting_key='compaction_table_writes',
+            setting_value=64,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.compaction_interval_hours_setting = GlobalSetting(
+            description="The age, in hours, of the last compaction of a vector table after which the next maintenance run compacts it if it was written to.",
+            namespace='omnilake::vector_storage',
+            setting_key='compaction_interval_hours',
+            setting_value=24,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.version_retention_hours_setting = GlobalSetting(
+            description="The number of hours old vector table versions are retained when compacting.",
+            namespace='omnilake::vector_storage',
+            setting_key='version_retention_hours',
+            setting_value=24,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.scalar_index_optimize_rows_setting = GlobalSetting(
+            description="The number of rows missing from the chunk_id and entry_id scalar indexes of a vector store that trigger a rebuild of them.",
+            namespace='omnilake::vector_storage',
+            setting_key='scalar_index_optimize_rows',
+            setting_value=1000,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
         self.entry_tag_generator_event = EventBusSubscriptionFunction(
             base_image=self.app_base_image,
             construct_id='entry_tag_generator',
@@ -346,6 +592,11 @@ class LakeConstructArchiveVectorStack(Stack):
                 ),
             ],
             resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
                 ResourceAccessRequest(
                     resource_name='ai_statistics_collector',
                     resource_type=ResourceType.REST_SERVICE,
@@ -368,10 +619,160 @@ class LakeConstructArchiveVectorStack(Stack):
                     resource_type=ResourceType.TABLE,
                     policy_name='read_write',
                 ),
+                ResourceAccessRequest(
+                    resource_name=VectorStore.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStoreChunk.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+            ],
+            scope=self,
+            timeout=Duration.minutes(2),
+        )
+
+        self.vector_store_bucket.grant_read_write(self.entry_tag_generator_event.handler.function)
+
+        self.add_shard = EventBusSubscriptionFunction(
+            base_image=self.app_base_image,
+            construct_id='vector_add_shard',
+            description='Adds a vector store shard to an archive',
+            entry=self.runtime_path,
+            event_type='omnilake_archive_vector_add_shard_request',
+            index='shards.py',
+            handler='handler',
+            function_name=resource_namer('archive-vector-add-shard', scope=self),
+            memory_size=512,
+            resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=Job.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStore.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
             ],
             scope=self,
             timeout=Duration.minutes(2),
         )
 
+        self.vector_store_bucket.grant_read_write(self.add_shard.handler.function)
+
+        self.reembed = EventBusSubscriptionFunction(
+            base_image=self.app_base_image,
+            construct_id='vector_reembed',
+            description='Re-embeds the vector stores of an archive with a different embedding model',
+            entry=self.runtime_path,
+            event_type='omnilake_archive_vector_reembed_request',
+            index='reembed.py',
+            handler='handler',
+            function_name=resource_namer('archive-vector-reembed', scope=self),
+            memory_size=4096,
+            managed_policies=[
+                ManagedPolicy.from_managed_policy_arn(
+                    scope=self,
+                    id='vector-reembed-amazon-bedrock-full-access',
+                    managed_policy_arn='arn:aws:iam::aws:policy/AmazonBedrockFullAccess'
+                ),
+            ],
+            resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=CachedEmbedding.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name='event_bus',
+                    resource_type=ResourceType.ASYNC_SERVICE,
+                ),
+                ResourceAccessRequest(
+                    resource_name=IndexedEntry.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+                ResourceAccessRequest(
+                    resource_name=Job.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name='raw_storage_manager',
+                    resource_type=ResourceType.REST_SERVICE,
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStore.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStoreChunk.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStoreMigration.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+            ],
+            scope=self,
+            timeout=Duration.minutes(15),
+        )
+
+        self.vector_store_bucket.grant_read_write(self.reembed.handler.function)
+
+        self.tag_backfill = EventBusSubscriptionFunction(
+            base_image=self.app_base_image,
+            construct_id='vector_tag_backfill',
+            description='Normalizes the tags of the entries and chunks of a vector archive',
+            entry=self.runtime_path,
+            event_type='omnilake_archive_vector_backfill_tags_request',
+            index='backfill_tags.py',
+            handler='handler',
+            function_name=resource_namer('archive-vector-tag-backfill', scope=self),
+            memory_size=1024,
+            resource_access_requests=[
+                ResourceAccessRequest(
+                    resource_name=ArchiveWriteVersion.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name='event_bus',
+                    resource_type=ResourceType.ASYNC_SERVICE,
+                ),
+                ResourceAccessRequest(
+                    resource_name=IndexedEntry.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=Job.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read_write',
+                ),
+                ResourceAccessRequest(
+                    resource_name=VectorStore.table_name,
+                    resource_type=ResourceType.TABLE,
+                    policy_name='read',
+                ),
+            ],
+            scope=self,
+            timeout=Duration.minutes(15),
+        )
+
+        self.vector_store_bucket.grant_read_write(self.tag_backfill.handler.function)
+
         # Register the Vector Archive Construct
         RegisteredRequestConstruct.from_definition(registered_construct=self.registered_request_construct_obj, scope=self)
\ No newline at end of file
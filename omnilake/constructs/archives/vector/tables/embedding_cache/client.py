@@ -0,0 +1,219 @@
+import base64
+
+from array import array
+from datetime import datetime, UTC as utc_tz
+from typing import Dict, List, Optional, Union
+
+from da_vinci.core.orm import (
+    TableClient,
+    TableObject,
+    TableObjectAttribute,
+    TableObjectAttributeType,
+    TableScanDefinition,
+)
+
+from omnilake.tables.entries.client import Entry
+
+
+class CachedEmbedding(TableObject):
+    table_name = "vector_embedding_cache"
+
+    description = "Embeddings keyed by the embedding model, input type, and hash of the embedded text"
+
+    partition_key_attribute = TableObjectAttribute(
+        name="cache_key",
+        attribute_type=TableObjectAttributeType.STRING,
+        description="The cache key, formatted as <model_id>#<input_type>#<content_hash>",
+    )
+
+    ttl_attribute = TableObjectAttribute(
+        name="time_to_live",
+        attribute_type=TableObjectAttributeType.DATETIME,
+        description="The time-to-live for the cached embedding, used by DynamoDB TTL.",
+        optional=True,
+    )
+
+    attributes = [
+        TableObjectAttribute(
+            name="created_on",
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description="The date and time the embedding was cached",
+            default=lambda: datetime.now(utc_tz),
+        ),
+
+        TableObjectAttribute(
+            name="embedding",
+            attribute_type=TableObjectAttributeType.STRING,
+            description="The base64 encoded float32 embedding",
+        ),
+
+        TableObjectAttribute(
+            name="input_type",
+            attribute_type=TableObjectAttributeType.STRING,
+            description="The input type the embedding was generated with",
+        ),
+
+        TableObjectAttribute(
+            name="model_id",
+            attribute_type=TableObjectAttributeType.STRING,
+            description="The model that generated the embedding",
+        ),
+    ]
+
+    def __init__(self, cache_key: str, embedding: str, input_type: str, model_id: str,
+                 created_on: Optional[datetime] = None, time_to_live: Optional[datetime] = None):
+        """
+        Initialize a cached embedding
+
+        Keyword Arguments:
+        cache_key -- The cache key
+        embedding -- The base64 encoded float32 embedding
+        input_type -- The input type the embedding was generated with
+        model_id -- The model that generated the embedding
+        created_on -- The date and time the embedding was cached
+        time_to_live -- The time-to-live for the cached embedding
+        """
+        super().__init__(
+            cache_key=cache_key,
+            created_on=created_on,
+            embedding=embedding,
+            input_type=input_type,
+            model_id=model_id,
+            time_to_live=time_to_live,
+        )
+
+    @staticmethod
+    def calculate_cache_key(model_id: str, input_type: str, text: str) -> str:
+        """
+        Generate the cache key for the given text, uses the same content hashing as the entries table.
+
+        Keyword Arguments:
+        model_id -- The embedding model ID
+        input_type -- The embedding input type
+        text -- The text that is embedded
+        """
+        content_hash = Entry.calculate_hash(text)
+
+        return f"{model_id}#{input_type}#{content_hash}"
+
+    @staticmethod
+    def decode_embedding(encoded_embedding: str) -> List[float]:
+        """
+        Decode a base64 encoded float32 embedding
+
+        Keyword Arguments:
+        encoded_embedding -- The encoded embedding
+        """
+        return array('f', base64.b64decode(encoded_embedding)).tolist()
+
+    @staticmethod
+    def encode_embedding(embedding: List[float]) -> str:
+        """
+        Encode an embedding as base64 float32, roughly a fifth of the size of the JSON representation
+
+        Keyword Arguments:
+        embedding -- The embedding to encode
+        """
+        return base64.b64encode(array('f', embedding).tobytes()).decode('utf-8')
+
+    def to_embedding(self) -> List[float]:
+        """
+        Return the decoded embedding
+        """
+        return self.decode_embedding(self.embedding)
+
+
+class EmbeddingCacheScanDefinition(TableScanDefinition):
+    def __init__(self):
+        super().__init__(table_object_class=CachedEmbedding)
+
+
+class EmbeddingCacheClient(TableClient):
+    # DynamoDB limits for the batch operations
+    BATCH_GET_LIMIT = 100
+
+    BATCH_WRITE_LIMIT = 25
+
+    def __init__(self, app_name: Optional[str] = None, deployment_id: Optional[str] = None):
+        super().__init__(
+            app_name=app_name,
+            default_object_class=CachedEmbedding,
+            deployment_id=deployment_id,
+        )
+
+    def batch_get(self, cache_keys: List[str]) -> Dict[str, CachedEmbedding]:
+        """
+        Get many cached embeddings, returns a dictionary of the found embeddings keyed by cache key
+
+        Keyword Arguments:
+        cache_keys -- The cache keys to retrieve
+        """
+        found = {}
+
+        unique_keys = list(dict.fromkeys(cache_keys))
+
+        for idx in range(0, len(unique_keys), self.BATCH_GET_LIMIT):
+            request_items = {
+                self.table_endpoint_name: {
+                    "Keys": [{"CacheKey": {"S": key}} for key in unique_keys[idx:idx + self.BATCH_GET_LIMIT]],
+                }
+            }
+
+            while request_items:
+                response = self.client.batch_get_item(RequestItems=request_items)
+
+                for item in response.get("Responses", {}).get(self.table_endpoint_name, []):
+                    cached = self.default_object_class.from_dynamodb_item(item)
+
+                    found[cached.cache_key] = cached
+
+                request_items = response.get("UnprocessedKeys")
+
+        return found
+
+    def batch_put(self, cached_embeddings: List[CachedEmbedding]) -> None:
+        """
+        Put many cached embeddings
+
+        Keyword Arguments:
+        cached_embeddings -- The cached embeddings to put
+        """
+        for idx in range(0, len(cached_embeddings), self.BATCH_WRITE_LIMIT):
+            request_items = {
+                self.table_endpoint_name: [
+                    {"PutRequest": {"Item": cached.to_dynamodb_item()}}
+                    for cached in cached_embeddings[idx:idx + self.BATCH_WRITE_LIMIT]
+                ]
+            }
+
+            while request_items:
+                response = self.client.batch_write_item(RequestItems=request_items)
+
+                request_items = response.get("UnprocessedItems")
+
+    def delete(self, cached_embedding: CachedEmbedding) -> None:
+        """
+        Delete a cached embedding
+
+        Keyword Arguments:
+        cached_embedding -- The cached embedding to delete
+        """
+        self.delete_object(cached_embedding)
+
+    def get(self, cache_key: str) -> Union[CachedEmbedding, None]:
+        """
+        Get a cached embedding
+
+        Keyword Arguments:
+        cache_key -- The cache key
+        """
+        return self.get_object(partition_key_value=cache_key)
+
+    def put(self, cached_embedding: CachedEmbedding) -> None:
+        """
+        Put a cached embedding
+
+        Keyword Arguments:
+        cached_embedding -- The cached embedding to put
+        """
+        self.put_object(cached_embedding)
@@ -1,5 +1,7 @@
+import time
+
 from datetime import datetime, UTC as utc_tz
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from da_vinci.core.orm import (
     TableClient,
@@ -55,6 +57,16 @@ class VectorStoreChunksScanDefinition(TableScanDefinition):
 
 
 class VectorStoreChunksClient(TableClient):
+    # DynamoDB limits of a BatchGetItem and a BatchWriteItem request
+    BATCH_GET_LIMIT = 100
+
+    BATCH_WRITE_LIMIT = 25
+
+    # Unprocessed items and keys are retried with exponential backoff, starting at the base delay
+    BATCH_WRITE_MAX_RETRIES = 8
+
+    BATCH_WRITE_RETRY_BASE_SECONDS = 0.05
+
     def __init__(self, app_name: Optional[str] = None, deployment_id: Optional[str] = None):
         super().__init__(
             app_name=app_name,
@@ -62,6 +74,113 @@ class VectorStoreChunksClient(TableClient):
             deployment_id=deployment_id
         )
 
+    def _batch_write(self, write_requests: List[dict]) -> None:
+        """
+        Submit write requests in batches, retrying unprocessed requests with exponential backoff
+
+        Keyword Arguments:
+        write_requests -- The write requests
+        """
+        for idx in range(0, len(write_requests), self.BATCH_WRITE_LIMIT):
+            request_items = {
+                self.table_endpoint_name: write_requests[idx:idx + self.BATCH_WRITE_LIMIT],
+            }
+
+            retries = 0
+
+            while request_items:
+                if retries > self.BATCH_WRITE_MAX_RETRIES:
+                    unprocessed = len(request_items[self.table_endpoint_name])
+
+                    raise Exception(f"Unable to write {unprocessed} chunks after {self.BATCH_WRITE_MAX_RETRIES} retries")
+
+                if retries:
+                    time.sleep(self.BATCH_WRITE_RETRY_BASE_SECONDS * 2 ** (retries - 1))
+
+                response = self.client.batch_write_item(RequestItems=request_items)
+
+                request_items = response.get("UnprocessedItems")
+
+                retries += 1
+
+    def batch_delete(self, chunks: List[VectorStoreChunk]) -> None:
+        """
+        Delete many chunks of entries stored in the vector store, retrying unprocessed deletes with exponential
+        backoff
+
+        Keyword Arguments:
+        chunks -- The chunks to delete
+        """
+        self._batch_write([
+            {
+                "DeleteRequest": {
+                    "Key": {
+                        "ArchiveId": {"S": chunk.archive_id},
+                        "ChunkId": {"S": chunk.chunk_id},
+                    }
+                }
+            }
+            for chunk in chunks
+        ])
+
+    def batch_put(self, chunks: List[VectorStoreChunk]) -> None:
+        """
+        Put many chunks of entries stored in the vector store, retrying unprocessed puts with exponential backoff
+
+        Keyword Arguments:
+        chunks -- The chunks to put
+        """
+        self._batch_write([{"PutRequest": {"Item": chunk.to_dynamodb_item()}} for chunk in chunks])
+
+    def filter_unchanged(self, chunks: List[VectorStoreChunk]) -> List[VectorStoreChunk]:
+        """
+        Return the chunks that are still recorded against their entry, read consistently from the table. Chunks
+        read from the entry index may lag behind a re-index that re-assigned them to another entry, or removed
+        them.
+
+        Keyword Arguments:
+        chunks -- The chunks to check
+        """
+        recorded_entry_ids = {}
+
+        for idx in range(0, len(chunks), self.BATCH_GET_LIMIT):
+            request_items = {
+                self.table_endpoint_name: {
+                    "ConsistentRead": True,
+                    "Keys": [
+                        {
+                            "ArchiveId": {"S": chunk.archive_id},
+                            "ChunkId": {"S": chunk.chunk_id},
+                        }
+                        for chunk in chunks[idx:idx + self.BATCH_GET_LIMIT]
+                    ],
+                    "ProjectionExpression": "ArchiveId, ChunkId, EntryId",
+                }
+            }
+
+            retries = 0
+
+            while request_items:
+                if retries > self.BATCH_WRITE_MAX_RETRIES:
+                    raise Exception(f"Unable to read chunks after {self.BATCH_WRITE_MAX_RETRIES} retries")
+
+                if retries:
+                    time.sleep(self.BATCH_WRITE_RETRY_BASE_SECONDS * 2 ** (retries - 1))
+
+                response = self.client.batch_get_item(RequestItems=request_items)
+
+                for item in response.get("Responses", {}).get(self.table_endpoint_name, []):
+                    recorded_entry_ids[(item["ArchiveId"]["S"], item["ChunkId"]["S"])] = item["EntryId"]["S"]
+
+                request_items = response.get("UnprocessedKeys")
+
+                retries += 1
+
+        return [
+            chunk for chunk in chunks
+            if recorded_entry_ids.get((chunk.archive_id, chunk.chunk_id)) == chunk.entry_id
+        ]
+
     def delete(self, chunk: VectorStoreChunk) -> None:
         """
         Delete a chunk of an entry stored in the vector store
@@ -100,6 +219,34 @@ class VectorStoreChunksClient(TableClient):
 
         return chunks
 
+    def get_page_by_archive(self, archive_id: str, exclusive_start_key: Optional[Dict] = None,
+                            limit: int = 500) -> Tuple[List[VectorStoreChunk], Optional[Dict]]:
+        """
+        Get a single page of the chunks that belong to an archive, ordered by chunk ID. Returns the chunks and the
+        key to resume from, None once the last page was returned. The key can be saved to resume reading the
+        chunks at a later time.
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive that this chunk belongs to
+        exclusive_start_key -- The key returned with the previous page, None to start from the first page
+        limit -- The maximum number of chunks returned
+        """
+        params = {
+            "KeyConditionExpression": "ArchiveId = :archive_id",
+            "ExpressionAttributeValues": {":archive_id": {"S": archive_id}},
+            "Limit": limit,
+            "TableName": self.table_endpoint_name,
+        }
+
+        if exclusive_start_key:
+            params["ExclusiveStartKey"] = exclusive_start_key
+
+        response = self.client.query(**params)
+
+        chunks = [self.default_object_class.from_dynamodb_item(item) for item in response.get("Items", [])]
+
+        return chunks, response.get("LastEvaluatedKey")
+
     def get_chunks_by_archive_and_entry(self, archive_id: str, entry_id: str) -> List[VectorStoreChunk]:
         """
         Get all chunks that belong to an archive and entry
@@ -0,0 +1,171 @@
+from datetime import datetime, UTC as utc_tz
+from enum import StrEnum
+from typing import Dict, Optional, Union
+
+from da_vinci.core.orm import (
+    TableClient,
+    TableObject,
+    TableObjectAttribute,
+    TableObjectAttributeType,
+)
+
+
+class MigrationStatus(StrEnum):
+    BUILDING = 'BUILDING'
+    COMPLETED = 'COMPLETED'
+    CUTOVER = 'CUTOVER'
+    DRAINING = 'DRAINING'
+    INDEXING = 'INDEXING'
+
+
+class VectorStoreMigration(TableObject):
+    table_name = 'vector_store_migrations'
+
+    description = 'Tracks the re-embedding of the vector stores of an archive into new vector tables.'
+
+    partition_key_attribute = TableObjectAttribute(
+        name='archive_id',
+        attribute_type=TableObjectAttributeType.STRING,
+        description='The ID of the archive being re-embedded.',
+    )
+
+    attributes = [
+        TableObjectAttribute(
+            name='checkpoint',
+            attribute_type=TableObjectAttributeType.JSON_STRING,
+            description='The key of the last chunk of the archive re-embedded, unset before the first batch and once all chunks were re-embedded.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='completed_on',
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description='The date and time the migration completed.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='created_on',
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description='The date and time the migration was started.',
+            default=lambda: datetime.now(utc_tz),
+        ),
+
+        TableObjectAttribute(
+            name='cutover_on',
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description='The date and time lookups were switched over to the new vector tables.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='embedding_dimensions',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of dimensions of the embeddings generated by the migration.',
+        ),
+
+        TableObjectAttribute(
+            name='embedding_model_id',
+            attribute_type=TableObjectAttributeType.STRING,
+            description='The ID of the model the chunks are re-embedded with.',
+        ),
+
+        TableObjectAttribute(
+            name='migrated_chunks',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of chunks re-embedded by the migration.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='reconcile_checkpoint',
+            attribute_type=TableObjectAttributeType.JSON_STRING,
+            description='The progress of the reconcile of the new vector tables in progress, unset when no reconcile is in progress.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='shard_tables',
+            attribute_type=TableObjectAttributeType.JSON_STRING,
+            description='The new and previous vector table of each vector store of the archive, keyed by vector store ID.',
+            default={},
+        ),
+
+        TableObjectAttribute(
+            name='status',
+            attribute_type=TableObjectAttributeType.STRING,
+            description='The status of the migration.',
+            default=MigrationStatus.BUILDING, # BUILDING, INDEXING, CUTOVER, DRAINING or COMPLETED
+        ),
+    ]
+
+    def __init__(self, archive_id: str, embedding_dimensions: int, embedding_model_id: str,
+                 checkpoint: Optional[Dict] = None, completed_on: Optional[datetime] = None,
+                 created_on: Optional[datetime] = None, cutover_on: Optional[datetime] = None,
+                 migrated_chunks: Optional[int] = 0, reconcile_checkpoint: Optional[Dict] = None,
+                 shard_tables: Optional[Dict] = None, status: Optional[MigrationStatus] = MigrationStatus.BUILDING):
+        """
+        Initialize a new vector store migration object.
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive being re-embedded.
+        embedding_dimensions -- The number of dimensions of the embeddings generated by the migration.
+        embedding_model_id -- The ID of the model the chunks are re-embedded with.
+        checkpoint -- The key of the last chunk of the archive re-embedded.
+        completed_on -- The date and time the migration completed.
+        created_on -- The date and time the migration was started.
+        cutover_on -- The date and time lookups were switched over to the new vector tables.
+        migrated_chunks -- The number of chunks re-embedded by the migration.
+        reconcile_checkpoint -- The progress of the reconcile of the new vector tables in progress.
+        shard_tables -- The new and previous vector table of each vector store of the archive.
+        status -- The status of the migration.
+        """
+        super().__init__(
+            archive_id=archive_id,
+            checkpoint=checkpoint,
+            completed_on=completed_on,
+            created_on=created_on,
+            cutover_on=cutover_on,
+            embedding_dimensions=embedding_dimensions,
+            embedding_model_id=embedding_model_id,
+            migrated_chunks=migrated_chunks,
+            reconcile_checkpoint=reconcile_checkpoint,
+            shard_tables=shard_tables,
+            status=status,
+        )
+
+
+class VectorStoreMigrationsClient(TableClient):
+    def __init__(self, app_name: Optional[str] = None, deployment_id: Optional[str] = None):
+        super().__init__(
+            app_name=app_name,
+            default_object_class=VectorStoreMigration,
+            deployment_id=deployment_id,
+        )
+
+    def delete(self, migration: VectorStoreMigration) -> None:
+        """
+        Delete a vector store migration
+
+        Keyword Arguments:
+        migration -- The migration to delete
+        """
+        self.delete_object(migration)
+
+    def get(self, archive_id: str) -> Union[VectorStoreMigration, None]:
+        """
+        Get the vector store migration of an archive
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive
+        """
+        return self.get_object(partition_key_value=archive_id, consistent_read=True)
+
+    def put(self, migration: VectorStoreMigration) -> None:
+        """
+        Put a vector store migration
+
+        Keyword Arguments:
+        migration -- The migration to put
+        """
+        self.put_object(migration)
@@ -1,7 +1,9 @@
 from datetime import datetime, UTC as utc_tz
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 from uuid import uuid4
 
+from botocore.exceptions import ClientError as DynamoDBClientError
+
 from da_vinci.core.orm import (
     TableClient,
     TableObject,
@@ -11,6 +13,37 @@ from da_vinci.core.orm import (
 )
 
 
+# Embedding model and dimensions of vector stores created before they were tracked per store
+DEFAULT_EMBEDDING_MODEL_ID = 'cohere.embed-multilingual-v3'
+
+DEFAULT_EMBEDDING_DIMENSIONS = 1024
+
+# Counters only ever updated atomically, see VectorStoresClient.add_embedding_cache_statistics and
+# VectorStoresClient.add_staged_rows
+ATOMIC_COUNTER_ATTRIBUTES = ('EmbeddingCacheHits', 'EmbeddingCacheMisses', 'StagedRows')
+
+# Only written by the put that creates the vector store, see VectorStoresClient.increment_shard_count
+CREATE_ONLY_ATTRIBUTES = ('ShardCount',)
+
+# Separates the archive ID from the shard number in the key of the additional shards of an archive
+SHARD_KEY_SEPARATOR = '#'
+
+
+def shard_key(archive_id: str, shard_number: int = 0) -> str:
+    """
+    Return the key the vector store of an archive shard is tracked under. The first shard is keyed by the archive
+    ID alone, so archives that are not sharded keep a single vector store keyed by their ID.
+
+    Keyword arguments:
+    archive_id -- The archive ID
+    shard_number -- The number of the shard
+    """
+    if not shard_number:
+        return archive_id
+
+    return f'{archive_id}{SHARD_KEY_SEPARATOR}{shard_number}'
+
+
 class VectorStore(TableObject):
     table_name = 'vector_stores'
 
@@ -19,7 +52,7 @@ class VectorStore(TableObject):
     partition_key_attribute = TableObjectAttribute(
         name='archive_id',
         attribute_type=TableObjectAttributeType.STRING,
-        description='The unique identifier for the archive the vector store belongs to.',
+        description='The unique identifier for the archive the vector store belongs to, suffixed with #<shard_number> for all but the first shard of a sharded archive.',
     )
 
     attributes = [
@@ -29,6 +62,13 @@ class VectorStore(TableObject):
             description='The S3 bucket name where the vector store content is stored.',
         ),
 
+        TableObjectAttribute(
+            name='compacted_on',
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description='The date and time the vector table was last compacted.',
+            optional=True,
+        ),
+
         TableObjectAttribute(
             name='created_on',
             attribute_type=TableObjectAttributeType.DATETIME,
@@ -36,6 +76,118 @@ class VectorStore(TableObject):
             default=lambda: datetime.now(utc_tz),
         ),
 
+        TableObjectAttribute(
+            name='embedding_cache_hits',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The total number of chunk embeddings served from the embedding cache while indexing.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='embedding_cache_misses',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The total number of chunk embeddings that required an embedding request while indexing.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='embedding_dimensions',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of dimensions of the embeddings held by the vector table.',
+            default=DEFAULT_EMBEDDING_DIMENSIONS,
+        ),
+
+        TableObjectAttribute(
+            name='embedding_model_id',
+            attribute_type=TableObjectAttributeType.STRING,
+            description='The ID of the model that generated the embeddings held by the vector table.',
+            default=DEFAULT_EMBEDDING_MODEL_ID,
+        ),
+
+        TableObjectAttribute(
+            name='fragments_after_compaction',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of fragments of the vector table after the last compaction.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='fragments_before_compaction',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of fragments of the vector table before the last compaction.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='full_text_index_rows',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of rows covered by the full text index as of the last build, 0 when the store has no full text index.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='query_latency_after_compaction_ms',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The median latency, in milliseconds, of a probe query after the last compaction.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='query_latency_before_compaction_ms',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The median latency, in milliseconds, of a probe query before the last compaction.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='scalar_index_rows',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of rows covered by the chunk_id and entry_id scalar indexes as of the last build, 0 when the store has no scalar indexes.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='shard_count',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of vector stores the archive is split across, only tracked by the first shard.',
+            default=1,
+        ),
+
+        TableObjectAttribute(
+            name='shard_number',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of the shard of the archive held by the vector store, 0 for the first shard.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='shard_strategy',
+            attribute_type=TableObjectAttributeType.STRING,
+            description='How new entries are routed to the shards of the archive, HASH or TIME, only tracked by the first shard.',
+            default='HASH',
+        ),
+
+        TableObjectAttribute(
+            name='staged_rows',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The approximate number of rows staged in the write buffer of the vector store and not flushed yet.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='table_writes_since_compaction',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The approximate number of writes, each adding a fragment or version, made to the vector table since the last compaction.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='total_chunks',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The total number of chunks (rows) in the vector store.',
+            default=0,
+        ),
+
         TableObjectAttribute(
             name='total_entries',
             attribute_type=TableObjectAttributeType.NUMBER,
@@ -50,37 +202,144 @@ class VectorStore(TableObject):
             default=lambda: datetime.now(utc_tz),
         ),
 
+        TableObjectAttribute(
+            name='vector_index_last_updated',
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description='The date and time the ANN index of the vector store was last built or optimized.',
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name='vector_index_rows',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of rows covered by the ANN index as of the last build or optimization.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='vector_index_trained_rows',
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description='The number of rows the ANN index was trained on during the last full build.',
+            default=0,
+        ),
+
+        TableObjectAttribute(
+            name='vector_index_type',
+            attribute_type=TableObjectAttributeType.STRING,
+            description='The type of ANN index built over the vector store, unset when the store has no index.',
+            optional=True,
+        ),
+
         TableObjectAttribute(
             name='vector_store_id',
             attribute_type=TableObjectAttributeType.STRING,
             description='The unique id of the vector store',
             default=lambda: str(uuid4())
         ),
+
+        TableObjectAttribute(
+            name='vector_table_name',
+            attribute_type=TableObjectAttributeType.STRING,
+            description='The name of the vector table holding the chunks of the vector store, unset when the table is named after the vector store ID.',
+            optional=True,
+        ),
     ]
 
-    def __init__(self, archive_id: str, bucket_name: str, created_on: Optional[datetime] = None,
-                 total_entries: Optional[int] = 0, total_entries_last_calculated: Optional[datetime] = None,
-                 vector_store_id: Optional[str] = None):
+    def __init__(self, archive_id: str, bucket_name: str, compacted_on: Optional[datetime] = None,
+                 created_on: Optional[datetime] = None, embedding_cache_hits: Optional[int] = 0,
+                 embedding_cache_misses: Optional[int] = 0,
+                 embedding_dimensions: Optional[int] = DEFAULT_EMBEDDING_DIMENSIONS,
+                 embedding_model_id: Optional[str] = DEFAULT_EMBEDDING_MODEL_ID, fragments_after_compaction: Optional[int] = None,
+                 fragments_before_compaction: Optional[int] = None, full_text_index_rows: Optional[int] = 0,
+                 query_latency_after_compaction_ms: Optional[float] = None,
+                 query_latency_before_compaction_ms: Optional[float] = None, scalar_index_rows: Optional[int] = 0,
+                 shard_count: Optional[int] = 1, shard_number: Optional[int] = 0, shard_strategy: Optional[str] = 'HASH',
+                 staged_rows: Optional[int] = 0, table_writes_since_compaction: Optional[int] = 0, total_chunks: Optional[int] = 0, total_entries: Optional[int] = 0,
+                 total_entries_last_calculated: Optional[datetime] = None,
+                 vector_index_last_updated: Optional[datetime] = None, vector_index_rows: Optional[int] = 0,
+                 vector_index_trained_rows: Optional[int] = 0, vector_index_type: Optional[str] = None,
+                 vector_store_id: Optional[str] = None, vector_table_name: Optional[str] = None):
         """
         Initialize a new vector store object.
 
         Keyword Arguments:
-        archive_id -- The unique identifier for the archive the vector store belongs to.
+        archive_id -- The unique identifier for the archive the vector store belongs to, see shard_key.
         bucket_name -- The S3 bucket name where the vector store content is stored.
+        compacted_on -- The date and time the vector table was last compacted.
         created_on -- The date and time the vector store was created.
+        embedding_cache_hits -- The total number of chunk embeddings served from the embedding cache.
+        embedding_cache_misses -- The total number of chunk embeddings that required an embedding request.
+        embedding_dimensions -- The number of dimensions of the embeddings held by the vector table.
+        embedding_model_id -- The ID of the model that generated the embeddings held by the vector table.
+        fragments_after_compaction -- The number of fragments of the vector table after the last compaction.
+        fragments_before_compaction -- The number of fragments of the vector table before the last compaction.
+        full_text_index_rows -- The number of rows covered by the full text index.
+        query_latency_after_compaction_ms -- The median probe query latency after the last compaction.
+        query_latency_before_compaction_ms -- The median probe query latency before the last compaction.
+        scalar_index_rows -- The number of rows covered by the scalar indexes.
+        shard_count -- The number of vector stores the archive is split across.
+        shard_number -- The number of the shard of the archive held by the vector store.
+        shard_strategy -- How new entries are routed to the shards of the archive.
+        staged_rows -- The approximate number of rows staged in the write buffer and not flushed yet.
+        table_writes_since_compaction -- The approximate number of writes made to the vector table since the last compaction.
+        total_chunks -- The total number of chunks (rows) in the vector store.
         total_entries -- The total number of entries in the vector store.
         total_entries_last_calculated -- The date and time the total entries was last calculated.
+        vector_index_last_updated -- The date and time the ANN index was last built or optimized.
+        vector_index_rows -- The number of rows covered by the ANN index.
+        vector_index_trained_rows -- The number of rows the ANN index was trained on.
+        vector_index_type -- The type of ANN index built over the vector store.
         vector_store_id -- The unique name of the vector store.
+        vector_table_name -- The name of the vector table, defaults to the vector store ID.
         """
         super().__init__(
             archive_id=archive_id,
             bucket_name=bucket_name,
+            compacted_on=compacted_on,
             created_on=created_on,
+            embedding_cache_hits=embedding_cache_hits,
+            embedding_cache_misses=embedding_cache_misses,
+            embedding_dimensions=embedding_dimensions,
+            embedding_model_id=embedding_model_id,
+            fragments_after_compaction=fragments_after_compaction,
+            fragments_before_compaction=fragments_before_compaction,
+            full_text_index_rows=full_text_index_rows,
+            query_latency_after_compaction_ms=query_latency_after_compaction_ms,
+            query_latency_before_compaction_ms=query_latency_before_compaction_ms,
+            scalar_index_rows=scalar_index_rows,
+            shard_count=shard_count,
+            shard_number=shard_number,
+            shard_strategy=shard_strategy,
+            staged_rows=staged_rows,
+            table_writes_since_compaction=table_writes_since_compaction,
+            total_chunks=total_chunks,
             total_entries=total_entries,
             total_entries_last_calculated=total_entries_last_calculated,
+            vector_index_last_updated=vector_index_last_updated,
+            vector_index_rows=vector_index_rows,
+            vector_index_trained_rows=vector_index_trained_rows,
+            vector_index_type=vector_index_type,
             vector_store_id=vector_store_id,
+            vector_table_name=vector_table_name,
         )
 
+    def embedding_model(self) -> Tuple[str, int]:
+        """
+        Return the ID of the embedding model and the number of dimensions of the embeddings held by the vector
+        store. Lookups must embed their query with the same model and dimensions.
+        """
+        return (
+            self.embedding_model_id or DEFAULT_EMBEDDING_MODEL_ID,
+            int(self.embedding_dimensions or DEFAULT_EMBEDDING_DIMENSIONS),
+        )
+
+    def storage_table_name(self) -> str:
+        """
+        Return the name of the vector table holding the chunks of the vector store. The table is named after the
+        vector store ID unless the store was re-embedded into a new table.
+        """
+        return self.vector_table_name or self.vector_store_id
+
 
 class VectorStoresScanDefinition(TableScanDefinition):
     def __init__(self):
@@ -110,6 +369,73 @@ class VectorStoresClient(TableClient):
         """
         self.delete_object(vector_store)
 
+    def add_embedding_cache_statistics(self, archive_id: str, hits: int, misses: int) -> None:
+        """
+        Atomically add to the embedding cache hit and miss counters of a vector store.
+
+        Keyword Arguments:
+        archive_id -- The unique identifier for the archive the vector store belongs to.
+        hits -- The number of embeddings served from the cache.
+        misses -- The number of embeddings that required an embedding request.
+        """
+        self.client.update_item(
+            TableName=self.table_endpoint_name,
+            Key={
+                'ArchiveId': {'S': archive_id},
+            },
+            UpdateExpression='ADD EmbeddingCacheHits :hits, EmbeddingCacheMisses :misses',
+            ExpressionAttributeValues={
+                ':hits': {'N': str(hits)},
+                ':misses': {'N': str(misses)},
+            },
+        )
+
+    def add_staged_rows(self, archive_id: str, rows: int) -> int:
+        """
+        Atomically add to the staged rows counter of a vector store, returning the updated number of staged rows.
+        Flushes subtract the rows they committed.
+
+        Keyword Arguments:
+        archive_id -- The unique identifier for the archive the vector store belongs to.
+        rows -- The number of rows staged, negative for rows that were flushed.
+        """
+        response = self.client.update_item(
+            TableName=self.table_endpoint_name,
+            Key={
+                'ArchiveId': {'S': archive_id},
+            },
+            UpdateExpression='ADD StagedRows :rows',
+            ExpressionAttributeValues={
+                ':rows': {'N': str(rows)},
+            },
+            ReturnValues='UPDATED_NEW',
+        )
+
+        return int(response['Attributes']['StagedRows']['N'])
+
+    def put_if_not_exists(self, vector_store: VectorStore) -> bool:
+        """
+        Put a new vector store into the table, unless a vector store is already tracked under its key. Returns
+        whether the vector store was put.
+
+        Keyword Arguments:
+        vector_store -- The vector store to put into the table.
+        """
+        try:
+            self.client.put_item(
+                TableName=self.table_endpoint_name,
+                Item=vector_store.to_dynamodb_item(),
+                ConditionExpression='attribute_not_exists(ArchiveId)',
+            )
+
+            return True
+
+        except DynamoDBClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+
+            raise
+
     def get(self, archive_id: str) -> Union[VectorStore, None]:
         """
         Get a vector store by its unique name.
@@ -119,11 +445,109 @@ class VectorStoresClient(TableClient):
         """
         return self.get_object(partition_key_value=archive_id)
 
+    def get_shard(self, archive_id: str, shard_number: int = 0) -> Union[VectorStore, None]:
+        """
+        Get the vector store of a shard of an archive.
+
+        Keyword Arguments:
+        archive_id -- The unique identifier for the archive the vector store belongs to.
+        shard_number -- The number of the shard.
+        """
+        return self.get(archive_id=shard_key(archive_id, shard_number))
+
+    def get_shards(self, archive_id: str) -> List[VectorStore]:
+        """
+        Get the vector stores of all shards of an archive, ordered by shard number. Returns an empty list when the
+        archive has no vector store.
+
+        Keyword Arguments:
+        archive_id -- The unique identifier for the archive the vector stores belong to.
+        """
+        first_shard = self.get(archive_id=archive_id)
+
+        if not first_shard:
+            return []
+
+        shards = [first_shard]
+
+        for shard_number in range(1, first_shard.shard_count or 1):
+            shard = self.get_shard(archive_id=archive_id, shard_number=shard_number)
+
+            if not shard:
+                raise ValueError(f'Could not find shard {shard_number} of the vector stores of archive {archive_id}')
+
+            shards.append(shard)
+
+        return shards
+
+    def increment_shard_count(self, archive_id: str, shard_count: int) -> bool:
+        """
+        Conditionally add a shard to the shard count of an archive. Only succeeds when the shard count is still
+        the one the new shard was numbered after, returns whether the shard count was incremented.
+
+        Keyword Arguments:
+        archive_id -- The unique identifier for the archive.
+        shard_count -- The shard count the new shard was numbered after.
+        """
+        condition_expression = 'ShardCount = :shard_count'
+
+        # Vector stores created before archives were sharded have no shard count
+        if shard_count == 1:
+            condition_expression = f'attribute_not_exists(ShardCount) OR {condition_expression}'
+
+        try:
+            self.client.update_item(
+                TableName=self.table_endpoint_name,
+                Key={
+                    'ArchiveId': {'S': archive_id},
+                },
+                UpdateExpression='SET ShardCount = :next_shard_count',
+                ConditionExpression=condition_expression,
+                ExpressionAttributeValues={
+                    ':shard_count': {'N': str(shard_count)},
+                    ':next_shard_count': {'N': str(shard_count + 1)},
+                },
+            )
+
+            return True
+
+        except DynamoDBClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+
+            raise
+
     def put(self, vector_store: VectorStore) -> None:
         """
-        Put a vector store into the table.
+        Put a vector store into the table. The atomic counters are left out of the write and the shard count is
+        only written when the vector store is created, so a put of a vector store loaded before a concurrent
+        increment does not overwrite the increment.
 
         Keyword Arguments:
         vector_store -- The vector store to put into the table.
         """
-        return self.put_object(vector_store)
\ No newline at end of file
+        item = vector_store.to_dynamodb_item()
+
+        key = {'ArchiveId': item.pop('ArchiveId')}
+
+        for attribute_name in ATOMIC_COUNTER_ATTRIBUTES:
+            item.pop(attribute_name, None)
+
+        attribute_names = list(item.keys())
+
+        assignments = []
+
+        for idx, attribute_name in enumerate(attribute_names):
+            if attribute_name in CREATE_ONLY_ATTRIBUTES:
+                assignments.append(f'#attr{idx} = if_not_exists(#attr{idx}, :attr{idx})')
+
+            else:
+                assignments.append(f'#attr{idx} = :attr{idx}')
+
+        self.client.update_item(
+            TableName=self.table_endpoint_name,
+            Key=key,
+            UpdateExpression='SET ' + ', '.join(assignments),
+            ExpressionAttributeNames={f'#attr{idx}': name for idx, name in enumerate(attribute_names)},
+            ExpressionAttributeValues={f':attr{idx}': item[name] for idx, name in enumerate(attribute_names)},
+        )
\ No newline at end of file
@@ -98,7 +98,7 @@ class RawStorageManager(RESTClientBase):
         )
 
     def create_entry(self, content: str, sources: Union[List[str], Set[str]], effective_on: Union[datetime, str] = None,
-                     original_of_source: Optional[str] = None):
+                     original_of_source: Optional[str] = None, entry_id: Optional[str] = None):
         '''
         Creates an entry from scratch, manages the entries table and the raw entry bucket
 
@@ -107,6 +107,7 @@ class RawStorageManager(RESTClientBase):
         effective_on -- The effective date of the entry
         sources -- The sources of the entry
         original_of_source -- The resource name of the source that this entry is content of
+        entry_id -- Optional ID of the entry, generated when not provided
         '''
         effective_on_str = effective_on
 
@@ -119,6 +120,7 @@ class RawStorageManager(RESTClientBase):
                 'content': content,
                 'sources': list(sources),
                 'effective_on': effective_on_str,
+                'entry_id': entry_id,
                 'original_of_source': original_of_source,
             }
         )
@@ -180,6 +182,22 @@ class RawStorageManager(RESTClientBase):
         '''
         return self.post(path='/get_entry', body={'entry_id': entry_id})
 
+    def get_entry_ranges(self, entry_id: str, ranges: List[List[int]]):
+        '''
+        Gets byte ranges of an entry
+
+        Keyword arguments:
+        entry_id -- The entry ID
+        ranges -- The [start, end) byte ranges to read
+        '''
+        return self.post(
+            path='/get_entry_ranges',
+            body={
+                'entry_id': entry_id,
+                'ranges': [list(byte_range) for byte_range in ranges],
+            }
+        )
+
     def get_existing_source_entry(self, source_type: str, source_arguments: Dict):
         '''
         Gets an existing source entry
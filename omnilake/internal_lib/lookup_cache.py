@@ -0,0 +1,226 @@
+'''
+Caches the results of archive lookups. Results are keyed by the normalized lookup instruction together with the
+write versions of the archives it looked up, so any write to an archive makes its cached results unreachable.
+'''
+import hashlib
+import json
+import logging
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, UTC as utc_tz
+from typing import Dict, List, Optional, Tuple
+
+from da_vinci.core.global_settings import setting_value
+
+from omnilake.internal_lib.tags import normalize_tags
+
+from omnilake.tables.archive_write_versions.client import ArchiveWriteVersionsClient
+from omnilake.tables.lookup_result_cache.client import CachedLookupResult, LookupResultCacheClient
+
+
+# Lookup instruction attributes holding lists whose order does not change the lookup result
+UNORDERED_ATTRIBUTES = ('archive_ids', 'prioritize_tags', 'required_tags')
+
+# Process local lookup results, shared across warm invocations
+_LOCAL_RESULTS: OrderedDict = OrderedDict()
+
+
+def bump_archive_write_version(archive_id: str) -> int:
+    '''
+    Record a write to an archive, invalidating the cached lookup results of the archive. Returns the new write
+    version of the archive.
+
+    Keyword arguments:
+    archive_id -- The ID of the archive that was written to
+    '''
+    write_version = ArchiveWriteVersionsClient().bump(archive_id=archive_id)
+
+    logging.debug(f'Archive {archive_id} is now at write version {write_version}')
+
+    return write_version
+
+
+def normalize_lookup_instruction(lookup_instruction: Dict) -> Dict:
+    '''
+    Return the lookup instruction in a normalized form, so instructions that describe the same lookup produce the
+    same cache key. Unset attributes are dropped, tags are normalized like the generated tags and
+    lists whose order does not matter are sorted.
+
+    Keyword arguments:
+    lookup_instruction -- The lookup instruction
+    '''
+    normalized = {}
+
+    for attribute_name, value in lookup_instruction.items():
+        if value is None or value == []:
+            continue
+
+        if attribute_name.endswith('_tags'):
+            value = normalize_tags(value)
+
+        if attribute_name in UNORDERED_ATTRIBUTES:
+            value = sorted(set(value))
+
+        elif isinstance(value, str):
+            value = value.strip()
+
+        normalized[attribute_name] = value
+
+    return normalized
+
+
+class LookupResultCache:
+    '''
+    Two tier lookup result cache. A bounded, least recently used, process local tier sits in front of the
+    persistent lookup result cache table, which is evicted by DynamoDB TTL.
+    '''
+    def __init__(self, request_type: str, ttl_seconds: Optional[int] = None, max_local_entries: Optional[int] = None,
+                 max_result_entries: Optional[int] = None, cache_client: Optional[LookupResultCacheClient] = None,
+                 versions_client: Optional[ArchiveWriteVersionsClient] = None):
+        '''
+        Initialize the lookup result cache, unset limits are loaded from the global settings
+
+        Keyword arguments:
+        request_type -- The lookup request type the cached results belong to
+        ttl_seconds -- The number of seconds a result is cached, 0 disables the cache
+        max_local_entries -- The maximum number of results held in the process local tier
+        max_result_entries -- The maximum number of entry IDs in a cached result, larger results are not cached
+        cache_client -- Optional lookup result cache table client
+        versions_client -- Optional archive write versions table client
+        '''
+        self.request_type = request_type
+
+        if ttl_seconds is None:
+            ttl_seconds = setting_value(namespace='omnilake::lookup_result_cache', setting_key='ttl_seconds')
+
+        if max_local_entries is None:
+            max_local_entries = setting_value(namespace='omnilake::lookup_result_cache', setting_key='max_local_entries')
+
+        if max_result_entries is None:
+            max_result_entries = setting_value(namespace='omnilake::lookup_result_cache', setting_key='max_result_entries')
+
+        self.ttl_seconds = ttl_seconds or 0
+
+        self.max_local_entries = max_local_entries or 0
+
+        self.max_result_entries = max_result_entries or 0
+
+        self.cache_client = cache_client or LookupResultCacheClient()
+
+        self.versions_client = versions_client or ArchiveWriteVersionsClient()
+
+    @property
+    def enabled(self) -> bool:
+        '''
+        Whether lookup results are cached
+        '''
+        return self.ttl_seconds > 0
+
+    def cache_key(self, archive_ids: List[str], lookup_instruction: Dict) -> str:
+        '''
+        Return the cache key of a lookup. The key includes the current write versions of the archives, any write to
+        one of them results in a new key.
+
+        Keyword arguments:
+        archive_ids -- The archives the lookup is performed against
+        lookup_instruction -- The lookup instruction
+        '''
+        write_versions = self.versions_client.get_versions(archive_ids=sorted(set(archive_ids)))
+
+        keyed_lookup = json.dumps(
+            {
+                'lookup_instruction': normalize_lookup_instruction(lookup_instruction),
+                'write_versions': write_versions,
+            },
+            default=str,
+            sort_keys=True,
+        )
+
+        lookup_hash = hashlib.sha256(keyed_lookup.encode('utf-8')).hexdigest()
+
+        return f'{self.request_type}#{lookup_hash}'
+
+    def _set_local(self, cache_key: str, expires_on: datetime, entry_ids: List[str]):
+        '''
+        Add a result to the process local tier, evicting the least recently used results when full.
+
+        Keyword arguments:
+        cache_key -- The cache key
+        expires_on -- The time the result expires
+        entry_ids -- The entry IDs of the result
+        '''
+        _LOCAL_RESULTS[cache_key] = (expires_on, entry_ids)
+
+        _LOCAL_RESULTS.move_to_end(cache_key)
+
+        while len(_LOCAL_RESULTS) > self.max_local_entries:
+            _LOCAL_RESULTS.popitem(last=False)
+
+    def get(self, cache_key: str) -> Optional[List[str]]:
+        '''
+        Return the cached entry IDs of a lookup, None when the result is not cached or expired.
+
+        Keyword arguments:
+        cache_key -- The cache key
+        '''
+        now = datetime.now(tz=utc_tz)
+
+        local_result: Optional[Tuple[datetime, List[str]]] = _LOCAL_RESULTS.get(cache_key)
+
+        if local_result:
+            expires_on, entry_ids = local_result
+
+            if expires_on > now:
+                _LOCAL_RESULTS.move_to_end(cache_key)
+
+                return list(entry_ids)
+
+            del _LOCAL_RESULTS[cache_key]
+
+        cached = self.cache_client.get(cache_key=cache_key)
+
+        if not cached or not cached.time_to_live:
+            return None
+
+        expires_on = cached.time_to_live
+
+        if expires_on.tzinfo is None:
+            expires_on = expires_on.replace(tzinfo=utc_tz)
+
+        # DynamoDB removes expired items lazily, they may still be returned for some time after expiring
+        if expires_on <= now:
+            return None
+
+        entry_ids = cached.entry_ids or []
+
+        self._set_local(cache_key, expires_on, entry_ids)
+
+        return list(entry_ids)
+
+    def put(self, cache_key: str, archive_ids: List[str], entry_ids: List[str]):
+        '''
+        Cache the entry IDs returned by a lookup
+
+        Keyword arguments:
+        cache_key -- The cache key
+        archive_ids -- The archives the lookup was performed against
+        entry_ids -- The entry IDs returned by the lookup
+        '''
+        if len(entry_ids) > self.max_result_entries:
+            logging.debug(f'Lookup result of {len(entry_ids)} entries exceeds the cacheable size ... skipping cache')
+
+            return
+
+        expires_on = datetime.now(tz=utc_tz) + timedelta(seconds=self.ttl_seconds)
+
+        self._set_local(cache_key, expires_on, list(entry_ids))
+
+        self.cache_client.put(
+            CachedLookupResult(
+                cache_key=cache_key,
+                archive_ids=sorted(set(archive_ids)),
+                entry_ids=list(entry_ids),
+                request_type=self.request_type,
+                time_to_live=expires_on,
+            )
+        )
@@ -0,0 +1,83 @@
+'''
+Normalization and scoring of entry tags
+'''
+import re
+import unicodedata
+
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+
+# Runs of whitespace, hyphens and underscores separate the words of a tag
+_TAG_WORD_SEPARATORS = re.compile(r'[\s\-_]+')
+
+
+@lru_cache(maxsize=4096)
+def normalize_tag(tag: str) -> str:
+    '''
+    Return the normalized form of a tag, tags that only differ in case, spacing or word separators such as
+    "Machine-Learning" and "machine learning" share the same normalized form. Archives share a small vocabulary
+    of tags, so the normalized forms are cached.
+
+    Keyword arguments:
+    tag -- The tag to normalize
+    '''
+    folded_tag = unicodedata.normalize('NFKC', tag).casefold()
+
+    return _TAG_WORD_SEPARATORS.sub(' ', folded_tag).strip()
+
+
+def normalize_tags(tags: List[str]) -> List[str]:
+    '''
+    Return the normalized tags, in their original order with empty and duplicate tags removed
+
+    Keyword arguments:
+    tags -- The tags to normalize
+    '''
+    normalized_tags = (normalize_tag(tag) for tag in tags)
+
+    return list(dict.fromkeys(tag for tag in normalized_tags if tag))
+
+
+def tag_match_scores(candidate_tags: List[List[str]], target_tags: List[str]) -> np.ndarray:
+    '''
+    Return the percentage of the target tags each candidate is tagged with, the same score as
+    IndexedEntry.calculate_tag_match_percentage. Both the candidate and the target tags are normalized, so
+    candidates tagged before tags were normalized still match. The tags of all candidates are mapped to integer
+    IDs of a shared vocabulary, so the matches of all candidates are counted at once rather than with a set per
+    candidate.
+
+    Keyword arguments:
+    candidate_tags -- The tags of each candidate
+    target_tags -- The tags to score the candidates against
+    '''
+    target_tags = normalize_tags(target_tags)
+
+    # Normalizing also removes the duplicates of each candidate
+    candidate_tags = [normalize_tags(tags or []) for tags in candidate_tags]
+
+    scores = np.zeros(len(candidate_tags), dtype=np.float64)
+
+    tag_counts = np.fromiter((len(tags) for tags in candidate_tags), dtype=np.int64, count=len(candidate_tags))
+
+    if not target_tags or not tag_counts.sum():
+        return scores
+
+    flat_tags = np.array([tag for tags in candidate_tags for tag in tags] + target_tags, dtype=np.str_)
+
+    _, tag_ids = np.unique(flat_tags, return_inverse=True)
+
+    candidate_tag_ids = tag_ids[:-len(target_tags)]
+
+    candidate_rows = np.repeat(np.arange(len(candidate_tags)), tag_counts)
+
+    is_target = np.isin(candidate_tag_ids, tag_ids[-len(target_tags):])
+
+    # The tags of a candidate are unique once normalized, so each match is counted once
+    matches = np.bincount(candidate_rows[is_target], minlength=len(candidate_tags))
+
+    scores[:] = matches / len(target_tags) * 100
+
+    return scores
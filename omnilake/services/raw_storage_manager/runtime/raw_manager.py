@@ -64,6 +64,11 @@ class RawManager(SimpleRESTServiceBase):
                     method='POST',
                     path='/get_entry'
                 ),
+                Route(
+                    handler=self.get_entry_ranges,
+                    method='POST',
+                    path='/get_entry_ranges'
+                ),
                 Route(
                     handler=self.get_existing_source_entry,
                     method='POST',
@@ -208,7 +213,7 @@ class RawManager(SimpleRESTServiceBase):
         )
 
     def create_entry(self, content: str, sources: List[str], effective_on: str = None,
-                     original_of_source: str = None):
+                     original_of_source: str = None, entry_id: str = None):
         """
         Creates an entry
 
@@ -217,11 +222,13 @@ class RawManager(SimpleRESTServiceBase):
         sources -- The sources of the entry
         effective_on -- The effective date of the entry
         original_of_source -- The original source of the entry
+        entry_id -- Optional ID of the entry, generated when not provided
         """
         if effective_on:
             effective_on = datetime.fromisoformat(effective_on)
 
         entry = Entry(
+            entry_id=entry_id,
             char_count=len(content),
             content_hash=Entry.calculate_hash(content),
             effective_on=effective_on,
@@ -325,6 +332,49 @@ class RawManager(SimpleRESTServiceBase):
             status_code=200
         )
 
+    def get_entry_ranges(self, entry_id: str, ranges: List[List[int]]):
+        """
+        Gets byte ranges of an entry without downloading the whole entry
+
+        Keyword arguments:
+        entry_id -- The entry ID
+        ranges -- The [start, end) byte ranges to read, the ranges must fall on UTF-8 character boundaries
+        """
+        contents = []
+
+        for byte_range in ranges:
+            start, end = byte_range
+
+            if start < 0 or end <= start:
+                return self.respond(
+                    body={"message": f"Invalid byte range {byte_range}"},
+                    status_code=400
+                )
+
+            try:
+                # S3 byte ranges are inclusive of the end byte
+                response = self.s3.get_object(
+                    Bucket=self.raw_bucket,
+                    Key=entry_id,
+                    Range=f'bytes={start}-{end - 1}'
+                )
+
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                    return self.respond(
+                        body={"message": "Entry not found"},
+                        status_code=404
+                    )
+
+                raise
+
+            contents.append(response['Body'].read().decode())
+
+        return self.respond(
+            body={'contents': contents},
+            status_code=200
+        )
+
     def get_existing_source_entry(self, source_type: str, source_arguments: Dict[str, Any]):
         """
         Gets an existing source
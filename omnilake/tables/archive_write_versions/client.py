@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional, Union
+
+from da_vinci.core.orm import (
+    TableClient,
+    TableObject,
+    TableObjectAttribute,
+    TableObjectAttributeType,
+)
+
+
+class ArchiveWriteVersion(TableObject):
+    table_name = "archive_write_versions"
+
+    description = "Tracks a version of the content of each archive, bumped every time the archive is written to"
+
+    partition_key_attribute = TableObjectAttribute(
+        name="archive_id",
+        attribute_type=TableObjectAttributeType.STRING,
+        description="The ID of the archive",
+    )
+
+    attributes = [
+        TableObjectAttribute(
+            name="write_version",
+            attribute_type=TableObjectAttributeType.NUMBER,
+            description="The write version of the archive, incremented by every write",
+            default=0,
+        ),
+    ]
+
+    def __init__(self, archive_id: str, write_version: Optional[int] = 0):
+        """
+        Initialize an ArchiveWriteVersion TableObject
+
+        Keyword arguments:
+        archive_id -- The ID of the archive
+        write_version -- The write version of the archive
+        """
+        super().__init__(
+            archive_id=archive_id,
+            write_version=write_version,
+        )
+
+
+class ArchiveWriteVersionsClient(TableClient):
+    def __init__(self, app_name: Optional[str] = None, deployment_id: Optional[str] = None):
+        super().__init__(
+            app_name=app_name,
+            default_object_class=ArchiveWriteVersion,
+            deployment_id=deployment_id,
+        )
+
+    def bump(self, archive_id: str) -> int:
+        """
+        Atomically increment the write version of an archive, returns the new version. Only ever incremented, so
+        the versions of an archive are never re-used.
+
+        Keyword arguments:
+        archive_id -- The ID of the archive
+        """
+        response = self.client.update_item(
+            TableName=self.table_endpoint_name,
+            Key={
+                "ArchiveId": {"S": archive_id},
+            },
+            UpdateExpression="ADD WriteVersion :one",
+            ExpressionAttributeValues={
+                ":one": {"N": "1"},
+            },
+            ReturnValues="UPDATED_NEW",
+        )
+
+        return int(response["Attributes"]["WriteVersion"]["N"])
+
+    def get(self, archive_id: str) -> Union[ArchiveWriteVersion, None]:
+        """
+        Get the write version of an archive
+
+        Keyword arguments:
+        archive_id -- The ID of the archive
+        """
+        return self.get_object(partition_key_value=archive_id, consistent_read=True)
+
+    def get_versions(self, archive_ids: List[str]) -> Dict[str, int]:
+        """
+        Get the write versions of the given archives, archives that were never written to are at version 0
+
+        Keyword arguments:
+        archive_ids -- The IDs of the archives
+        """
+        versions = {}
+
+        for archive_id in archive_ids:
+            archive_version = self.get(archive_id=archive_id)
+
+            versions[archive_id] = int(archive_version.write_version) if archive_version else 0
+
+        return versions
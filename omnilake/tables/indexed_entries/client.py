@@ -1,5 +1,5 @@
 from datetime import datetime, UTC as utc_tz
-from typing import List, Optional
+from typing import Dict, Generator, List, Optional, Tuple
 
 from da_vinci.core.orm import (
     TableClient,
@@ -9,6 +9,8 @@ from da_vinci.core.orm import (
     TableScanDefinition,
 )
 
+from omnilake.internal_lib.tags import normalize_tags
+
 
 class IndexedEntry(TableObject):
     table_name = "indexed_entries"
@@ -46,6 +48,7 @@ class IndexedEntry(TableObject):
             name="original_of_source",
             attribute_type=TableObjectAttributeType.STRING,
             description="The source resource name if the entry is original content of a source",
+            optional=True,
         ),
 
         TableObjectAttribute(
@@ -82,13 +85,19 @@ class IndexedEntry(TableObject):
     @staticmethod
     def calculate_tag_match_percentage(object_tags: List[str], target_tags: List[str]) -> int:
         """
-        Calculate the match percentage between the object's tags and the target tags.
+        Calculate the match percentage between the object's tags and the target tags. Both are normalized, so
+        tags stored before tags were normalized still match.
 
         Keyword arguments:
         object_tags -- The list of tags to compare
         target_tags -- The list of tags to compare
         """
-        matching_tags = set(object_tags) & set(target_tags)
+        target_tags = normalize_tags(target_tags)
+
+        if not target_tags:
+            return 0
+
+        matching_tags = set(normalize_tags(object_tags or [])) & set(target_tags)
 
         # Calculate the match percentage
         return len(matching_tags) / len(target_tags) * 100
@@ -131,6 +140,90 @@ class IndexedEntriesClient(TableClient):
         """
         return self.delete_object(table_object=indexed_entry)
 
+    def get_by_archive(self, archive_id: str,
+                       attribute_names: Optional[List[str]] = None) -> Generator[List[IndexedEntry], None, None]:
+        """
+        Query the entries of an archive, yielding them page by page. Only the partition of the archive is read, so
+        the cost scales with the size of the archive rather than with the size of the table.
+
+        Keyword arguments:
+        archive_id -- The ID of the archive
+        attribute_names -- Optional names of the attributes loaded for each entry, all attributes are loaded when
+                           unset. The archive and entry IDs are always loaded.
+        """
+        params = {
+            "KeyConditionExpression": "ArchiveId = :archive_id",
+            "ExpressionAttributeValues": {":archive_id": {"S": archive_id}},
+        }
+
+        if attribute_names:
+            projected_names = list(dict.fromkeys(["archive_id", "entry_id", *attribute_names]))
+
+            # Attribute names are aliased as some, such as Tags, may be reserved words
+            params["ExpressionAttributeNames"] = {
+                f"#attr{idx}": "".join(part.capitalize() for part in attribute_name.split("_"))
+                for idx, attribute_name in enumerate(projected_names)
+            }
+
+            params["ProjectionExpression"] = ", ".join(params["ExpressionAttributeNames"].keys())
+
+        for page in self.paginated(call="query", parameters=params):
+            yield page
+
+    def get_page_by_archive(self, archive_id: str, exclusive_start_key: Optional[Dict] = None,
+                            limit: int = 100) -> Tuple[List[IndexedEntry], Optional[Dict]]:
+        """
+        Get a single page of the entries of an archive, ordered by entry ID. Returns the entries and the key to
+        resume from, None once the last page was returned. The key can be saved to resume reading the entries at a
+        later time.
+
+        Keyword arguments:
+        archive_id -- The ID of the archive
+        exclusive_start_key -- The key returned with the previous page, None to start from the first page
+        limit -- The maximum number of entries returned
+        """
+        params = {
+            "KeyConditionExpression": "ArchiveId = :archive_id",
+            "ExpressionAttributeValues": {":archive_id": {"S": archive_id}},
+            "Limit": limit,
+            "TableName": self.table_endpoint_name,
+        }
+
+        if exclusive_start_key:
+            params["ExclusiveStartKey"] = exclusive_start_key
+
+        response = self.client.query(**params)
+
+        entries = [self.default_object_class.from_dynamodb_item(item) for item in response.get("Items", [])]
+
+        return entries, response.get("LastEvaluatedKey")
+
+    def get_by_original_of_source(self, original_of_source: str, archive_id: Optional[str] = None) -> List[IndexedEntry]:
+        """
+        Get the entries that are the original content of a source, across all archives unless an archive is given.
+
+        Keyword arguments:
+        original_of_source -- The source resource name
+        archive_id -- Optional ID of the archive to limit the entries to
+        """
+        params = {
+            "KeyConditionExpression": "OriginalOfSource = :original_of_source",
+            "ExpressionAttributeValues": {":original_of_source": {"S": original_of_source}},
+            "IndexName": "original_of_source-index",
+        }
+
+        if archive_id:
+            params["KeyConditionExpression"] += " AND ArchiveId = :archive_id"
+
+            params["ExpressionAttributeValues"][":archive_id"] = {"S": archive_id}
+
+        entries = []
+
+        for page in self.paginated(call="query", parameters=params):
+            entries.extend(page)
+
+        return entries
+
     def get(self, archive_id: str, entry_id: str) -> Optional[IndexedEntry]:
         """
         Get an entry from the table.
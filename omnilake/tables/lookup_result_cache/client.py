@@ -0,0 +1,116 @@
+from datetime import datetime, UTC as utc_tz
+from typing import List, Optional, Union
+
+from da_vinci.core.orm import (
+    TableClient,
+    TableObject,
+    TableObjectAttribute,
+    TableObjectAttributeType,
+)
+
+
+class CachedLookupResult(TableObject):
+    table_name = "lookup_result_cache"
+
+    description = "Results of archive lookups keyed by the normalized lookup instruction and the write versions of the archives"
+
+    partition_key_attribute = TableObjectAttribute(
+        name="cache_key",
+        attribute_type=TableObjectAttributeType.STRING,
+        description="The cache key, formatted as <request_type>#<hash of the lookup instruction and archive write versions>",
+    )
+
+    ttl_attribute = TableObjectAttribute(
+        name="time_to_live",
+        attribute_type=TableObjectAttributeType.DATETIME,
+        description="The time-to-live for the cached result, used by DynamoDB TTL.",
+        optional=True,
+    )
+
+    attributes = [
+        TableObjectAttribute(
+            name="archive_ids",
+            attribute_type=TableObjectAttributeType.STRING_LIST,
+            description="The archives the lookup was performed against",
+        ),
+
+        TableObjectAttribute(
+            name="created_on",
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description="The date and time the result was cached",
+            default=lambda: datetime.now(utc_tz),
+        ),
+
+        TableObjectAttribute(
+            name="entry_ids",
+            attribute_type=TableObjectAttributeType.STRING_LIST,
+            description="The entry IDs returned by the lookup, in the order they were returned",
+            default=[],
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name="request_type",
+            attribute_type=TableObjectAttributeType.STRING,
+            description="The lookup request type",
+        ),
+    ]
+
+    def __init__(self, cache_key: str, archive_ids: List[str], request_type: str,
+                 created_on: Optional[datetime] = None, entry_ids: Optional[List[str]] = None,
+                 time_to_live: Optional[datetime] = None):
+        """
+        Initialize a cached lookup result
+
+        Keyword Arguments:
+        cache_key -- The cache key
+        archive_ids -- The archives the lookup was performed against
+        request_type -- The lookup request type
+        created_on -- The date and time the result was cached
+        entry_ids -- The entry IDs returned by the lookup
+        time_to_live -- The time-to-live for the cached result
+        """
+        super().__init__(
+            cache_key=cache_key,
+            archive_ids=archive_ids,
+            created_on=created_on,
+            entry_ids=entry_ids,
+            request_type=request_type,
+            time_to_live=time_to_live,
+        )
+
+
+class LookupResultCacheClient(TableClient):
+    def __init__(self, app_name: Optional[str] = None, deployment_id: Optional[str] = None):
+        super().__init__(
+            app_name=app_name,
+            default_object_class=CachedLookupResult,
+            deployment_id=deployment_id,
+        )
+
+    def delete(self, cached_result: CachedLookupResult) -> None:
+        """
+        Delete a cached lookup result
+
+        Keyword Arguments:
+        cached_result -- The cached lookup result to delete
+        """
+        self.delete_object(cached_result)
+
+    def get(self, cache_key: str) -> Union[CachedLookupResult, None]:
+        """
+        Get a cached lookup result
+
+        Keyword Arguments:
+        cache_key -- The cache key
+        """
+        return self.get_object(partition_key_value=cache_key)
+
+    def put(self, cached_result: CachedLookupResult) -> None:
+        """
+        Put a cached lookup result
+
+        Keyword Arguments:
+        cached_result -- The cached lookup result to put
+        """
+        self.put_object(cached_result)
@@ -0,0 +1,50 @@
+from constructs import Construct
+
+from da_vinci_cdk.constructs.dynamodb import DynamoDBTable
+from da_vinci_cdk.constructs.global_setting import GlobalSetting, GlobalSettingType
+from da_vinci_cdk.stack import Stack
+
+from omnilake.tables.lookup_result_cache.client import CachedLookupResult
+
+
+class LookupResultCacheTable(Stack):
+    def __init__(self, app_name: str, deployment_id: str,
+                 scope: Construct, stack_name: str):
+        super().__init__(
+            app_name=app_name,
+            deployment_id=deployment_id,
+            scope=scope,
+            stack_name=stack_name
+        )
+
+        self.table = DynamoDBTable.from_orm_table_object(
+            scope=self,
+            table_object=CachedLookupResult,
+        )
+
+        self.max_local_entries_setting = GlobalSetting(
+            description="The maximum number of lookup results held in the process local lookup result cache of a function.",
+            namespace='omnilake::lookup_result_cache',
+            setting_key='max_local_entries',
+            setting_value=256,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.max_result_entries_setting = GlobalSetting(
+            description="The maximum number of entry IDs in a cached lookup result, larger results are not cached.",
+            namespace='omnilake::lookup_result_cache',
+            setting_key='max_result_entries',
+            setting_value=1000,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
+
+        self.ttl_seconds_setting = GlobalSetting(
+            description="The number of seconds a lookup result is cached, 0 disables the lookup result cache. CHANGES WILL NOT AFFECT EXISTING ENTRIES!!",
+            namespace='omnilake::lookup_result_cache',
+            setting_key='ttl_seconds',
+            setting_value=300,
+            scope=self,
+            setting_type=GlobalSettingType.INTEGER
+        )
@@ -68,6 +68,13 @@ class Archive(TableObject):
             optional=True,
         ),
 
+        TableObjectAttribute(
+            name="tag_postings_backfilled_on",
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description="The time every entry of the archive was given its tag postings, unset while entries indexed before the tag postings were introduced may lack them",
+            optional=True,
+        ),
+
         TableObjectAttribute(
             name="updated_on",
             attribute_type=TableObjectAttributeType.DATETIME,
@@ -78,7 +85,8 @@ class Archive(TableObject):
 
     def __init__(self, archive_id: str, archive_type: str, configuration: dict, description: str,
                  created_on: Optional[datetime] = None, status: Optional[ArchiveStatus] = None,
-                 status_context_job_ids: Optional[list] = None, updated_on: Optional[datetime] = None):
+                 status_context_job_ids: Optional[list] = None, tag_postings_backfilled_on: Optional[datetime] = None,
+                 updated_on: Optional[datetime] = None):
         """
         Initialize an Archive TableObject
 
@@ -90,6 +98,7 @@ class Archive(TableObject):
         created_on -- The time the archive was created
         status -- The status of the archive
         status_context_job_ids -- The job IDs associated with the status of the archive
+        tag_postings_backfilled_on -- The time every entry of the archive was given its tag postings
         updated_on -- The time the archive was last updated
         """
         super().__init__(
@@ -100,6 +109,7 @@ class Archive(TableObject):
             created_on=created_on,
             status=status,
             status_context_job_ids=status_context_job_ids,
+            tag_postings_backfilled_on=tag_postings_backfilled_on,
             updated_on=updated_on,
         )
 
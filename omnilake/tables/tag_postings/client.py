@@ -0,0 +1,204 @@
+import time
+
+from datetime import datetime
+from typing import Generator, List, Optional
+
+from da_vinci.core.orm import (
+    TableClient,
+    TableObject,
+    TableObjectAttribute,
+    TableObjectAttributeType,
+)
+
+from omnilake.internal_lib.tags import normalize_tag, normalize_tags
+
+
+class TagPosting(TableObject):
+    table_name = "tag_postings"
+
+    description = "Inverted tag index of the indexed entries, one posting per tag of an entry in an archive"
+
+    partition_key_attribute = TableObjectAttribute(
+        name="archive_tag",
+        attribute_type=TableObjectAttributeType.STRING,
+        description="The archive and tag of the posting, formatted as <archive_id>#<tag>",
+    )
+
+    sort_key_attribute = TableObjectAttribute(
+        name="entry_id",
+        attribute_type=TableObjectAttributeType.STRING,
+        description="The ID of the entry tagged with the tag",
+    )
+
+    attributes = [
+        TableObjectAttribute(
+            name="archive_id",
+            attribute_type=TableObjectAttributeType.STRING,
+            description="The ID of the archive the entry belongs to",
+        ),
+
+        TableObjectAttribute(
+            name="effective_on",
+            attribute_type=TableObjectAttributeType.DATETIME,
+            description="The date and time the entry is effective on, used to rank entries without loading them. Unset when the entry has no effective date, which ranks it as the least recent entry.",
+            optional=True,
+        ),
+
+        TableObjectAttribute(
+            name="tag",
+            attribute_type=TableObjectAttributeType.STRING,
+            description="The normalized tag",
+        ),
+    ]
+
+    def __init__(self, archive_id: str, entry_id: str, tag: str, archive_tag: Optional[str] = None,
+                 effective_on: Optional[datetime] = None):
+        """
+        Initialize a tag posting, the tag is normalized so postings match the normalized tags of lookups
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive the entry belongs to
+        entry_id -- The ID of the entry tagged with the tag
+        tag -- The tag
+        archive_tag -- The archive and tag of the posting, calculated when not provided
+        effective_on -- The date and time the entry is effective on
+        """
+        tag = normalize_tag(tag)
+
+        super().__init__(
+            archive_id=archive_id,
+            archive_tag=archive_tag or self.calculate_archive_tag(archive_id=archive_id, tag=tag),
+            effective_on=effective_on,
+            entry_id=entry_id,
+            tag=tag,
+        )
+
+    @staticmethod
+    def calculate_archive_tag(archive_id: str, tag: str) -> str:
+        """
+        Generate the partition key of the postings of a tag in an archive
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive
+        tag -- The tag, normalized for the key
+        """
+        return f"{archive_id}#{normalize_tag(tag)}"
+
+
+class TagPostingsClient(TableClient):
+    # DynamoDB limit of a BatchWriteItem request
+    BATCH_WRITE_LIMIT = 25
+
+    # Unprocessed items are retried with exponential backoff, starting at the base delay
+    BATCH_WRITE_MAX_RETRIES = 8
+
+    BATCH_WRITE_RETRY_BASE_SECONDS = 0.05
+
+    def __init__(self, app_name: Optional[str] = None, deployment_id: Optional[str] = None):
+        super().__init__(
+            app_name=app_name,
+            default_object_class=TagPosting,
+            deployment_id=deployment_id,
+        )
+
+    def _batch_write(self, write_requests: List[dict]) -> None:
+        """
+        Submit write requests in batches, retrying unprocessed requests with exponential backoff
+
+        Keyword Arguments:
+        write_requests -- The write requests
+        """
+        for idx in range(0, len(write_requests), self.BATCH_WRITE_LIMIT):
+            request_items = {
+                self.table_endpoint_name: write_requests[idx:idx + self.BATCH_WRITE_LIMIT],
+            }
+
+            retries = 0
+
+            while request_items:
+                if retries > self.BATCH_WRITE_MAX_RETRIES:
+                    unprocessed = len(request_items[self.table_endpoint_name])
+
+                    raise Exception(f"Unable to write {unprocessed} tag postings after {self.BATCH_WRITE_MAX_RETRIES} retries")
+
+                if retries:
+                    time.sleep(self.BATCH_WRITE_RETRY_BASE_SECONDS * 2 ** (retries - 1))
+
+                response = self.client.batch_write_item(RequestItems=request_items)
+
+                request_items = response.get("UnprocessedItems")
+
+                retries += 1
+
+    def batch_delete(self, postings: List[TagPosting]) -> None:
+        """
+        Delete many tag postings
+
+        Keyword Arguments:
+        postings -- The postings to delete
+        """
+        self._batch_write([
+            {
+                "DeleteRequest": {
+                    "Key": {
+                        "ArchiveTag": {"S": posting.archive_tag},
+                        "EntryId": {"S": posting.entry_id},
+                    }
+                }
+            }
+            for posting in postings
+        ])
+
+    def batch_put(self, postings: List[TagPosting]) -> None:
+        """
+        Put many tag postings
+
+        Keyword Arguments:
+        postings -- The postings to put
+        """
+        self._batch_write([{"PutRequest": {"Item": posting.to_dynamodb_item()}} for posting in postings])
+
+    def get_by_tag(self, archive_id: str, tag: str) -> Generator[List[TagPosting], None, None]:
+        """
+        Query the postings of a tag in an archive, yielding them page by page
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive
+        tag -- The tag
+        """
+        params = {
+            "KeyConditionExpression": "ArchiveTag = :archive_tag",
+            "ExpressionAttributeValues": {
+                ":archive_tag": {"S": TagPosting.calculate_archive_tag(archive_id=archive_id, tag=tag)},
+            },
+        }
+
+        for page in self.paginated(call="query", parameters=params):
+            yield page
+
+    def replace_entry_tags(self, archive_id: str, entry_id: str, tags: List[str],
+                           previous_tags: Optional[List[str]] = None, effective_on: Optional[datetime] = None) -> None:
+        """
+        Update the postings of an entry after its tags changed. Postings of tags the entry no longer has are
+        removed and postings of its current tags are written.
+
+        Keyword Arguments:
+        archive_id -- The ID of the archive the entry belongs to
+        entry_id -- The ID of the entry
+        tags -- The current tags of the entry
+        previous_tags -- The tags the entry had before, if any
+        effective_on -- The date and time the entry is effective on
+        """
+        tags = normalize_tags(tags)
+
+        removed_tags = set(normalize_tags(previous_tags or [])) - set(tags)
+
+        if removed_tags:
+            self.batch_delete([
+                TagPosting(archive_id=archive_id, entry_id=entry_id, tag=tag) for tag in removed_tags
+            ])
+
+        self.batch_put([
+            TagPosting(archive_id=archive_id, entry_id=entry_id, effective_on=effective_on, tag=tag)
+            for tag in tags
+        ])
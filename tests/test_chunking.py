@@ -0,0 +1,102 @@
+import pytest
+
+from omnilake.constructs.archives.vector.runtime.chunking import (
+    count_tokens,
+    sentence_chunk_spans,
+    text_segments,
+)
+
+
+def _segments(text):
+    return [(text[start:end], ends_paragraph) for start, end, ends_paragraph in text_segments(text)]
+
+
+def test_text_segments_splits_sentences_and_paragraphs():
+    text = 'First sentence. Second one!\n\nNew paragraph? Last.'
+
+    assert _segments(text) == [
+        ('First sentence.', False),
+        ('Second one!', True),
+        ('New paragraph?', False),
+        ('Last.', True),
+    ]
+
+
+def test_text_segments_excludes_surrounding_whitespace():
+    text = '  \n Leading space.   Trailing space.  \n\n  '
+
+    assert _segments(text) == [
+        ('Leading space.', False),
+        ('Trailing space.', True),
+    ]
+
+
+def test_text_segments_of_whitespace_only_text():
+    assert _segments('') == []
+
+    assert _segments(' \n\n \t ') == []
+
+
+def test_text_segments_single_newline_does_not_end_paragraph():
+    text = 'One line.\nNext line.'
+
+    assert _segments(text) == [
+        ('One line.', False),
+        ('Next line.', True),
+    ]
+
+
+def test_count_tokens_counts_words_and_punctuation():
+    assert count_tokens('Hello, world!') == 4
+
+    assert count_tokens('Hello, world!', start=7) == 2
+
+
+def test_sentence_chunk_spans_packs_whole_sentences():
+    text = 'One two three. Four five six. Seven eight nine.'
+
+    chunks = [text[start:end] for start, end in sentence_chunk_spans(text, max_tokens=8, overlap_tokens=0)]
+
+    assert chunks == ['One two three. Four five six.', 'Seven eight nine.']
+
+
+def test_sentence_chunk_spans_overlaps_trailing_sentences():
+    text = 'One two three. Four five six. Seven eight nine.'
+
+    chunks = [text[start:end] for start, end in sentence_chunk_spans(text, max_tokens=8, overlap_tokens=4)]
+
+    assert chunks == ['One two three. Four five six.', 'Four five six. Seven eight nine.']
+
+
+def test_sentence_chunk_spans_splits_long_sentences_within_budget():
+    text = ' '.join(f'word{idx}' for idx in range(25)) + '.'
+
+    spans = list(sentence_chunk_spans(text, max_tokens=10, overlap_tokens=0))
+
+    assert len(spans) == 3
+
+    assert all(count_tokens(text, start, end) <= 10 for start, end in spans)
+
+    # The pieces cover the sentence without gaps
+    assert ' '.join(text[start:end] for start, end in spans) == text
+
+
+def test_sentence_chunk_spans_closes_chunks_at_paragraphs():
+    text = 'Alpha beta gamma delta. Epsilon zeta eta theta.\n\nIota kappa.'
+
+    chunks = [text[start:end] for start, end in sentence_chunk_spans(text, max_tokens=20, overlap_tokens=0)]
+
+    assert chunks == ['Alpha beta gamma delta. Epsilon zeta eta theta.', 'Iota kappa.']
+
+
+def test_sentence_chunk_spans_respects_budget():
+    text = ' '.join(f'Sentence number {idx} has a few words.' for idx in range(200))
+
+    for start, end in sentence_chunk_spans(text, max_tokens=32, overlap_tokens=8):
+        assert count_tokens(text, start, end) <= 32
+
+
+@pytest.mark.parametrize('max_tokens, overlap_tokens', [(0, 0), (8, -1), (8, 8)])
+def test_sentence_chunk_spans_rejects_invalid_budgets(max_tokens, overlap_tokens):
+    with pytest.raises(ValueError):
+        list(sentence_chunk_spans('Some text.', max_tokens=max_tokens, overlap_tokens=overlap_tokens))
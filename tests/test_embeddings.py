@@ -0,0 +1,195 @@
+import io
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('da_vinci')
+
+from omnilake.constructs.archives.vector.runtime import embeddings
+from omnilake.constructs.archives.vector.runtime.embeddings import (
+    INT8_EMBEDDING_TYPE,
+    MAX_EMBEDDING_BATCH_SIZE,
+    EmbeddingCache,
+    EmbeddingGenerator,
+)
+from omnilake.constructs.archives.vector.tables.embedding_cache.client import CachedEmbedding
+
+
+class StubBedrockClient:
+    """
+    Bedrock runtime client embedding every text as its length followed by zeros
+    """
+    def __init__(self, dimensions=2):
+        self.dimensions = dimensions
+
+        self.requests = []
+
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId, contentType, accept, body):
+        request = json.loads(body)
+
+        with self._lock:
+            self.requests.append(request)
+
+        vectors = [[float(len(text))] + [0.0] * (self.dimensions - 1) for text in request['texts']]
+
+        return {'body': io.BytesIO(json.dumps({'embeddings': vectors}).encode('utf-8'))}
+
+
+class StubEmbeddingCacheClient:
+    """
+    Embedding cache table client holding the cached embeddings in memory
+    """
+    def __init__(self):
+        self.cached = {}
+
+        self.batch_gets = 0
+
+    def batch_get(self, cache_keys):
+        self.batch_gets += 1
+
+        return {cache_key: self.cached[cache_key] for cache_key in cache_keys if cache_key in self.cached}
+
+    def batch_put(self, cached_embeddings):
+        for cached_embedding in cached_embeddings:
+            self.cached[cached_embedding.cache_key] = cached_embedding
+
+
+@pytest.fixture(autouse=True)
+def _empty_local_embeddings():
+    embeddings._LOCAL_EMBEDDINGS.clear()
+
+    yield
+
+    embeddings._LOCAL_EMBEDDINGS.clear()
+
+
+def _generator(client, **kwargs):
+    return EmbeddingGenerator(bedrock_client=client, dimensions=client.dimensions, model_id='stub-model', **kwargs)
+
+
+def test_batches_pack_texts_in_order():
+    generator = _generator(StubBedrockClient(), max_batch_size=2)
+
+    assert generator.batches(['a', 'b', 'c', 'd', 'e']) == [['a', 'b'], ['c', 'd'], ['e']]
+
+
+def test_embed_batches_texts_and_preserves_order():
+    client = StubBedrockClient()
+
+    generator = _generator(client, max_batch_size=3, max_concurrency=4)
+
+    texts = ['x' * length for length in range(1, 11)]
+
+    embeddings = generator.embed(texts)
+
+    assert [embedding[0] for embedding in embeddings] == [float(length) for length in range(1, 11)]
+
+    assert sorted(len(request['texts']) for request in client.requests) == [1, 3, 3, 3]
+
+
+def test_embed_single_batch_makes_one_request():
+    client = StubBedrockClient()
+
+    _generator(client).embed(['text'] * MAX_EMBEDDING_BATCH_SIZE)
+
+    assert len(client.requests) == 1
+
+
+def test_embed_nothing_makes_no_request():
+    client = StubBedrockClient()
+
+    assert _generator(client).embed([]) == []
+
+    assert client.requests == []
+
+
+def test_embed_rejects_embeddings_of_other_dimensions():
+    client = StubBedrockClient(dimensions=3)
+
+    generator = EmbeddingGenerator(bedrock_client=client, dimensions=2, model_id='stub-model')
+
+    with pytest.raises(ValueError):
+        generator.embed(['text'])
+
+
+@pytest.mark.parametrize('max_batch_size, max_concurrency', [(0, 1), (MAX_EMBEDDING_BATCH_SIZE + 1, 1), (1, 0)])
+def test_generator_rejects_invalid_limits(max_batch_size, max_concurrency):
+    with pytest.raises(ValueError):
+        _generator(StubBedrockClient(), max_batch_size=max_batch_size, max_concurrency=max_concurrency)
+
+
+def test_cached_embedding_round_trips_as_float32():
+    encoded = CachedEmbedding.encode_embedding([0.5, -1.25, 3.0])
+
+    assert CachedEmbedding.decode_embedding(encoded) == [0.5, -1.25, 3.0]
+
+
+def test_cache_key_depends_on_model_input_type_and_text():
+    cache_key = CachedEmbedding.calculate_cache_key('model', 'search_document', 'text')
+
+    assert cache_key == CachedEmbedding.calculate_cache_key('model', 'search_document', 'text')
+
+    assert cache_key != CachedEmbedding.calculate_cache_key('other-model', 'search_document', 'text')
+
+    assert cache_key != CachedEmbedding.calculate_cache_key('model', 'search_query', 'text')
+
+    assert cache_key != CachedEmbedding.calculate_cache_key('model', 'search_document', 'other text')
+
+
+def test_embed_only_requests_distinct_uncached_texts():
+    client = StubBedrockClient()
+
+    cache = EmbeddingCache(cache_client=StubEmbeddingCacheClient())
+
+    generator = _generator(client, cache=cache)
+
+    first = generator.embed(['a', 'bb', 'a'])
+
+    assert client.requests[0]['texts'] == ['a', 'bb']
+
+    second = generator.embed(['bb', 'ccc'])
+
+    assert client.requests[1]['texts'] == ['ccc']
+
+    assert [embedding[0] for embedding in first + second] == [1.0, 2.0, 1.0, 2.0, 3.0]
+
+
+def test_embed_returns_the_same_values_cached_or_generated():
+    client = StubBedrockClient()
+
+    generated = _generator(client, cache=EmbeddingCache(cache_client=StubEmbeddingCacheClient())).embed(['text'])
+
+    cached = _generator(client, cache=EmbeddingCache(cache_client=StubEmbeddingCacheClient())).embed(['text'])
+
+    assert len(client.requests) == 1
+
+    assert generated == cached
+
+
+def test_cache_reads_the_table_for_keys_evicted_from_the_process():
+    cache_client = StubEmbeddingCacheClient()
+
+    cache = EmbeddingCache(max_local_entries=1, cache_client=cache_client)
+
+    cache.put_many({'first': [1.0], 'second': [2.0]}, input_type='search_document', model_id='model')
+
+    assert list(embeddings._LOCAL_EMBEDDINGS) == ['second']
+
+    assert cache.get_many(['first', 'second', 'missing']) == {'first': [1.0], 'second': [2.0]}
+
+    assert cache_client.batch_gets == 1
+
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_quantized_and_float_embeddings_are_cached_apart():
+    client = StubBedrockClient()
+
+    float_generator = _generator(client)
+
+    int8_generator = _generator(client, embedding_type=INT8_EMBEDDING_TYPE)
+
+    assert float_generator.cache_model_id != int8_generator.cache_model_id
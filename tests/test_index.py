@@ -0,0 +1,131 @@
+from datetime import datetime, UTC as utc_tz
+
+import pytest
+
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+import lancedb
+
+from omnilake.constructs.archives.vector.runtime import index
+from omnilake.constructs.archives.vector.runtime.index import (
+    CHUNK_HASH_COLUMN,
+    find_previous_entry_id,
+    generate_vector_data,
+    load_previous_chunks,
+)
+from omnilake.tables.entries.client import Entry
+
+
+class StubEmbeddingGenerator:
+    """
+    Embedding generator embedding every text as its length, recording the texts it embedded
+    """
+    embedding_type = 'float'
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def _previous_chunk(chunk_id, text):
+    return {'chunk_id': chunk_id, CHUNK_HASH_COLUMN: Entry.calculate_hash(text), 'vector': [0.0, 0.0]}
+
+
+def test_generate_vector_data_reuses_unchanged_chunks():
+    generator = StubEmbeddingGenerator()
+
+    data = generate_vector_data(
+        entry_id='entry-2',
+        text_chunks=['kept', 'changed'],
+        embedding_generator=generator,
+        include_chunk_hash=True,
+        previous_chunks=[_previous_chunk('chunk-1', 'kept'), _previous_chunk('chunk-2', 'removed')],
+    )
+
+    assert generator.embedded == ['changed']
+
+    assert data[0]['chunk_id'] == 'chunk-1'
+
+    assert data[0]['vector'] == [0.0, 0.0]
+
+    assert data[1]['chunk_id'] not in ('chunk-1', 'chunk-2')
+
+    assert data[1]['vector'] == [7.0, 1.0]
+
+    assert [chunk['entry_id'] for chunk in data] == ['entry-2', 'entry-2']
+
+    assert data[1][CHUNK_HASH_COLUMN] == Entry.calculate_hash('changed')
+
+
+def test_generate_vector_data_reuses_every_previous_chunk_once():
+    generator = StubEmbeddingGenerator()
+
+    data = generate_vector_data(
+        entry_id='entry-2',
+        text_chunks=['repeated', 'repeated'],
+        embedding_generator=generator,
+        previous_chunks=[_previous_chunk('chunk-1', 'repeated')],
+    )
+
+    assert generator.embedded == ['repeated']
+
+    assert len({chunk['chunk_id'] for chunk in data}) == 2
+
+    assert CHUNK_HASH_COLUMN not in data[0]
+
+
+def test_generate_vector_data_without_previous_chunks_embeds_everything():
+    generator = StubEmbeddingGenerator()
+
+    data = generate_vector_data(entry_id='entry-1', text_chunks=['a', 'bb'], embedding_generator=generator,
+                                include_text=True)
+
+    assert generator.embedded == ['a', 'bb']
+
+    assert [chunk['text'] for chunk in data] == ['a', 'bb']
+
+
+def test_load_previous_chunks_of_an_entry(tmp_path):
+    table = lancedb.connect(str(tmp_path)).create_table('chunks', data=[
+        {'entry_id': 'entry-1', 'chunk_id': 'chunk-1', CHUNK_HASH_COLUMN: 'hash-1', 'vector': [1.0, 0.0]},
+        {'entry_id': 'entry-1', 'chunk_id': 'chunk-2', CHUNK_HASH_COLUMN: 'hash-2', 'vector': [0.0, 1.0]},
+        {'entry_id': 'entry-2', 'chunk_id': 'chunk-3', CHUNK_HASH_COLUMN: 'hash-3', 'vector': [1.0, 1.0]},
+    ])
+
+    previous_chunks = load_previous_chunks(table, entry_id='entry-1', total_chunks=2)
+
+    assert sorted(chunk['chunk_id'] for chunk in previous_chunks) == ['chunk-1', 'chunk-2']
+
+    assert load_previous_chunks(table, entry_id='entry-1', total_chunks=0) == []
+
+
+class _IndexedEntry:
+    def __init__(self, entry_id, effective_on):
+        self.entry_id = entry_id
+
+        self.effective_on = effective_on
+
+
+def test_find_previous_entry_id_returns_the_latest_other_entry(monkeypatch):
+    indexed_entries = [
+        _IndexedEntry('entry-1', datetime(2024, 1, 1, tzinfo=utc_tz)),
+        _IndexedEntry('entry-2', datetime(2024, 6, 1, tzinfo=utc_tz)),
+        _IndexedEntry('entry-3', datetime(2024, 9, 1, tzinfo=utc_tz)),
+    ]
+
+    class StubIndexedEntriesClient:
+        def get_by_original_of_source(self, original_of_source, archive_id):
+            return indexed_entries
+
+    monkeypatch.setattr(index, 'IndexedEntriesClient', StubIndexedEntriesClient)
+
+    assert find_previous_entry_id(archive_id='archive', entry_id='entry-3', original_of_source='source') == 'entry-2'
+
+    indexed_entries[:] = indexed_entries[2:]
+
+    assert find_previous_entry_id(archive_id='archive', entry_id='entry-3', original_of_source='source') is None
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, UTC as utc_tz
+
+import pytest
+
+pytest.importorskip('da_vinci')
+
+from omnilake.internal_lib import lookup_cache
+from omnilake.internal_lib.lookup_cache import LookupResultCache, normalize_lookup_instruction
+
+
+class StubVersionsClient:
+    """
+    Archive write versions table client holding the versions in memory
+    """
+    def __init__(self):
+        self.versions = {}
+
+    def bump(self, archive_id):
+        self.versions[archive_id] = self.versions.get(archive_id, 0) + 1
+
+        return self.versions[archive_id]
+
+    def get_versions(self, archive_ids):
+        return {archive_id: self.versions.get(archive_id, 0) for archive_id in archive_ids}
+
+
+class StubResultCacheClient:
+    """
+    Lookup result cache table client holding the cached results in memory
+    """
+    def __init__(self):
+        self.cached = {}
+
+    def get(self, cache_key):
+        return self.cached.get(cache_key)
+
+    def put(self, cached_result):
+        self.cached[cached_result.cache_key] = cached_result
+
+
+@pytest.fixture(autouse=True)
+def _empty_local_results():
+    lookup_cache._LOCAL_RESULTS.clear()
+
+    yield
+
+    lookup_cache._LOCAL_RESULTS.clear()
+
+
+def _cache(versions_client=None, cache_client=None, **kwargs):
+    settings = {'ttl_seconds': 300, 'max_local_entries': 16, 'max_result_entries': 100}
+
+    settings.update(kwargs)
+
+    return LookupResultCache(
+        request_type='VECTOR',
+        cache_client=cache_client or StubResultCacheClient(),
+        versions_client=versions_client or StubVersionsClient(),
+        **settings,
+    )
+
+
+def test_normalize_lookup_instruction_drops_unset_and_orders_unordered_lists():
+    normalized = normalize_lookup_instruction({
+        'archive_ids': ['b', 'a', 'b'],
+        'prioritize_tags': ['Machine-Learning', 'AI'],
+        'query_string': '  what changed?  ',
+        'max_entries': 5,
+        'nprobes': None,
+        'required_tags': [],
+    })
+
+    assert normalized == {
+        'archive_ids': ['a', 'b'],
+        'prioritize_tags': ['ai', 'machine learning'],
+        'query_string': 'what changed?',
+        'max_entries': 5,
+    }
+
+
+def test_cache_key_is_the_same_for_equivalent_lookups():
+    cache = _cache()
+
+    first = cache.cache_key(archive_ids=['a', 'b'], lookup_instruction={'prioritize_tags': ['AI', 'Data']})
+
+    second = cache.cache_key(archive_ids=['b', 'a'], lookup_instruction={'prioritize_tags': ['data', 'ai']})
+
+    assert first == second
+
+    assert first.startswith('VECTOR#')
+
+
+def test_cache_key_changes_with_any_archive_write():
+    versions_client = StubVersionsClient()
+
+    cache = _cache(versions_client=versions_client)
+
+    before = cache.cache_key(archive_ids=['a', 'b'], lookup_instruction={'query_string': 'q'})
+
+    versions_client.bump('b')
+
+    assert cache.cache_key(archive_ids=['a', 'b'], lookup_instruction={'query_string': 'q'}) != before
+
+
+def test_get_returns_put_results_from_both_tiers():
+    cache_client = StubResultCacheClient()
+
+    cache = _cache(cache_client=cache_client)
+
+    cache.put(cache_key='key', archive_ids=['a'], entry_ids=['entry-1', 'entry-2'])
+
+    assert cache.get('key') == ['entry-1', 'entry-2']
+
+    lookup_cache._LOCAL_RESULTS.clear()
+
+    assert cache.get('key') == ['entry-1', 'entry-2']
+
+    assert 'key' in lookup_cache._LOCAL_RESULTS
+
+
+def test_get_ignores_expired_results():
+    cache_client = StubResultCacheClient()
+
+    cache = _cache(cache_client=cache_client)
+
+    cache.put(cache_key='key', archive_ids=['a'], entry_ids=['entry-1'])
+
+    lookup_cache._LOCAL_RESULTS.clear()
+
+    cache_client.cached['key'].time_to_live = datetime.now(tz=utc_tz) - timedelta(seconds=1)
+
+    assert cache.get('key') is None
+
+
+def test_put_skips_results_larger_than_the_cacheable_size():
+    cache = _cache(max_result_entries=2)
+
+    cache.put(cache_key='key', archive_ids=['a'], entry_ids=['entry-1', 'entry-2', 'entry-3'])
+
+    assert cache.get('key') is None
+
+
+def test_local_tier_evicts_the_least_recently_used_result():
+    cache = _cache(max_local_entries=2)
+
+    for cache_key in ('first', 'second', 'third'):
+        cache.put(cache_key=cache_key, archive_ids=['a'], entry_ids=[cache_key])
+
+    assert list(lookup_cache._LOCAL_RESULTS) == ['second', 'third']
+
+
+def test_cache_is_disabled_without_ttl():
+    assert not _cache(ttl_seconds=0).enabled
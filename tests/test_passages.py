@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+from omnilake.constructs.archives.vector.runtime.passages import merge_byte_spans, passage_entry_id
+
+
+@pytest.mark.parametrize('spans, expected', [
+    ([], []),
+    ([(10, 20)], [(10, 20)]),
+    ([(30, 40), (0, 10)], [(0, 10), (30, 40)]),
+    ([(0, 10), (5, 15)], [(0, 15)]),
+    ([(0, 10), (10, 20)], [(0, 20)]),
+    ([(0, 50), (10, 20)], [(0, 50)]),
+])
+def test_merge_byte_spans(spans, expected):
+    assert merge_byte_spans(spans) == expected
+
+
+def test_passage_entry_id_is_stable_per_entry_and_spans():
+    entry_id = passage_entry_id('entry', [(0, 10), (20, 30)])
+
+    assert entry_id == passage_entry_id('entry', [(0, 10), (20, 30)])
+
+    assert entry_id != passage_entry_id('entry', [(0, 10)])
+
+    assert entry_id != passage_entry_id('other-entry', [(0, 10), (20, 30)])
@@ -0,0 +1,195 @@
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+from omnilake.constructs.archives.vector.runtime import query
+from omnilake.constructs.archives.vector.runtime.query import (
+    VectorStorageSearch,
+    maximal_marginal_relevance,
+    merge_shard_hits,
+    merge_vector_hits,
+    reciprocal_rank_fusion,
+    rescore_hits,
+)
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStore
+
+
+def _hit(chunk_id, distance=None, vector=None):
+    return {'chunk_id': chunk_id, '_distance': distance, 'vector': vector}
+
+
+def _ids(hits):
+    return [hit['chunk_id'] for hit in hits]
+
+
+def test_reciprocal_rank_fusion_favors_hits_of_both_rankings():
+    keyword = [_hit('a'), _hit('b'), _hit('c')]
+
+    vector = [_hit('c'), _hit('b'), _hit('d')]
+
+    assert _ids(reciprocal_rank_fusion(rankings=[keyword, vector], weights=[1.0, 1.0])) == ['c', 'b', 'a', 'd']
+
+
+def test_reciprocal_rank_fusion_applies_weights():
+    keyword = [_hit('a'), _hit('b')]
+
+    vector = [_hit('b'), _hit('a')]
+
+    assert _ids(reciprocal_rank_fusion(rankings=[keyword, vector], weights=[2.0, 1.0])) == ['a', 'b']
+
+    assert _ids(reciprocal_rank_fusion(rankings=[keyword, vector], weights=[1.0, 2.0])) == ['b', 'a']
+
+
+def test_reciprocal_rank_fusion_keeps_the_first_ranking_hit():
+    keyword_hit = _hit('a', distance=None)
+
+    vector_hit = _hit('a', distance=0.1)
+
+    fused = reciprocal_rank_fusion(rankings=[[keyword_hit], [vector_hit]], weights=[1.0, 1.0])
+
+    assert fused == [keyword_hit]
+
+
+def test_merge_shard_hits_merges_by_key_up_to_limit():
+    shard_hits = [
+        [_hit('a', 0.1), _hit('c', 0.3), _hit('e', 0.5)],
+        [_hit('b', 0.2), _hit('d', 0.4)],
+    ]
+
+    merged = merge_shard_hits(shard_hits, result_limits=4, key=lambda hit: hit['_distance'])
+
+    assert _ids(merged) == ['a', 'b', 'c', 'd']
+
+
+def test_merge_shard_hits_of_a_single_shard():
+    shard_hits = [[_hit('a', 0.1), _hit('b', 0.2), _hit('c', 0.3)]]
+
+    assert _ids(merge_shard_hits(shard_hits, result_limits=2, key=lambda hit: hit['_distance'])) == ['a', 'b']
+
+
+def test_merge_vector_hits_compares_distances_of_the_same_model():
+    shard_hits = [
+        [_hit('a', 0.1), _hit('c', 0.3)],
+        [_hit('b', 0.2), _hit('d', 0.4)],
+    ]
+
+    merged = merge_vector_hits(shard_hits, shard_models=['model-a', 'model-a'], result_limits=3)
+
+    assert _ids(merged) == ['a', 'b', 'c']
+
+
+def test_merge_vector_hits_fuses_models_by_rank():
+    # Distances of different models are not comparable, the second model's hits rank by position alone
+    shard_hits = [
+        [_hit('a', 0.5), _hit('c', 0.6)],
+        [_hit('b', 0.01), _hit('d', 0.02)],
+    ]
+
+    merged = merge_vector_hits(shard_hits, shard_models=['model-a', 'model-b'], result_limits=4)
+
+    assert set(_ids(merged[:2])) == {'a', 'b'}
+
+    assert set(_ids(merged[2:])) == {'c', 'd'}
+
+
+def test_maximal_marginal_relevance_demotes_near_duplicates():
+    hits = [
+        _hit('a', vector=[0.8, 0.6]),
+        _hit('duplicate', vector=[0.8, 0.6]),
+        _hit('distinct', vector=[0.8, -0.6]),
+    ]
+
+    reranked = maximal_marginal_relevance(query_vector=[1.0, 0.0], hits=hits, mmr_lambda=0.5, limit=2)
+
+    assert _ids(reranked) == ['a', 'distinct', 'duplicate']
+
+
+def test_maximal_marginal_relevance_by_relevance_only():
+    hits = [
+        _hit('a', vector=[0.8, 0.6]),
+        _hit('duplicate', vector=[0.8, 0.6]),
+        _hit('distinct', vector=[0.8, -0.6]),
+    ]
+
+    reranked = maximal_marginal_relevance(query_vector=[1.0, 0.0], hits=hits, mmr_lambda=1.0, limit=3)
+
+    assert _ids(reranked) == ['a', 'duplicate', 'distinct']
+
+
+def test_maximal_marginal_relevance_ranks_hits_without_vectors_last():
+    hits = [
+        _hit('keyword only'),
+        _hit('relevant', vector=[1.0, 0.0]),
+    ]
+
+    reranked = maximal_marginal_relevance(query_vector=[1.0, 0.0], hits=hits, mmr_lambda=0.5, limit=2)
+
+    assert _ids(reranked) == ['relevant', 'keyword only']
+
+
+def test_search_shard_pages_searches_only_the_rows_past_earlier_rounds(monkeypatch):
+    monkeypatch.setattr(query, 'setting_value', lambda namespace, setting_key: 'bucket')
+
+    shard_rows = {
+        'store-0': [_hit(f'a{idx}', idx / 10) for idx in range(3)],
+        'store-1': [_hit(f'b{idx}', idx / 10) for idx in range(10)],
+    }
+
+    searches = []
+
+    def _search(shard, offset, limit):
+        searches.append((shard.vector_store_id, offset, limit))
+
+        return [dict(hit) for hit in shard_rows[shard.vector_store_id][offset:offset + limit]]
+
+    shards = [VectorStore(archive_id='archive', bucket_name='bucket', vector_store_id=vector_store_id)
+              for vector_store_id in shard_rows]
+
+    shard_hits = [[], []]
+
+    exhausted = set()
+
+    search_args = {
+        'shards': shards,
+        'shard_hits': shard_hits,
+        'exhausted': exhausted,
+        'search': _search,
+        'shard_archives': {'store-0': 'archive', 'store-1': 'archive'},
+    }
+
+    storage_search = VectorStorageSearch()
+
+    assert storage_search._search_shard_pages(result_limits=4, **search_args) == 7
+
+    assert exhausted == {0}
+
+    # The second round only searches the shard with rows left, for the rows it did not return yet
+    assert storage_search._search_shard_pages(result_limits=8, **search_args) == 4
+
+    assert searches == [('store-0', 0, 4), ('store-1', 0, 4), ('store-1', 4, 4)]
+
+    assert _ids(shard_hits[1]) == [f'b{idx}' for idx in range(8)]
+
+    assert shard_hits[1][0]['vector_store_id'] == 'store-1'
+
+    storage_search._search_shard_pages(result_limits=16, **search_args)
+
+    assert exhausted == {0, 1}
+
+    assert storage_search._search_shard_pages(result_limits=32, **search_args) == 0
+
+
+def test_rescore_hits_reranks_by_full_precision_vectors():
+    hits = [_hit('a', 0.01), _hit('b', 0.02), _hit('c', 0.03)]
+
+    rescored = rescore_hits(query_vector=[1.0, 0.0], hits=hits, vectors=[[0.0, 1.0], [1.0, 0.0], [0.0, 0.0]])
+
+    assert _ids(rescored) == ['b', 'a', 'c']
+
+    assert [hit['_distance'] for hit in rescored] == pytest.approx([0.0, 1.0, 1.0])
+
+
+def test_rescore_hits_of_no_hits():
+    assert rescore_hits(query_vector=[1.0, 0.0], hits=[], vectors=[]) == []
@@ -0,0 +1,145 @@
+import pytest
+
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+import lancedb
+import pyarrow as pa
+
+from omnilake.constructs.archives.vector.runtime import reembed
+from omnilake.constructs.archives.vector.runtime.reembed import (
+    ChunkReembedder,
+    chunk_id_predicate,
+    reembedded_schema,
+)
+
+
+class StubEmbeddingGenerator:
+    """
+    Embedding generator embedding every text as its length followed by ones
+    """
+    def __init__(self, embedding_type, dimensions):
+        self.embedding_type = embedding_type
+
+        self.dimensions = dimensions
+
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+
+        return [[float(len(text))] + [1.0] * (self.dimensions - 1) for text in texts]
+
+
+class _EntryContent:
+    def __init__(self, response_body):
+        self.response_body = response_body
+
+
+class StubRawStorage:
+    """
+    Raw storage manager client holding the content of the entries in memory
+    """
+    def __init__(self, contents):
+        self.contents = contents
+
+        self.requested = []
+
+    def get_entry(self, entry_id):
+        self.requested.append(entry_id)
+
+        if entry_id not in self.contents:
+            return _EntryContent({'message': 'not found'})
+
+        return _EntryContent({'content': self.contents[entry_id]})
+
+
+@pytest.fixture
+def generators(monkeypatch):
+    created = {}
+
+    def _get_embedding_generator(input_type, model_id, embedding_type, dimensions):
+        created[embedding_type] = StubEmbeddingGenerator(embedding_type=embedding_type, dimensions=dimensions)
+
+        return created[embedding_type]
+
+    monkeypatch.setattr(reembed, 'get_embedding_generator', _get_embedding_generator)
+
+    return created
+
+
+def _source_table(db, value_type=pa.float32()):
+    return db.create_table('source', data=pa.table({
+        'entry_id': ['entry-1', 'entry-1', 'entry-2'],
+        'chunk_id': ['chunk-1', 'chunk-2', 'chunk-3'],
+        'text': ['first', 'second', 'third'],
+        'vector': pa.FixedSizeListArray.from_arrays(pa.array([0.0] * 12, type=pa.float32()).cast(value_type), 4),
+    }))
+
+
+def test_chunk_id_predicate():
+    assert chunk_id_predicate(['chunk-1', 'chunk-2']) == "chunk_id IN ('chunk-1', 'chunk-2')"
+
+
+def test_reembedded_schema_resizes_only_the_vectors(tmp_path):
+    source = _source_table(lancedb.connect(str(tmp_path)), value_type=pa.float16())
+
+    schema = reembedded_schema(source, dimensions=2)
+
+    assert schema.names == source.schema.names
+
+    assert schema.field('vector').type == pa.list_(pa.float16(), 2)
+
+
+def test_chunk_texts_reads_chunks_without_text_from_their_entry():
+    raw_storage = StubRawStorage({'entry-1': 'héllo world'})
+
+    reembedder = ChunkReembedder(embedding_model_id='model', embedding_dimensions=2, raw_storage=raw_storage)
+
+    texts = reembedder.chunk_texts([
+        {'chunk_id': 'chunk-1', 'entry_id': 'entry-1', 'text': 'stored'},
+        {'chunk_id': 'chunk-2', 'entry_id': 'entry-1', 'byte_start': 0, 'byte_end': 6},
+        {'chunk_id': 'chunk-3', 'entry_id': 'entry-1', 'byte_start': 7, 'byte_end': 12},
+    ])
+
+    assert texts == ['stored', 'héllo', 'world']
+
+    assert raw_storage.requested == ['entry-1']
+
+
+def test_chunk_texts_of_chunks_without_text_or_position():
+    reembedder = ChunkReembedder(embedding_model_id='model', embedding_dimensions=2, raw_storage=StubRawStorage({}))
+
+    with pytest.raises(ValueError):
+        reembedder.chunk_texts([{'chunk_id': 'chunk-1', 'entry_id': 'entry-1'}])
+
+
+def test_copy_reembeds_chunks_into_the_target_table(tmp_path, generators, monkeypatch):
+    monkeypatch.setattr(reembed, 'COPY_BATCH_SIZE', 2)
+
+    db = lancedb.connect(str(tmp_path))
+
+    source = _source_table(db)
+
+    target = db.create_table('target', schema=reembedded_schema(source, dimensions=2))
+
+    reembedder = ChunkReembedder(embedding_model_id='model', embedding_dimensions=2, raw_storage=StubRawStorage({}))
+
+    copied = reembedder.copy(source, target, chunk_ids=['chunk-1', 'chunk-3', 'chunk-missing'])
+
+    assert sorted(copied) == ['entry-1', 'entry-2']
+
+    rows = {row['chunk_id']: row for row in target.to_arrow().to_pylist()}
+
+    assert sorted(rows) == ['chunk-1', 'chunk-3']
+
+    assert rows['chunk-1']['vector'] == [5.0, 1.0]
+
+    assert rows['chunk-3']['text'] == 'third'
+
+    # Copying the same chunks again replaces them
+    reembedder.copy(source, target, chunk_ids=['chunk-1'])
+
+    assert target.count_rows() == 2
+
+    assert list(generators) == ['float']
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+from omnilake.constructs.archives.vector.tables.vector_stores.client import VectorStore
+from omnilake.constructs.archives.vector.runtime.shards import ShardStrategy, route_entry
+
+
+def _first_shard(shard_count, shard_strategy=ShardStrategy.HASH):
+    return VectorStore(
+        archive_id='archive',
+        bucket_name='bucket',
+        shard_count=shard_count,
+        shard_strategy=shard_strategy,
+    )
+
+
+def test_route_entry_of_a_single_shard():
+    assert route_entry(_first_shard(shard_count=1), entry_id='entry') == 0
+
+
+def test_route_entry_hash_is_stable_and_spreads_entries():
+    first_shard = _first_shard(shard_count=4)
+
+    routes = [route_entry(first_shard, entry_id=f'entry-{idx}') for idx in range(400)]
+
+    assert routes == [route_entry(first_shard, entry_id=f'entry-{idx}') for idx in range(400)]
+
+    assert set(routes) == {0, 1, 2, 3}
+
+    # Each shard receives roughly a quarter of the entries
+    assert all(60 <= routes.count(shard_number) <= 140 for shard_number in range(4))
+
+
+def test_route_entry_time_writes_to_the_last_shard():
+    first_shard = _first_shard(shard_count=3, shard_strategy=ShardStrategy.TIME)
+
+    assert {route_entry(first_shard, entry_id=f'entry-{idx}') for idx in range(20)} == {2}
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from omnilake.internal_lib.tags import normalize_tag, normalize_tags, tag_match_scores
+
+
+@pytest.mark.parametrize('tag, expected', [
+    ('Machine-Learning', 'machine learning'),
+    ('  machine_learning ', 'machine learning'),
+    ('MACHINE   LEARNING', 'machine learning'),
+    ('Straße', 'strasse'),
+    ('ｆｕｌｌ width', 'full width'),
+    (' - ', ''),
+])
+def test_normalize_tag(tag, expected):
+    assert normalize_tag(tag) == expected
+
+
+def test_normalize_tags_keeps_order_and_drops_empty_and_duplicates():
+    assert normalize_tags(['AI', 'Machine-Learning', '', 'ai', 'machine learning', 'Data']) == [
+        'ai',
+        'machine learning',
+        'data',
+    ]
+
+
+def test_tag_match_scores_normalizes_both_sides():
+    scores = tag_match_scores(
+        candidate_tags=[['Machine-Learning', 'AI'], ['ai', 'AI'], ['other'], [], None],
+        target_tags=['machine learning', 'Ai'],
+    )
+
+    assert scores.tolist() == [100.0, 50.0, 0.0, 0.0, 0.0]
+
+
+def test_tag_match_scores_without_targets():
+    assert tag_match_scores(candidate_tags=[['ai']], target_tags=[]).tolist() == [0.0]
+
+    assert tag_match_scores(candidate_tags=[], target_tags=['ai']).tolist() == []
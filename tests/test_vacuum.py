@@ -0,0 +1,187 @@
+import pytest
+
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+import lancedb
+
+from omnilake.constructs.archives.vector.runtime import vacuum
+from omnilake.constructs.archives.vector.tables.vector_store_chunks.client import (
+    VectorStoreChunk,
+    VectorStoreChunksClient,
+)
+
+
+class StubDynamoDBClient:
+    """
+    DynamoDB client recording the batch requests, leaving the first request of every batch unprocessed
+    """
+    def __init__(self, table_name, recorded_entry_ids=None):
+        self.table_name = table_name
+
+        self.recorded_entry_ids = recorded_entry_ids or {}
+
+        self.batch_writes = []
+
+        self.batch_gets = []
+
+    def batch_write_item(self, RequestItems):
+        requests = RequestItems[self.table_name]
+
+        self.batch_writes.append(requests)
+
+        if len(requests) > 1:
+            return {'UnprocessedItems': {self.table_name: requests[:1]}}
+
+        return {}
+
+    def batch_get_item(self, RequestItems):
+        keys = RequestItems[self.table_name]['Keys']
+
+        self.batch_gets.append(RequestItems[self.table_name])
+
+        items = [
+            {**key, 'EntryId': {'S': self.recorded_entry_ids[key['ChunkId']['S']]}}
+            for key in keys if key['ChunkId']['S'] in self.recorded_entry_ids
+        ]
+
+        return {'Responses': {self.table_name: items}}
+
+
+def _chunks_client(dynamodb_client):
+    # Built without resource discovery, only the low level client and the table name are used by batch requests
+    chunks_client = VectorStoreChunksClient.__new__(VectorStoreChunksClient)
+
+    chunks_client.client = dynamodb_client
+
+    chunks_client.table_endpoint_name = dynamodb_client.table_name
+
+    chunks_client.BATCH_WRITE_RETRY_BASE_SECONDS = 0
+
+    return chunks_client
+
+
+def _chunk(chunk_id, entry_id, vector_store_id='store-0'):
+    return VectorStoreChunk(archive_id='archive', chunk_id=chunk_id, entry_id=entry_id, vector_store_id=vector_store_id)
+
+
+def test_batch_delete_batches_and_retries_unprocessed_deletes():
+    dynamodb_client = StubDynamoDBClient(table_name='chunks')
+
+    _chunks_client(dynamodb_client).batch_delete([_chunk(f'chunk-{idx}', 'entry-1') for idx in range(30)])
+
+    # Two batches of 25 and 5 deletes, each retrying its unprocessed delete once
+    assert [len(requests) for requests in dynamodb_client.batch_writes] == [25, 1, 5, 1]
+
+    assert dynamodb_client.batch_writes[0][0] == {
+        'DeleteRequest': {'Key': {'ArchiveId': {'S': 'archive'}, 'ChunkId': {'S': 'chunk-0'}}},
+    }
+
+
+def test_filter_unchanged_skips_reassigned_and_removed_chunks():
+    dynamodb_client = StubDynamoDBClient(
+        table_name='chunks',
+        recorded_entry_ids={'chunk-1': 'entry-1', 'chunk-2': 'entry-2'},
+    )
+
+    chunks = [_chunk('chunk-1', 'entry-1'), _chunk('chunk-2', 'entry-1'), _chunk('chunk-3', 'entry-1')]
+
+    unchanged = _chunks_client(dynamodb_client).filter_unchanged(chunks)
+
+    assert [chunk.chunk_id for chunk in unchanged] == ['chunk-1']
+
+    assert dynamodb_client.batch_gets[0]['ConsistentRead']
+
+
+class _VectorStore:
+    def __init__(self, vector_store_id, shard_number, total_chunks, total_entries):
+        self.vector_store_id = vector_store_id
+
+        self.shard_number = shard_number
+
+        self.total_chunks = total_chunks
+
+        self.total_entries = total_entries
+
+        self.table_writes_since_compaction = 0
+
+    def storage_table_name(self):
+        return self.vector_store_id
+
+
+def test_delete_entries_index_deletes_from_the_shards_of_the_chunks(tmp_path, monkeypatch):
+    db = lancedb.connect(str(tmp_path))
+
+    rows = {
+        'store-0': [('entry-1', 'chunk-1'), ('entry-1', 'chunk-2'), ('entry-3', 'chunk-5')],
+        'store-1': [('entry-2', 'chunk-3'), ('entry-2', 'chunk-4')],
+    }
+
+    for vector_store_id, store_rows in rows.items():
+        db.create_table(vector_store_id, data=[
+            {'entry_id': entry_id, 'chunk_id': chunk_id, 'vector': [1.0, 0.0]} for entry_id, chunk_id in store_rows
+        ])
+
+    recorded_chunks = {
+        'entry-1': [_chunk('chunk-1', 'entry-1'), _chunk('chunk-2', 'entry-1')],
+        'entry-2': [_chunk('chunk-3', 'entry-2', 'store-1'), _chunk('chunk-4', 'entry-2', 'store-1')],
+    }
+
+    shards = [_VectorStore('store-0', 0, 3, 2), _VectorStore('store-1', 1, 2, 1)]
+
+    deleted_chunks = []
+
+    class StubChunksClient:
+        def get_chunks_by_archive_and_entry(self, archive_id, entry_id):
+            return recorded_chunks.get(entry_id, [])
+
+        def filter_unchanged(self, chunks):
+            return chunks
+
+        def batch_delete(self, chunks):
+            deleted_chunks.extend(chunk.chunk_id for chunk in chunks)
+
+    class StubVectorStoresClient:
+        def get_shards(self, archive_id):
+            return shards
+
+        def put(self, vector_store):
+            pass
+
+    class StubPolicy:
+        @staticmethod
+        def from_settings():
+            return StubPolicy()
+
+        def compaction_required(self, vector_store, previous_table_writes):
+            return vector_store.table_writes_since_compaction > previous_table_writes
+
+    class StubRegistry:
+        def open_table(self, name, latest=False):
+            return db.open_table(name)
+
+    monkeypatch.setattr(vacuum, 'VectorStoreChunksClient', StubChunksClient)
+
+    monkeypatch.setattr(vacuum, 'VectorStoresClient', StubVectorStoresClient)
+
+    monkeypatch.setattr(vacuum, 'VectorIndexPolicy', StubPolicy)
+
+    monkeypatch.setattr(vacuum, 'get_table_registry', StubRegistry)
+
+    monkeypatch.setattr(vacuum, 'bump_archive_write_version', lambda archive_id: None)
+
+    compaction_required = vacuum.delete_entries_index(entry_ids=['entry-1', 'entry-2'], archive_id='archive')
+
+    assert compaction_required == [0, 1]
+
+    assert deleted_chunks == ['chunk-1', 'chunk-2', 'chunk-3', 'chunk-4']
+
+    assert db.open_table('store-0').to_arrow().column('chunk_id').to_pylist() == ['chunk-5']
+
+    assert db.open_table('store-1').count_rows() == 0
+
+    assert [(shard.total_chunks, shard.total_entries) for shard in shards] == [(1, 1), (0, 0)]
+
+
+def test_delete_entries_index_of_no_entries():
+    assert vacuum.delete_entries_index(entry_ids=[], archive_id='archive') == []
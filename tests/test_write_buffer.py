@@ -0,0 +1,190 @@
+import io
+
+from datetime import datetime, timedelta, UTC as utc_tz
+
+import pytest
+
+pytest.importorskip('lancedb')
+pytest.importorskip('da_vinci')
+
+import lancedb
+import pyarrow as pa
+
+from botocore.exceptions import ClientError
+
+from omnilake.constructs.archives.vector.runtime import flush
+from omnilake.constructs.archives.vector.runtime.write_buffer import VectorWriteBuffer
+
+
+class StubS3Client:
+    """
+    S3 client holding the objects of a single bucket in memory, with conditional writes
+    """
+    def __init__(self):
+        self.objects = {}
+
+        self.delete_requests = 0
+
+    def _precondition_failed(self):
+        return ClientError({'Error': {'Code': 'PreconditionFailed'}}, 'PutObject')
+
+    def put_object(self, Bucket, Key, Body, IfNoneMatch=None, IfMatch=None):
+        if IfNoneMatch == '*' and Key in self.objects:
+            raise self._precondition_failed()
+
+        if IfMatch is not None:
+            if Key not in self.objects:
+                raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'PutObject')
+
+            if self.objects[Key]['ETag'] != IfMatch:
+                raise self._precondition_failed()
+
+        self.objects[Key] = {'Body': Body, 'ETag': str(hash(Body)), 'LastModified': datetime.now(utc_tz)}
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[Key]['Body'])}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+        return self.objects[Key]
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_requests += 1
+
+        for obj in Delete['Objects']:
+            self.objects.pop(obj['Key'], None)
+
+    def get_paginator(self, operation_name):
+        objects = self.objects
+
+        class _Paginator:
+            def paginate(self, Bucket, Prefix):
+                keys = [key for key in objects if key.startswith(Prefix)]
+
+                # Pages of two keys, in no particular order
+                for idx in range(0, len(keys), 2):
+                    yield {'Contents': [{'Key': key} for key in reversed(keys[idx:idx + 2])]}
+
+        return _Paginator()
+
+
+@pytest.fixture
+def table(tmp_path):
+    return lancedb.connect(str(tmp_path)).create_table('chunks', data=[
+        {'entry_id': 'entry-0', 'chunk_id': 'chunk-0', 'vector': [0.0, 0.0]},
+    ])
+
+
+def _rows(count, start=0):
+    return [
+        {'entry_id': f'entry-{idx}', 'chunk_id': f'chunk-{idx}', 'vector': [float(idx), 1.0]}
+        for idx in range(start, start + count)
+    ]
+
+
+def test_staged_rows_round_trip(table):
+    write_buffer = VectorWriteBuffer(bucket_name='bucket', vector_store_id='store', s3_client=StubS3Client())
+
+    first_key = write_buffer.stage(table, _rows(3))
+
+    second_key = write_buffer.stage(table, _rows(2, start=3))
+
+    assert first_key.startswith('staged_writes/store/')
+
+    assert [VectorWriteBuffer.staged_rows(key) for key in (first_key, second_key)] == [3, 2]
+
+    assert write_buffer.staged_keys() == [first_key, second_key]
+
+    assert write_buffer.staged_keys(max_keys=1) == [first_key]
+
+    staged, staged_rows = write_buffer.load(write_buffer.staged_keys())
+
+    assert staged_rows == 5
+
+    assert staged.column('chunk_id').to_pylist() == [f'chunk-{idx}' for idx in range(5)]
+
+    assert staged.schema == table.schema
+
+
+def test_load_of_nothing_staged(table):
+    write_buffer = VectorWriteBuffer(bucket_name='bucket', vector_store_id='store', s3_client=StubS3Client())
+
+    assert write_buffer.load([]) == (None, 0)
+
+
+def test_remove_deletes_in_batches(table, monkeypatch):
+    s3_client = StubS3Client()
+
+    write_buffer = VectorWriteBuffer(bucket_name='bucket', vector_store_id='store', s3_client=s3_client)
+
+    monkeypatch.setattr('omnilake.constructs.archives.vector.runtime.write_buffer.DELETE_OBJECTS_LIMIT', 2)
+
+    for idx in range(5):
+        write_buffer.stage(table, _rows(1, start=idx))
+
+    write_buffer.remove(write_buffer.staged_keys())
+
+    assert write_buffer.staged_keys() == []
+
+    assert s3_client.delete_requests == 3
+
+
+def test_lock_is_held_by_a_single_flusher():
+    s3_client = StubS3Client()
+
+    first = VectorWriteBuffer(bucket_name='bucket', vector_store_id='store', s3_client=s3_client)
+
+    second = VectorWriteBuffer(bucket_name='bucket', vector_store_id='store', s3_client=s3_client)
+
+    assert first.acquire_lock(lock_seconds=60)
+
+    assert not second.acquire_lock(lock_seconds=60)
+
+    first.release_lock()
+
+    assert second.acquire_lock(lock_seconds=60)
+
+
+def test_abandoned_lock_is_taken_over():
+    s3_client = StubS3Client()
+
+    write_buffer = VectorWriteBuffer(bucket_name='bucket', vector_store_id='store', s3_client=s3_client)
+
+    assert write_buffer.acquire_lock(lock_seconds=60)
+
+    s3_client.objects[write_buffer.lock_key]['LastModified'] -= timedelta(seconds=120)
+
+    abandoned_etag = s3_client.objects[write_buffer.lock_key]['ETag']
+
+    assert write_buffer.acquire_lock(lock_seconds=60)
+
+    assert s3_client.objects[write_buffer.lock_key]['ETag'] != abandoned_etag
+
+
+def test_reconcile_staged_entries_drops_removed_entries_and_applies_tags(monkeypatch):
+    class _IndexedEntry:
+        def __init__(self, tags):
+            self.tags = tags
+
+    class StubIndexedEntriesClient:
+        def get(self, archive_id, entry_id):
+            return {'entry-1': _IndexedEntry(['generated']), 'entry-3': _IndexedEntry(None)}.get(entry_id)
+
+    monkeypatch.setattr(flush, 'IndexedEntriesClient', StubIndexedEntriesClient)
+
+    staged = pa.table({
+        'entry_id': ['entry-1', 'entry-2', 'entry-1', 'entry-3'],
+        'chunk_id': ['chunk-1', 'chunk-2', 'chunk-3', 'chunk-4'],
+        'tags': pa.array([[], ['removed'], [], ['stale']], type=pa.list_(pa.string())),
+    })
+
+    reconciled = flush.reconcile_staged_entries(archive_id='archive', staged_data=staged)
+
+    assert reconciled.column('chunk_id').to_pylist() == ['chunk-1', 'chunk-3', 'chunk-4']
+
+    assert reconciled.column('tags').to_pylist() == [['generated'], ['generated'], []]